@@ -0,0 +1,418 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+DRIVERS MANAGEMENT - CONTACT RATE COMMERCE
+══════════════════════════════════════════════════════════════════════════════
+Description: Management and validation of driver values for CR calculation
+
+DriverStore (--driver-store):
+  Drivers (CR denominator) do not depend on the commerce group, only on the
+  driver type of config/drivers_mapping.get_driver_config:
+    - Orders (BT_ORD_ORDERS by ORD_CLOSED_DT, site-filtered or global)
+    - Shipping (BT_CX_DRIVERS_CR by MONTH_ID, one measure per commerce group)
+  The store fetches daily order counts and monthly Shipping drivers for every
+  site once, persists them as Parquet and answers drv(site_or_group, start,
+  end, driver_type) and the weekly series from memory. Every report and the
+  cross-site cuadro share it; only the days / months it is missing go to
+  BigQuery. The most recent DIAS_ABIERTOS days (and the month they fall in,
+  for Shipping) are still being completed upstream: they are read on every
+  run and never persisted.
+
+Layout:
+  {store_dir}/
+      manifest.json               → loaded days (orders) and months (shipping)
+      orders/{YYYY-MM}.parquet    → FECHA, SIT_SITE_ID, ORDERS, ORDERS_DISTINTAS
+      shipping.parquet            → MONTH_ID, SIT_SITE_ID, one column per measure
+
+Usage:
+  from calculations.drivers_management import DriverStore, driver_type
+
+  store = DriverStore.shared('.cache/drivers', backend=backend)
+  store.prefetch('2025-07-01', '2025-12-31')
+  store.drv('MLB', '2025-12-01', '2025-12-31', driver_type(get_driver_config('PDD')))
+
+Version: 2.5 (Commerce)
+Last Update: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.drivers_mapping import DRIVER_CONFIG
+from config.site_groups import get_site_list
+from utils.local_store import dias, escribir_parquet, guardar_manifest, leer_manifest, ultimo_cerrado
+from utils.report_queries import build_daily_orders_query, build_shipping_drivers_query, weekly_start
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_STORE_DIR = '.cache/drivers'
+
+# Bump when the partition format changes (the store is loaded again)
+STORE_VERSION = 1
+
+# Driver types: order rows or one BT_CX_DRIVERS_CR measure
+ORDERS = 'ORDERS'
+SHIPPING_MEASURES = sorted({
+    config['count_expression'].replace('SUM(drv.', '').replace(')', '')
+    for config in DRIVER_CONFIG.values() if config['type'] == 'shipping_drivers'
+})
+
+# Sources of the store (orders by day, shipping by month)
+SOURCES = ('orders', 'shipping')
+
+
+def driver_type(driver_config: dict) -> str:
+    """Driver type of a commerce group: ORDERS or its BT_CX_DRIVERS_CR measure."""
+    if driver_config['type'] == 'shipping_drivers':
+        return driver_config['count_expression'].replace('SUM(drv.', '').replace(')', '')
+    return ORDERS
+
+
+def _months(start: str, end: str) -> list:
+    """YYYY-MM months between start and end (inclusive)."""
+    return sorted({d[:7] for d in dias(start, end)})
+
+
+def _month_end(month: str) -> str:
+    """Last day of a YYYY-MM month."""
+    first = date.fromisoformat(f'{month}-01')
+    return ((first + timedelta(days=32)).replace(day=1) - timedelta(days=1)).isoformat()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DRIVERS MANAGER CLASS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class DriversManager:
+    """
+    Manage driver values for CR calculation
+
+    Structure:
+        {
+            'MLA': {
+                '2026-01': 1500000,
+                '2026-02': 1600000
+            },
+            'MLB': {
+                '2026-01': 5000000,
+                '2026-02': 5200000
+            }
+        }
+    """
+
+    def __init__(self):
+        self.drivers_by_site = {}
+
+    def get_driver(self, site: str, period: str) -> Optional[float]:
+        """Get driver value for site and period"""
+        return self.drivers_by_site.get(site, {}).get(period, None)
+
+    def set_driver(self, site: str, period: str, value: float) -> None:
+        """Set driver value for site and period"""
+        if site not in self.drivers_by_site:
+            self.drivers_by_site[site] = {}
+        self.drivers_by_site[site][period] = value
+
+    def get_all_drivers(self) -> Dict:
+        """Get all configured drivers"""
+        return self.drivers_by_site.copy()
+
+    def clear_drivers(self) -> None:
+        """Clear all configured drivers"""
+        self.drivers_by_site.clear()
+
+    def validate_drivers(self, required_sites: List[str], required_periods: List[str]) -> Dict:
+        """
+        Validate that all required drivers are configured
+
+        Returns:
+            dict: Validation summary with missing drivers
+        """
+        missing = []
+
+        for site in required_sites:
+            for period in required_periods:
+                driver = self.get_driver(site, period)
+                if driver is None or driver <= 0:
+                    missing.append({'site': site, 'period': period})
+
+        return {
+            'is_valid': len(missing) == 0,
+            'missing_count': len(missing),
+            'missing_drivers': missing
+        }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DRIVER STORE CLASS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class DriverStore(DriversManager):
+    """
+    Persistent, thread-safe store of daily order and monthly Shipping drivers per site
+
+    Drivers set with set_driver() still take precedence in get_driver();
+    everything else is answered from the loaded counts. All partitions are
+    kept in memory after the first read: use shared() so the reports of a
+    process (queue, server, batch) share one instance per directory.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR, backend=None, today: date = None):
+        """
+        Args:
+            store_dir: Store directory
+            backend: QueryBackend for prefetch() (optional)
+            today: Reference date for the open days (default: today)
+        """
+        super().__init__()
+        self.path = Path(store_dir)
+        self.backend = backend
+        self.last_closed = ultimo_cerrado(today).isoformat()
+        self.loaded_days = 0
+        self._data = None     # source → DataFrame (disk partitions + open rows of this process)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def shared(cls, store_dir: str = DEFAULT_STORE_DIR, backend=None) -> 'DriverStore':
+        """Instance shared by every report of the process for a directory."""
+        key = os.path.abspath(store_dir)
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls._instances[key] = cls(store_dir, backend=backend)
+            elif store.backend is None:
+                store.backend = backend
+            return store
+
+    # ──────────────────────────────────────────────
+    # Loaded days / months
+    # ──────────────────────────────────────────────
+
+    def _manifest(self) -> dict:
+        """{source: set of loaded days (orders) or months (shipping)} (empty if missing or another version)."""
+        manifest = leer_manifest(self.path / 'manifest.json', self._header(), 'DRIVERS')
+        return {source: set(values) for source, values in manifest.get('loaded', {}).items()}
+
+    def _save_manifest(self, loaded: dict):
+        guardar_manifest(self.path / 'manifest.json', self._header(),
+                         loaded={s: sorted(v) for s, v in loaded.items()})
+
+    @staticmethod
+    def _header() -> dict:
+        """Manifest fields that must match (partition format and Shipping measures)."""
+        return {'version': STORE_VERSION, 'measures': SHIPPING_MEASURES}
+
+    def _closed(self, source: str, value: str) -> bool:
+        """Whether a day (orders) or month (shipping) is complete upstream and can be persisted."""
+        return (value if source == 'orders' else _month_end(value)) <= self.last_closed
+
+    def missing_range(self, source: str, start: str, end: str, refresh: bool = False):
+        """
+        Range to read from BigQuery so the store covers [start, end].
+
+        Args:
+            source: 'orders' or 'shipping'
+            start, end: Dates needed (YYYY-MM-DD, inclusive)
+            refresh: Consider every day / month missing (read again and overwritten)
+
+        Returns:
+            (start, end) to read (whole months for shipping) or None if the store has everything
+        """
+        loaded = set() if refresh else self._manifest().get(source, set())
+        if source == 'orders':
+            missing = [d for d in dias(start, end) if d not in loaded]
+            return (missing[0], missing[-1]) if missing else None
+        missing = [m for m in _months(start, end) if m not in loaded]
+        return (f'{missing[0]}-01', _month_end(missing[-1])) if missing else None
+
+    # ──────────────────────────────────────────────
+    # Write
+    # ──────────────────────────────────────────────
+
+    def _empty(self, source: str):
+        import pandas as pd
+
+        if source == 'orders':
+            return pd.DataFrame({'FECHA': pd.Series(dtype='datetime64[ns]'), 'SIT_SITE_ID': pd.Series(dtype='object'),
+                                 'ORDERS': pd.Series(dtype='int64'), 'ORDERS_DISTINTAS': pd.Series(dtype='int64')})
+        return pd.DataFrame({'MONTH_ID': pd.Series(dtype='datetime64[ns]'), 'SIT_SITE_ID': pd.Series(dtype='object'),
+                             **{m: pd.Series(dtype='float64') for m in SHIPPING_MEASURES}})
+
+    def _normalize(self, source: str, df):
+        """Column order and dtypes of the partitions."""
+        import pandas as pd
+
+        fecha = 'FECHA' if source == 'orders' else 'MONTH_ID'
+        df = df[list(self._empty(source).columns)].copy()
+        df[fecha] = pd.to_datetime(df[fecha]).astype('datetime64[ns]')
+        df['SIT_SITE_ID'] = df['SIT_SITE_ID'].astype(str).astype(object)
+        if source == 'orders':
+            return df.astype({'ORDERS': 'int64', 'ORDERS_DISTINTAS': 'int64'})
+        return df.astype({m: 'float64' for m in SHIPPING_MEASURES})
+
+    def _frame(self, source: str):
+        """In-memory data of a source (all partitions are read from disk the first time)."""
+        import pandas as pd
+
+        with self._lock:
+            if self._data is None:
+                loaded = self._manifest()
+                self._data = {}
+                for name in SOURCES:
+                    if name == 'orders':
+                        paths = sorted((self.path / 'orders').glob('*.parquet')) if loaded.get('orders') else []
+                    else:
+                        paths = [self.path / 'shipping.parquet'] if loaded.get('shipping') else []
+                    parts = [pd.read_parquet(p) for p in paths if p.exists()]
+                    self._data[name] = (self._normalize(name, pd.concat(parts, ignore_index=True))
+                                        if parts else self._empty(name))
+            return self._data[source]
+
+    def update(self, source: str, df, start: str, end: str):
+        """
+        Incorporate the result of build_daily_orders_query / build_shipping_drivers_query for [start, end].
+
+        Closed days / months replace the stored ones and are registered in the
+        manifest; open ones only stay in memory (they are missing for the next run).
+
+        Args:
+            source: 'orders' or 'shipping'
+            df: Query result (every site)
+            start, end: Range read (inclusive)
+        """
+        import pandas as pd
+
+        fecha = 'FECHA' if source == 'orders' else 'MONTH_ID'
+        df = self._normalize(source, df)
+        values = dias(start, end) if source == 'orders' else _months(start, end)
+        closed = [v for v in values if self._closed(source, v)]
+
+        with self._lock:
+            data = self._frame(source)
+            keys = data[fecha].dt.strftime('%Y-%m-%d' if source == 'orders' else '%Y-%m')
+            data = pd.concat([data[~keys.isin(values)], df], ignore_index=True)
+            self._data[source] = data.sort_values([fecha, 'SIT_SITE_ID']).reset_index(drop=True)
+            if source == 'orders':
+                self.loaded_days += len(values)
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            loaded = self._manifest()
+            if closed:
+                self._write(source, closed)
+            loaded[source] = loaded.get(source, set()) | set(closed)
+            # The manifest goes last: it only lists days whose partitions are on disk
+            self._save_manifest(loaded)
+
+    def _write(self, source: str, closed: list):
+        """Persist the closed days / months of the in-memory data (atomic writes)."""
+        data = self._data[source]
+        if source == 'orders':
+            writes = []
+            for month in sorted({d[:7] for d in closed}):
+                rows = data[data['FECHA'].dt.strftime('%Y-%m') == month]
+                open_days = rows['FECHA'].dt.strftime('%Y-%m-%d') > self.last_closed
+                writes.append((self.path / 'orders' / f'{month}.parquet', rows[~open_days]))
+        else:
+            open_months = data['MONTH_ID'].dt.strftime('%Y-%m').map(lambda m: not self._closed(source, m))
+            writes = [(self.path / 'shipping.parquet', data[~open_months])]
+
+        for path, rows in writes:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            escribir_parquet(rows, path)
+
+    def prefetch(self, start: str, end: str, sources=SOURCES, refresh: bool = False, backend=None) -> int:
+        """
+        Bulk load of whatever the store is missing for [start, end] (one query per source).
+
+        Args:
+            start, end: Dates (YYYY-MM-DD, inclusive)
+            sources: Sources to load ('orders', 'shipping')
+            refresh: Read everything again
+            backend: QueryBackend (default: the one given to the constructor)
+
+        Returns:
+            Number of queries executed
+        """
+        backend = backend or self.backend
+        if backend is None:
+            raise ValueError("DriverStore.prefetch needs a query backend")
+        queries = 0
+        for source in sources:
+            missing = self.missing_range(source, start, end, refresh)
+            if missing is None:
+                continue
+            if source == 'orders':
+                query = build_daily_orders_query(*missing)
+            else:
+                query = build_shipping_drivers_query(*missing, SHIPPING_MEASURES)
+            self.update(source, backend.to_dataframe(query), *missing)
+            queries += 1
+        return queries
+
+    # ──────────────────────────────────────────────
+    # Read
+    # ──────────────────────────────────────────────
+
+    def _rows(self, source: str, site_or_group: Optional[str], start: str, end: str):
+        """Rows of the sites (None = global) between start and end."""
+        import pandas as pd
+
+        data = self._frame(source)
+        fecha = 'FECHA' if source == 'orders' else 'MONTH_ID'
+        mask = (data[fecha] >= pd.Timestamp(start)) & (data[fecha] <= pd.Timestamp(end))
+        if site_or_group is not None:
+            mask &= data['SIT_SITE_ID'].isin(get_site_list(site_or_group))
+        return data[mask]
+
+    def drv(self, site_or_group: Optional[str], start: str, end: str, driver_type: str = ORDERS) -> int:
+        """
+        Driver of a site, site group or global (None) between start and end.
+
+        Same semantics as build_drivers_total_query: order rows with
+        ORD_CLOSED_DT in [start, end], or the Shipping measure of the months
+        with MONTH_ID in [start, end].
+        """
+        with self._lock:
+            if driver_type == ORDERS:
+                return int(self._rows('orders', site_or_group, start, end)['ORDERS'].sum())
+            return int(self._rows('shipping', site_or_group, start, end)[driver_type].sum())
+
+    def weekly(self, site_or_group: Optional[str], p2_end: str):
+        """
+        Weekly orders of the PASO 2 series (same columns as build_weekly_drivers_query).
+
+        Distinct orders are summed per day: an order has a single ORD_CLOSED_DT.
+
+        Returns:
+            DataFrame[SEMANA, ORDERS]
+        """
+        import pandas as pd
+
+        with self._lock:
+            rows = self._rows('orders', site_or_group, weekly_start(p2_end), p2_end)
+        rows = rows.assign(SEMANA=rows['FECHA'] - pd.to_timedelta(rows['FECHA'].dt.weekday, unit='D'))
+        return (rows.groupby('SEMANA', as_index=False)['ORDERS_DISTINTAS'].sum()
+                .rename(columns={'ORDERS_DISTINTAS': 'ORDERS'}))
+
+    def get_driver(self, site: str, period: str) -> Optional[float]:
+        """Get driver value for site and period (YYYY-MM): set_driver() value or monthly orders of the store"""
+        value = super().get_driver(site, period)
+        if value is not None:
+            return value
+        orders = self.drv(site, f'{period}-01', _month_end(period))
+        return float(orders) if orders else None
+
+
+# REFERENCES:
+# - Contact Rate calc: /calculations/contact-rate.py
+# - Business context: /docs/business-context.md
+# - Driver types: /config/drivers_mapping.py
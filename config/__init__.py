@@ -14,6 +14,7 @@ from .causas_sinonimos import (
 from .site_groups import (
     resolve_site_sql,
     get_site_list,
+    get_report_sites,
     is_site_group,
     get_site_display_name,
     SITE_GROUPS,
@@ -30,6 +31,7 @@ __all__ = [
     'UMBRAL_CONFIRMADO',
     'resolve_site_sql',
     'get_site_list',
+    'get_report_sites',
     'is_site_group',
     'get_site_display_name',
     'SITE_GROUPS',
@@ -18,6 +18,9 @@ Referencias:
 ══════════════════════════════════════════════════════════════════════════════
 """
 
+import itertools
+import re
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN DE DRIVERS ALTERNATIVOS
@@ -1401,6 +1404,142 @@ def listar_drivers_disponibles(commerce_group: str = None) -> list:
     return resultado
 
 
+def buscar_driver_alternativo(commerce_group: str, driver_key: str) -> tuple:
+    """
+    Ubica un driver alternativo del commerce group solo por su key (sin proceso ni CDU).
+
+    Args:
+        commerce_group: Nombre del Commerce Group (acepta aliases, ej: 'FBM_SELLERS')
+        driver_key: Key del driver alternativo (acepta aliases)
+
+    Returns:
+        (commerce_group, proceso, cdu, driver_key) para build_driver_query y el batch.
+
+    Raises:
+        KeyError: Si el commerce group no tiene ese driver.
+    """
+    dk = _normalize(driver_key)
+    disponibles = listar_drivers_disponibles(commerce_group)
+    for d in disponibles:
+        if d['driver_key'] == dk:
+            return d['commerce_group'], d['proceso_key'], d['cdu_key'], d['driver_key']
+    raise KeyError(
+        f"Driver alternativo '{driver_key}' no encontrado para {commerce_group}. "
+        f"Disponibles: {[d['driver_key'] for d in disponibles]}"
+    )
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EVALUACIÓN BATCH DE DRIVERS ALTERNATIVOS
+# ══════════════════════════════════════════════════════════════════════════════
+# Comparar varias alternativas (o una alternativa en varios sites) con las
+# funciones de arriba cuesta una query por driver, site y tipo. El batch arma
+# una sola query por tabla_fuente con todas las ramas (UNION ALL) y las tablas
+# se ejecutan en paralelo: comparar las alternativas de un CDU es ~1 ida y
+# vuelta a BigQuery.
+
+def _rama_batch(driver_id: int, site: str, query: str, semanal: bool) -> str:
+    """Rama del UNION ALL: id del driver, site y las columnas comunes del batch."""
+    if semanal:
+        # El orden no se conserva dentro del UNION ALL
+        query = re.sub(r'\s*ORDER BY SEMANA\s*$', '', query)
+        columnas = ("'SEMANAL' AS TIPO, CAST(SEMANA AS DATE) AS SEMANA, "
+                    "CAST(NULL AS INT64) AS DRV_P1, CAST(NULL AS INT64) AS DRV_P2, DRIVER")
+    else:
+        columnas = ("'TOTAL' AS TIPO, CAST(NULL AS DATE) AS SEMANA, "
+                    "DRV_P1, DRV_P2, CAST(NULL AS INT64) AS DRIVER")
+    return f"SELECT {driver_id} AS ID, '{site}' AS SIT_SITE_ID, {columnas}\nFROM (\n{query}\n)"
+
+
+def build_batch_driver_queries(drivers: list, p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                               sites: list, incluir_semanal: bool = True) -> dict:
+    """
+    Construye una query por tabla fuente con todos los drivers alternativos pedidos.
+
+    Cada (driver, site) es una rama del UNION ALL con el mismo SQL que
+    build_driver_query (y build_weekly_query si incluir_semanal). Los sites
+    fuera de sites_disponibles de un driver se omiten.
+
+    Args:
+        drivers: Lista de (commerce_group, proceso, cdu, driver_key)
+        p1_start: Fecha inicio P1 (YYYY-MM-DD)
+        p1_end: Fecha fin P1 (YYYY-MM-DD)
+        p2_start: Fecha inicio P2 (YYYY-MM-DD)
+        p2_end: Fecha fin P2 (YYYY-MM-DD)
+        sites: Sites a evaluar (ej: ['MLA', 'MLB'])
+        incluir_semanal: Agregar las ramas de la serie semanal
+
+    Returns:
+        {tabla_fuente: query} con columnas ID (posición en drivers), SIT_SITE_ID,
+        TIPO ('TOTAL' o 'SEMANAL'), SEMANA, DRV_P1, DRV_P2 y DRIVER.
+
+    Raises:
+        KeyError: Si algún driver no existe.
+    """
+    ramas = {}
+    for driver_id, (commerce_group, proceso, cdu, driver_key) in enumerate(drivers):
+        config = get_driver_alternativo(commerce_group, proceso, cdu, driver_key)
+        sites_ok = config.get('sites_disponibles', [])
+        tabla = ramas.setdefault(config['tabla_fuente'], [])
+        for site in sites:
+            if sites_ok and site not in sites_ok:
+                continue
+            driver = (commerce_group, proceso, cdu, driver_key)
+            query = build_driver_query(*driver, p1_start, p1_end, p2_start, p2_end, site)
+            tabla.append(_rama_batch(driver_id, site, query, semanal=False))
+            if incluir_semanal:
+                query = build_weekly_query(*driver, p2_end, site)
+                tabla.append(_rama_batch(driver_id, site, query, semanal=True))
+
+    return {tabla: '\nUNION ALL\n'.join(partes) for tabla, partes in ramas.items() if partes}
+
+
+_LLAMADAS = itertools.count()
+
+
+def evaluar_drivers_alternativos(scheduler, drivers: list, p1_start: str, p1_end: str,
+                                 p2_start: str, p2_end: str, sites: list,
+                                 incluir_semanal: bool = True):
+    """
+    Ejecuta el batch de build_batch_driver_queries: un job por tabla, en paralelo.
+
+    Args:
+        scheduler: QueryScheduler (utils.query_scheduler)
+        drivers, p1_start, p1_end, p2_start, p2_end, sites, incluir_semanal:
+            Mismos que build_batch_driver_queries.
+
+    Returns:
+        (df_totales, df_semanal):
+        - df_totales: COMMERCE_GROUP, PROCESO, CDU, DRIVER_KEY, LABEL, SIT_SITE_ID, DRV_P1, DRV_P2
+        - df_semanal: COMMERCE_GROUP, PROCESO, CDU, DRIVER_KEY, LABEL, SIT_SITE_ID, SEMANA, DRIVER
+    """
+    import pandas as pd
+
+    queries = build_batch_driver_queries(drivers, p1_start, p1_end, p2_start, p2_end, sites, incluir_semanal)
+    # Nombres por tabla_fuente completa (dos datasets pueden tener tablas homónimas) y
+    # por llamada (el mismo scheduler puede evaluar drivers más de una vez)
+    llamada = next(_LLAMADAS)
+    nombres = [f"driver_alt_{llamada}_{tabla}" for tabla in queries]
+    for nombre, query in zip(nombres, queries.values()):
+        scheduler.submit(nombre, query)
+
+    claves = ['COMMERCE_GROUP', 'PROCESO', 'CDU', 'DRIVER_KEY', 'LABEL', 'SIT_SITE_ID']
+    info = pd.DataFrame([
+        {'ID': driver_id, 'COMMERCE_GROUP': cg, 'PROCESO': proceso, 'CDU': cdu, 'DRIVER_KEY': driver_key,
+         'LABEL': get_driver_alternativo(cg, proceso, cdu, driver_key).get('label', driver_key)}
+        for driver_id, (cg, proceso, cdu, driver_key) in enumerate(drivers)
+    ], columns=['ID'] + claves[:-1])
+    resultados = [scheduler.result(nombre) for nombre in nombres]
+    df = (pd.concat(resultados, ignore_index=True) if resultados else
+          pd.DataFrame(columns=['ID', 'SIT_SITE_ID', 'TIPO', 'SEMANA', 'DRV_P1', 'DRV_P2', 'DRIVER']))
+    df = info.merge(df.astype({'ID': 'int64'}), on='ID')
+
+    df = df.sort_values(['ID', 'SIT_SITE_ID', 'SEMANA'], kind='stable')
+    df_totales = df[df['TIPO'] == 'TOTAL'][claves + ['DRV_P1', 'DRV_P2']]
+    df_semanal = df[df['TIPO'] == 'SEMANAL'][claves + ['SEMANA', 'DRIVER']]
+    return df_totales.reset_index(drop=True), df_semanal.reset_index(drop=True)
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # USAGE EXAMPLES
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1412,6 +1551,7 @@ from config.drivers_alternativos import (
     build_driver_query,
     build_detail_query,
     build_weekly_query,
+    evaluar_drivers_alternativos,
     listar_drivers_disponibles
 )
 
@@ -1471,4 +1611,16 @@ weekly = build_weekly_query(
     site='MLM'
 )
 # Genera: ... AND i.warehouse_id LIKE 'MX%'
+
+# ── EJEMPLO 6: Comparar varias alternativas en batch (una query por tabla) ──
+from utils.query_scheduler import QueryScheduler
+
+drivers = [('FBM Sellers', 'FBM-Retiro de Stock', '_TODOS', dk)
+           for dk in get_drivers_alternativos('FBM Sellers', 'FBM-Retiro de Stock', '_TODOS')]
+df_totales, df_semanal = evaluar_drivers_alternativos(
+    QueryScheduler(client), drivers,
+    '2025-12-01', '2025-12-31', '2026-01-01', '2026-01-31',
+    sites=['MLA', 'MLB', 'MLM']
+)
+# df_totales: una fila por driver y site con DRV_P1 / DRV_P2
 """
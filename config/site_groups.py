@@ -11,6 +11,10 @@ Grupos disponibles:
 Uso:
   from config.site_groups import resolve_site_sql, get_site_list, is_site_group
 
+  # Un reporte por site (--site MLA,MLB,MLM o --site ROLA --explode-group):
+  get_report_sites('MLA,MLB,MLM')   # → ['MLA', 'MLB', 'MLM']
+  get_report_sites('ROLA', True)    # → ['MLC', 'MCO', 'MEC', 'MLU', 'MPE']
+
   # En SQL queries:
   f"WHERE {resolve_site_sql(args.site, 'C.SIT_SITE_ID')}"
   # → Individual: "WHERE C.SIT_SITE_ID = 'MLA'"
@@ -67,6 +71,31 @@ def get_site_list(site: str) -> list:
     return [site_upper]
 
 
+def get_report_sites(site: str, explode_group: bool = False) -> list:
+    """
+    Retorna los sites o grupos que reciben un reporte propio.
+
+    Args:
+        site: Site, grupo o lista separada por comas (ej: 'MLA,MLB,ROLA')
+        explode_group: Si True, cada grupo se reemplaza por sus sites individuales
+
+    Returns:
+        Lista sin duplicados en el orden recibido
+        - 'MLB'              → ['MLB']
+        - 'MLA,MLB,ROLA'     → ['MLA', 'MLB', 'ROLA']  (ROLA agregado)
+        - 'ROLA' + explode   → ['MLC', 'MCO', 'MEC', 'MLU', 'MPE']
+    """
+    sites = []
+    for item in site.upper().split(','):
+        item = item.strip()
+        if not item:
+            continue
+        for s in (get_site_list(item) if explode_group else [item]):
+            if s not in sites:
+                sites.append(s)
+    return sites
+
+
 def resolve_site_sql(site: str, column: str = 'C.SIT_SITE_ID') -> str:
     """
     FUNCIÓN CLAVE. Genera la condición SQL para filtrar por site o grupo.
@@ -30,8 +30,6 @@ python metrics/eventos/generar_correlaciones.py --sites MLB,MLA --periodo 2025-1
 
 import argparse
 import sys
-from google.cloud.bigquery import Client
-import pandas as pd
 import json
 from datetime import datetime
 from pathlib import Path
@@ -40,10 +38,11 @@ from pathlib import Path
 repo_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(repo_root))
 from config.site_groups import resolve_site_sql
+from utils.query_backend import add_backend_arguments, backend_from_args
+from utils.metrics_queries import build_eventos_incoming_query
 
-print("[METRICS] Generador de Correlaciones con Eventos Comerciales v2.0")
-print("[METRICS] Fuente de eventos: WHOWNER.LK_MKP_PROMOTIONS_EVENT")
-print("="*70)
+# pandas y el cliente de BigQuery se cargan recién en main(), después de validar
+# los argumentos: --help y los errores de parámetros no pagan imports ni autenticación
 
 # ========================================
 # FUNCIÓN: OBTENER EVENTOS DESDE TABLA OFICIAL
@@ -54,7 +53,7 @@ def obtener_eventos_comerciales(client, site, periodo):
     Obtiene eventos comerciales desde la tabla oficial WHOWNER.LK_MKP_PROMOTIONS_EVENT
     
     Args:
-        client: BigQuery client
+        client: Backend de queries (utils.query_backend)
         site: Site code (MLB, MLA, etc.)
         periodo: Período en formato YYYY-MM
     
@@ -86,7 +85,7 @@ def obtener_eventos_comerciales(client, site, periodo):
     """
     
     try:
-        df_eventos = client.query(query_eventos).to_dataframe()
+        df_eventos = client.to_dataframe(query_eventos)
         
         if len(df_eventos) == 0:
             print(f"[EVENTOS] [WARNING] No se encontraron eventos en tabla oficial para {site} periodo {periodo}")
@@ -113,49 +112,23 @@ def obtener_eventos_comerciales(client, site, periodo):
         print(f"[EVENTOS] [INFO] Verifica permisos de acceso a WHOWNER.LK_MKP_PROMOTIONS_EVENT")
         return {}
 
-# ========================================
-# PARSEO DE ARGUMENTOS
-# ========================================
-
-parser = argparse.ArgumentParser(description='Generar correlaciones con eventos comerciales')
-parser.add_argument('--site', type=str, help='Site code (MLB, MLA, etc.)')
-parser.add_argument('--sites', type=str, help='Múltiples sites separados por coma (MLB,MLA,MCO)')
-parser.add_argument('--periodo', type=str, required=True, help='Período en formato YYYY-MM (ej: 2025-12)')
-parser.add_argument('--commerce-groups', type=str, help='Commerce groups específicos (ej: PDD,PNR)', default='ALL')
-
-args = parser.parse_args()
-
-# Determinar sites a procesar
-if args.sites:
-    sites_to_process = args.sites.split(',')
-elif args.site:
-    sites_to_process = [args.site]
-else:
-    print("[ERROR] Debe especificar --site o --sites")
-    exit(1)
-
-periodo = args.periodo
-periodo_date = f"{periodo}-01"
-
-print(f"[CONFIG] Sites: {', '.join(sites_to_process)}")
-print(f"[CONFIG] Período: {periodo}")
-print(f"[CONFIG] Commerce Groups: {args.commerce_groups}")
-print()
-
-# ========================================
-# INICIALIZAR BIGQUERY CLIENT
-# ========================================
-
-client = Client()
-
 # ========================================
 # FUNCIÓN: GENERAR CORRELACIONES PARA UN SITE
 # ========================================
 
-def generar_correlaciones_site(site, periodo_date):
+def generar_correlaciones_site(client, site, periodo, commerce_groups):
     """
     Genera correlaciones para un site específico
+
+    Args:
+        client: Backend de queries (utils.query_backend)
+        site: Site code (MLB, MLA, etc.)
+        periodo: Período en formato YYYY-MM
+        commerce_groups: Commerce groups a incluir ([] = todos)
     """
+    import pandas as pd
+
+    periodo_date = f"{periodo}-01"
     print(f"\n[{site}] Procesando correlaciones para {periodo}...")
     
     # Obtener eventos desde tabla oficial
@@ -171,64 +144,13 @@ def generar_correlaciones_site(site, periodo_date):
     # ========================================
     print(f"[{site}] Paso 1: Obteniendo incoming completo...")
     
-    # Filtros de commerce groups si se especificaron
-    commerce_filter = ""
-    if args.commerce_groups != 'ALL':
-        commerce_groups_list = args.commerce_groups.split(',')
-        commerce_conditions = []
-        for cg in commerce_groups_list:
-            if cg == 'PDD':
-                commerce_conditions.append("C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' OR C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others'")
-            elif cg == 'PNR':
-                commerce_conditions.append("C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' OR C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale'")
-            # Agregar más commerce groups según necesidad
-        
-        if commerce_conditions:
-            commerce_filter = f"AND ({' OR '.join(commerce_conditions)})"
-    
-    query_incoming = f"""
-    WITH BASE_CONTACTS AS (
-        SELECT
-            C.CLA_CLAIM_ID,
-            C.REASON_DETAIL_GROUP_REPORTING as TIPIFICACION,
-            C.PROCESS_NAME as PROCESO,
-            DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
-            CASE 
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' THEN 'PDD'  
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others' THEN 'PDD'
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' THEN 'PNR'
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale' THEN 'PNR'
-                ELSE 'OTRO'
-            END AS COMMERCE_GROUP
-        FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
-        WHERE {resolve_site_sql(site, 'C.SIT_SITE_ID')}
-            AND DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) = '{periodo_date}'
-            AND C.PROCESS_BU_CR_REPORTING IN ('ME','ML')
-            AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
-            AND C.CLA_CLAIM_ID IS NOT NULL
-            AND C.REASON_DETAIL_GROUP_REPORTING IS NOT NULL
-            {commerce_filter}
-    ),
-    ORDERS_DATA AS (
-        SELECT
-            PP.CLA_CLAIM_ID,
-            PP.ORD_CLOSED_DT as ORD_CLOSED_DATE
-        FROM `meli-bi-data.WHOWNER.DM_CX_POST_PURCHASE` PP
-        WHERE PP.ORD_CLOSED_DT >= DATE_SUB('{periodo_date}', INTERVAL 1 MONTH)
-            AND PP.ORD_CLOSED_DT < DATE_ADD('{periodo_date}', INTERVAL 2 MONTH)
-    )
-    SELECT 
-        B.COMMERCE_GROUP,
-        B.TIPIFICACION,
-        B.PROCESO,
-        B.PERIODO,
-        O.ORD_CLOSED_DATE
-    FROM BASE_CONTACTS B
-    LEFT JOIN ORDERS_DATA O ON B.CLA_CLAIM_ID = O.CLA_CLAIM_ID
-    """
+    # Filtros de commerce groups si se especificaron (rangos sargables: ver utils.metrics_queries)
+    query_incoming = build_eventos_incoming_query(site, periodo, commerce_groups)
     
     print(f"[{site}] Ejecutando query (puede tardar 2-3 min)...")
-    df_incoming = client.query(query_incoming).to_dataframe()
+    # Descarga Arrow (Storage Read API): dimensiones categóricas, sin objetos Python por fila
+    df_incoming = client.to_dataframe(query_incoming, arrow=True,
+                                      categoricals=['COMMERCE_GROUP', 'TIPIFICACION', 'PROCESO'])
     
     if len(df_incoming) == 0:
         print(f"[{site}] [WARNING] No se encontró incoming para este período")
@@ -262,7 +184,7 @@ def generar_correlaciones_site(site, periodo_date):
         ]
         
         # Agrupar por commerce_group + tipificación
-        for (commerce, tipif), group in df_incoming.groupby(['COMMERCE_GROUP', 'TIPIFICACION']):
+        for (commerce, tipif), group in df_incoming.groupby(['COMMERCE_GROUP', 'TIPIFICACION'], observed=True):
             casos_totales = len(group)
             casos_en_evento = len(df_evento[
                 (df_evento['COMMERCE_GROUP'] == commerce) & 
@@ -368,47 +290,102 @@ def generar_correlaciones_site(site, periodo_date):
     return df_correlaciones
 
 # ========================================
-# EJECUTAR PARA CADA SITE
+# PARSEO DE ARGUMENTOS
 # ========================================
 
-print("\n" + "="*70)
-print("INICIANDO GENERACIÓN DE MÉTRICAS")
-print("="*70)
+def build_parser():
+    """Parser de argumentos del generador."""
+    parser = argparse.ArgumentParser(description='Generar correlaciones con eventos comerciales')
+    parser.add_argument('--site', type=str, help='Site code (MLB, MLA, etc.)')
+    parser.add_argument('--sites', type=str, help='Múltiples sites separados por coma (MLB,MLA,MCO)')
+    parser.add_argument('--periodo', type=str, required=True, help='Período en formato YYYY-MM (ej: 2025-12)')
+    parser.add_argument('--commerce-groups', type=str, help='Commerce groups específicos (ej: PDD,PNR)', default='ALL')
+    add_backend_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    """Punto de entrada CLI: valida argumentos, inicializa el backend y genera cada site."""
+    args = build_parser().parse_args(argv)
 
-resultados_totales = []
+    # Determinar sites a procesar
+    if args.sites:
+        sites_to_process = args.sites.split(',')
+    elif args.site:
+        sites_to_process = [args.site]
+    else:
+        print("[ERROR] Debe especificar --site o --sites")
+        sys.exit(1)
 
-for site in sites_to_process:
+    periodo = args.periodo
     try:
-        df_result = generar_correlaciones_site(site, periodo_date)
-        if df_result is not None:
-            resultados_totales.append(df_result)
-    except Exception as e:
-        print(f"[{site}] [ERROR] {str(e)}")
-        import traceback
-        traceback.print_exc()
+        datetime.strptime(periodo, '%Y-%m')
+    except ValueError:
+        print(f"[ERROR] Período inválido '{periodo}' (formato YYYY-MM)")
+        sys.exit(1)
+    commerce_groups = [] if args.commerce_groups == 'ALL' else args.commerce_groups.split(',')
+
+    print("[METRICS] Generador de Correlaciones con Eventos Comerciales v2.0")
+    print("[METRICS] Fuente de eventos: WHOWNER.LK_MKP_PROMOTIONS_EVENT")
+    print("="*70)
+
+    print(f"[CONFIG] Sites: {', '.join(sites_to_process)}")
+    print(f"[CONFIG] Período: {periodo}")
+    print(f"[CONFIG] Commerce Groups: {args.commerce_groups}")
+    print()
+
+    # ========================================
+    # INICIALIZAR BACKEND DE QUERIES (BigQuery o DuckDB local)
+    # ========================================
+
+    client = backend_from_args(args)
+
+    # ========================================
+    # EJECUTAR PARA CADA SITE
+    # ========================================
+
+    print("\n" + "="*70)
+    print("INICIANDO GENERACIÓN DE MÉTRICAS")
+    print("="*70)
+
+    resultados_totales = []
+
+    for site in sites_to_process:
+        try:
+            df_result = generar_correlaciones_site(client, site, periodo, commerce_groups)
+            if df_result is not None:
+                resultados_totales.append(df_result)
+        except Exception as e:
+            print(f"[{site}] [ERROR] {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+    # ========================================
+    # RESUMEN FINAL
+    # ========================================
+
+    print("\n" + "="*70)
+    print("RESUMEN FINAL")
+    print("="*70)
+
+    if len(resultados_totales) > 0:
+        for i, df in enumerate(resultados_totales):
+            site = sites_to_process[i]
+            print(f"\n[{site}]")
+            print(f"  - Correlaciones: {len(df):,}")
+            print(f"  - Incoming total: {df['CASOS_TOTALES'].sum():,}")
+            print(f"  - Casos correlacionados: {df['CASOS'].sum():,}")
+            print(f"  - % correlacionado: {df['CASOS'].sum() / df['CASOS_TOTALES'].sum() * 100:.1f}%")
+            print(f"  - Commerce Groups: {', '.join(df['COMMERCE_GROUP'].unique())}")
+            print(f"  - Tipificaciones: {len(df['TIPIFICACION'].unique())}")
+
+        print(f"\n[OK] METRICAS GENERADAS EXITOSAMENTE")
+        print(f"[UBICACION] metrics/eventos/data/")
+    else:
+        print("\n[ERROR] NO SE GENERARON METRICAS")
+
+    print("="*70)
 
-# ========================================
-# RESUMEN FINAL
-# ========================================
 
-print("\n" + "="*70)
-print("RESUMEN FINAL")
-print("="*70)
-
-if len(resultados_totales) > 0:
-    for i, df in enumerate(resultados_totales):
-        site = sites_to_process[i]
-        print(f"\n[{site}]")
-        print(f"  - Correlaciones: {len(df):,}")
-        print(f"  - Incoming total: {df['CASOS_TOTALES'].sum():,}")
-        print(f"  - Casos correlacionados: {df['CASOS'].sum():,}")
-        print(f"  - % correlacionado: {df['CASOS'].sum() / df['CASOS_TOTALES'].sum() * 100:.1f}%")
-        print(f"  - Commerce Groups: {', '.join(df['COMMERCE_GROUP'].unique())}")
-        print(f"  - Tipificaciones: {len(df['TIPIFICACION'].unique())}")
-    
-    print(f"\n[OK] METRICAS GENERADAS EXITOSAMENTE")
-    print(f"[UBICACION] metrics/eventos/data/")
-else:
-    print("\n[ERROR] NO SE GENERARON METRICAS")
-
-print("="*70)
+if __name__ == '__main__':
+    main()
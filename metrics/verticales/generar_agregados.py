@@ -35,60 +35,19 @@ python metrics/verticales/generar_agregados.py --site MLA --periodo 2025-12 --fo
 
 import argparse
 import sys
-from google.cloud.bigquery import Client
-import pandas as pd
 import json
 from datetime import datetime
 from pathlib import Path
-import os
 
 # Agregar path del repositorio para imports
 repo_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(repo_root))
-from config.site_groups import resolve_site_sql
+from utils.query_backend import add_backend_arguments, backend_from_args
+from utils.metrics_queries import build_verticales_query
+from utils.partition_predicates import POST_PURCHASE_MESES_DESPUES
 
-print("[METRICS] Generador de Agregados de Verticales y Dominios v1.0")
-print("[METRICS] Fuente: WHOWNER.DM_CX_POST_PURCHASE (VERTICAL, DOM_DOMAIN_AGG1)")
-print("[METRICS] Alcance: SOLO PDD y PNR (Post-Compra)")
-print("="*70)
-
-# ========================================
-# PARSEO DE ARGUMENTOS
-# ========================================
-
-parser = argparse.ArgumentParser(description='Generar métricas de verticales y dominios')
-parser.add_argument('--site', type=str, help='Site code (MLA, MLB, etc.)')
-parser.add_argument('--sites', type=str, help='Múltiples sites separados por coma (MLA,MLB,MCO)')
-parser.add_argument('--periodo', type=str, required=True, help='Período en formato YYYY-MM (ej: 2025-12)')
-parser.add_argument('--commerce-group', type=str, help='Commerce group específico (PDD o PNR)', default='ALL')
-parser.add_argument('--force', action='store_true', help='Forzar regeneración incluso si existe')
-
-args = parser.parse_args()
-
-# Determinar sites a procesar
-if args.sites:
-    sites_to_process = args.sites.split(',')
-elif args.site:
-    sites_to_process = [args.site]
-else:
-    print("[ERROR] Debe especificar --site o --sites")
-    exit(1)
-
-periodo = args.periodo
-periodo_date = f"{periodo}-01"
-periodo_str = periodo.replace('-', '_')
-
-print(f"[CONFIG] Sites: {', '.join(sites_to_process)}")
-print(f"[CONFIG] Período: {periodo}")
-print(f"[CONFIG] Commerce Group: {args.commerce_group}")
-print(f"[CONFIG] Force regeneration: {args.force}")
-print()
-
-# ========================================
-# INICIALIZAR BIGQUERY CLIENT
-# ========================================
-
-client = Client()
+# pandas y el cliente de BigQuery se cargan recién en main(), después de validar
+# los argumentos: --help y los errores de parámetros no pagan imports ni autenticación
 
 # ========================================
 # FUNCIÓN: VERIFICAR SI EXISTE MÉTRICA
@@ -127,10 +86,20 @@ def verificar_metrica_existente(site, periodo_str):
 # FUNCIÓN: GENERAR AGREGADOS PARA UN SITE
 # ========================================
 
-def generar_agregados_site(site, periodo_date, force=False):
+def generar_agregados_site(client, site, periodo, commerce_group='ALL', force=False):
     """
     Genera agregados de verticales para un site específico
+
+    Args:
+        client: Backend de queries (utils.query_backend)
+        site: Site code (MLA, MLB, etc.)
+        periodo: Período en formato YYYY-MM
+        commerce_group: PDD, PNR o 'ALL' (ambos)
+        force: Regenerar aunque exista una métrica reciente
     """
+    import pandas as pd
+
+    periodo_str = periodo.replace('-', '_')
     print(f"\n[{site}] Procesando agregados de verticales para {periodo}...")
     
     # ========================================
@@ -156,58 +125,12 @@ def generar_agregados_site(site, periodo_date, force=False):
     
     print(f"[{site}] Paso 1: Obteniendo incoming de PDD/PNR...")
     
-    # Filtro de commerce group si se especificó
-    commerce_filter = ""
-    if args.commerce_group == 'PDD':
-        commerce_filter = "AND (C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' OR C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others')"
-    elif args.commerce_group == 'PNR':
-        commerce_filter = "AND (C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' OR C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale')"
-    # Si es 'ALL' o cualquier otro valor, no filtrar (obtener ambos PDD y PNR)
-    
-    query_verticales = f"""
-    WITH BASE_CONTACTS AS (
-        SELECT
-            C.CLA_CLAIM_ID,
-            C.SIT_SITE_ID,
-            DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
-            CASE 
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' THEN 'PDD'  
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others' THEN 'PDD'
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' THEN 'PNR'
-                WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale' THEN 'PNR'
-                ELSE 'OTRO'
-            END AS COMMERCE_GROUP
-        FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
-        WHERE {resolve_site_sql(site, 'C.SIT_SITE_ID')}
-            AND DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) = '{periodo_date}'
-            AND C.PROCESS_BU_CR_REPORTING IN ('ME','ML')
-            AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
-            AND C.CLA_CLAIM_ID IS NOT NULL
-            {commerce_filter}
-    ),
-    VERTICALES_DATA AS (
-        SELECT
-            PP.CLA_CLAIM_ID,
-            PP.VERTICAL,
-            PP.DOM_DOMAIN_AGG1 as DOMINIO
-        FROM `meli-bi-data.WHOWNER.DM_CX_POST_PURCHASE` PP
-        WHERE PP.VERTICAL IS NOT NULL
-    )
-    SELECT 
-        B.SIT_SITE_ID as SITE,
-        B.PERIODO,
-        B.COMMERCE_GROUP,
-        COALESCE(V.VERTICAL, 'SIN_VERTICAL') as VERTICAL,
-        COALESCE(V.DOMINIO, 'SIN_DOMINIO') as DOMINIO,
-        COUNT(DISTINCT B.CLA_CLAIM_ID) as INCOMING
-    FROM BASE_CONTACTS B
-    LEFT JOIN VERTICALES_DATA V ON B.CLA_CLAIM_ID = V.CLA_CLAIM_ID
-    WHERE B.COMMERCE_GROUP IN ('PDD', 'PNR')
-    GROUP BY 1, 2, 3, 4, 5
-    """
+    # Si es 'ALL' o cualquier otro valor, no filtrar (obtener ambos PDD y PNR).
+    # DM_CX_POST_PURCHASE se acota por ORD_CLOSED_DT (ver utils.partition_predicates)
+    query_verticales = build_verticales_query(site, periodo, commerce_group)
     
     print(f"[{site}] Ejecutando query (puede tardar 2-3 min)...")
-    df_verticales = client.query(query_verticales).to_dataframe()
+    df_verticales = client.to_dataframe(query_verticales)
     
     if len(df_verticales) == 0:
         print(f"[{site}] [WARNING] No se encontró incoming PDD/PNR para este período")
@@ -346,7 +269,8 @@ def generar_agregados_site(site, periodo_date, force=False):
             'FLAG_EXCLUDE_NUMERATOR_CR = 0',
             'PROCESS_BU_CR_REPORTING IN (ME, ML)',
             'SIT_SITE_ID NOT IN (MLV)',
-            'PROCESS_PROBLEMATIC_REPORTING: PDD/PNR only'
+            'PROCESS_PROBLEMATIC_REPORTING: PDD/PNR only',
+            f'DM_CX_POST_PURCHASE.ORD_CLOSED_DT: hasta {POST_PURCHASE_MESES_DESPUES} mes después del período'
         ],
         'valores_dinamicos': True,
         'verticales_hardcodeadas': False,
@@ -361,63 +285,120 @@ def generar_agregados_site(site, periodo_date, force=False):
     return df_verticales
 
 # ========================================
-# EJECUTAR PARA CADA SITE
+# PARSEO DE ARGUMENTOS
 # ========================================
 
-print("\n" + "="*70)
-print("INICIANDO GENERACIÓN DE MÉTRICAS")
-print("="*70)
+def build_parser():
+    """Parser de argumentos del generador."""
+    parser = argparse.ArgumentParser(description='Generar métricas de verticales y dominios')
+    parser.add_argument('--site', type=str, help='Site code (MLA, MLB, etc.)')
+    parser.add_argument('--sites', type=str, help='Múltiples sites separados por coma (MLA,MLB,MCO)')
+    parser.add_argument('--periodo', type=str, required=True, help='Período en formato YYYY-MM (ej: 2025-12)')
+    parser.add_argument('--commerce-group', type=str, help='Commerce group específico (PDD o PNR)', default='ALL')
+    parser.add_argument('--force', action='store_true', help='Forzar regeneración incluso si existe')
+    add_backend_arguments(parser)
+    return parser
+
 
-resultados_totales = []
+def main(argv=None):
+    """Punto de entrada CLI: valida argumentos, inicializa el backend y genera cada site."""
+    args = build_parser().parse_args(argv)
 
-for site in sites_to_process:
+    # Determinar sites a procesar
+    if args.sites:
+        sites_to_process = args.sites.split(',')
+    elif args.site:
+        sites_to_process = [args.site]
+    else:
+        print("[ERROR] Debe especificar --site o --sites")
+        sys.exit(1)
+
+    periodo = args.periodo
     try:
-        df_result = generar_agregados_site(site, periodo_date, force=args.force)
-        if df_result is not None:
-            resultados_totales.append({'site': site, 'data': df_result})
-    except Exception as e:
-        print(f"[{site}] [ERROR] {str(e)}")
-        import traceback
-        traceback.print_exc()
+        datetime.strptime(periodo, '%Y-%m')
+    except ValueError:
+        print(f"[ERROR] Período inválido '{periodo}' (formato YYYY-MM)")
+        sys.exit(1)
 
-# ========================================
-# RESUMEN FINAL
-# ========================================
+    print("[METRICS] Generador de Agregados de Verticales y Dominios v1.0")
+    print("[METRICS] Fuente: WHOWNER.DM_CX_POST_PURCHASE (VERTICAL, DOM_DOMAIN_AGG1)")
+    print("[METRICS] Alcance: SOLO PDD y PNR (Post-Compra)")
+    print("="*70)
 
-print("\n" + "="*70)
-print("RESUMEN FINAL")
-print("="*70)
+    print(f"[CONFIG] Sites: {', '.join(sites_to_process)}")
+    print(f"[CONFIG] Período: {periodo}")
+    print(f"[CONFIG] Commerce Group: {args.commerce_group}")
+    print(f"[CONFIG] Force regeneration: {args.force}")
+    print()
 
-if len(resultados_totales) > 0:
-    for resultado in resultados_totales:
-        site = resultado['site']
-        df = resultado['data']
-        
-        print(f"\n[{site}]")
-        print(f"  - Filas generadas: {len(df):,}")
-        print(f"  - Incoming total: {df['INCOMING'].sum():,}")
-        
-        # Por commerce group
-        for cg in sorted(df['COMMERCE_GROUP'].unique()):
-            df_cg = df[df['COMMERCE_GROUP'] == cg]
-            incoming_cg = df_cg['INCOMING'].sum()
-            vert_count = len(df_cg['VERTICAL'].unique())
-            print(f"  - {cg}: {incoming_cg:,} casos, {vert_count} verticales")
-        
-        # Top 3 verticales
-        top3 = df.groupby('VERTICAL')['INCOMING'].sum().sort_values(ascending=False).head(3)
-        print(f"  - Top 3 verticales:")
-        for vertical, count in top3.items():
-            if vertical != 'SIN_VERTICAL':
-                pct = (count / df['INCOMING'].sum() * 100)
-                print(f"    · {vertical}: {count:,} ({pct:.1f}%)")
-    
-    print(f"\n[OK] ✅ METRICAS GENERADAS EXITOSAMENTE")
-    print(f"[UBICACION] metrics/verticales/data/")
-    print(f"\n[INFO] Para usar en reportes:")
-    print(f"       df = pd.read_parquet('metrics/verticales/data/verticales_{{site}}_{{periodo}}.parquet')")
-else:
-    print("\n[ERROR] ❌ NO SE GENERARON METRICAS")
-    print("[INFO] Verifica los errores arriba para más detalles")
-
-print("="*70)
+    # ========================================
+    # INICIALIZAR BACKEND DE QUERIES (BigQuery o DuckDB local)
+    # ========================================
+
+    client = backend_from_args(args)
+
+    # ========================================
+    # EJECUTAR PARA CADA SITE
+    # ========================================
+
+    print("\n" + "="*70)
+    print("INICIANDO GENERACIÓN DE MÉTRICAS")
+    print("="*70)
+
+    resultados_totales = []
+
+    for site in sites_to_process:
+        try:
+            df_result = generar_agregados_site(client, site, periodo, args.commerce_group, force=args.force)
+            if df_result is not None:
+                resultados_totales.append({'site': site, 'data': df_result})
+        except Exception as e:
+            print(f"[{site}] [ERROR] {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+    # ========================================
+    # RESUMEN FINAL
+    # ========================================
+
+    print("\n" + "="*70)
+    print("RESUMEN FINAL")
+    print("="*70)
+
+    if len(resultados_totales) > 0:
+        for resultado in resultados_totales:
+            site = resultado['site']
+            df = resultado['data']
+
+            print(f"\n[{site}]")
+            print(f"  - Filas generadas: {len(df):,}")
+            print(f"  - Incoming total: {df['INCOMING'].sum():,}")
+
+            # Por commerce group
+            for cg in sorted(df['COMMERCE_GROUP'].unique()):
+                df_cg = df[df['COMMERCE_GROUP'] == cg]
+                incoming_cg = df_cg['INCOMING'].sum()
+                vert_count = len(df_cg['VERTICAL'].unique())
+                print(f"  - {cg}: {incoming_cg:,} casos, {vert_count} verticales")
+
+            # Top 3 verticales
+            top3 = df.groupby('VERTICAL')['INCOMING'].sum().sort_values(ascending=False).head(3)
+            print(f"  - Top 3 verticales:")
+            for vertical, count in top3.items():
+                if vertical != 'SIN_VERTICAL':
+                    pct = (count / df['INCOMING'].sum() * 100)
+                    print(f"    · {vertical}: {count:,} ({pct:.1f}%)")
+
+        print(f"\n[OK] ✅ METRICAS GENERADAS EXITOSAMENTE")
+        print(f"[UBICACION] metrics/verticales/data/")
+        print(f"\n[INFO] Para usar en reportes:")
+        print(f"       df = pd.read_parquet('metrics/verticales/data/verticales_{{site}}_{{periodo}}.parquet')")
+    else:
+        print("\n[ERROR] ❌ NO SE GENERARON METRICAS")
+        print("[INFO] Verifica los errores arriba para más detalles")
+
+    print("="*70)
+
+
+if __name__ == '__main__':
+    main()
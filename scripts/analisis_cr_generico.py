@@ -28,6 +28,7 @@ import re
 
 # Importar soporte para agrupaciones de sites (ROLA, HSP)
 from config.site_groups import resolve_site_sql, get_site_list, is_site_group, get_site_display_name
+from utils.canonical_sql import canonical_query, fecha_param, sites_param
 
 # ============================================================================
 # CONFIGURACIÓN Y CONSTANTES
@@ -112,6 +113,15 @@ def leer_csv_bigquery(csv_path):
 # GENERADORES DE QUERIES DINÁMICAS
 # ============================================================================
 
+def _query_params(config):
+    """Parámetros comunes (sites y período) de las queries canónicas"""
+    return {
+        'sites': sites_param(get_site_list(config['site'])),
+        'periodo_inicio': fecha_param(config['periodo_inicio']),
+        'periodo_fin': fecha_param(config['periodo_fin']),
+    }
+
+
 def generar_query_incoming(config):
     """
     Genera query de incoming adaptada a la dimensión solicitada.
@@ -119,6 +129,10 @@ def generar_query_incoming(config):
     Args:
         config: Dict con 'dimension_principal', 'valor_filtro', 'dimension_drill', 
                 'site', 'periodo_inicio', 'periodo_fin'
+
+    Returns:
+        CanonicalQuery (site, período y valor van como parámetros: el mismo
+        pedido genera siempre el mismo texto y reutiliza la cache de BigQuery)
     """
     dimension_sql = get_sql_field(config['dimension_principal'])
     drill_sql = get_sql_field(config['dimension_drill'])
@@ -133,13 +147,13 @@ def generar_query_incoming(config):
             WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%PNR%') THEN 'PNR'
             WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale' THEN 'PNR'
             ELSE 'OTRO' 
-        END = '{config['valor_filtro']}'
+        END = @valor_filtro
         """
     else:
         # Para otras dimensiones, usar LIKE
-        filtro_principal = f"UPPER(C.{dimension_sql}) LIKE '%{config['valor_filtro'].upper()}%'"
+        filtro_principal = f"UPPER(C.{dimension_sql}) LIKE @valor_like"
     
-    query = f"""
+    return canonical_query(f"""
 -- ══════════════════════════════════════════════════════════════════════════════
 -- INCOMING ANALYSIS - {config['dimension_principal']} = {config['valor_filtro']}
 -- Site: {config['site']} | Período: {config['periodo_inicio']} a {config['periodo_fin']}
@@ -158,8 +172,8 @@ WITH BASE_CONTACTS AS (
         1.0 AS CANT_CASES
     FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
     WHERE
-        CAST(C.CONTACT_DATE_ID AS DATE) BETWEEN '{config['periodo_inicio']}' AND '{config['periodo_fin']}'
-        AND {resolve_site_sql(config['site'], 'C.SIT_SITE_ID')}
+        C.CONTACT_DATE_ID BETWEEN @periodo_inicio AND @periodo_fin
+        AND C.SIT_SITE_ID IN UNNEST(@sites)
         AND C.SIT_SITE_ID NOT IN ('MLV')
         AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
         AND {filtro_principal}
@@ -175,16 +189,15 @@ SELECT
 FROM BASE_CONTACTS
 GROUP BY MES, DIM_DRILL_CLEAN
 ORDER BY MES, INCOMING DESC
-"""
-    return query
+""", **_query_params(config), valor_filtro=config['valor_filtro'],
+        valor_like=f"%{config['valor_filtro'].upper()}%")
 
 
 def generar_query_drivers(config):
-    """Genera query de drivers (órdenes totales)"""
-    query = f"""
+    """Genera query de drivers (órdenes totales) como CanonicalQuery"""
+    return canonical_query("""
 -- ══════════════════════════════════════════════════════════════════════════════
--- DRIVER CALCULATION - {config['site']}
--- Período: {config['periodo_inicio']} a {config['periodo_fin']}
+-- DRIVER CALCULATION - sites y período como parámetros (@sites, @periodo_inicio, @periodo_fin)
 -- ══════════════════════════════════════════════════════════════════════════════
 
 SELECT
@@ -192,16 +205,15 @@ SELECT
     COUNT(DISTINCT ORD.ORD_ORDER_ID) AS DRIVER_ORDENES
 FROM `meli-bi-data.WHOWNER.BT_ORD_ORDERS` ORD
 WHERE
-    CAST(ORD.ORD_CLOSED_DT AS DATE) BETWEEN '{config['periodo_inicio']}' AND '{config['periodo_fin']}'
-    AND {resolve_site_sql(config['site'], 'ORD.SIT_SITE_ID')}
+    ORD.ORD_CLOSED_DT BETWEEN @periodo_inicio AND @periodo_fin
+    AND ORD.SIT_SITE_ID IN UNNEST(@sites)
     AND ORD.ORD_GMV_FLG = TRUE
     AND ORD.ORD_MARKETPLACE_FLG = TRUE
     AND ORD.SIT_SITE_ID NOT IN ('MLV')
     AND (UPPER(ORD.DOM_DOMAIN_ID) <> 'TIPS')
 GROUP BY MES
 ORDER BY MES
-"""
-    return query
+""", **_query_params(config))
 
 
 def generar_query_muestreo(config, elemento_drill):
@@ -265,7 +277,7 @@ INCOMING_BASE AS (
         DATE(INC.CONTACT_DATE_ID) as FECHA_CONTACTO
     FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` INC
     WHERE {resolve_site_sql(config['site'], 'INC.SIT_SITE_ID')}
-        AND CAST(INC.CONTACT_DATE_ID AS DATE) BETWEEN '{config['periodo_inicio']}' AND '{config['periodo_fin']}'
+        AND INC.CONTACT_DATE_ID BETWEEN '{config['periodo_inicio']}' AND '{config['periodo_fin']}'
         AND COALESCE(INC.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
         AND {filtro_principal}
         {"AND INC." + drill_sql + " = '" + elemento_drill + "'" if usar_drill_filter else ""}
@@ -0,0 +1,183 @@
+"""
+Script para generar fixtures Parquet locales (backend DuckDB)
+
+Genera datos sintéticos con el esquema de las tablas de BigQuery que leen el
+template universal y los generadores de métricas, para correr el pipeline
+completo sin red ni credenciales:
+
+    BT_CX_CONTACTS, BT_ORD_ORDERS, BT_CX_DRIVERS_CR, BT_CX_STUDIO_SAMPLE,
+    DM_CX_POST_PURCHASE, LK_TIM_HOLIDAYS, LK_MKP_PROMOTIONS_EVENT
+
+Los volúmenes son configurables (--casos-por-dia) para perfilar y hacer
+pruebas de carga a tamaños realistas.
+
+Uso:
+    python scripts/generar_fixtures_locales.py --output-dir fixtures
+    python scripts/generar_fixtures_locales.py --output-dir fixtures --casos-por-dia 20000
+
+    python generar_reporte_cr_universal_v6.3.6.py --backend duckdb --fixtures-dir fixtures \\
+        --site MLB --commerce-group PDD --p1-start 2025-11-01 --p1-end 2025-11-30 \\
+        --p2-start 2025-12-01 --p2-end 2025-12-31
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SITES = ['MLA', 'MLB', 'MLM', 'MLC', 'MCO', 'MEC', 'MLU', 'MPE', 'MLV']
+PESO_SITES = [.25, .3, .2, .05, .05, .05, .03, .05, .02]
+
+PROBLEMATICAS = [
+    'PDD', 'Conflict Others', 'PNR', 'Conflict Stale', 'Post Compra Comprador',
+    'Post Compra Funcionalidades Vendedor', 'Mercado Envíos', 'FBM Sellers',
+    'Pagos', 'Moderaciones', 'Drivers',
+]
+
+# Ordenes por contacto (el CR sintético queda en el orden de 10-15%)
+ORDENES_POR_CASO = 8
+
+
+def generar_contactos(rng, dias, casos_por_dia):
+    """BT_CX_CONTACTS: un registro por caso"""
+    n = len(dias) * casos_por_dia
+    return pd.DataFrame({
+        'CAS_CASE_ID': np.arange(n) + 1_000_000,
+        'CLA_CLAIM_ID': np.where(rng.random(n) < .8, np.arange(n) + 5_000_000, None),
+        'SIT_SITE_ID': rng.choice(SITES, n, p=PESO_SITES),
+        'CONTACT_DATE_ID': dias[rng.integers(0, len(dias), n)].date,
+        'PROCESS_BU_CR_REPORTING': rng.choice(['ME', 'ML', 'MP'], n, p=[.45, .45, .1]),
+        'FLAG_EXCLUDE_NUMERATOR_CR': rng.choice([0, 1], n, p=[.95, .05]),
+        'QUEUE_ID': rng.choice([100, 200, 300, 230], n, p=[.4, .3, .28, .02]),
+        'PROCESS_ID': rng.choice([10, 20, 1312], n, p=[.5, .49, .01]),
+        'CI_REASON_ID': rng.choice([1, 2, 2592], n, p=[.5, .45, .05]),
+        'PROCESS_PROBLEMATIC_REPORTING': rng.choice(PROBLEMATICAS, n),
+        'PROCESS_GROUP_ECOMMERCE': rng.choice(['Comprador', 'Vendedor'], n),
+        'PROCESS_NAME': rng.choice(['Reclamos', 'Devoluciones', 'Pre Compra', 'Post Compra', 'Envios', 'Drivers', None],
+                                   n, p=[.25, .2, .15, .15, .15, .05, .05]),
+        'CDU': rng.choice(['No recibido', 'Distinto', 'Roto', 'Incompleto', 'Arrepentimiento', None], n),
+        'REASON_DETAIL_GROUP_REPORTING': rng.choice(['Tip A', 'Tip B', 'Tip C', 'Tip D'], n),
+        'ENVIRONMENT': rng.choice(['FBM', 'XD', 'DS', 'FLEX', None], n),
+        'CLA_REASON_DETAIL': rng.choice(['PDD9904', 'PDD9905', 'PNR3001', 'PNR3002'], n),
+        'CHANNEL_ID': rng.choice([1, 2, 3, 4], n),
+        'SOLUTION_ID': rng.choice([10, 11, 12], n),
+        'CUS_CUST_ID': rng.integers(1, max(2, n // 3), n),
+    })
+
+
+def generar_ordenes(rng, dias, casos_por_dia):
+    """BT_ORD_ORDERS: órdenes cerradas"""
+    m = len(dias) * casos_por_dia * ORDENES_POR_CASO
+    return pd.DataFrame({
+        'ORD_ORDER_ID': np.arange(m) + 1,
+        'SIT_SITE_ID': rng.choice(SITES, m),
+        'ORD_CLOSED_DT': dias[rng.integers(0, len(dias), m)].date,
+        'ORD_GMV_FLG': rng.random(m) < .97,
+        'ORD_MARKETPLACE_FLG': rng.random(m) < .95,
+        'DOM_DOMAIN_ID': rng.choice(['MLA-CELLPHONES', 'MLB-SHOES', 'TIPS'], m, p=[.5, .48, .02]),
+    })
+
+
+def generar_drivers(rng, dias):
+    """BT_CX_DRIVERS_CR: órdenes enviadas por mes y site"""
+    meses = pd.date_range(dias[0], dias[-1], freq='MS')
+    return pd.DataFrame([
+        {
+            'MONTH_ID': mes.date(),
+            'SIT_SITE_ID': site,
+            'ORDERS_SHIPPED': int(rng.integers(500_000, 1_000_000)),
+            'OS_WITHOUT_FBM': int(rng.integers(300_000, 600_000)),
+            'OS_WITH_FBM': int(rng.integers(100_000, 300_000)),
+        }
+        for mes in meses for site in SITES
+    ])
+
+
+def generar_feriados(dias):
+    """LK_TIM_HOLIDAYS: un feriado cada 37 días por site"""
+    return pd.DataFrame([
+        {'SIT_SITE_ID': site, 'TIM_DAY': dia.date(), 'HOLIDAY_DESC': f'Feriado {dia:%d-%m}'}
+        for site in SITES for dia in dias[::37]
+    ])
+
+
+def generar_eventos(dias):
+    """LK_MKP_PROMOTIONS_EVENT: un evento de 3 días cada 20 días por site"""
+    tipos = ['TIER_1', 'TIER_2', 'DOUBLE_DAYS']
+    return pd.DataFrame([
+        {
+            'SIT_SITE_ID': site,
+            'EVENT_NAME': f'Evento {i}',
+            'EVENT_START_DTTM': dia,
+            'EVENT_END_DTTM': dia + pd.Timedelta(days=3),
+            'STANDARD_METADATA': {'TYPE': tipos[i % len(tipos)]},
+        }
+        for site in SITES for i, dia in enumerate(dias[::20])
+    ])
+
+
+def generar_post_compra(rng, contactos):
+    """DM_CX_POST_PURCHASE: vertical, dominio y fecha de orden de cada claim"""
+    claims = contactos[contactos['CLA_CLAIM_ID'].notna()]
+    n = len(claims)
+    fecha_orden = pd.to_datetime(claims['CONTACT_DATE_ID']) - pd.to_timedelta(rng.integers(0, 40, n), 'D')
+    return pd.DataFrame({
+        'CLA_CLAIM_ID': claims['CLA_CLAIM_ID'].astype('int64').values,
+        'ORD_CLOSED_DT': fecha_orden.dt.date.values,
+        'VERTICAL': rng.choice(['CE', 'HOME', 'FASHION', None], n),
+        'DOM_DOMAIN_AGG1': rng.choice(['CELL', 'SHOES', 'TV'], n),
+    })
+
+
+def generar_studio(contactos, fraccion_muestra):
+    """BT_CX_STUDIO_SAMPLE: resumen de conversación de una muestra de casos"""
+    muestra = contactos.sample(frac=fraccion_muestra, random_state=1)
+    return pd.DataFrame({
+        'CAS_CASE_ID': muestra['CAS_CASE_ID'].values,
+        'ARRIVAL_DATE': muestra['CONTACT_DATE_ID'].values,
+        'SUMMARY_CX_STUDIO': [
+            json.dumps({'problem': f'El usuario reporta problema {i % 7} con su compra',
+                        'solution': f'Se ofrece solucion {i % 5}'})
+            for i in range(len(muestra))
+        ],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generar fixtures Parquet locales para el backend DuckDB')
+    parser.add_argument('--output-dir', default='fixtures', help='Directorio de salida (default: fixtures)')
+    parser.add_argument('--desde', default='2025-06-01', help='Primer día de datos (default: 2025-06-01)')
+    parser.add_argument('--hasta', default='2026-01-31', help='Último día de datos (default: 2026-01-31)')
+    parser.add_argument('--casos-por-dia', type=int, default=300,
+                        help='Contactos por día, todos los sites (default: 300)')
+    parser.add_argument('--fraccion-studio', type=float, default=.5,
+                        help='Fracción de casos con resumen de CX Studio (default: 0.5)')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla aleatoria (default: 42)')
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    dias = pd.date_range(args.desde, args.hasta)
+
+    contactos = generar_contactos(rng, dias, args.casos_por_dia)
+    tablas = {
+        'BT_CX_CONTACTS': contactos,
+        'BT_ORD_ORDERS': generar_ordenes(rng, dias, args.casos_por_dia),
+        'BT_CX_DRIVERS_CR': generar_drivers(rng, dias),
+        'LK_TIM_HOLIDAYS': generar_feriados(dias),
+        'LK_MKP_PROMOTIONS_EVENT': generar_eventos(dias),
+        'DM_CX_POST_PURCHASE': generar_post_compra(rng, contactos),
+        'BT_CX_STUDIO_SAMPLE': generar_studio(contactos, args.fraccion_studio),
+    }
+
+    for nombre, df in tablas.items():
+        path = output_dir / f'{nombre}.parquet'
+        df.to_parquet(path, index=False)
+        print(f"[OK] {path} ({len(df):,} filas)")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,7 +11,7 @@ Description:
 
 Dependencies:
     - pandas
-    - google.cloud.bigquery
+    - google.cloud.bigquery (or duckdb with --backend duckdb)
     - sys, os, io
 
 Usage:
@@ -27,6 +27,8 @@ Parameters:
     --output-dir: Output directory (default: test/outputs/)
     --threshold: Minimum incoming cases (default: 50)
     --format: Output format (csv, html, both) (default: both)
+    --backend: Query backend (bigquery, duckdb) (default: bigquery)
+    --fixtures-dir: Local Parquet fixtures for --backend duckdb (default: fixtures)
 
 Examples:
     # Analyze PDD in MLA by PROCESS_NAME for Nov-Dec 2025
@@ -42,10 +44,10 @@ import sys
 import os
 import io
 import argparse
+import unicodedata
 import webbrowser
 from datetime import datetime
 import pandas as pd
-from google.cloud import bigquery
 
 # Fix encoding for Windows
 if sys.platform == 'win32':
@@ -63,6 +65,9 @@ except ImportError:
     thresholds = None
     commerce_groups = None
 
+from utils.query_backend import add_backend_arguments, backend_from_args
+from utils.report_queries import COMMERCE_GROUP_FILTERS, FIELD_MAPPING, build_dimension_query
+
 # Constants
 CR_MULTIPLIER = 100
 MIN_THRESHOLD = 50
@@ -115,69 +120,94 @@ def _df_to_table_rows(df: pd.DataFrame, dimension: str) -> str:
         )
     return "\n".join(rows)
 
+def commerce_group_key(commerce_group: str) -> str:
+    """
+    Normalize a Commerce Group name to its key (e.g., 'ME Distribución' -> 'ME_DISTRIBUCION').
+    """
+    sin_acentos = unicodedata.normalize('NFKD', commerce_group).encode('ascii', 'ignore').decode('ascii')
+    return sin_acentos.strip().upper().replace(' ', '_')
+
 def get_commerce_group_filter(commerce_group: str) -> str:
     """
-    Get the SQL filter for a specific Commerce Group.
-    
+    Get the SQL CASE expression for a specific Commerce Group.
+
+    Uses the same filters as the universal report (utils.report_queries).
+
     Args:
         commerce_group: Commerce Group name
-    
+
     Returns:
-        SQL WHERE clause for the Commerce Group
+        SQL CASE expression that labels contacts with the Commerce Group key
+
+    Raises:
+        ValueError: If the Commerce Group is unknown
     """
-    # This is a simplified version. In production, import from config/commerce-groups.py
-    commerce_filters = {
-        'PDD': "PROCESS_PROBLEMATIC_REPORTING LIKE '%Dañado%' OR PROCESS_PROBLEMATIC_REPORTING LIKE '%Defectuoso%'",
-        'PNR': "PROCESS_PROBLEMATIC_REPORTING LIKE '%No recibido%'",
-        'ME Distribución': "PROCESS_PROBLEMATIC_REPORTING LIKE '%Distribución%'",
-        # Add more as needed
-    }
-    
-    return commerce_filters.get(commerce_group, "1=1")
+    key = commerce_group_key(commerce_group)
+    if key not in COMMERCE_GROUP_FILTERS:
+        raise ValueError(f"Unknown Commerce Group '{commerce_group}'. "
+                         f"Available: {', '.join(COMMERCE_GROUP_FILTERS)}")
+    return COMMERCE_GROUP_FILTERS[key]
+
+def _month_range(period: str) -> tuple:
+    """
+    First and last day of a YYYY-MM period (YYYY-MM-DD).
+    """
+    month = pd.Period(period, freq='M')
+    return month.start_time.strftime('%Y-%m-%d'), month.end_time.strftime('%Y-%m-%d')
+
+def _dimension_field(dimension: str) -> str:
+    """
+    BigQuery field of a dimension (report names like TIPIFICACION or raw column names).
+    """
+    if dimension.upper() in FIELD_MAPPING:
+        return FIELD_MAPPING[dimension.upper()]
+    if not dimension.replace('_', '').isalnum():
+        raise ValueError(f"Invalid dimension '{dimension}'")
+    return f"C.{dimension.upper()}"
 
 def build_query(commerce_group: str, site: str, dimension: str, period1: str, period2: str) -> str:
     """
     Build BigQuery SQL for CR analysis.
-    
+
+    Uses the canonical parameterized incoming-by-dimension query of the
+    universal report, so the same request from either tool reuses BigQuery's
+    cached result.
+
     Args:
         commerce_group: Commerce Group name
         site: Site code
         dimension: Analysis dimension
         period1: First period (YYYY-MM)
         period2: Second period (YYYY-MM)
-    
+
     Returns:
-        SQL query string
+        CanonicalQuery with columns DIMENSION_VAL, INC_P1, INC_P2, VAR_INC, VAR_ABS
     """
-    commerce_filter = get_commerce_group_filter(commerce_group)
-    
-    query = f"""
-    WITH BASE_CONTACTS AS (
-        SELECT
-            PERIOD_MONTH,
-            {dimension},
-            COUNT(*) AS INCOMING
-        FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS`
-        WHERE 1=1
-            AND SITE_ID = '{site}'
-            AND PERIOD_MONTH IN ('{period1}', '{period2}')
-            AND ({commerce_filter})
-            AND FLAG_EXCLUDE_NUMERATOR_CR = 0
-            AND QUEUE_ID NOT IN (2131, 230, 1102, 1241, 2075, 2294, 2295)
-        GROUP BY 1, 2
+    p1_start, p1_end = _month_range(period1)
+    p2_start, p2_end = _month_range(period2)
+    return build_dimension_query(
+        site, commerce_group_key(commerce_group), get_commerce_group_filter(commerce_group),
+        _dimension_field(dimension), p1_start, p1_end, p2_start, p2_end
     )
-    
-    SELECT
-        {dimension},
-        SUM(CASE WHEN PERIOD_MONTH = '{period1}' THEN INCOMING ELSE 0 END) AS INCOMING_PERIOD1,
-        SUM(CASE WHEN PERIOD_MONTH = '{period2}' THEN INCOMING ELSE 0 END) AS INCOMING_PERIOD2
-    FROM BASE_CONTACTS
-    GROUP BY 1
-    HAVING (INCOMING_PERIOD1 >= {MIN_THRESHOLD} OR INCOMING_PERIOD2 >= {MIN_THRESHOLD})
-    ORDER BY INCOMING_PERIOD2 DESC
+
+def shape_results(df: pd.DataFrame, dimension: str, threshold: int = MIN_THRESHOLD) -> pd.DataFrame:
     """
-    
-    return query
+    Rename query columns and keep elements above the incoming threshold.
+
+    Args:
+        df: Result of build_query
+        dimension: Analysis dimension (column name in the output)
+        threshold: Minimum incoming cases in either period
+
+    Returns:
+        DataFrame with [dimension], INCOMING_PERIOD1 and INCOMING_PERIOD2, sorted by INCOMING_PERIOD2
+    """
+    df = df.rename(columns={'DIMENSION_VAL': dimension, 'INC_P1': 'INCOMING_PERIOD1',
+                            'INC_P2': 'INCOMING_PERIOD2'})
+    df = df[(df['INCOMING_PERIOD1'] >= threshold) | (df['INCOMING_PERIOD2'] >= threshold)]
+    df = df[[dimension, 'INCOMING_PERIOD1', 'INCOMING_PERIOD2']].astype(
+        {'INCOMING_PERIOD1': 'int64', 'INCOMING_PERIOD2': 'int64'})
+    return df.sort_values('INCOMING_PERIOD2', ascending=False).reset_index(drop=True)
 
 def calculate_variation(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -287,6 +317,7 @@ def main():
     parser.add_argument('--threshold', type=int, default=50, help='Minimum incoming threshold')
     parser.add_argument('--format', default='both', choices=['csv', 'html', 'both'], help='Output format')
     parser.add_argument('--open-report', action='store_true', help='Open the HTML report after generation')
+    add_backend_arguments(parser)
     
     args = parser.parse_args()
     
@@ -301,13 +332,17 @@ def main():
     
     # Build query
     print(f"\n📊 Construyendo query...")
-    query = build_query(args.commerce_group, args.site, args.dimension, args.period1, args.period2)
+    try:
+        query = build_query(args.commerce_group, args.site, args.dimension, args.period1, args.period2)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
     
     # Execute query
-    print(f"⚙️ Ejecutando query en BigQuery...")
+    print(f"⚙️ Ejecutando query en {args.backend}...")
     try:
-        client = bigquery.Client(project=PROJECT_ID)
-        df = client.query(query).to_dataframe()
+        client = backend_from_args(args, project=PROJECT_ID)
+        df = shape_results(client.to_dataframe(query), args.dimension, args.threshold)
         print(f"✅ Query ejecutado: {len(df)} registros obtenidos")
     except Exception as e:
         print(f"❌ Error al ejecutar query: {e}")
@@ -320,10 +355,10 @@ def main():
     deep_df = None
     if args.deep_dive_dimension:
         print(f"\n🔎 Construyendo query deep dive...")
-        deep_query = build_query(args.commerce_group, args.site, args.deep_dive_dimension, args.period1, args.period2)
-        print(f"⚙️ Ejecutando query deep dive en BigQuery...")
+        print(f"⚙️ Ejecutando query deep dive en {args.backend}...")
         try:
-            deep_df = client.query(deep_query).to_dataframe()
+            deep_query = build_query(args.commerce_group, args.site, args.deep_dive_dimension, args.period1, args.period2)
+            deep_df = shape_results(client.to_dataframe(deep_query), args.deep_dive_dimension, args.threshold)
             print(f"✅ Deep dive obtenido: {len(deep_df)} registros")
             deep_df = calculate_variation(deep_df)
         except Exception as e:
@@ -0,0 +1,226 @@
+"""
+Unit Tests: test_batch_reports.py
+Purpose: Test batch and multi-site report specs and the shared contacts / orders scans
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_batch_reports.py -v
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from io import StringIO
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.site_groups import get_report_sites
+from utils.batch_reports import batch_commerce_groups, expand_batch_spec, load_batch_spec, site_reports
+from utils.report_pipeline import ReportError, ReportPipeline, report_args
+from utils.report_queries import (
+    COMMERCE_GROUP_FILTERS, build_batch_contacts_query, build_fused_contacts_query,
+    split_batch_contacts, split_batch_orders, split_fused_contacts
+)
+
+try:
+    from utils.query_backend import DuckDBBackend
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+SPEC = {
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+    'aperturas': 'PROCESO,CDU', 'skip_conversations': True,
+}
+
+
+class TestBatchSpec(unittest.TestCase):
+    """Test suite for batch spec loading and expansion"""
+
+    def test_all_commerce_groups(self):
+        """Test ALL expands to every reportable commerce group once per alias"""
+        reportes = expand_batch_spec(dict(SPEC, sites=['MLB', 'ROLA'], commerce_groups='ALL'))
+        grupos = batch_commerce_groups()
+
+        self.assertEqual(len(reportes), 2 * len(grupos))
+        self.assertIn('FBM Sellers', grupos)
+        self.assertNotIn('FBM_SELLERS', grupos)
+        self.assertNotIn('PCF_COMPRADOR', grupos)
+
+    def test_report_options(self):
+        """Test each report is fused, without base table and in its own directory"""
+        reportes = expand_batch_spec(
+            dict(SPEC, sites=['MLB'], commerce_groups=['PDD'], output_dir='salida',
+                 reportes=[{'site': 'MLA', 'commerce_group': 'PNR', 'aperturas': 'CDU'}]),
+            ['--materialize-base', '--no-cache']
+        )
+
+        self.assertEqual([(a.site, a.commerce_group, a.aperturas) for a in reportes],
+                         [('MLB', 'PDD', 'PROCESO,CDU'), ('MLA', 'PNR', 'CDU')])
+        self.assertEqual(reportes[0].output_dir, os.path.join('salida', 'mlb_pdd'))
+        for args in reportes:
+            self.assertTrue(args.fused_scan)
+            self.assertFalse(args.materialize_base)
+            self.assertTrue(args.no_cache)
+
+    def test_invalid_specs(self):
+        """Test a spec without reports or with an unknown commerce group raises ReportError"""
+        with self.assertRaises(ReportError):
+            expand_batch_spec(SPEC)
+        with self.assertRaises(ReportError):
+            expand_batch_spec(dict(SPEC, sites=['MLB'], commerce_groups=['INEXISTENTE']))
+
+    def test_load_json(self):
+        """Test JSON specs load without PyYAML and missing files raise ReportError"""
+        directorio = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directorio, 'batch.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(dict(SPEC, sites=['MLB']), f)
+
+            self.assertEqual(load_batch_spec(path)['sites'], ['MLB'])
+            with self.assertRaises(ReportError):
+                load_batch_spec(os.path.join(directorio, 'no_existe.yaml'))
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+class TestSiteReports(unittest.TestCase):
+    """Test suite for one report per site (--site MLA,MLB,MLM / --explode-group)"""
+
+    def test_report_sites(self):
+        """Test site lists keep groups blended unless exploded"""
+        self.assertEqual(get_report_sites('mlb'), ['MLB'])
+        self.assertEqual(get_report_sites('MLA, MLB,ROLA'), ['MLA', 'MLB', 'ROLA'])
+        self.assertEqual(get_report_sites('ROLA', explode_group=True), ['MLC', 'MCO', 'MEC', 'MLU', 'MPE'])
+        self.assertEqual(get_report_sites('MLA,HSP', explode_group=True),
+                         ['MLA', 'MLC', 'MCO', 'MEC', 'MLM', 'MLU', 'MPE'])
+
+    def test_site_reports(self):
+        """Test each site gets a fused report in the same output directory"""
+        args = report_args(dict(SPEC, site='MLA,MLB', commerce_group='PDD', materialize_base=True))
+        reportes = site_reports(args)
+
+        self.assertEqual([a.site for a in reportes], ['MLA', 'MLB'])
+        for a in reportes:
+            self.assertTrue(a.fused_scan)
+            self.assertFalse(a.materialize_base)
+            self.assertEqual(a.output_dir, args.output_dir)
+        self.assertEqual(args.site, 'MLA,MLB')
+
+    def test_exploded_batch(self):
+        """Test a batch spec can explode groups into per-site directories"""
+        reportes = expand_batch_spec(dict(SPEC, sites=['ROLA'], commerce_groups=['PDD'],
+                                          explode_group=True, output_dir='salida'))
+
+        self.assertEqual(len(reportes), 5)
+        self.assertEqual(reportes[0].output_dir, os.path.join('salida', 'mlc_pdd'))
+
+    def test_pipeline_rejects_multiple_sites(self):
+        """Test a single ReportPipeline refuses a multi-site invocation"""
+        pipeline = ReportPipeline(dict(SPEC, site='MLA,MLB', commerce_group='PDD'))
+
+        with redirect_stdout(StringIO()), self.assertRaises(ReportError):
+            pipeline.configure()
+
+
+class TestBatchOrders(unittest.TestCase):
+    """Test suite for splitting the shared orders scan"""
+
+    def setUp(self):
+        """Set up a shared orders result with two sites"""
+        nan = None
+        self.df = pd.DataFrame([
+            {'SIT_SITE_ID': 'MLB', 'G_SEMANA': 1, 'SEMANA': nan, 'DRV_P1': 100, 'DRV_P2': 120, 'ORDERS': 900},
+            {'SIT_SITE_ID': 'MLB', 'G_SEMANA': 0, 'SEMANA': '2025-12-01', 'DRV_P1': 0, 'DRV_P2': 30, 'ORDERS': 30},
+            {'SIT_SITE_ID': 'MLB', 'G_SEMANA': 0, 'SEMANA': nan, 'DRV_P1': 50, 'DRV_P2': 0, 'ORDERS': 400},
+            {'SIT_SITE_ID': 'MLA', 'G_SEMANA': 1, 'SEMANA': nan, 'DRV_P1': 10, 'DRV_P2': 20, 'ORDERS': 90},
+            {'SIT_SITE_ID': 'MLA', 'G_SEMANA': 0, 'SEMANA': '2025-12-01', 'DRV_P1': 0, 'DRV_P2': 5, 'ORDERS': 5},
+        ])
+
+    def test_by_site(self):
+        """Test drivers filtered by site only sum the report's sites"""
+        drivers = split_batch_orders(self.df, ['MLA'])
+
+        self.assertEqual(drivers['drivers_total'].iloc[0].tolist(), [10, 20])
+        self.assertEqual(drivers['drivers_semanales']['ORDERS'].tolist(), [5])
+
+    def test_global(self):
+        """Test global drivers sum every site and drop weeks outside the series"""
+        drivers = split_batch_orders(self.df)
+
+        self.assertEqual(drivers['drivers_total'].iloc[0].tolist(), [110, 140])
+        self.assertEqual(drivers['drivers_semanales']['SEMANA'].tolist(), ['2025-12-01'])
+        self.assertEqual(drivers['drivers_semanales']['ORDERS'].tolist(), [35])
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestBatchContactsEquivalence(unittest.TestCase):
+    """Test the shared contacts scan gives the same results as each fused scan"""
+
+    def setUp(self):
+        """Set up a BT_CX_CONTACTS fixture with two sites and two commerce groups"""
+        self.dir = tempfile.mkdtemp()
+        filas = []
+        for i in range(240):
+            filas.append({
+                'CAS_CASE_ID': i, 'CLA_CLAIM_ID': i,
+                'SIT_SITE_ID': ['MLB', 'MLA', 'MCO'][i % 3],
+                'CONTACT_DATE_ID': date(2025, 11, 1) + timedelta(days=i % 61),
+                'PROCESS_BU_CR_REPORTING': ['ME', 'ML', 'MP'][i % 3],
+                'FLAG_EXCLUDE_NUMERATOR_CR': 1 if i % 11 == 0 else 0,
+                'QUEUE_ID': 230 if i % 7 == 0 else 100,
+                'PROCESS_ID': 10,
+                'CI_REASON_ID': None,
+                'PROCESS_PROBLEMATIC_REPORTING': ['PDD', 'PNR', 'Conflict Stale', 'Pagos', 'PDD'][i % 5],
+                'PROCESS_NAME': ['Reclamos', 'Devoluciones'][i % 2],
+                'CDU': ['Roto', None, 'Distinto', 'Incompleto'][i % 4],
+            })
+        pd.DataFrame(filas).to_parquet(os.path.join(self.dir, 'BT_CX_CONTACTS.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_same_results(self):
+        """Test each site × commerce group slice matches its fused query"""
+        periodos = ('2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+        campos = {'PROCESO': 'C.PROCESS_NAME', 'CDU': 'C.CDU'}
+        grupos = ['PDD', 'PNR']
+        df_batch = self.backend.to_dataframe(build_batch_contacts_query(
+            ['MLB', 'MLA'], grupos, campos, *periodos))
+
+        for site in ('MLB', 'MLA'):
+            for commerce_group in grupos:
+                with self.subTest(site=site, commerce_group=commerce_group):
+                    df_fusionado = self.backend.to_dataframe(build_fused_contacts_query(
+                        site, commerce_group, COMMERCE_GROUP_FILTERS[commerce_group], campos, *periodos))
+                    esperado = split_fused_contacts(df_fusionado, list(campos))
+                    resultado = split_fused_contacts(
+                        split_batch_contacts(df_batch, grupos, commerce_group, [site], list(campos)),
+                        list(campos)
+                    )
+
+                    self.assertGreater(esperado['inc_p1'], 0)
+                    self.assertEqual((resultado['inc_p1'], resultado['inc_p2']),
+                                     (esperado['inc_p1'], esperado['inc_p2']))
+                    pd.testing.assert_frame_equal(resultado['weekly'], esperado['weekly'], check_dtype=False)
+                    for apertura in campos:
+                        pd.testing.assert_frame_equal(resultado['dimensiones'][apertura],
+                                                      esperado['dimensiones'][apertura], check_dtype=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
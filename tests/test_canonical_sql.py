@@ -0,0 +1,145 @@
+"""
+Unit Tests: test_canonical_sql.py
+Purpose: Test canonical parameterized SQL for the shared report queries
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_canonical_sql.py -v
+"""
+
+import unittest
+import sys
+import os
+from datetime import date
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.canonical_sql import CanonicalQuery, canonical_query, fecha_param, sites_param
+from utils.query_backend import BigQueryBackend
+from utils.report_queries import COMMERCE_GROUP_FILTERS, build_dimension_query, build_feriados_query
+
+
+class TestCanonicalQuery(unittest.TestCase):
+    """Test suite for canonical_query"""
+
+    def test_render_and_parameters(self):
+        """Test the str value has literals and .sql keeps the parameters"""
+        query = canonical_query("""
+            SELECT * FROM T
+            WHERE SITE IN UNNEST(@sites) AND FECHA BETWEEN @inicio AND @fin
+        """, sites=['MLA', 'MLB'], inicio=date(2025, 11, 1), fin=date(2025, 11, 30), sin_uso=1)
+
+        self.assertIsInstance(query, CanonicalQuery)
+        self.assertEqual(query, "SELECT * FROM T WHERE SITE IN ('MLA', 'MLB') "
+                                "AND FECHA BETWEEN '2025-11-01' AND '2025-11-30'")
+        self.assertIn('UNNEST(@sites)', query.sql)
+        self.assertEqual(set(query.params), {'sites', 'inicio', 'fin'})
+
+    def test_literals_untouched(self):
+        """Test @ inside string literals is not a parameter and quotes are escaped"""
+        query = canonical_query("SELECT 'a@b.com' AS MAIL, @nombre AS N", nombre="O'Brien")
+
+        self.assertEqual(query, "SELECT 'a@b.com' AS MAIL, 'O''Brien' AS N")
+        self.assertEqual(list(query.params), ['nombre'])
+
+    def test_missing_parameter(self):
+        """Test a referenced parameter without value fails"""
+        with self.assertRaises(ValueError):
+            canonical_query("SELECT @falta")
+
+    def test_param_values(self):
+        """Test dates and site lists are normalized"""
+        self.assertEqual(fecha_param('2025-11-01 00:00:00'), date(2025, 11, 1))
+        self.assertEqual(sites_param(['mlb', 'MLA', 'MLB']), ['MLA', 'MLB'])
+
+
+class TestSharedQueries(unittest.TestCase):
+    """Test the report builders produce the same text for the same logical request"""
+
+    def test_same_request_same_text(self):
+        """Test equivalent requests (site group vs explicit order, formats) give identical SQL"""
+        q1 = build_feriados_query('MLA', '2025-11-01', '2025-12-31')
+        q2 = build_feriados_query('mla', '2025-11-01 00:00:00', '2025-12-31')
+
+        self.assertEqual(q1.sql, q2.sql)
+        self.assertEqual(q1.params, q2.params)
+        self.assertEqual(str(q1), str(q2))
+
+    def test_values_only_in_parameters(self):
+        """Test the run values are not interpolated in the parameterized text"""
+        query = build_dimension_query('MLB', 'PDD', COMMERCE_GROUP_FILTERS['PDD'], 'C.PROCESS_NAME',
+                                      '2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+
+        self.assertNotIn('2025-11-01', query.sql)
+        self.assertNotIn("'MLB'", query.sql)
+        self.assertEqual(query.params['commerce_group'], 'PDD')
+        self.assertEqual(query.params['p2_end'], date(2025, 12, 31))
+
+
+class FakeJobConfig(SimpleNamespace):
+    """QueryJobConfig with its API representation round-trip"""
+
+    def to_api_repr(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_api_repr(cls, recurso):
+        return cls(**recurso)
+
+
+class TestBigQueryParameters(unittest.TestCase):
+    """Test BigQueryBackend sends CanonicalQuery parameters"""
+
+    def setUp(self):
+        """Set up a BigQueryBackend with a fake bigquery module and client"""
+        self.enviadas = []
+        bigquery = SimpleNamespace(
+            QueryJobConfig=FakeJobConfig,
+            ScalarQueryParameter=lambda *args: ('scalar',) + args,
+            ArrayQueryParameter=lambda *args: ('array',) + args,
+        )
+        self.backend = BigQueryBackend.__new__(BigQueryBackend)
+        self.backend._bigquery = bigquery
+        self.backend.client = SimpleNamespace(
+            query=lambda sql, job_config=None: self.enviadas.append((sql, job_config)))
+
+    def test_query_parameters(self):
+        """Test the parameterized SQL is sent with typed query parameters"""
+        query = canonical_query("SELECT @n, @d WHERE S IN UNNEST(@sites)",
+                                n=5, d=date(2025, 1, 1), sites=['MLA'])
+        self.backend.query(query)
+
+        sql, config = self.enviadas[0]
+        self.assertEqual(sql, query.sql)
+        self.assertEqual(config.query_parameters, [
+            ('scalar', 'n', 'INT64', 5),
+            ('scalar', 'd', 'DATE', date(2025, 1, 1)),
+            ('array', 'sites', 'STRING', ['MLA']),
+        ])
+
+    def test_shared_job_config_is_not_modified(self):
+        """Test a job_config shared across queries keeps its fields and gets no parameters"""
+        compartida = FakeJobConfig(use_query_cache=False)
+        self.backend.query(canonical_query("SELECT @n", n=1), job_config=compartida)
+        self.backend.query(canonical_query("SELECT @n", n=2), job_config=compartida)
+
+        self.assertFalse(hasattr(compartida, 'query_parameters'))
+        primera, segunda = (config for _, config in self.enviadas)
+        self.assertIsNot(primera, compartida)
+        self.assertFalse(primera.use_query_cache)
+        self.assertEqual(primera.query_parameters, [('scalar', 'n', 'INT64', 1)])
+        self.assertEqual(segunda.query_parameters, [('scalar', 'n', 'INT64', 2)])
+
+    def test_plain_sql(self):
+        """Test plain SQL is sent as is"""
+        self.backend.query('SELECT 1')
+
+        self.assertEqual(self.enviadas, [('SELECT 1', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Unit Tests: test_contacts_cube.py
+Purpose: Test the local daily contacts cube (incremental loading, open days and equivalence with the fused scan)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_contacts_cube.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from io import StringIO
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.contacts_cube import TOTAL, ContactsCube
+from utils.report_queries import (
+    COMMERCE_GROUP_FILTERS, build_daily_contacts_query, build_fused_contacts_query, split_fused_contacts
+)
+
+try:
+    from utils.query_backend import DuckDBBackend
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+HOY = date(2026, 2, 10)
+
+
+def _diario(dias, aperturas, valores=('A', 'B')):
+    """Result of build_daily_contacts_query: one total row and one row per value and apertura per day"""
+    filas = []
+    for dia in dias:
+        base = {f'G_{a}': 1 for a in aperturas}
+        filas.append(dict(base, FECHA=pd.Timestamp(dia), CASOS=2.0 * len(valores)))
+        for apertura in aperturas:
+            for valor in valores:
+                filas.append(dict(base, **{f'G_{apertura}': 0, 'FECHA': pd.Timestamp(dia),
+                                           f'DIM_{apertura}': valor, 'CASOS': 2.0}))
+    return pd.DataFrame(filas)
+
+
+class TestContactsCube(unittest.TestCase):
+    """Test suite for ContactsCube"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cubo = ContactsCube(self.dir, 'MLB', 'PDD', hoy=HOY)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_incremental(self):
+        """Test loaded days are not read again and a new apertura only reads its own days"""
+        rangos = self.cubo.rangos(['PROCESO'], '2025-11-01', '2025-12-31')
+        inicio, fin, aperturas = self.cubo.missing_range(rangos)
+        self.assertEqual((inicio, fin, aperturas), ('2025-07-09', '2025-12-31', ['PROCESO']))
+
+        dias = pd.date_range(inicio, fin).strftime('%Y-%m-%d')
+        self.cubo.update(_diario(dias, aperturas), inicio, fin, aperturas)
+        cubo = ContactsCube(self.dir, 'MLB', 'PDD', hoy=HOY)
+        self.assertIsNone(cubo.missing_range(rangos))
+        self.assertEqual(cubo.missing_range(cubo.rangos(['PROCESO', 'CDU'], '2025-11-01', '2025-12-31')),
+                         ('2025-11-01', '2025-12-31', ['CDU']))
+        self.assertEqual(cubo.missing_range(cubo.rangos(['PROCESO'], '2025-12-01', '2026-01-31')),
+                         ('2026-01-01', '2026-01-31', ['PROCESO']))
+
+        refresh = ContactsCube(self.dir, 'MLB', 'PDD', refresh=True, hoy=HOY)
+        self.assertEqual(refresh.missing_range(rangos), ('2025-07-09', '2025-12-31', ['PROCESO']))
+
+    def test_answer(self):
+        """Test totals by period month, weekly series and dimension tables"""
+        dias = pd.date_range('2025-07-01', '2025-12-31').strftime('%Y-%m-%d')
+        self.cubo.update(_diario(dias, ['PROCESO']), '2025-07-01', '2025-12-31', ['PROCESO'])
+        # Recargar días no duplica
+        self.cubo.update(_diario(dias[-10:], ['PROCESO']), dias[-10], dias[-1], ['PROCESO'])
+
+        partes = self.cubo.answer(['PROCESO'], '2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+
+        self.assertEqual((partes['inc_p1'], partes['inc_p2']), (30 * 4, 31 * 4))
+        self.assertEqual(partes['weekly']['SEMANA'].iloc[-1], pd.Timestamp('2025-12-29'))
+        self.assertEqual(partes['weekly']['CASOS'].iloc[-1], 3 * 4)
+        self.assertEqual(partes['weekly']['CASOS'].iloc[-2], 7 * 4)
+        df_dim = partes['dimensiones']['PROCESO']
+        self.assertEqual(df_dim.columns.tolist(), ['DIMENSION_VAL', 'INC_P1', 'INC_P2', 'VAR_INC', 'VAR_ABS'])
+        self.assertEqual(df_dim['INC_P2'].tolist(), [62.0, 62.0])
+
+    def test_open_days_are_not_stored(self):
+        """Test the most recent days answer this run but stay missing for the next one"""
+        cubo = ContactsCube(self.dir, 'MLB', 'PDD', hoy=date(2026, 1, 2))
+        dias = pd.date_range('2025-12-25', '2026-01-01').strftime('%Y-%m-%d')
+        cubo.update(_diario(dias, []), dias[0], dias[-1], [])
+
+        self.assertEqual(len(cubo.read(TOTAL, dias[0], dias[-1])), 8)
+        siguiente = ContactsCube(self.dir, 'MLB', 'PDD', hoy=date(2026, 1, 2))
+        self.assertEqual(len(siguiente.read(TOTAL, dias[0], dias[-1])), 6)
+        self.assertEqual(siguiente.missing_range({TOTAL: (dias[0], dias[-1])}), ('2025-12-31', '2026-01-01', []))
+
+    def test_process_has_its_own_cube(self):
+        """Test --process-name uses a separate cube"""
+        proceso = ContactsCube(self.dir, 'MLB', 'PDD', process_name='Reclamos', hoy=HOY)
+        self.assertNotEqual(proceso.path, self.cubo.path)
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestContactsCubeEquivalence(unittest.TestCase):
+    """Test the cube answers the same as the fused scan for any period pair"""
+
+    def setUp(self):
+        """Set up a BT_CX_CONTACTS fixture spanning several months"""
+        self.dir = tempfile.mkdtemp()
+        filas = []
+        for i in range(600):
+            filas.append({
+                'CAS_CASE_ID': i, 'CLA_CLAIM_ID': i,
+                'SIT_SITE_ID': ['MLB', 'MLA'][i % 2],
+                'CONTACT_DATE_ID': date(2025, 6, 1) + timedelta(days=(i * 7) % 214),
+                'PROCESS_BU_CR_REPORTING': ['ME', 'ML', 'MP'][i % 3],
+                'FLAG_EXCLUDE_NUMERATOR_CR': 1 if i % 11 == 0 else 0,
+                'QUEUE_ID': 230 if i % 13 == 0 else 100,
+                'PROCESS_ID': 10,
+                'CI_REASON_ID': None,
+                'PROCESS_PROBLEMATIC_REPORTING': ['PDD', 'PNR', 'Conflict Others'][i % 3],
+                'PROCESS_NAME': ['Reclamos', 'Devoluciones', 'Cancelaciones'][i % 3],
+                'CDU': ['Roto', None, 'Distinto', 'Incompleto'][i % 4],
+            })
+        pd.DataFrame(filas).to_parquet(os.path.join(self.dir, 'BT_CX_CONTACTS.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+        self.cubo = ContactsCube(os.path.join(self.dir, 'cube'), 'MLB', 'PDD', hoy=HOY)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _responder(self, campos, periodos):
+        """Load what the cube is missing (like ReportPipeline) and answer"""
+        faltante = self.cubo.missing_range(self.cubo.rangos(list(campos), periodos[0], periodos[3]))
+        if faltante is not None:
+            inicio, fin, aperturas = faltante
+            df = self.backend.to_dataframe(build_daily_contacts_query(
+                'MLB', 'PDD', COMMERCE_GROUP_FILTERS['PDD'], {a: campos[a] for a in aperturas}, inicio, fin))
+            self.cubo.update(df, inicio, fin, aperturas)
+        return self.cubo.answer(list(campos), *periodos)
+
+    def test_same_results(self):
+        """Test several period pairs and apertura sets loaded incrementally"""
+        casos = [
+            ({'PROCESO': 'C.PROCESS_NAME'}, ('2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')),
+            ({'PROCESO': 'C.PROCESS_NAME', 'CDU': 'C.CDU'}, ('2025-10-01', '2025-10-31', '2025-11-01', '2025-11-30')),
+            ({'CDU': 'C.CDU'}, ('2025-09-01', '2025-10-31', '2025-11-01', '2025-12-31')),
+        ]
+        for campos, periodos in casos:
+            with self.subTest(aperturas=list(campos), periodos=periodos), redirect_stdout(StringIO()):
+                esperado = split_fused_contacts(self.backend.to_dataframe(build_fused_contacts_query(
+                    'MLB', 'PDD', COMMERCE_GROUP_FILTERS['PDD'], campos, *periodos)), list(campos))
+                resultado = self._responder(campos, periodos)
+
+                self.assertGreater(esperado['inc_p1'], 0)
+                self.assertEqual((resultado['inc_p1'], resultado['inc_p2']), (esperado['inc_p1'], esperado['inc_p2']))
+                pd.testing.assert_frame_equal(resultado['weekly'], esperado['weekly'], check_dtype=False)
+                for apertura in campos:
+                    ordenar = lambda df: df.sort_values('DIMENSION_VAL').reset_index(drop=True)
+                    pd.testing.assert_frame_equal(ordenar(resultado['dimensiones'][apertura]),
+                                                  ordenar(esperado['dimensiones'][apertura]), check_dtype=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Unit Tests: test_drivers_alternativos.py
+Purpose: Test the batch evaluation of alternative drivers (one query per source table, same results as standalone queries) and the lookup by key
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_drivers_alternativos.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.drivers_alternativos import (
+    buscar_driver_alternativo, build_batch_driver_queries, build_driver_query, build_weekly_query,
+    evaluar_drivers_alternativos
+)
+
+try:
+    from utils.query_backend import DuckDBBackend
+    from utils.query_scheduler import QueryScheduler
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+PERIODOS = ('2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+PARADAS = ('ME PreDespacho', 'Reputación ME', 'HT Colecta', 'paradas_colecta')
+MODERACIONES = ('Moderaciones', '_TODOS', '_TODOS', 'items_moderados')
+RETIROS = ('FBM Sellers', 'FBM-Retiro de Stock', '_TODOS', 'retiro_requests')
+
+
+class TestBuildBatchDriverQueries(unittest.TestCase):
+    """Test suite for build_batch_driver_queries"""
+
+    def test_one_query_per_table(self):
+        """Test every driver and site is a branch of its source table's query"""
+        queries = build_batch_driver_queries([PARADAS, MODERACIONES, RETIROS], *PERIODOS, sites=['MLA', 'MLB'])
+
+        self.assertEqual(len(queries), 3)
+        query = queries['meli-bi-data.WHOWNER.DM_SHP_FBM_PICKUP']
+        self.assertEqual(query.count('UNION ALL'), 3)
+        self.assertIn(build_driver_query(*PARADAS, *PERIODOS, 'MLB'), query)
+        self.assertNotIn('ORDER BY SEMANA', query)
+
+    def test_sites_and_weekly(self):
+        """Test unavailable sites are skipped and weekly branches are optional"""
+        queries = build_batch_driver_queries([PARADAS], *PERIODOS, sites=['MLA', 'MLU'], incluir_semanal=False)
+
+        self.assertEqual(list(queries), ['meli-bi-data.WHOWNER.DM_SHP_FBM_PICKUP'])
+        self.assertNotIn('UNION ALL', queries['meli-bi-data.WHOWNER.DM_SHP_FBM_PICKUP'])
+        self.assertEqual(build_batch_driver_queries([PARADAS], *PERIODOS, sites=['MLU']), {})
+        with self.assertRaises(KeyError):
+            build_batch_driver_queries([('ME PreDespacho', 'Reputación ME', 'HT Colecta', 'otro')],
+                                       *PERIODOS, sites=['MLA'])
+
+
+class TestBuscarDriverAlternativo(unittest.TestCase):
+    """Test suite for buscar_driver_alternativo"""
+
+    def test_lookup_by_key(self):
+        """Test a driver is found by commerce group and key (aliases accepted) or raises KeyError"""
+        self.assertEqual(buscar_driver_alternativo('FBM_SELLERS', 'withdrawal requests'), RETIROS)
+        self.assertEqual(buscar_driver_alternativo('ME PreDespacho', 'paradas_colecta'), PARADAS)
+        with self.assertRaises(KeyError):
+            buscar_driver_alternativo('FBM_SELLERS', 'paradas_colecta')
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestBatchEquivalence(unittest.TestCase):
+    """Test the batch returns the same drivers as the standalone queries"""
+
+    def setUp(self):
+        """Set up DM_SHP_FBM_PICKUP and BT_MODERATIONS fixtures"""
+        self.dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        n = 3000
+        pd.DataFrame({
+            'DATES_DT': [date(2025, 11, 1) + timedelta(days=int(d)) for d in rng.integers(0, 92, n)],
+            'CUST_ID': rng.integers(0, 300, n),
+            'WAREHOUSE_ID': rng.choice(['AR01', 'BR02', 'BR03'], n),
+            'SITE_ID': rng.choice(['MLA', 'MLB', 'MLV'], n),
+        }).to_parquet(os.path.join(self.dir, 'DM_SHP_FBM_PICKUP.parquet'), index=False)
+        pd.DataFrame({
+            'MONTH_ID': [date(2025, int(m), 1) for m in rng.integers(6, 13, n)],
+            'mod_event_id': rng.integers(0, 2000, n),
+            'FLG_FIRST_MOD': rng.random(n) < 0.7,
+            'SIT_SITE_ID': rng.choice(['MLA', 'MLB'], n),
+        }).to_parquet(os.path.join(self.dir, 'BT_MODERATIONS.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_same_results(self):
+        """Test totals and weekly series for every driver and site"""
+        scheduler = QueryScheduler(self.backend)
+        try:
+            df_totales, df_semanal = evaluar_drivers_alternativos(
+                scheduler, [PARADAS, MODERACIONES], *PERIODOS, sites=['MLA', 'MLB'])
+        finally:
+            scheduler.shutdown()
+
+        self.assertEqual(df_totales['DRIVER_KEY'].tolist(), ['paradas_colecta'] * 2 + ['items_moderados'] * 2)
+        for driver in (PARADAS, MODERACIONES):
+            for site in ('MLA', 'MLB'):
+                with self.subTest(driver=driver[3], site=site):
+                    filtro = lambda df: df[(df['DRIVER_KEY'] == driver[3]) & (df['SIT_SITE_ID'] == site)]
+                    esperado = self.backend.to_dataframe(build_driver_query(*driver, *PERIODOS, site))
+                    self.assertGreater(esperado['DRV_P1'].iloc[0], 0)
+                    self.assertEqual(filtro(df_totales)[['DRV_P1', 'DRV_P2']].values.tolist(),
+                                     esperado.values.tolist())
+
+                    esperado = self.backend.to_dataframe(build_weekly_query(*driver, PERIODOS[3], site))
+                    pd.testing.assert_frame_equal(filtro(df_semanal)[['SEMANA', 'DRIVER']].reset_index(drop=True),
+                                                  esperado, check_dtype=False)
+
+    def test_twice_on_same_scheduler(self):
+        """Test a second evaluation on the same scheduler registers its own jobs"""
+        scheduler = QueryScheduler(self.backend)
+        try:
+            primera = evaluar_drivers_alternativos(scheduler, [PARADAS], *PERIODOS, sites=['MLA'])
+            segunda = evaluar_drivers_alternativos(scheduler, [PARADAS], *PERIODOS, sites=['MLA'])
+        finally:
+            scheduler.shutdown()
+
+        for df_primera, df_segunda in zip(primera, segunda):
+            pd.testing.assert_frame_equal(df_primera, df_segunda)
+
+
+if __name__ == '__main__':
+    unittest.main()
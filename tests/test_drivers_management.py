@@ -0,0 +1,233 @@
+"""
+Unit Tests: test_drivers_management.py
+Purpose: Test the persistent DriverStore (incremental loading, open days, sharing and equivalence with the driver queries)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_drivers_management.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from io import StringIO
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from calculations.drivers_management import ORDERS, SHIPPING_MEASURES, DriverStore, driver_type
+from config.drivers_mapping import get_driver_config
+from utils.report_pipeline import ReportPipeline
+from utils.report_queries import (
+    build_drivers_total_query, build_global_drivers_query, build_weekly_drivers_query, weekly_start
+)
+
+try:
+    from utils.query_backend import DuckDBBackend
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+HOY = date(2026, 2, 10)
+PARAMS = {
+    'site': 'MLB', 'commerce_group': 'PDD', 'aperturas': 'PROCESO',
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+    'skip_conversations': True, 'no_cache': True,
+}
+
+
+def _ordenes(dias, sites=('MLA', 'MLB')):
+    """Result of build_daily_orders_query: 3 rows (2 distinct orders) per site and day"""
+    return pd.DataFrame([{'FECHA': pd.Timestamp(dia), 'SIT_SITE_ID': site, 'ORDERS': 3, 'ORDERS_DISTINTAS': 2}
+                         for dia in dias for site in sites])
+
+
+class RecordingBackend:
+    """Backend that records the dry-run SQL (plan mode)"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.sqls = []
+
+    def dry_run(self, sql):
+        self.sqls.append(sql)
+        return 1024**3
+
+    def query(self, sql, **kwargs):
+        raise AssertionError('plan mode executed a query')
+
+
+class TestDriverStore(unittest.TestCase):
+    """Test suite for DriverStore"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = DriverStore(self.dir, today=HOY)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_incremental(self):
+        """Test loaded days are not read again, also from a new instance"""
+        self.assertEqual(self.store.missing_range('orders', '2025-11-01', '2025-12-31'), ('2025-11-01', '2025-12-31'))
+        dias = pd.date_range('2025-11-01', '2025-12-31').strftime('%Y-%m-%d')
+        self.store.update('orders', _ordenes(dias), '2025-11-01', '2025-12-31')
+
+        store = DriverStore(self.dir, today=HOY)
+        self.assertIsNone(store.missing_range('orders', '2025-11-10', '2025-12-31'))
+        self.assertEqual(store.missing_range('orders', '2025-10-01', '2026-01-15'), ('2025-10-01', '2026-01-15'))
+        self.assertEqual(store.missing_range('orders', '2025-12-01', '2026-01-15'), ('2026-01-01', '2026-01-15'))
+        self.assertEqual(store.missing_range('orders', '2025-12-01', '2025-12-31', refresh=True),
+                         ('2025-12-01', '2025-12-31'))
+        self.assertEqual(store.missing_range('shipping', '2025-11-15', '2025-12-31'), ('2025-11-01', '2025-12-31'))
+
+    def test_drv_and_weekly(self):
+        """Test sums by site, site group and global, and the weekly distinct orders"""
+        dias = pd.date_range('2025-07-01', '2025-12-31').strftime('%Y-%m-%d')
+        self.store.update('orders', _ordenes(dias, ('MLB', 'MLC', 'MCO')), '2025-07-01', '2025-12-31')
+        # Recargar días no los duplica
+        self.store.update('orders', _ordenes(dias[-5:], ('MLB', 'MLC', 'MCO')), dias[-5], dias[-1])
+
+        self.assertEqual(self.store.drv('MLB', '2025-12-01', '2025-12-31'), 31 * 3)
+        self.assertEqual(self.store.drv('ROLA', '2025-12-01', '2025-12-31'), 31 * 3 * 2)
+        self.assertEqual(self.store.drv(None, '2025-12-01', '2025-12-31', ORDERS), 31 * 3 * 3)
+
+        semanal = self.store.weekly('MLB', '2025-12-31')
+        self.assertEqual(semanal.columns.tolist(), ['SEMANA', 'ORDERS'])
+        self.assertEqual(semanal['SEMANA'].iloc[-1], pd.Timestamp('2025-12-29'))
+        self.assertEqual(semanal['ORDERS'].iloc[-1], 3 * 2)
+        self.assertEqual(semanal['ORDERS'].iloc[-2], 7 * 2)
+
+    def test_shipping(self):
+        """Test monthly Shipping measures and the driver type of each commerce group"""
+        medida = driver_type(get_driver_config('ME_DISTRIBUCION'))
+        self.assertIn(medida, SHIPPING_MEASURES)
+        self.assertEqual(driver_type(get_driver_config('PDD')), ORDERS)
+
+        df = pd.DataFrame([{'MONTH_ID': f'2025-{mes:02d}-01', 'SIT_SITE_ID': site, **{m: 10 for m in SHIPPING_MEASURES}}
+                           for mes in (11, 12) for site in ('MLA', 'MLB')])
+        self.store.update('shipping', df, '2025-11-01', '2025-12-31')
+
+        self.assertEqual(self.store.drv(None, '2025-11-01', '2025-12-31', medida), 40)
+        self.assertEqual(self.store.drv('MLA', '2025-12-01', '2025-12-31', medida), 10)
+        self.assertIsNone(DriverStore(self.dir, today=HOY).missing_range('shipping', '2025-11-01', '2025-12-31'))
+
+    def test_open_days_are_not_stored(self):
+        """Test the most recent days answer this run but stay missing for the next one"""
+        store = DriverStore(self.dir, today=date(2026, 1, 2))
+        dias = pd.date_range('2025-12-25', '2026-01-01').strftime('%Y-%m-%d')
+        store.update('orders', _ordenes(dias), dias[0], dias[-1])
+
+        self.assertEqual(store.drv('MLB', dias[0], dias[-1]), 8 * 3)
+        siguiente = DriverStore(self.dir, today=date(2026, 1, 2))
+        self.assertEqual(siguiente.drv('MLB', dias[0], dias[-1]), 6 * 3)
+        self.assertEqual(siguiente.missing_range('orders', dias[0], dias[-1]), ('2025-12-31', '2026-01-01'))
+
+    def test_shared_and_manual_drivers(self):
+        """Test shared() returns one instance per directory and set_driver() takes precedence"""
+        self.assertIs(DriverStore.shared(self.dir), DriverStore.shared(os.path.join(self.dir, '.')))
+        dias = pd.date_range('2025-12-01', '2025-12-31').strftime('%Y-%m-%d')
+        self.store.update('orders', _ordenes(dias), dias[0], dias[-1])
+
+        self.assertEqual(self.store.get_driver('MLB', '2025-12'), 31 * 3)
+        self.store.set_driver('MLB', '2025-12', 5.0)
+        self.assertEqual(self.store.get_driver('MLB', '2025-12'), 5.0)
+        self.assertIsNone(self.store.get_driver('MLB', '2025-10'))
+        self.assertTrue(self.store.validate_drivers(['MLA'], ['2025-12'])['is_valid'])
+
+    def test_pipeline_jobs(self):
+        """Test --driver-store replaces the driver queries by one load per source"""
+        backend = RecordingBackend()
+        pipeline = ReportPipeline(dict(PARAMS, plan=True, driver_store=True,
+                                       driver_store_dir=os.path.join(self.dir, 'pipeline')), backend=backend)
+        with redirect_stdout(StringIO()):
+            pipeline.run()
+
+        nombres = [item['nombre'] for item in pipeline.plan.items]
+        self.assertIn('drivers_diarios', nombres)
+        for nombre in ('drivers_total', 'drivers_semanales', 'cross_site_drivers', 'drivers_envios'):
+            self.assertNotIn(nombre, nombres)
+        # PASO 2 ya no cruza contactos con órdenes
+        self.assertFalse(any('BT_ORD_ORDERS' in str(sql) and 'BT_CX_CONTACTS' in str(sql) for sql in backend.sqls))
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestDriverStoreEquivalence(unittest.TestCase):
+    """Test the store answers the same as the driver queries of the report"""
+
+    def setUp(self):
+        """Set up BT_ORD_ORDERS and BT_CX_DRIVERS_CR fixtures spanning several months"""
+        self.dir = tempfile.mkdtemp()
+        sites = ['MLA', 'MLB', 'MLC', 'MCO', 'MLV']
+        pd.DataFrame([{
+            'ORD_ORDER_ID': i,
+            'SIT_SITE_ID': sites[i % 5],
+            'ORD_CLOSED_DT': date(2025, 6, 1) + timedelta(days=(i * 7) % 214),
+            'ORD_GMV_FLG': i % 17 != 0,
+            'ORD_MARKETPLACE_FLG': True,
+            'DOM_DOMAIN_ID': 'MLA-TIPS' if i % 19 == 0 else 'MLA-CELLPHONES',
+        } for i in range(3000)]).to_parquet(os.path.join(self.dir, 'BT_ORD_ORDERS.parquet'), index=False)
+        pd.DataFrame([{
+            'MONTH_ID': date(2025, mes, 1), 'SIT_SITE_ID': site,
+            **{m: 100 * mes + j + k for k, m in enumerate(SHIPPING_MEASURES)},
+        } for mes in range(6, 13) for j, site in enumerate(sites)]).to_parquet(
+            os.path.join(self.dir, 'BT_CX_DRIVERS_CR.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+        self.store = DriverStore(os.path.join(self.dir, 'store'), backend=self.backend, today=HOY)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_same_results(self):
+        """Test totals, cross-site and weekly drivers for several commerce groups, sites and periods"""
+        casos = [
+            ('PDD', 'MLB', ('2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31'), False),
+            ('GENERALES_COMPRA', 'ROLA', ('2025-10-01', '2025-11-30', '2025-12-01', '2025-12-31'), False),
+            ('GENERALES_COMPRA', 'MLA', ('2025-09-10', '2025-10-20', '2025-11-05', '2025-12-20'), False),
+            ('ME_DISTRIBUCION', 'MLB', ('2025-10-01', '2025-10-31', '2025-11-01', '2025-11-30'), False),
+            ('FBM_SELLERS', 'ROLA', ('2025-07-01', '2025-09-30', '2025-10-01', '2025-12-31'), True),
+        ]
+        for commerce_group, site, periodos, por_site in casos:
+            with self.subTest(commerce_group=commerce_group, site=site, periodos=periodos):
+                config = get_driver_config(commerce_group)
+                self.store.prefetch(periodos[0], periodos[3])
+                self.store.prefetch(min(periodos[0], weekly_start(periodos[3])), periodos[3], sources=('orders',))
+                tipo = driver_type(config)
+                if tipo == ORDERS:
+                    sitio = site if config['filter_by_site'] else None
+                else:
+                    sitio = site if por_site else None
+
+                esperado = self.backend.to_dataframe(build_drivers_total_query(site, config, *periodos, por_site))
+                self.assertEqual((self.store.drv(sitio, periodos[0], periodos[1], tipo),
+                                  self.store.drv(sitio, periodos[2], periodos[3], tipo)),
+                                 (int(esperado['DRV_P1'].iloc[0]), int(esperado['DRV_P2'].iloc[0])))
+
+                esperado = self.backend.to_dataframe(build_global_drivers_query(config, *periodos))
+                self.assertEqual(self.store.drv(None, periodos[0], periodos[1], tipo), int(esperado['DRV_P1'].iloc[0]))
+
+                esperado = self.backend.to_dataframe(build_weekly_drivers_query(site, periodos[3], config['filter_by_site']))
+                resultado = self.store.weekly(site if config['filter_by_site'] else None, periodos[3])
+                ordenar = lambda df: df.sort_values('SEMANA').reset_index(drop=True)
+                pd.testing.assert_frame_equal(ordenar(resultado), ordenar(esperado), check_dtype=False)
+
+    def test_prefetch_is_incremental(self):
+        """Test a second prefetch of a covered range runs no query"""
+        self.assertEqual(self.store.prefetch('2025-10-01', '2025-12-31'), 2)
+        self.assertEqual(self.store.prefetch('2025-11-01', '2025-12-31'), 0)
+        self.assertEqual(self.store.prefetch('2025-09-01', '2025-12-31', sources=('orders',)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Unit Tests: test_hll_sketches.py
+Purpose: Test the HyperLogLog sketch store (estimator accuracy, merges, incremental loading and equivalence with COUNT(DISTINCT))
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_hll_sketches.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.hll_sketches import HASH_BITS, HLL_PRECISION, HllSketch, SketchStore
+
+try:
+    from utils.query_backend import DuckDBBackend
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+HOY = date(2026, 2, 10)
+
+
+def _registros(hashes, precision=HLL_PRECISION):
+    """REGISTRO / RHO rows like build_hll_registers_query for 63-bit hashes"""
+    hashes = np.asarray(hashes, dtype=np.int64)
+    w = hashes >> precision
+    rho = np.full(len(hashes), HASH_BITS - precision + 1, dtype=np.int64)
+    distinto_cero = w != 0
+    bajo = w[distinto_cero] & -w[distinto_cero]
+    rho[distinto_cero] = np.log2(bajo.astype(np.float64)).astype(np.int64) + 1
+    return pd.DataFrame({'REGISTRO': hashes & (2 ** precision - 1), 'RHO': rho})
+
+
+def _hashes(n, semilla=0):
+    return np.random.default_rng(semilla).integers(0, 2 ** 63 - 1, size=n, dtype=np.int64)
+
+
+class TestHllSketch(unittest.TestCase):
+    """Test suite for HllSketch"""
+
+    def test_estimate(self):
+        """Test the estimate is exact-ish for small sets and within 5% for large ones"""
+        self.assertEqual(HllSketch().count(), 0)
+        for n in (10, 1000, 100000):
+            with self.subTest(n=n):
+                estimado = HllSketch.from_rows(_registros(_hashes(n, n))).estimate()
+                self.assertLess(abs(estimado - n) / n, 0.05)
+
+    def test_merge_is_union(self):
+        """Test merging two sketches equals the sketch of the union"""
+        a, b = _hashes(5000, 1), _hashes(5000, 2)
+        b[:2500] = a[:2500]
+        union = HllSketch.from_rows(_registros(np.concatenate([a, b])))
+        merge = HllSketch.from_rows(_registros(a)) | HllSketch.from_rows(_registros(b))
+
+        np.testing.assert_array_equal(merge.registros, union.registros)
+        self.assertLess(abs(merge.estimate() - 7500) / 7500, 0.05)
+        with self.assertRaises(ValueError):
+            merge.merge(HllSketch(precision=10))
+
+
+class TestSketchStore(unittest.TestCase):
+    """Test suite for SketchStore"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _dia(self, dias, sites=('MLB', 'MLA'), por_dia=200):
+        """Daily registers: every day repeats half of the previous day's ids"""
+        partes = []
+        for i, dia in enumerate(dias):
+            for j, site in enumerate(sites):
+                hashes = _hashes(10000, j)[i * por_dia // 2:i * por_dia // 2 + por_dia]
+                df = _registros(hashes).groupby('REGISTRO', as_index=False)['RHO'].max()
+                partes.append(df.assign(FECHA=pd.Timestamp(dia), SIT_SITE_ID=site))
+        return pd.concat(partes, ignore_index=True)
+
+    def test_incremental(self):
+        """Test loaded days are not read again and open days stay missing"""
+        store = SketchStore(self.dir, 'customers', 'PDD', hoy=HOY)
+        self.assertEqual(store.missing_range('2026-01-01', '2026-02-10'), ('2026-01-01', '2026-02-10'))
+        dias = pd.date_range('2026-01-01', '2026-02-10').strftime('%Y-%m-%d')
+        store.update(self._dia(dias), '2026-01-01', '2026-02-10')
+
+        siguiente = SketchStore(self.dir, 'customers', 'PDD', hoy=HOY)
+        self.assertEqual(siguiente.missing_range('2026-01-01', '2026-02-10'), ('2026-02-08', '2026-02-10'))
+        self.assertIsNone(siguiente.missing_range('2026-01-01', '2026-01-31'))
+        self.assertEqual(len(store.read('MLB', '2026-02-01', '2026-02-10')['FECHA'].unique()), 10)
+        self.assertEqual(len(siguiente.read('MLB', '2026-02-01', '2026-02-10')['FECHA'].unique()), 7)
+        refresh = SketchStore(self.dir, 'customers', 'PDD', refresh=True, hoy=HOY)
+        self.assertEqual(refresh.missing_range('2026-01-01', '2026-01-31'), ('2026-01-01', '2026-01-31'))
+        self.assertNotEqual(SketchStore(self.dir, 'customers', 'ME_DISTRIBUCION').path, store.path)
+
+    def test_distinct(self):
+        """Test window counts merge days (overlapping ids) and sites"""
+        store = SketchStore(self.dir, 'cases', hoy=HOY)
+        dias = pd.date_range('2025-12-01', '2025-12-31').strftime('%Y-%m-%d')
+        store.update(self._dia(dias), '2025-12-01', '2025-12-31')
+        # Recargar días no duplica
+        store.update(self._dia(dias[:5]), dias[0], dias[4])
+
+        # 31 días de 200 ids que comparten 100 con el anterior → 3200 distintos por site
+        self.assertLess(abs(store.distinct('MLB', '2025-12-01', '2025-12-31') - 3200) / 3200, 0.05)
+        self.assertLess(abs(store.distinct(None, '2025-12-01', '2025-12-31') - 6400) / 6400, 0.05)
+        semanal = store.weekly('MLB', '2025-12-01', '2025-12-31')
+        self.assertEqual(semanal['SEMANA'].tolist(), list(pd.date_range('2025-12-01', '2025-12-29', freq='7D')))
+        self.assertLess(abs(semanal['DISTINTOS'].iloc[0] - 800) / 800, 0.05)
+
+    def test_invalid_metric(self):
+        """Test unknown metrics and commerce groups on order sketches are rejected"""
+        with self.assertRaises(ValueError):
+            SketchStore(self.dir, 'sellers')
+        with self.assertRaises(ValueError):
+            SketchStore(self.dir, 'orders', 'PDD')
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestSketchStoreEquivalence(unittest.TestCase):
+    """Test sketch counts against COUNT(DISTINCT) on a BT_CX_CONTACTS fixture"""
+
+    def setUp(self):
+        """Set up a BT_CX_CONTACTS fixture where cases and customers repeat across days"""
+        self.dir = tempfile.mkdtemp()
+        filas = []
+        for i in range(20000):
+            filas.append({
+                'CAS_CASE_ID': i // 3, 'CLA_CLAIM_ID': i, 'CUS_CUST_ID': (i * 7919) % 4000,
+                'SIT_SITE_ID': ['MLB', 'MLA'][(i // 3) % 2],
+                'CONTACT_DATE_ID': date(2025, 11, 1) + timedelta(days=i % 61),
+                'PROCESS_BU_CR_REPORTING': 'ME',
+                'FLAG_EXCLUDE_NUMERATOR_CR': 0,
+                'QUEUE_ID': 100,
+                'PROCESS_ID': 10,
+                'CI_REASON_ID': None,
+                'PROCESS_PROBLEMATIC_REPORTING': ['PDD', 'PNR'][i % 2],
+                'PROCESS_NAME': 'Reclamos',
+                'CDU': None,
+            })
+        self.contactos = pd.DataFrame(filas)
+        self.contactos.to_parquet(os.path.join(self.dir, 'BT_CX_CONTACTS.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_same_results(self):
+        """Test distinct cases and customers by window and site within 5% of the exact count"""
+        for metrica, columna in (('cases', 'CAS_CASE_ID'), ('customers', 'CUS_CUST_ID')):
+            store = SketchStore(os.path.join(self.dir, 'sketches'), metrica, 'PDD', hoy=HOY)
+            self.assertTrue(store.load(self.backend, '2025-11-01', '2025-12-31'))
+            self.assertFalse(store.load(self.backend, '2025-11-01', '2025-12-31'))
+            for site, inicio, fin in (('MLB', '2025-11-01', '2025-11-30'), (None, '2025-11-15', '2025-12-31')):
+                with self.subTest(metrica=metrica, site=site, inicio=inicio):
+                    df = self.contactos[(self.contactos['PROCESS_PROBLEMATIC_REPORTING'] == 'PDD')
+                                        & (self.contactos['CONTACT_DATE_ID'] >= date.fromisoformat(inicio))
+                                        & (self.contactos['CONTACT_DATE_ID'] <= date.fromisoformat(fin))]
+                    if site:
+                        df = df[df['SIT_SITE_ID'] == site]
+                    esperado = df[columna].nunique()
+                    self.assertLess(abs(store.distinct(site, inicio, fin) - esperado) / esperado, 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Unit Tests: test_partition_predicates.py
+Purpose: Test sargable partition predicates and that generated queries can prune
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_partition_predicates.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.drivers_mapping import get_driver_config
+from utils.metrics_queries import build_eventos_incoming_query, build_verticales_query
+from utils.partition_predicates import (
+    add_months, month_bounds, month_predicate, post_purchase_predicate, pruning_violations
+)
+from utils.report_queries import (
+    COMMERCE_GROUP_EVENTS_FILTERS, COMMERCE_GROUP_FILTERS, build_base_contacts_table,
+    build_cross_site_incoming_query, build_dimension_query, build_drivers_total_query,
+    build_eventos_fallback_query, build_feriados_query, build_fused_contacts_query,
+    build_global_drivers_query, build_incoming_total_query, build_weekly_drivers_query,
+    build_weekly_query
+)
+
+try:
+    from utils.query_backend import DuckDBBackend
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+PERIODOS = ('2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+
+
+class TestPredicates(unittest.TestCase):
+    """Test suite for the predicate builders"""
+
+    def test_month_predicate(self):
+        """Test a month is a half-open range on the bare column"""
+        self.assertEqual(month_predicate('C.CONTACT_DATE_ID', '2025-12'),
+                         "C.CONTACT_DATE_ID >= '2025-12-01' AND C.CONTACT_DATE_ID < '2026-01-01'")
+        self.assertEqual(month_bounds('2025-02-15'), (date(2025, 2, 1), date(2025, 3, 1)))
+
+    def test_add_months(self):
+        """Test month arithmetic across years"""
+        self.assertEqual(add_months(date(2025, 1, 20), -1), date(2024, 12, 1))
+        self.assertEqual(add_months(date(2025, 11, 1), 2), date(2026, 1, 1))
+
+    def test_post_purchase_window(self):
+        """Test the join window covers whole months around the contacts range"""
+        self.assertEqual(post_purchase_predicate('PP.ORD_CLOSED_DT', '2025-12-01', '2026-01-01', 1, 1),
+                         "PP.ORD_CLOSED_DT >= '2025-11-01' AND PP.ORD_CLOSED_DT < '2026-02-01'")
+        self.assertIn("< '2026-02-01'", post_purchase_predicate('X', '2025-11-01', '2025-12-15', 0, 1))
+        self.assertEqual(post_purchase_predicate('PP.ORD_CLOSED_DT', '2025-12-01', '2026-01-01'),
+                         "PP.ORD_CLOSED_DT < '2026-02-01'")
+
+
+class TestPruningViolations(unittest.TestCase):
+    """Test suite for pruning_violations"""
+
+    def test_wrapped_partition_column(self):
+        """Test DATE_TRUNC / CAST over the partition column is reported"""
+        sql = """SELECT 1 FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+                 WHERE DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) = '2025-12-01'"""
+        violaciones = pruning_violations(sql)
+
+        self.assertIn('BT_CX_CONTACTS C: sin rango sargable sobre CONTACT_DATE_ID', violaciones)
+        self.assertIn('BT_CX_CONTACTS C: CONTACT_DATE_ID envuelta en una función en un filtro', violaciones)
+        self.assertTrue(pruning_violations(
+            "SELECT 1 FROM `t.BT_ORD_ORDERS` ORD WHERE CAST(ORD.ORD_CLOSED_DT AS DATE) BETWEEN '2025-01-01' AND '2025-01-31'"))
+
+    def test_unbounded_join_side(self):
+        """Test a partitioned table joined without its own range is reported"""
+        sql = """SELECT 1 FROM `p.d.BT_CX_CONTACTS` c
+                 LEFT JOIN `p.d.DM_CX_POST_PURCHASE` pp ON c.CLA_CLAIM_ID = pp.CLA_CLAIM_ID
+                 WHERE c.CONTACT_DATE_ID BETWEEN '2025-12-01' AND '2025-12-31'"""
+
+        self.assertEqual(pruning_violations(sql),
+                         ['DM_CX_POST_PURCHASE pp: sin rango sargable sobre ORD_CLOSED_DT'])
+
+    def test_upper_bound_only(self):
+        """Test an upper bound is enough for DM_CX_POST_PURCHASE but not for the other tables"""
+        self.assertEqual(pruning_violations(
+            "SELECT 1 FROM `p.d.DM_CX_POST_PURCHASE` PP WHERE PP.ORD_CLOSED_DT < '2026-02-01'"), [])
+        self.assertEqual(pruning_violations(
+            "SELECT 1 FROM `p.d.BT_ORD_ORDERS` ORD WHERE ORD.ORD_CLOSED_DT < '2026-02-01'"),
+            ['BT_ORD_ORDERS ORD: sin rango sargable sobre ORD_CLOSED_DT'])
+
+    def test_wrapped_cluster_column(self):
+        """Test functions over the cluster column are reported"""
+        sql = """SELECT 1 FROM `p.d.BT_CX_CONTACTS` WHERE UPPER(SIT_SITE_ID) = 'MLA'
+                 AND CONTACT_DATE_ID >= '2025-12-01' AND CONTACT_DATE_ID < '2026-01-01'"""
+
+        self.assertEqual(pruning_violations(sql),
+                         ['BT_CX_CONTACTS: SIT_SITE_ID envuelta en una función en un filtro'])
+
+    def test_sargable_query(self):
+        """Test range predicates and functions outside filters are accepted"""
+        sql = f"""SELECT DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO
+                  FROM `p.d.BT_CX_CONTACTS` C
+                  WHERE C.SIT_SITE_ID IN ('MLA') AND {month_predicate('C.CONTACT_DATE_ID', '2025-12')}"""
+
+        self.assertEqual(pruning_violations(sql), [])
+
+
+class TestGeneratedQueriesPrune(unittest.TestCase):
+    """Test every generated query reads partitioned tables with sargable ranges"""
+
+    def queries(self):
+        """Queries of the universal report and the metrics generators"""
+        pdd = COMMERCE_GROUP_FILTERS['PDD']
+        campos = {'PROCESO': 'C.PROCESS_NAME', 'CDU': 'C.CDU'}
+        yield 'incoming_total', build_incoming_total_query('MLA', 'PDD', pdd, *PERIODOS)
+        for cg in ('PDD', 'PAGOS', 'ME_DISTRIBUCION'):
+            yield f'drivers_{cg}', build_drivers_total_query('MLA', get_driver_config(cg), *PERIODOS)
+            yield f'global_drivers_{cg}', build_global_drivers_query(get_driver_config(cg), *PERIODOS)
+        yield 'weekly', build_weekly_query('ROLA', 'PDD', pdd, '2025-12-31', filter_by_site=True)
+        yield 'weekly_drivers', build_weekly_drivers_query('MLA', '2025-12-31', filter_by_site=False)
+        yield 'dimension', build_dimension_query('MLA', 'PDD', pdd, 'C.CDU', *PERIODOS)
+        yield 'feriados', build_feriados_query('MLA', '2025-10-15', '2025-12-31')
+        yield 'eventos_fallback', build_eventos_fallback_query(
+            'MLA', *PERIODOS, COMMERCE_GROUP_EVENTS_FILTERS['PDD'])
+        yield 'cross_site', build_cross_site_incoming_query('PDD', pdd, *PERIODOS)
+        yield 'fused', build_fused_contacts_query('MLA', 'PDD', pdd, campos, *PERIODOS)
+        yield 'base_contacts', build_base_contacts_table(
+            'MLA', 'PDD', pdd, list(campos.values()), '2025-11-01', '2025-12-31', 'p.scratch')[1]
+        yield 'metrics_eventos', build_eventos_incoming_query('MLB', '2025-12', ['PDD', 'PNR'])
+        yield 'metrics_verticales', build_verticales_query('MLA', '2025-12', 'ALL')
+
+    def test_queries_can_prune(self):
+        """Test no generated query wraps or leaves unbounded a partition column"""
+        for nombre, sql in self.queries():
+            with self.subTest(query=nombre):
+                self.assertEqual(pruning_violations(sql), [])
+
+    def test_metrics_queries_bound_post_purchase(self):
+        """Test the metrics joins bound DM_CX_POST_PURCHASE around the month"""
+        verticales = build_verticales_query('MLA', '2025-12')
+        eventos = build_eventos_incoming_query('MLA', '2025-12')
+
+        self.assertNotIn('DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) =', verticales)
+        self.assertIn("PP.ORD_CLOSED_DT < '2026-02-01'", verticales)
+        self.assertNotIn("PP.ORD_CLOSED_DT >=", verticales)
+        self.assertIn("PP.ORD_CLOSED_DT >= '2025-11-01' AND PP.ORD_CLOSED_DT < '2026-02-01'", eventos)
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestVerticalesEquivalence(unittest.TestCase):
+    """Test the bounded post-purchase join keeps the vertical of every claim"""
+
+    def setUp(self):
+        """Set up December claims whose orders closed in the same month, 6 months and 2 years before"""
+        self.dir = tempfile.mkdtemp()
+        ordenes = [date(2025, 12, 5), date(2025, 6, 10), date(2023, 11, 20)]
+        pd.DataFrame({
+            'CLA_CLAIM_ID': [1, 2, 3],
+            'SIT_SITE_ID': 'MLA',
+            'CONTACT_DATE_ID': [date(2025, 12, 10)] * 3,
+            'PROCESS_BU_CR_REPORTING': 'ML',
+            'FLAG_EXCLUDE_NUMERATOR_CR': 0,
+            'PROCESS_PROBLEMATIC_REPORTING': 'PDD',
+        }).to_parquet(os.path.join(self.dir, 'BT_CX_CONTACTS.parquet'), index=False)
+        pd.DataFrame({
+            'CLA_CLAIM_ID': [1, 2, 3],
+            'ORD_CLOSED_DT': ordenes,
+            'VERTICAL': ['ELECTRO', 'HOGAR', 'MODA'],
+            'DOM_DOMAIN_AGG1': ['CELULARES', 'MUEBLES', 'ZAPATILLAS'],
+        }).to_parquet(os.path.join(self.dir, 'DM_CX_POST_PURCHASE.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_old_order_keeps_vertical(self):
+        """Test a claim on an order closed two years before the month is not SIN_VERTICAL"""
+        df = self.backend.to_dataframe(build_verticales_query('MLA', '2025-12', 'PDD'))
+
+        self.assertEqual(sorted(df['VERTICAL']), ['ELECTRO', 'HOGAR', 'MODA'])
+        self.assertEqual(df['INCOMING'].sum(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
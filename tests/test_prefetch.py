@@ -0,0 +1,182 @@
+"""
+Unit Tests: test_prefetch.py
+Purpose: Test the speculative prefetch of likely follow-up reports (candidates, SQL parity and background cache warm-up)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_prefetch.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import date
+from io import StringIO
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.prefetch import Prefetcher, likely_next_requests, prefetch_jobs, report_metric_jobs
+from utils.query_cache import QueryCache
+from utils.report_pipeline import ReportError, ReportPipeline, report_args, validate_args
+
+PARAMS = {
+    'site': 'MLA', 'commerce_group': 'PDD', 'aperturas': 'PROCESO,CDU',
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+    'skip_conversations': True, 'no_cache': True,
+}
+HOY = date(2026, 2, 10)
+
+
+class RecordingBackend:
+    """Backend that records the dry-run SQL (plan mode)"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.sqls = []
+
+    def dry_run(self, sql):
+        self.sqls.append(sql)
+        return 1024**3
+
+    def query(self, sql, **kwargs):
+        raise AssertionError('plan mode executed a query')
+
+
+class FakeResult:
+    def __init__(self, sql):
+        self.sql = sql
+
+    def result(self, timeout=None):
+        return self
+
+    def to_dataframe(self):
+        return pd.DataFrame({'SQL_LEN': [len(self.sql)]})
+
+
+class FakeBackend:
+    """Backend that answers every query with a one-row DataFrame"""
+
+    name = 'fake'
+
+    def __init__(self, bloquear=None):
+        self.queries = []
+        self.bloquear = bloquear
+        self.lock = threading.Lock()
+
+    def query(self, sql, job_config=None):
+        if self.bloquear is not None:
+            self.bloquear.wait(5)
+        with self.lock:
+            self.queries.append(sql)
+        return FakeResult(sql)
+
+
+class TestLikelyNextRequests(unittest.TestCase):
+    """Test suite for likely_next_requests / prefetch_jobs"""
+
+    def test_candidates(self):
+        """Test other top-level aperturas, the next closed month and the other big sites"""
+        args = report_args(PARAMS)
+        motivos = [c[0] for c in likely_next_requests(args, ['PROCESO', 'CDU'], hoy=HOY)]
+
+        self.assertEqual(motivos, ['apertura TIPIFICACION', 'mes 2026-01', 'site MLB', 'site MLM'])
+        siguiente = likely_next_requests(args, ['PROCESO', 'CDU'], hoy=HOY)[1][1]
+        self.assertEqual((siguiente.p1_start, siguiente.p2_start, siguiente.p2_end),
+                         ('2025-12-01', '2026-01-01', '2026-01-31'))
+        self.assertEqual(args.p2_start, '2025-12-01')
+
+    def test_month_not_closed_and_site_groups(self):
+        """Test an open next month and site groups skip their candidates"""
+        motivos = [c[0] for c in likely_next_requests(report_args(PARAMS), ['PROCESO', 'CDU'], hoy=date(2026, 1, 20))]
+        self.assertNotIn('mes 2026-01', motivos)
+
+        motivos = [c[0] for c in likely_next_requests(report_args(dict(PARAMS, site='ROLA')), ['PROCESO', 'CDU'], hoy=HOY)]
+        self.assertEqual(motivos, ['apertura TIPIFICACION', 'mes 2026-01'])
+
+    def test_jobs(self):
+        """Test a new apertura only prefetches its cube and no SQL is repeated"""
+        jobs = prefetch_jobs(report_args(PARAMS), ['PROCESO', 'CDU'], hoy=HOY)
+        nombres = [nombre for nombre, _ in jobs]
+
+        self.assertEqual([n for n in nombres if n.startswith('apertura')], ['apertura TIPIFICACION: dimension_TIPIFICACION'])
+        self.assertIn('site MLB: weekly', nombres)
+        self.assertIn('mes 2026-01: dimension_CDU', nombres)
+        self.assertEqual(len({sql for _, sql in jobs}), len(jobs))
+
+    def test_same_sql_as_pipeline(self):
+        """Test the prefetched SQL is the one the pipeline runs (the cache keys must match)"""
+        for fused_scan in (False, True):
+            with self.subTest(fused_scan=fused_scan):
+                backend = RecordingBackend()
+                pipeline = ReportPipeline(dict(PARAMS, plan=True, fused_scan=fused_scan), backend=backend)
+                with redirect_stdout(StringIO()):
+                    pipeline.run()
+
+                jobs = report_metric_jobs(pipeline.args, pipeline.aperturas_list)
+                self.assertEqual(len(jobs), 3 if fused_scan else 5)
+                for nombre, sql in jobs:
+                    self.assertIn(sql, backend.sqls, nombre)
+
+
+class TestPrefetcher(unittest.TestCase):
+    """Test suite for Prefetcher"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = QueryCache(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_warms_the_cache(self):
+        """Test only uncached queries run, up to the maximum, and their results land in the cache"""
+        self.cache.put('SELECT 1', pd.DataFrame({'X': [1]}))
+        jobs = [('a', 'SELECT 1'), ('b', 'SELECT 2'), ('c', 'SELECT 3'), ('d', 'SELECT 4')]
+        backend = FakeBackend()
+        prefetcher = Prefetcher(backend, self.cache, max_queries=2)
+
+        with redirect_stdout(StringIO()):
+            self.assertEqual(prefetcher.start(jobs), 2)
+            prefetcher.scheduler.result('c')
+            resumen = prefetcher.stop()
+
+        self.assertEqual(resumen, {'precargadas': 2, 'fallidas': 0, 'pendientes': 0})
+        self.assertEqual(sorted(backend.queries), ['SELECT 2', 'SELECT 3'])
+        self.assertTrue(self.cache.contains('SELECT 3'))
+        self.assertFalse(self.cache.contains('SELECT 4'))
+
+    def test_stop_cancels_pending(self):
+        """Test stop does not wait for the background queries and cancels the ones not started"""
+        bloquear = threading.Event()
+        backend = FakeBackend(bloquear)
+        prefetcher = Prefetcher(backend, self.cache, max_workers=1)
+
+        with redirect_stdout(StringIO()):
+            prefetcher.start([('a', 'SELECT 1'), ('b', 'SELECT 2'), ('c', 'SELECT 3')])
+            resumen = prefetcher.stop()
+            bloquear.set()
+            prefetcher.scheduler.result('a')
+
+        self.assertEqual(resumen['pendientes'], 3)
+        self.assertLessEqual(len(backend.queries), 1)
+
+    def test_requires_query_cache(self):
+        """Test --prefetch is rejected without the local query cache"""
+        with self.assertRaises(ReportError):
+            validate_args(report_args(dict(PARAMS, prefetch=True)))
+        validate_args(report_args(dict(PARAMS, prefetch=True, no_cache=False)))
+
+
+if __name__ == '__main__':
+    unittest.main()
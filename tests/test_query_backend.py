@@ -0,0 +1,180 @@
+"""
+Unit Tests: test_query_backend.py
+Purpose: Test the BigQuery → DuckDB dialect shim and the local DuckDB backend
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_query_backend.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pyarrow as pa
+
+from utils.query_backend import DuckDBBackend, arrow_to_dataframe, get_backend, to_duckdb_sql
+
+try:
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+
+class TestDialectShim(unittest.TestCase):
+    """Test suite for to_duckdb_sql"""
+
+    def test_table_reference(self):
+        """Test fully qualified tables map to the fixture view name"""
+        sql = to_duckdb_sql("SELECT * FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C")
+
+        self.assertEqual(sql, "SELECT * FROM BT_CX_CONTACTS C")
+
+    def test_date_trunc(self):
+        """Test DATE_TRUNC date parts, including WEEK(MONDAY)"""
+        self.assertEqual(
+            to_duckdb_sql("DATE_TRUNC(C.CONTACT_DATE_ID, MONTH)"),
+            "CAST(date_trunc('month', CAST(C.CONTACT_DATE_ID AS DATE)) AS DATE)"
+        )
+        self.assertIn("date_trunc('week'", to_duckdb_sql("DATE_TRUNC(C.CONTACT_DATE_ID, WEEK(MONDAY))"))
+
+    def test_nested_date_functions(self):
+        """Test nested DATE_SUB / DATE calls are rewritten inside out"""
+        sql = to_duckdb_sql("DATE_SUB(DATE('2025-12-31'), INTERVAL 25 WEEK)")
+
+        self.assertEqual(sql, "CAST(CAST(CAST('2025-12-31' AS DATE) AS DATE) - INTERVAL (25) WEEK AS DATE)")
+
+    def test_json_and_regexp(self):
+        """Test JSON_VALUE, REGEXP_REPLACE and raw string literals"""
+        sql = to_duckdb_sql("REGEXP_REPLACE(JSON_VALUE(S.SUMMARY, '$.problem'), r'\\s+', ' ')")
+
+        self.assertEqual(sql, "regexp_replace(json_extract_string(S.SUMMARY, '$.problem'), '\\s+', ' ', 'g')")
+
+    def test_string_literals_untouched(self):
+        """Test function names inside string literals and column names are not rewritten"""
+        sql = "SELECT 'DATE(x)' AS T, C.CONTACT_DATE_ID FROM X"
+
+        self.assertEqual(to_duckdb_sql(sql), sql)
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected"""
+        with self.assertRaises(ValueError):
+            get_backend('oracle')
+
+
+class TestArrowToDataframe(unittest.TestCase):
+    """Test suite for the Arrow → pandas dtype mapping"""
+
+    def setUp(self):
+        """Set up a table with text, dimension and dictionary-encoded columns"""
+        self.sites = pa.DictionaryArray.from_arrays(pa.array([0, 1, 0], pa.int32()), pa.array(['MLA', 'MLB', 'MLV']))
+        self.tabla = pa.table({
+            'PROCESO': ['PNR', 'PDD', 'PNR'],
+            'CDU': ['Demora', 'Roto', 'Demora'],
+            'SIT_SITE_ID': self.sites,
+            'CASOS': [10, 20, 30],
+        })
+
+    def test_text_columns(self):
+        """Test text columns come back as string[pyarrow]"""
+        df = arrow_to_dataframe(self.tabla)
+
+        self.assertEqual(df['CDU'].dtype, pd.StringDtype('pyarrow'))
+        self.assertEqual(df['CDU'].tolist(), ['Demora', 'Roto', 'Demora'])
+        self.assertEqual(df['CASOS'].dtype, 'int64')
+
+    def test_categoricals(self):
+        """Test dimension columns come back as category"""
+        df = arrow_to_dataframe(self.tabla, categoricals=['PROCESO'])
+
+        self.assertEqual(df['PROCESO'].dtype, 'category')
+        self.assertEqual(list(df['PROCESO'].cat.categories), ['PNR', 'PDD'])
+        self.assertEqual(df['PROCESO'].tolist(), ['PNR', 'PDD', 'PNR'])
+        self.assertEqual(df['CDU'].dtype, pd.StringDtype('pyarrow'))
+
+    def test_dictionary_column_untouched(self):
+        """Test an already dictionary-encoded column keeps its dictionary (including unused values)"""
+        df = arrow_to_dataframe(self.tabla, categoricals=['SIT_SITE_ID'])
+
+        self.assertEqual(df['SIT_SITE_ID'].dtype, 'category')
+        self.assertEqual(list(df['SIT_SITE_ID'].cat.categories), ['MLA', 'MLB', 'MLV'])
+        self.assertEqual(df['SIT_SITE_ID'].tolist(), ['MLA', 'MLB', 'MLA'])
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestDuckDBBackend(unittest.TestCase):
+    """Test suite for DuckDBBackend over Parquet fixtures"""
+
+    def setUp(self):
+        """Set up a minimal BT_CX_CONTACTS fixture"""
+        self.dir = tempfile.mkdtemp()
+        pd.DataFrame({
+            'CAS_CASE_ID': [1, 2, 3, 4],
+            'SIT_SITE_ID': ['MLB', 'MLB', 'MLB', 'MLA'],
+            'CONTACT_DATE_ID': [date(2025, 11, 3), date(2025, 11, 20), date(2025, 12, 1), date(2025, 12, 2)],
+        }).to_parquet(os.path.join(self.dir, 'BT_CX_CONTACTS.parquet'), index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_runs_bigquery_sql(self):
+        """Test generated BigQuery SQL runs unchanged against the fixtures"""
+        backend = DuckDBBackend(self.dir)
+        df = backend.to_dataframe("""
+            SELECT DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO, COUNT(*) AS CASOS
+            FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+            WHERE C.SIT_SITE_ID = 'MLB'
+              AND C.CONTACT_DATE_ID < DATE_ADD('2025-11-30', INTERVAL 2 DAY)
+            GROUP BY 1
+            ORDER BY 1
+        """)
+
+        self.assertEqual(list(df['CASOS']), [2, 1])
+        self.assertEqual(pd.Timestamp(df['PERIODO'].iloc[0]), pd.Timestamp('2025-11-01'))
+
+    def test_job_interface(self):
+        """Test jobs expose the BigQuery QueryJob interface used by the scheduler"""
+        job = DuckDBBackend(self.dir).query("SELECT COUNT(*) AS N FROM `p.d.BT_CX_CONTACTS`")
+
+        self.assertEqual(int(job.result(timeout=1).to_dataframe()['N'].iloc[0]), 4)
+        self.assertGreater(job.total_bytes_processed, 0)
+        self.assertFalse(job.cache_hit)
+
+    def test_arrow_download(self):
+        """Test the Arrow path returns the same rows with mapped dtypes"""
+        backend = DuckDBBackend(self.dir)
+        sql = "SELECT SIT_SITE_ID, COUNT(*) AS N FROM `p.d.BT_CX_CONTACTS` GROUP BY 1 ORDER BY 1"
+
+        df = backend.to_dataframe(sql, arrow=True, categoricals=['SIT_SITE_ID'])
+
+        self.assertEqual(list(df['SIT_SITE_ID'].astype(str)), ['MLA', 'MLB'])
+        self.assertIsInstance(df['SIT_SITE_ID'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df['N']), [1, 3])
+
+    def test_dry_run(self):
+        """Test dry-run estimates the fixture bytes and validates tables without executing"""
+        backend = DuckDBBackend(self.dir)
+
+        self.assertGreater(backend.dry_run("SELECT COUNT(*) FROM `p.d.BT_CX_CONTACTS`"), 0)
+        with self.assertRaises(Exception):
+            backend.dry_run("SELECT * FROM `p.d.TABLA_INEXISTENTE`")
+
+    def test_missing_fixtures(self):
+        """Test an empty fixtures directory fails with a hint"""
+        with self.assertRaises(FileNotFoundError):
+            DuckDBBackend(tempfile.mkdtemp(dir=self.dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Unit Tests: test_query_cache.py
+Purpose: Test the content-addressed on-disk query result cache
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_query_cache.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.query_cache import (
+    QueryCache, cache_key, normalize_sql, ttl_for,
+    TTL_PERIODO_CERRADO, TTL_POR_TABLA
+)
+
+
+QUERY_CERRADA = """
+    SELECT COUNT(*) AS N  -- incoming
+    FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+    WHERE C.CONTACT_DATE_ID BETWEEN '2025-11-01' AND '2025-12-31'
+"""
+
+
+class TestQueryKey(unittest.TestCase):
+    """Test suite for SQL normalization and TTL"""
+
+    def test_key_ignores_formatting(self):
+        """Test whitespace and comments do not change the key"""
+        compacta = "SELECT COUNT(*) AS N FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C " \
+                   "WHERE C.CONTACT_DATE_ID BETWEEN '2025-11-01' AND '2025-12-31'"
+
+        self.assertEqual(cache_key(QUERY_CERRADA), cache_key(compacta))
+
+    def test_key_preserves_literals(self):
+        """Test whitespace inside string literals is significant"""
+        self.assertEqual(normalize_sql("WHERE  X = 'a  b'"), "WHERE X = 'a  b'")
+        self.assertNotEqual(cache_key("SELECT 'a b'"), cache_key("SELECT 'a  b'"))
+
+    def test_ttl_closed_period(self):
+        """Test queries over closed months get the long TTL"""
+        self.assertEqual(ttl_for(QUERY_CERRADA, hoy=date(2026, 2, 10)), TTL_PERIODO_CERRADO)
+
+    def test_ttl_recent_days_are_open(self):
+        """Test a month that just ended is still open while its last days are being completed"""
+        self.assertEqual(ttl_for(QUERY_CERRADA, hoy=date(2026, 1, 1)), TTL_POR_TABLA['BT_CX_CONTACTS'])
+        self.assertEqual(ttl_for(QUERY_CERRADA, hoy=date(2026, 1, 2)), TTL_POR_TABLA['BT_CX_CONTACTS'])
+        self.assertEqual(ttl_for(QUERY_CERRADA, hoy=date(2026, 1, 3)), TTL_PERIODO_CERRADO)
+
+    def test_ttl_open_period_uses_table_ttl(self):
+        """Test queries touching the current month use the shortest table TTL"""
+        query = QUERY_CERRADA + " UNION ALL SELECT 1 FROM `meli-bi-data.WHOWNER.LK_TIM_HOLIDAYS`"
+
+        self.assertEqual(ttl_for(query, hoy=date(2025, 12, 15)), TTL_POR_TABLA['BT_CX_CONTACTS'])
+
+    def test_ttl_date_add_extends_range(self):
+        """Test DATE_ADD over a literal counts as a later date"""
+        query = "SELECT 1 FROM `p.d.BT_CX_CONTACTS` WHERE D < DATE_ADD('2026-01-25', INTERVAL 1 WEEK)"
+
+        self.assertEqual(ttl_for(query, hoy=date(2026, 2, 3)), TTL_POR_TABLA['BT_CX_CONTACTS'])
+        self.assertEqual(ttl_for("SELECT 1 FROM `p.d.BT_CX_CONTACTS` WHERE D < '2026-01-25'", hoy=date(2026, 2, 3)),
+                         TTL_PERIODO_CERRADO)
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test suite for QueryCache"""
+
+    def setUp(self):
+        """Set up an empty cache directory"""
+        self.dir = tempfile.mkdtemp()
+        self.cache = QueryCache(self.dir)
+        self.df = pd.DataFrame({'PERIODO': ['2025-11-01', '2025-12-01'], 'N': [10, 20]})
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test a stored result is returned for the same query"""
+        self.assertIsNone(self.cache.get(QUERY_CERRADA))
+
+        self.cache.put(QUERY_CERRADA, self.df)
+
+        pd.testing.assert_frame_equal(self.cache.get(QUERY_CERRADA), self.df)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_refresh_ignores_entries(self):
+        """Test refresh mode re-executes but still stores results"""
+        refresh = QueryCache(self.dir, refresh=True)
+        refresh.put(QUERY_CERRADA, self.df)
+
+        self.assertIsNone(refresh.get(QUERY_CERRADA))
+        self.assertIsNotNone(self.cache.get(QUERY_CERRADA))
+
+    def test_expired_entry(self):
+        """Test entries older than their TTL are not returned"""
+        cache = QueryCache(self.dir, ttl_por_tabla={'BT_CX_CONTACTS': 0})
+        query = "SELECT 1 FROM `p.d.BT_CX_CONTACTS` WHERE D <= CURRENT_DATE()"
+        cache.put(query, self.df)
+        time.sleep(0.01)
+
+        self.assertIsNone(cache.get(query))
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted over max_bytes"""
+        self.cache.put('SELECT 1', self.df)
+        tamano = self.cache.size_bytes()
+        cache = QueryCache(self.dir, max_bytes=int(tamano * 2.5))
+
+        cache.put('SELECT 2', self.df)
+        os.utime(next(p for p in cache.cache_dir.glob('*/*.parquet')
+                      if p.stem == cache.key('SELECT 2')), (1, 1))
+        self.assertIsNotNone(cache.get('SELECT 1'))
+        cache.put('SELECT 3', self.df)
+
+        self.assertTrue(cache.contains('SELECT 1'))
+        self.assertFalse(cache.contains('SELECT 2'))
+        self.assertTrue(cache.contains('SELECT 3'))
+
+    def test_eviction_scans_only_over_limit(self):
+        """Test puts under max_bytes keep a running size instead of scanning the directory"""
+        self.cache.put('SELECT 1', self.df)
+        escaneos = []
+        evict = self.cache._evict
+        self.cache._evict = lambda: (escaneos.append(1), evict())
+
+        self.cache.put('SELECT 2', self.df)
+        self.cache.put('SELECT 2', self.df)
+        self.assertEqual(escaneos, [])
+        self.assertEqual(self.cache._bytes, self.cache.size_bytes())
+
+        self.cache.max_bytes = self.cache.size_bytes() - 1
+        self.cache.put('SELECT 3', self.df)
+        self.assertEqual(len(escaneos), 1)
+        self.assertEqual(self.cache._bytes, self.cache.size_bytes())
+        self.assertLessEqual(self.cache._bytes, self.cache.max_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
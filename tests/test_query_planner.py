@@ -0,0 +1,160 @@
+"""
+Unit Tests: test_query_planner.py
+Purpose: Test dry-run byte estimates per stage and the per-run byte budget
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_query_planner.py -v
+"""
+
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.query_planner import ByteBudget, QueryBudgetError, QueryPlan, format_bytes
+from utils.query_scheduler import QueryScheduler, QueryJobError
+
+
+class FakeJob:
+    """Job terminado que retorna un DataFrame con el SQL"""
+
+    total_bytes_processed = 0
+    cache_hit = False
+
+    def __init__(self, sql):
+        self.sql = sql
+
+    def result(self, timeout=None):
+        return self
+
+    def to_dataframe(self):
+        return pd.DataFrame({'SQL': [self.sql]})
+
+
+class FakeBackend:
+    """Backend simulado: el dry-run estima len(sql) * 1000 bytes; 'MISSING' falla"""
+
+    def __init__(self):
+        self.dry_runs = []
+        self.queries = []
+
+    def dry_run(self, sql):
+        self.dry_runs.append(sql)
+        if 'MISSING' in sql:
+            raise RuntimeError('Not found: Table MISSING\nLocation: US')
+        return len(sql) * 1000
+
+    def query(self, sql, job_config=None):
+        self.queries.append(sql)
+        return FakeJob(sql)
+
+
+class SetCache:
+    """Cache simulada con un conjunto fijo de queries cacheadas"""
+
+    def __init__(self, cacheadas):
+        self.cacheadas = set(cacheadas)
+
+    def contains(self, sql):
+        return sql in self.cacheadas
+
+
+class TestQueryPlan(unittest.TestCase):
+    """Test suite for QueryPlan"""
+
+    def setUp(self):
+        """Set up a plan with cached, billed and non-estimable queries"""
+        self.backend = FakeBackend()
+        self.plan = QueryPlan(self.backend, cache=SetCache(['SELECT 2']))
+        self.plan.add('a', 'SELECT 1', 'metricas')
+        self.plan.add('b', 'SELECT 2', 'metricas')
+        self.plan.add('c', 'SELECT * FROM MISSING', 'contexto')
+        self.plan.add_pending('muestreo', 'muestreo', 'depende de PASO 3')
+
+    def test_totals_by_stage(self):
+        """Test cached queries count in the total but are not billed"""
+        etapas = self.plan.by_stage()
+
+        self.assertEqual(etapas['metricas'], {'queries': 2, 'cache': 1, 'bytes': 16000, 'facturable': 8000})
+        self.assertEqual(self.plan.total_bytes(), 16000)
+        self.assertEqual(self.plan.billed_bytes(), 8000)
+        self.assertEqual(self.plan.billed_bytes(('contexto',)), 0)
+
+    def test_dry_run_errors_are_recorded(self):
+        """Test a failing dry-run leaves the query as non-estimable with the first error line"""
+        item = self.plan.items[2]
+
+        self.assertIsNone(item['bytes'])
+        self.assertEqual(item['error'], 'Not found: Table MISSING')
+        self.assertIn('no estimable: Not found', self.plan.format())
+
+    def test_format_orders_stages(self):
+        """Test stages are printed in the order of the labels"""
+        texto = self.plan.format({'contexto': 'Contexto', 'metricas': 'Métricas'})
+
+        self.assertLess(texto.index('[contexto]'), texto.index('[metricas]'))
+        self.assertIn('1 de 4 queries desde cache local', texto)
+
+    def test_format_bytes(self):
+        """Test human readable byte units"""
+        self.assertEqual(format_bytes(512), '512 B')
+        self.assertEqual(format_bytes(1536), '1.5 KB')
+        self.assertEqual(format_bytes(3 * 1024**4), '3.00 TB')
+        self.assertEqual(format_bytes(None), 'n/d')
+
+
+class TestByteBudget(unittest.TestCase):
+    """Test suite for ByteBudget and its use in QueryScheduler"""
+
+    def setUp(self):
+        """Set up a budget that fits one 8-character query"""
+        self.backend = FakeBackend()
+        self.budget = ByteBudget(self.backend, max_bytes=10000)
+
+    def test_estimates_are_reused(self):
+        """Test queries estimated in the plan are not dry-run again when charged"""
+        QueryPlan(self.backend, budget=self.budget).add('a', 'SELECT 1', 'metricas')
+
+        self.assertEqual(self.budget.charge('a', 'SELECT  1'), 8000)
+        self.assertEqual(len(self.backend.dry_runs), 1)
+        self.assertEqual(self.budget.restante(), 2000)
+
+    def test_scheduler_refuses_over_budget(self):
+        """Test the scheduler does not send queries that exceed the remaining budget"""
+        scheduler = QueryScheduler(self.backend, max_workers=1, budget=self.budget)
+        try:
+            self.assertEqual(len(scheduler.run('a', 'SELECT 1')), 1)
+            with self.assertRaises(QueryBudgetError):
+                scheduler.run('b', 'SELECT 2')
+        finally:
+            scheduler.shutdown()
+
+        self.assertEqual(self.backend.queries, ['SELECT 1'])
+        self.assertEqual(self.budget.usado, 8000)
+
+    def test_rejected_job(self):
+        """Test rejected jobs fail on result() and their dependents are not sent"""
+        scheduler = QueryScheduler(self.backend, max_workers=1)
+        try:
+            scheduler.reject('contexto', QueryBudgetError('fuera de presupuesto'))
+            scheduler.submit('detalle', 'SELECT 1', depends_on=['contexto'])
+
+            with self.assertRaises(QueryBudgetError):
+                scheduler.result('contexto')
+            with self.assertRaises(QueryJobError):
+                scheduler.result('detalle')
+        finally:
+            scheduler.shutdown()
+
+        self.assertEqual(self.backend.queries, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Unit Tests: test_query_scheduler.py
+Purpose: Test concurrent query scheduling with dependencies and timeouts
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_query_scheduler.py -v
+"""
+
+import unittest
+import sys
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, TimeoutError as FutureTimeoutError
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.query_scheduler import QueryScheduler, QueryJobError
+
+
+class FakeJob:
+    """Query job simulado: el SQL es 'sleep:<segundos>:<valor>' o 'fail'"""
+
+    def __init__(self, sql, client):
+        self.sql = sql
+        self.client = client
+        self.cancelled = False
+        self.total_bytes_processed = 1024
+        self.cache_hit = False
+
+    def result(self, timeout=None):
+        if self.sql == 'fail':
+            raise RuntimeError('query inválida')
+        _, segundos, valor = self.sql.split(':')
+        if timeout is not None and float(segundos) > timeout:
+            time.sleep(timeout)
+            raise FutureTimeoutError()
+        with self.client.lock:
+            self.client.activos += 1
+            self.client.max_activos = max(self.client.max_activos, self.client.activos)
+        time.sleep(float(segundos))
+        with self.client.lock:
+            self.client.activos -= 1
+        self.valor = valor
+        return self
+
+    def to_dataframe(self):
+        return self.valor
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeClient:
+    """Cliente BigQuery simulado que registra la concurrencia alcanzada"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.activos = 0
+        self.max_activos = 0
+        self.jobs = []
+
+    def query(self, sql, job_config=None):
+        job = FakeJob(sql, self)
+        self.jobs.append(job)
+        return job
+
+
+class DictCache:
+    """QueryCache simulada en memoria"""
+
+    def __init__(self):
+        self.datos = {}
+
+    def get(self, sql):
+        return self.datos.get(sql)
+
+    def put(self, sql, df):
+        self.datos[sql] = df
+
+
+class TestQueryScheduler(unittest.TestCase):
+    """Test suite for QueryScheduler"""
+
+    def setUp(self):
+        """Set up a scheduler over a fake client"""
+        self.client = FakeClient()
+        self.scheduler = QueryScheduler(self.client, max_workers=4)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_independent_jobs_run_concurrently(self):
+        """Test independent jobs are submitted together"""
+        for i in range(3):
+            self.scheduler.submit(f'job_{i}', f'sleep:0.2:{i}')
+
+        resultados = [self.scheduler.result(f'job_{i}') for i in range(3)]
+
+        self.assertEqual(resultados, ['0', '1', '2'])
+        self.assertGreaterEqual(self.client.max_activos, 2)
+
+    def test_dependent_job_receives_results(self):
+        """Test a dependent job builds its SQL from upstream results"""
+        self.scheduler.submit('base', 'sleep:0.05:7')
+        self.scheduler.submit('detalle', lambda deps: f"sleep:0:{int(deps['base']) * 2}",
+                              depends_on=['base'])
+
+        self.assertEqual(self.scheduler.result('detalle'), '14')
+
+    def test_failed_dependency_propagates(self):
+        """Test a job is not executed when a dependency fails"""
+        self.scheduler.submit('base', 'fail')
+        self.scheduler.submit('detalle', 'sleep:0:1', depends_on=['base'])
+
+        with self.assertRaises(RuntimeError):
+            self.scheduler.result('base')
+        with self.assertRaises(QueryJobError):
+            self.scheduler.result('detalle')
+        self.assertEqual(len(self.client.jobs), 1)
+
+    def test_timeout_cancels_job(self):
+        """Test per-job timeout cancels the BigQuery job"""
+        self.scheduler.submit('lenta', 'sleep:5:x', timeout=0.1)
+
+        with self.assertRaises(QueryJobError):
+            self.scheduler.result('lenta')
+        self.assertTrue(self.client.jobs[0].cancelled)
+
+    def test_job_info(self):
+        """Test job statistics are recorded"""
+        self.scheduler.run('stats', 'sleep:0:ok')
+
+        info = self.scheduler.job_info('stats')
+        self.assertEqual(info['bytes_processed'], 1024)
+        self.assertFalse(info['cache_hit'])
+
+    def test_duplicate_and_unknown_jobs(self):
+        """Test duplicate names and unknown dependencies are rejected"""
+        self.scheduler.submit('a', 'sleep:0:1')
+
+        with self.assertRaises(QueryJobError):
+            self.scheduler.submit('a', 'sleep:0:1')
+        with self.assertRaises(QueryJobError):
+            self.scheduler.submit('b', 'sleep:0:1', depends_on=['no_existe'])
+
+    def test_cached_job_skips_query(self):
+        """Test jobs resolved from the local cache are not sent to BigQuery"""
+        cache = DictCache()
+        scheduler = QueryScheduler(self.client, max_workers=2, cache=cache)
+        try:
+            self.assertEqual(scheduler.run('primera', 'sleep:0:ok'), 'ok')
+            self.assertEqual(scheduler.run('segunda', 'sleep:0:ok'), 'ok')
+        finally:
+            scheduler.shutdown()
+
+        self.assertEqual(len(self.client.jobs), 1)
+        self.assertEqual(scheduler.job_info('segunda')['cache_hit'], 'local')
+        self.assertEqual(scheduler.job_info('segunda')['bytes_processed'], 0)
+
+    def test_shutdown_cancels_jobs_not_started(self):
+        """Test queued and waiting jobs fail on shutdown instead of hanging, running ones finish"""
+        scheduler = QueryScheduler(self.client, max_workers=1)
+        scheduler.submit('en_curso', 'sleep:0.2:1')
+        scheduler.submit('en_cola', 'sleep:0:2')
+        scheduler.submit('dependiente', 'sleep:0:3', depends_on=['en_curso'])
+        time.sleep(0.05)
+
+        scheduler.shutdown()
+
+        self.assertEqual(scheduler.result('en_curso', timeout=2), '1')
+        for nombre in ('en_cola', 'dependiente'):
+            with self.subTest(job=nombre), self.assertRaises(CancelledError):
+                scheduler.result(nombre, timeout=2)
+        with self.assertRaises(CancelledError):
+            scheduler.submit('posterior', 'sleep:0:4').result(timeout=2)
+        self.assertEqual(len(self.client.jobs), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
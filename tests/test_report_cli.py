@@ -0,0 +1,102 @@
+"""
+Unit Tests: test_report_cli.py
+Purpose: Test the light report CLI (argument validation and -X importtime regression for heavy imports)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_report_cli.py -v
+"""
+
+import unittest
+import sys
+import os
+import subprocess
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.report_cli import ReportError, report_args, validate_args
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+GENERADOR = os.path.join(REPO_DIR, 'generar_reporte_cr_universal_v6.3.6.py')
+
+# Módulos que --help y los errores de argumentos no deben cargar
+MODULOS_PESADOS = ('pandas', 'numpy', 'pyarrow', 'duckdb', 'google', 'utils.report_pipeline')
+
+PARAMS = {
+    'site': 'MLB', 'commerce_group': 'PDD', 'aperturas': 'PROCESO,CDU',
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+}
+ARGV = ['--site', 'MLB', '--commerce-group', 'PDD', '--aperturas', 'PROCESO,CDU',
+        '--p1-start', '2025-11-01', '--p1-end', '2025-11-30',
+        '--p2-start', '2025-12-01', '--p2-end', '2025-12-31']
+
+
+def _importtime(*args):
+    """Run a script with -X importtime; returns (process, imported module names)"""
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=REPO_DIR,
+                             capture_output=True, text=True, encoding='utf-8', timeout=60)
+    modulos = [linea.rsplit('|', 1)[1].strip() for linea in proceso.stderr.splitlines()
+               if linea.startswith('import time:') and '|' in linea]
+    return proceso, modulos
+
+
+class TestImportTime(unittest.TestCase):
+    """Test suite for the -X importtime regression (no heavy imports before a stage needs them)"""
+
+    def assertLight(self, modulos):
+        pesados = [m for m in modulos if m.split('.')[0] in MODULOS_PESADOS or m in MODULOS_PESADOS]
+        self.assertEqual(pesados, [])
+
+    def test_help(self):
+        """Test --help does not import pandas, BigQuery or the pipeline"""
+        proceso, modulos = _importtime(GENERADOR, '--help')
+
+        self.assertEqual(proceso.returncode, 0)
+        self.assertIn('--aperturas', proceso.stdout)
+        self.assertIn('utils.report_cli', modulos)
+        self.assertLight(modulos)
+
+    def test_invalid_arguments_fail_fast(self):
+        """Test invalid dates and commerce groups fail before loading the pipeline"""
+        fechas = ARGV[:-1] + ['2025-12-32']
+        proceso, modulos = _importtime(GENERADOR, *fechas)
+        self.assertEqual(proceso.returncode, 1)
+        self.assertIn('[ERROR] Fechas inválidas', proceso.stdout)
+        self.assertLight(modulos)
+
+        proceso, modulos = _importtime(GENERADOR, *ARGV[:2], '--commerce-group', 'NO_EXISTE', *ARGV[4:])
+        self.assertEqual(proceso.returncode, 1)
+        self.assertIn("Commerce group 'NO_EXISTE'", proceso.stdout)
+        self.assertLight(modulos)
+
+    def test_metrics_generators_help(self):
+        """Test the eventos and verticales generators parse arguments without pandas or a client"""
+        for script in ('metrics/eventos/generar_correlaciones.py', 'metrics/verticales/generar_agregados.py'):
+            proceso, modulos = _importtime(os.path.join(REPO_DIR, script), '--help')
+
+            self.assertEqual(proceso.returncode, 0, script)
+            self.assertLight(modulos)
+
+
+class TestValidateArgs(unittest.TestCase):
+    """Test suite for validate_args"""
+
+    def test_valid(self):
+        """Test valid parameters pass"""
+        validate_args(report_args(PARAMS))
+
+    def test_invalid(self):
+        """Test malformed or reversed dates, unknown commerce groups and incompatible flags"""
+        for cambio in ({'p1_start': '01/11/2025'}, {'p2_end': '2025-11-30'},
+                       {'commerce_group': 'NO_EXISTE'}, {'preview': True, 'export_only': True},
+                       {'distinct_sketches': True, 'process_name': 'Reclamos'}):
+            with self.subTest(cambio=cambio), self.assertRaises(ReportError):
+                validate_args(report_args(dict(PARAMS, **cambio)))
+
+
+if __name__ == '__main__':
+    unittest.main()
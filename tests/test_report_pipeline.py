@@ -0,0 +1,313 @@
+"""
+Unit Tests: test_report_pipeline.py
+Purpose: Test the importable report pipeline (parameters, plan mode, errors and the what-if denominator)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_report_pipeline.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.report_cli import build_parser
+from utils.report_pipeline import (
+    ReportError, ReportPipeline, generate_report, priorizar_elementos, report_args
+)
+
+PARAMS = {
+    'site': 'MLB', 'commerce_group': 'PDD', 'aperturas': ['PROCESO', 'CDU'],
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+    'skip_conversations': True, 'no_cache': True,
+}
+
+
+class FakeBackend:
+    """Backend that only answers dry-runs (plan mode must not execute queries)"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.dry_runs = 0
+
+    def dry_run(self, sql):
+        self.dry_runs += 1
+        return 1024**3
+
+    def query(self, sql, **kwargs):
+        raise AssertionError('plan mode executed a query')
+
+
+class TestReportArgs(unittest.TestCase):
+    """Test suite for report_args"""
+
+    def test_dict_matches_cli(self):
+        """Test a dict of parameters gives the same Namespace as the CLI"""
+        cli = build_parser().parse_args([
+            '--site', 'MLB', '--commerce-group', 'PDD', '--aperturas', 'PROCESO,CDU',
+            '--p1-start', '2025-11-01', '--p1-end', '2025-11-30',
+            '--p2-start', '2025-12-01', '--p2-end', '2025-12-31',
+            '--skip-conversations', '--no-cache',
+        ])
+
+        self.assertEqual(report_args(dict(PARAMS, process_name=None, open_report=False)), cli)
+        self.assertEqual(report_args({k.replace('_', '-'): v for k, v in PARAMS.items()}), cli)
+
+    def test_namespace_is_copied(self):
+        """Test the pipeline can modify its arguments without touching the caller's"""
+        args = report_args(PARAMS)
+        copia = report_args(args)
+        copia.filter_driver_by_site = True
+
+        self.assertEqual(copia.site, 'MLB')
+        self.assertFalse(args.filter_driver_by_site)
+
+    def test_invalid_parameters(self):
+        """Test missing required parameters raise ReportError instead of exiting"""
+        with redirect_stdout(StringIO()), self.assertRaises(ReportError):
+            report_args({'site': 'MLB'})
+
+
+class TestReportPipeline(unittest.TestCase):
+    """Test suite for ReportPipeline stages that do not need query results"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.params = dict(PARAMS, output_dir=self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_plan_mode(self):
+        """Test --plan returns the estimates without executing or writing a report"""
+        backend = FakeBackend()
+        with redirect_stdout(StringIO()):
+            resultado = generate_report(dict(self.params, plan=True), backend=backend)
+
+        self.assertIsNotNone(resultado.plan)
+        self.assertGreater(backend.dry_runs, 0)
+        self.assertGreater(resultado.plan.total_bytes(), 0)
+        self.assertIsNone(resultado.html_path)
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_memoized_stages_skip_their_queries(self):
+        """Test memoized stages drop their jobs and a new apertura only adds its own node"""
+        params = dict(self.params, plan=True, no_cache=False, cache_dir=os.path.join(self.dir, 'queries'),
+                      stage_cache_dir=os.path.join(self.dir, 'stages'))
+        primera = ReportPipeline(params, backend=FakeBackend())
+        with redirect_stdout(StringIO()):
+            primera.run()
+        for nodo, (key, ttl) in primera.claves_nodos.items():
+            primera.stage_cache.put(nodo, key, ttl, {'queries': []})
+
+        segunda = ReportPipeline(dict(params, aperturas='PROCESO,CDU,TIPIFICACION'), backend=FakeBackend())
+        with redirect_stdout(StringIO()):
+            segunda.run()
+
+        self.assertEqual(set(segunda.memo), {'consolidated_metrics', 'weekly', 'dimension:PROCESO', 'dimension:CDU'})
+        self.assertEqual(segunda.claves_nodos['dimension:CDU'], primera.claves_nodos['dimension:CDU'])
+        jobs = [item['nombre'] for item in segunda.plan.items]
+        self.assertIn('dimension_TIPIFICACION', jobs)
+        for nombre in ('incoming_total', 'drivers_total', 'weekly', 'dimension_PROCESO', 'dimension_CDU'):
+            self.assertNotIn(nombre, jobs)
+
+    def test_distinct_sketches_load_missing_days(self):
+        """Test --distinct-sketches plans one optional job per metric and none once the sketches have the days"""
+        params = dict(self.params, plan=True, distinct_sketches=True, sketch_dir=os.path.join(self.dir, 'sketches'))
+        primera = ReportPipeline(params, backend=FakeBackend())
+        with redirect_stdout(StringIO()):
+            primera.run()
+
+        etapas = {item['nombre']: item['etapa'] for item in primera.plan.items}
+        self.assertEqual(etapas['sketch_cases'], 'contexto')
+        self.assertEqual(etapas['sketch_customers'], 'contexto')
+        vacio = pd.DataFrame(columns=['FECHA', 'SIT_SITE_ID', 'REGISTRO', 'RHO'])
+        for store in primera.sketch_stores.values():
+            store.update(vacio, '2025-11-01', '2025-12-31')
+
+        segunda = ReportPipeline(params, backend=FakeBackend())
+        with redirect_stdout(StringIO()):
+            segunda.run()
+            segunda.distinct_counts()
+
+        self.assertFalse({'sketch_cases', 'sketch_customers'} & {item['nombre'] for item in segunda.plan.items})
+        self.assertEqual(segunda.conteos_distintos, {'cases': {'p1': 0, 'p2': 0}, 'customers': {'p1': 0, 'p2': 0}})
+
+    def test_budget_rejection(self):
+        """Test a run whose required stages exceed the budget raises ReportError"""
+        pipeline = ReportPipeline(dict(self.params, budget_gb=1), backend=FakeBackend())
+
+        with redirect_stdout(StringIO()), self.assertRaises(ReportError):
+            pipeline.run()
+
+    def test_budget_degrades_to_fused_scan(self):
+        """Test a tight budget switches PASO 1-3 to one read without rewriting --fused-scan"""
+        pipeline = ReportPipeline(dict(self.params, plan=True, budget_gb=4), backend=FakeBackend())
+        with redirect_stdout(StringIO()):
+            pipeline.run()
+
+        jobs = [item['nombre'] for item in pipeline.plan.items]
+        self.assertTrue(pipeline.fusionado_por_presupuesto)
+        self.assertFalse(pipeline.args.fused_scan)
+        self.assertIn('contactos_fusionados', jobs)
+        self.assertNotIn('incoming_total', jobs)
+        self.assertTrue(pipeline.rechazados)
+
+    def test_invalid_dates(self):
+        """Test invalid dates are reported as ReportError by configure"""
+        pipeline = ReportPipeline(dict(self.params, p1_start='2025-13-01'))
+
+        with redirect_stdout(StringIO()), self.assertRaises(ReportError):
+            pipeline.configure()
+
+    def test_preview_requires_html(self):
+        """Test --preview is rejected together with --export-only"""
+        pipeline = ReportPipeline(dict(self.params, preview=True, export_only=True))
+
+        with redirect_stdout(StringIO()), self.assertRaises(ReportError):
+            pipeline.configure()
+
+    def test_partial_html_never_fails_the_run(self):
+        """Test a partial HTML that cannot be rendered only logs a warning"""
+        pipeline = ReportPipeline(self.params)
+        salida = StringIO()
+
+        with redirect_stdout(salida):
+            self.assertIsNone(pipeline.checkpoint_html(['weekly', 'dimension_tables', 'conversations']))
+            pipeline.checkpoint_error(RuntimeError('falla'))
+
+        self.assertIn('[WARNING] No se pudo escribir el HTML parcial', salida.getvalue())
+        self.assertEqual(pipeline.secciones_pendientes, [])
+        self.assertIsNone(pipeline.html_path)
+
+    def test_no_partial_html_with_export_only(self):
+        """Test --export-only never writes a partial HTML"""
+        pipeline = ReportPipeline(dict(self.params, export_only=True))
+
+        self.assertIsNone(pipeline.checkpoint_html(['conversations']))
+        self.assertEqual(os.listdir(self.dir), [])
+
+
+def _metricas(inc_p1, inc_p2, drv_p1, drv_p2):
+    """Consolidated metrics like ReportPipeline.consolidated_metrics"""
+    cr_p1, cr_p2 = inc_p1 / drv_p1 * 100, inc_p2 / drv_p2 * 100
+    return {'inc_p1': inc_p1, 'inc_p2': inc_p2, 'var_inc': inc_p2 - inc_p1, 'var_inc_pct': 0,
+            'drv_p1': drv_p1, 'drv_p2': drv_p2, 'cr_p1': cr_p1, 'cr_p2': cr_p2,
+            'var_cr': cr_p2 - cr_p1, 'var_cr_pct': 0}
+
+
+class TestApplyDriver(unittest.TestCase):
+    """Test the 80% rule and the what-if denominator recomputation"""
+
+    def setUp(self):
+        inc_p1, inc_p2 = [400, 300, 200, 60, 40], [380, 330, 260, 60, 45]
+        self.dimension = pd.DataFrame({
+            'DIMENSION_VAL': list('ABCDE'), 'INC_P1': inc_p1, 'INC_P2': inc_p2,
+            'VAR_INC': [b - a for a, b in zip(inc_p1, inc_p2)],
+            'VAR_ABS': [abs(b - a) for a, b in zip(inc_p1, inc_p2)],
+        })
+        self.m = _metricas(1000, 1075, 10000, 10000)
+        self.pipeline = ReportPipeline(PARAMS)
+        self.pipeline.metrics_consolidadas = self.m
+        self.pipeline.driver_config = {'type': 'orders_global'}
+        self.pipeline.df_weekly = pd.DataFrame({
+            'SEMANA': pd.to_datetime(['2025-11-24', '2025-12-01']), 'INCOMING': [250, 260],
+            'DRIVER': [2500, 2600], 'CR': [10.0, 10.0], 'SEMANA_LABEL': ['24-Nov', '01-Dec'],
+        })
+        self.pipeline.cuadros_cuantitativos = {'CDU': priorizar_elementos(self.dimension, self.m)}
+        self.pipeline.dimensiones_completas = {'CDU': self.dimension}
+
+    def test_80_rule(self):
+        """Test elements are ordered by contribution with Otros and TOTAL rows and the input is not modified"""
+        cuadro = priorizar_elementos(self.dimension, self.m)
+
+        self.assertEqual(cuadro['DIMENSION_VAL'].tolist(), ['C', 'B', 'A', 'Otros (2 agrupados)', 'TOTAL'])
+        self.assertAlmostEqual(cuadro['CONTRIB_ABS'].iloc[:4].sum(), 100.0)
+        self.assertAlmostEqual(cuadro['VAR_CR'].iloc[-1], 0.75)
+        self.assertNotIn('CONTRIB_ABS', self.dimension.columns)
+
+    def test_same_driver_is_identity(self):
+        """Test applying the run's own driver gives back the same cuadros"""
+        esperado = self.pipeline.cuadros_cuantitativos['CDU']
+        with redirect_stdout(StringIO()):
+            self.pipeline.apply_driver(10000, 10000, self.pipeline.df_weekly[['SEMANA', 'DRIVER']], 'Órdenes')
+
+        pd.testing.assert_frame_equal(self.pipeline.cuadros_cuantitativos['CDU'], esperado)
+        pd.testing.assert_series_equal(self.pipeline.df_weekly['CR'], pd.Series([10.0, 10.0], name='CR'))
+
+    def test_alternative_driver(self):
+        """Test CR, weekly series and the 80% rule are recomputed with the new driver"""
+        semanal = pd.DataFrame({'SEMANA': [pd.Timestamp('2025-11-24').date(), pd.Timestamp('2025-12-01').date()],
+                                'DRIVER': [1250, 1300]})
+        with redirect_stdout(StringIO()):
+            self.pipeline.apply_driver(4000, 5000, semanal, 'Requests de Retiro')
+
+        m = self.pipeline.metrics_consolidadas
+        self.assertAlmostEqual(m['cr_p1'], 25.0)
+        self.assertAlmostEqual(m['cr_p2'], 21.5)
+        cuadro = self.pipeline.cuadros_cuantitativos['CDU']
+        pd.testing.assert_frame_equal(cuadro, priorizar_elementos(self.dimension, m))
+        # Con el driver en alza A y B pasan a explicar la caída del CR; C sale de los priorizados
+        self.assertEqual(cuadro['DIMENSION_VAL'].tolist(), ['A', 'B', 'D', 'Otros (2 agrupados)', 'TOTAL'])
+        self.assertEqual(self.pipeline.df_weekly.columns.tolist(), ['SEMANA', 'INCOMING', 'DRIVER', 'CR', 'SEMANA_LABEL'])
+        self.assertEqual(self.pipeline.df_weekly['CR'].tolist(), [20.0, 20.0])
+        self.assertIsNone(self.pipeline.nota_semanal)
+        self.assertEqual(self.pipeline.driver_config['type'], 'alternativo')
+        self.assertEqual(self.pipeline.driver_desc, 'Requests de Retiro')
+
+    def test_monthly_driver_is_prorated(self):
+        """Test a monthly driver series (MONTH_ID) is spread by day over the report weeks"""
+        mensual = pd.DataFrame({'SEMANA': pd.to_datetime(['2025-10-01', '2025-11-01', '2025-12-01']),
+                                'DRIVER': [9999, 3000, 3100]})
+        with redirect_stdout(StringIO()):
+            self.pipeline.apply_driver(4000, 5000, mensual, 'Items Moderados', serie_mensual=True)
+
+        self.assertEqual(self.pipeline.df_weekly['DRIVER'].round(6).tolist(), [700.0, 700.0])
+        self.assertAlmostEqual(self.pipeline.df_weekly['CR'].iloc[1], 260 / 700 * 100)
+        self.assertIn('prorrateado', self.pipeline.nota_semanal)
+
+    def test_uncovered_weeks_drop_weekly_cr(self):
+        """Test a driver series missing report weeks leaves no weekly CR and an explicit note"""
+        semanal = pd.DataFrame({'SEMANA': [pd.Timestamp('2025-12-01').date()], 'DRIVER': [1300]})
+        salida = StringIO()
+        with redirect_stdout(salida):
+            self.pipeline.apply_driver(4000, 5000, semanal, 'Requests de Retiro')
+
+        self.assertTrue(self.pipeline.df_weekly['CR'].isna().all())
+        self.assertEqual(self.pipeline.df_weekly['INCOMING'].tolist(), [250, 260])
+        self.assertIn('no cubre 1 de 2 semanas', self.pipeline.nota_semanal)
+        self.assertIn('[WARNING] CR semanal no disponible', salida.getvalue())
+
+    def test_runs_without_full_dimensions(self):
+        """Test cuadros of older runs keep their rows and only recompute drivers, CR and contribution"""
+        self.pipeline.dimensiones_completas = {}
+        filas = self.pipeline.cuadros_cuantitativos['CDU']['DIMENSION_VAL'].tolist()
+        with redirect_stdout(StringIO()):
+            self.pipeline.apply_driver(5000, 4000, self.pipeline.df_weekly[['SEMANA', 'DRIVER']], 'Otro')
+
+        cuadro = self.pipeline.cuadros_cuantitativos['CDU']
+        self.assertEqual(cuadro['DIMENSION_VAL'].tolist(), filas)
+        self.assertAlmostEqual(cuadro['CONTRIB_ABS'].iloc[:-1].sum(), 100.0)
+        self.assertAlmostEqual(cuadro['CR_P2'].iloc[-1], 26.875)
+
+    def test_zero_driver(self):
+        """Test a driver without data in a period raises ReportError"""
+        with redirect_stdout(StringIO()), self.assertRaises(ReportError):
+            self.pipeline.apply_driver(0, 4000, self.pipeline.df_weekly[['SEMANA', 'DRIVER']], 'Vacío')
+
+
+if __name__ == '__main__':
+    unittest.main()
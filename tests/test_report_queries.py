@@ -0,0 +1,204 @@
+"""
+Unit Tests: test_report_queries.py
+Purpose: Test query builders and result splitting of the universal CR report
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_report_queries.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.report_queries import (
+    build_base_contacts_table, build_dimension_query, build_fused_contacts_query,
+    build_incoming_total_query, split_fused_contacts, weekly_start
+)
+
+try:
+    from utils.query_backend import DuckDBBackend
+    import duckdb  # noqa: F401
+    DUCKDB_DISPONIBLE = True
+except ImportError:
+    DUCKDB_DISPONIBLE = False
+
+COMMERCE_FILTER_PDD = """
+        CASE
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%PDD%') THEN 'PDD'
+            ELSE 'OTRO'
+        END
+    """
+
+
+class TestFusedContactsScan(unittest.TestCase):
+    """Test suite for the fused PASO 1-3 scan"""
+
+    def setUp(self):
+        """Set up a fused result with total, weekly and one dimension"""
+        nan = None
+        self.df = pd.DataFrame([
+            # Grouping set () → total
+            {'G_SEMANA': 1, 'G_PROCESO': 1, 'SEMANA': nan, 'DIM_PROCESO': nan, 'INC_P1': 100.0, 'INC_P2': 130.0, 'CASOS': 400.0},
+            # Grouping set (SEMANA); SEMANA NULL = fuera de la serie semanal
+            {'G_SEMANA': 0, 'G_PROCESO': 1, 'SEMANA': '2025-12-08', 'DIM_PROCESO': nan, 'INC_P1': 0.0, 'INC_P2': 30.0, 'CASOS': 30.0},
+            {'G_SEMANA': 0, 'G_PROCESO': 1, 'SEMANA': '2025-12-01', 'DIM_PROCESO': nan, 'INC_P1': 0.0, 'INC_P2': 25.0, 'CASOS': 25.0},
+            {'G_SEMANA': 0, 'G_PROCESO': 1, 'SEMANA': nan, 'DIM_PROCESO': nan, 'INC_P1': 40.0, 'INC_P2': 0.0, 'CASOS': 90.0},
+            # Grouping set (DIM_PROCESO); NULL = valor de dimensión nulo
+            {'G_SEMANA': 1, 'G_PROCESO': 0, 'SEMANA': nan, 'DIM_PROCESO': 'Pre Compra', 'INC_P1': 60.0, 'INC_P2': 65.0, 'CASOS': 200.0},
+            {'G_SEMANA': 1, 'G_PROCESO': 0, 'SEMANA': nan, 'DIM_PROCESO': 'Post Compra', 'INC_P1': 30.0, 'INC_P2': 60.0, 'CASOS': 150.0},
+            {'G_SEMANA': 1, 'G_PROCESO': 0, 'SEMANA': nan, 'DIM_PROCESO': 'Antiguo', 'INC_P1': 0.0, 'INC_P2': 0.0, 'CASOS': 20.0},
+            {'G_SEMANA': 1, 'G_PROCESO': 0, 'SEMANA': nan, 'DIM_PROCESO': nan, 'INC_P1': 10.0, 'INC_P2': 5.0, 'CASOS': 30.0},
+        ])
+
+    def test_split_totals(self):
+        """Test total incoming comes from the empty grouping set"""
+        partes = split_fused_contacts(self.df, ['PROCESO'])
+
+        self.assertEqual(partes['inc_p1'], 100)
+        self.assertEqual(partes['inc_p2'], 130)
+
+    def test_split_weekly(self):
+        """Test weekly series drops rows outside the series and is sorted"""
+        partes = split_fused_contacts(self.df, ['PROCESO'])
+
+        self.assertEqual(list(partes['weekly']['SEMANA']), ['2025-12-01', '2025-12-08'])
+        self.assertEqual(list(partes['weekly']['CASOS']), [25.0, 30.0])
+
+    def test_split_dimension(self):
+        """Test dimension drops NULLs and empty elements, sorted by VAR_ABS"""
+        df_dim = split_fused_contacts(self.df, ['PROCESO'])['dimensiones']['PROCESO']
+
+        self.assertEqual(list(df_dim['DIMENSION_VAL']), ['Post Compra', 'Pre Compra'])
+        self.assertEqual(list(df_dim['VAR_INC']), [30.0, 5.0])
+        self.assertEqual(list(df_dim['VAR_ABS']), [30.0, 5.0])
+
+    def test_query_scans_once(self):
+        """Test fused query reads BT_CX_CONTACTS once over the widest range"""
+        query = build_fused_contacts_query(
+            'MLB', 'PDD', "'PDD'", {'PROCESO': 'C.PROCESS_NAME', 'CDU': 'C.CDU'},
+            '2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31'
+        )
+
+        self.assertEqual(query.count('BT_CX_CONTACTS'), 1)
+        self.assertIn(f"BETWEEN '{weekly_start('2025-12-31')}' AND '2025-12-31'", query)
+        self.assertIn('GROUPING SETS ((), (SEMANA), (DIM_PROCESO), (DIM_CDU))', query)
+
+    def test_weekly_start(self):
+        """Test weekly series start matches DATE_SUB(p2_end, INTERVAL 25 WEEK)"""
+        self.assertEqual(weekly_start('2025-12-31'), '2025-07-09')
+
+
+class TestBaseContactsTable(unittest.TestCase):
+    """Test suite for the materialized BASE_CONTACTS table"""
+
+    def build(self, **kwargs):
+        params = dict(site='MLB', commerce_group='PDD', commerce_filter=COMMERCE_FILTER_PDD,
+                      campos=['C.PROCESS_NAME', 'C.CDU'], p1_start='2025-11-01',
+                      p2_end='2025-12-31', dataset='proyecto.scratch')
+        params.update(kwargs)
+        return build_base_contacts_table(**params)
+
+    def test_table_name_is_deterministic(self):
+        """Test same parameters reuse the table and different ones do not"""
+        tabla, ddl = self.build()
+
+        self.assertEqual(tabla, self.build()[0])
+        self.assertNotEqual(tabla, self.build(commerce_group='PNR')[0])
+        self.assertTrue(tabla.startswith('`proyecto.scratch.BASE_CONTACTS_'))
+        self.assertIn('CREATE TABLE IF NOT EXISTS', ddl)
+        self.assertIn('CLUSTER BY CONTACT_DATE_ID, PROCESS_NAME, CDU', ddl)
+        self.assertIn(f"BETWEEN '{weekly_start('2025-12-31')}' AND '2025-12-31'", ddl)
+
+    def test_open_window_is_not_reused_next_day(self):
+        """Test a window with open days gets a new table each day and a shorter expiration"""
+        hoy = date(2026, 1, 2)
+        tabla, ddl = self.build(p2_end='2026-01-01', hoy=hoy)
+
+        self.assertEqual(tabla, self.build(p2_end='2026-01-01', hoy=hoy)[0])
+        self.assertNotEqual(tabla, self.build(p2_end='2026-01-01', hoy=hoy + timedelta(days=1))[0])
+        self.assertIn('INTERVAL 12 HOUR', ddl)
+        # Ventana cerrada: mismo nombre todos los días
+        hoy = date(2026, 2, 10)
+        self.assertEqual(self.build(hoy=hoy)[0], self.build(hoy=hoy + timedelta(days=1))[0])
+        self.assertIn('INTERVAL 24 HOUR', self.build(hoy=hoy)[1])
+
+    def test_rejects_expressions(self):
+        """Test only plain C.<COLUMN> fields can be materialized"""
+        with self.assertRaises(ValueError):
+            self.build(campos=['UPPER(C.CDU)'])
+
+    def test_queries_read_base_table(self):
+        """Test PASO 1-3 queries read the base table instead of BT_CX_CONTACTS"""
+        tabla, _ = self.build()
+        query = build_dimension_query('MLB', 'PDD', COMMERCE_FILTER_PDD, 'C.CDU',
+                                      '2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31',
+                                      base_table=tabla)
+
+        self.assertNotIn('BT_CX_CONTACTS', query)
+        self.assertIn(f'FROM {tabla} C', query)
+        self.assertIn('C.PASA_EXCLUSIONES_CR', query)
+
+
+@unittest.skipUnless(DUCKDB_DISPONIBLE, 'duckdb no instalado')
+class TestBaseContactsEquivalence(unittest.TestCase):
+    """Test the base table gives the same results as reading BT_CX_CONTACTS"""
+
+    def setUp(self):
+        """Set up a BT_CX_CONTACTS fixture including excluded rows"""
+        self.dir = tempfile.mkdtemp()
+        filas = []
+        for i in range(60):
+            filas.append({
+                'CAS_CASE_ID': i, 'CLA_CLAIM_ID': i,
+                'SIT_SITE_ID': 'MLB',
+                'CONTACT_DATE_ID': date(2025, 11 + i % 2, 1 + i % 28),
+                'PROCESS_BU_CR_REPORTING': ['ME', 'ML', 'MP'][i % 3],
+                'FLAG_EXCLUDE_NUMERATOR_CR': 1 if i % 11 == 0 else 0,
+                'QUEUE_ID': 230 if i % 7 == 0 else (None if i % 13 == 0 else 100),
+                'PROCESS_ID': 10,
+                'CI_REASON_ID': None,
+                'PROCESS_PROBLEMATIC_REPORTING': 'PDD' if i % 4 else 'PNR',
+                'PROCESS_NAME': ['Reclamos', 'Devoluciones'][i % 2],
+                'CDU': ['Roto', None, 'Distinto'][i % 3],
+            })
+        pd.DataFrame(filas).to_parquet(os.path.join(self.dir, 'BT_CX_CONTACTS.parquet'), index=False)
+        self.backend = DuckDBBackend(self.dir)
+        self.tabla, ddl = build_base_contacts_table(
+            'MLB', 'PDD', COMMERCE_FILTER_PDD, ['C.PROCESS_NAME', 'C.CDU'],
+            '2025-11-01', '2025-12-31', 'local.scratch'
+        )
+        self.backend.to_dataframe(ddl)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_same_results(self):
+        """Test incoming total and dimension match with and without the base table"""
+        periodos = ('2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+        for base_table in (None, self.tabla):
+            with self.subTest(base_table=base_table):
+                total = self.backend.to_dataframe(build_incoming_total_query(
+                    'MLB', 'PDD', COMMERCE_FILTER_PDD, *periodos, base_table=base_table))
+                dim = self.backend.to_dataframe(build_dimension_query(
+                    'MLB', 'PDD', COMMERCE_FILTER_PDD, 'C.CDU', *periodos, base_table=base_table))
+                resultado = (total.iloc[0].tolist(), dim.sort_values('DIMENSION_VAL').values.tolist())
+                if base_table is None:
+                    esperado = resultado
+                else:
+                    self.assertEqual(resultado, esperado)
+        self.assertGreater(esperado[0][0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Unit Tests: test_report_queue.py
+Purpose: Test the report queue (priorities, de-duplication, cancellation and per-worker limits)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_report_queue.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.report_queue import QueueError, ReportQueue, request_key
+
+PARAMS = {
+    'site': 'MLB', 'commerce_group': 'PDD', 'aperturas': 'PROCESO,CDU',
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+    'skip_conversations': True, 'plan': True,
+}
+
+
+class BlockingBackend:
+    """Backend whose dry-runs wait until the test releases them (plan mode only)"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.liberar = threading.Event()
+
+    def dry_run(self, sql):
+        self.liberar.wait(10)
+        return 1024**3
+
+    def query(self, sql, **kwargs):
+        raise AssertionError('plan mode executed a query')
+
+
+class TestReportQueue(unittest.TestCase):
+    """Test suite for ReportQueue with a single blocked worker"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.backend = BlockingBackend()
+        self.cola = ReportQueue(self.backend, workers=1, max_queries_per_worker=1)
+        self.cola.start()
+
+    def tearDown(self):
+        self.backend.liberar.set()
+        self.cola.stop()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _pedido(self, **params):
+        return dict(PARAMS, output_dir=self.dir, **params)
+
+    def _fin(self, job):
+        return list(job.events())[-1]
+
+    def _en_curso(self, **params):
+        """Submit a job and wait until the worker picks it up (it stays blocked in its dry-runs)"""
+        job, _ = self.cola.submit(self._pedido(**params))
+        for evento in job.events():
+            if evento['evento'] == 'inicio':
+                return job
+
+    def test_priority_order(self):
+        """Test pending jobs run by priority and FIFO within each priority"""
+        en_curso = self._en_curso(site='MLA')
+        baja, _ = self.cola.submit(self._pedido(site='MLM'), 'baja')
+        normal, _ = self.cola.submit(self._pedido(site='MLC'))
+        alta, _ = self.cola.submit(self._pedido(site='MCO'), 'alta')
+
+        estado = self.cola.status()
+        self.assertEqual([j['id'] for j in estado['pendientes']], [alta.id, normal.id, baja.id])
+        self.assertEqual(self.cola.position(alta), 1)
+
+        self.backend.liberar.set()
+        for job in (en_curso, alta, normal, baja):
+            self.assertTrue(self._fin(job)['ok'])
+        self.assertLess(alta.inicio, normal.inicio)
+        self.assertLess(normal.inicio, baja.inicio)
+
+    def test_duplicate_requests(self):
+        """Test an identical request joins the pending job and raises its priority"""
+        self._en_curso(site='MLA')
+        job, nuevo = self.cola.submit(self._pedido(), 'baja')
+        argv = ['--site', 'MLB', '--commerce-group', 'PDD', '--aperturas', 'PROCESO,CDU',
+                '--p1-start', '2025-11-01', '--p1-end', '2025-11-30',
+                '--p2-start', '2025-12-01', '--p2-end', '2025-12-31',
+                '--skip-conversations', '--plan', '--output-dir', self.dir]
+        mismo, nuevo_mismo = self.cola.submit({'argv': argv}, 'alta')
+
+        self.assertTrue(nuevo)
+        self.assertFalse(nuevo_mismo)
+        self.assertIs(mismo, job)
+        self.assertEqual(job.prioridad, 'alta')
+        self.assertEqual(job.suscriptores, 2)
+        self.assertEqual(request_key(self._pedido())[1], 'MLB PDD')
+
+    def test_cancel(self):
+        """Test only pending jobs can be cancelled"""
+        en_curso = self._en_curso(site='MLA')
+        job, _ = self.cola.submit(self._pedido())
+
+        self.cola.cancel(job.id)
+        fin = self._fin(job)
+        self.assertEqual(job.estado, 'cancelado')
+        self.assertFalse(fin['ok'])
+        self.assertEqual(self.cola.status()['pendientes'], [])
+        with self.assertRaises(QueueError):
+            self.cola.cancel(en_curso.id)
+        with self.assertRaises(QueueError):
+            self.cola.cancel(999)
+
+    def test_invalid_priority(self):
+        """Test an unknown priority is rejected before queueing"""
+        with self.assertRaises(QueueError):
+            self.cola.submit(self._pedido(), 'urgente')
+        self.assertEqual(self.cola.status()['pendientes'], [])
+
+    def test_worker_query_limit(self):
+        """Test the per-worker limit caps the report's concurrent queries"""
+        pipelines = []
+
+        class ReportPipelineSpy:
+            def __init__(self, args, **recursos):
+                pipelines.append(args)
+
+            def run(self):
+                return RuntimeError('spy')
+
+        with mock.patch('utils.report_pipeline.ReportPipeline', ReportPipelineSpy):
+            job, _ = self.cola.submit(self._pedido(max_concurrent_queries=6))
+            eventos = list(job.events())
+
+        self.assertEqual([e['evento'] for e in eventos], ['encolado', 'inicio', 'fin'])
+        self.assertEqual(eventos[-1]['reportes'][0]['error'], 'spy')
+        self.assertEqual(pipelines[0].max_concurrent_queries, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit Tests: test_report_server.py
+Purpose: Test the local report server (status, streamed events and errors)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_report_server.py -v
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.report_server import ReportServer, cancel_job, list_jobs, request_report, server_status
+
+PARAMS = {
+    'site': 'MLB', 'commerce_group': 'PDD', 'aperturas': 'PROCESO,CDU',
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+    'skip_conversations': True, 'plan': True,
+}
+
+
+class FakeBackend:
+    """Backend that only answers dry-runs (plan mode must not execute queries)"""
+
+    name = 'fake'
+
+    def dry_run(self, sql):
+        return 1024**3
+
+    def query(self, sql, **kwargs):
+        raise AssertionError('plan mode executed a query')
+
+
+class TestReportServer(unittest.TestCase):
+    """Test suite for ReportServer over a real localhost socket"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.server = ReportServer(('127.0.0.1', 0), FakeBackend())
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_status(self):
+        """Test /estado reports the shared backend and served reports"""
+        estado = server_status(self.url)
+
+        self.assertEqual(estado['backend'], 'fake')
+        self.assertEqual(estado['reportes'], 0)
+        self.assertEqual(estado['en_curso'], [])
+
+    def test_report_streams_log(self):
+        """Test a report request streams its log lines and ends with the result"""
+        lineas = []
+        reportes = request_report(dict(PARAMS, output_dir=self.dir), self.url, on_log=lineas.append)
+
+        self.assertEqual([r['reporte'] for r in reportes], ['MLB PDD'])
+        self.assertTrue(reportes[0]['ok'])
+        self.assertIsNone(reportes[0]['html_path'])
+        self.assertTrue(any('PLAN DE QUERIES' in linea for linea in lineas))
+        self.assertEqual(server_status(self.url)['reportes'], 1)
+
+    def test_argv_request(self):
+        """Test a request with command line flags is parsed like the CLI"""
+        argv = ['--site', 'MLB', '--commerce-group', 'PDD', '--aperturas', 'PROCESO',
+                '--p1-start', '2025-11-01', '--p1-end', '2025-11-30',
+                '--p2-start', '2025-12-01', '--p2-end', '2025-12-31',
+                '--skip-conversations', '--plan', '--output-dir', self.dir]
+        reportes = request_report({'argv': argv}, self.url, on_log=None)
+
+        self.assertTrue(reportes[0]['ok'])
+
+    def test_invalid_request(self):
+        """Test invalid parameters end the stream with an error and a non-JSON body is rejected"""
+        with self.assertRaises(RuntimeError):
+            request_report({'site': 'MLB'}, self.url, on_log=None)
+
+        request = urllib.request.Request(f'{self.url}/reportes', data=b'[1, 2]')
+        with self.assertRaises(urllib.error.HTTPError) as contexto:
+            urllib.request.urlopen(request)
+        self.assertEqual(contexto.exception.code, 400)
+        self.assertIn('error', json.loads(contexto.exception.read()))
+
+    def test_jobs(self):
+        """Test finished jobs are listed and only pending jobs can be cancelled"""
+        request_report(dict(PARAMS, output_dir=self.dir), self.url, on_log=None, prioridad='alta')
+        cola = list_jobs(self.url)
+
+        self.assertEqual(cola['pendientes'], [])
+        self.assertEqual([(j['reporte'], j['prioridad'], j['estado']) for j in cola['terminados']],
+                         [('MLB PDD', 'alta', 'terminado')])
+        with self.assertRaises(RuntimeError):
+            cancel_job(cola['terminados'][0]['id'], self.url)
+        with self.assertRaises(RuntimeError):
+            request_report(dict(PARAMS, output_dir=self.dir), self.url, on_log=None, prioridad='urgente')
+
+
+if __name__ == '__main__':
+    unittest.main()
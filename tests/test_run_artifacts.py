@@ -0,0 +1,158 @@
+"""
+Unit Tests: test_run_artifacts.py
+Purpose: Test the saved run artifacts used by --rerender (round trip, latest run and errors)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_run_artifacts.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.report_pipeline import ReportError, ReportPipeline, report_args, rerender_report, whatif_report
+from utils.run_artifacts import ESTADO_JSON, list_runs, load_run, new_run_id, save_run
+
+PARAMS = {
+    'site': 'MLB', 'commerce_group': 'PDD', 'aperturas': 'PROCESO,CDU',
+    'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+    'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+}
+
+
+def _pipeline(output_dir, **params):
+    """Pipeline-like object with the state save_run reads"""
+    pipeline = SimpleNamespace(
+        args=report_args(dict(PARAMS, output_dir=output_dir, **params)),
+        run_id=None,
+        df_weekly=pd.DataFrame({'SEMANA': pd.to_datetime(['2025-11-03', '2025-11-10']),
+                                'SEMANA_LABEL': ['03-Nov', '10-Nov'], 'INCOMING': [10, 12], 'CR': [0.5, 0.6]}),
+        cuadros_cuantitativos={'PROCESO': pd.DataFrame({'DIMENSION_VAL': ['A', 'TOTAL'], 'INC_P1': [5, 5]})},
+        dimensiones_completas={'PROCESO': pd.DataFrame({'DIMENSION_VAL': ['A', 'B'], 'INC_P1': [3, 2]})},
+        conversaciones_por_proceso={
+            'A': {'status': 'con_data', 'casos_p1': 1, 'casos_p2': 1,
+                  'df_all': pd.DataFrame({'CAS_CASE_ID': [1, 2], 'PERIODO': ['2025-11-01', '2025-12-01']}),
+                  'analisis_llm': {'causas': []}},
+            'B': {'status': 'sin_data', 'casos_p1': 0, 'casos_p2': 0},
+        },
+        csv_paths=[os.path.join(output_dir, 'cuadro_proceso_mlb_202511.csv')],
+    )
+    for nombre in ESTADO_JSON:
+        setattr(pipeline, nombre, {})
+    pipeline.queries_ejecutadas = []
+    pipeline.metrics_consolidadas = {'inc_p1': np.int64(900), 'cr_p1': np.float64(0.5)}
+    pipeline.eventos_comerciales = {'Black Friday': {'fecha_inicio': pd.Timestamp('2025-11-28'), 'casos_total': 3}}
+    return pipeline
+
+
+class TestRunArtifacts(unittest.TestCase):
+    """Test suite for save_run / load_run"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test the saved state and DataFrames load back with their types"""
+        run_id = save_run(_pipeline(self.dir))
+        corrida = load_run(run_id, self.dir)
+
+        self.assertEqual(corrida['args']['site'], 'MLB')
+        self.assertEqual(corrida['estado']['metrics_consolidadas'], {'inc_p1': 900, 'cr_p1': 0.5})
+        self.assertEqual(corrida['estado']['eventos_comerciales']['Black Friday']['fecha_inicio'], '2025-11-28T00:00:00')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(corrida['df_weekly']['SEMANA']))
+        self.assertEqual(list(corrida['cuadros']), ['PROCESO'])
+        self.assertEqual(corrida['dimensiones']['PROCESO']['INC_P1'].tolist(), [3, 2])
+        self.assertEqual(corrida['conversaciones']['A']['df_all']['CAS_CASE_ID'].tolist(), [1, 2])
+        self.assertNotIn('df_all', corrida['conversaciones']['B'])
+
+    def test_restore(self):
+        """Test a restored pipeline splits conversations by period and keeps the run id"""
+        run_id = save_run(_pipeline(self.dir))
+        pipeline = ReportPipeline(dict(PARAMS, output_dir=self.dir))
+        pipeline.restore_run(load_run(run_id, self.dir))
+
+        self.assertEqual(pipeline.run_id, run_id)
+        self.assertEqual(len(pipeline.conversaciones_por_proceso['A']['df_p1']), 1)
+        self.assertEqual(len(pipeline.conversaciones_por_proceso['A']['df_p2']), 1)
+        self.assertEqual(pipeline.metrics_consolidadas['inc_p1'], 900)
+
+    def test_latest_and_missing(self):
+        """Test 'latest' picks the newest run and an unknown id raises ReportError"""
+        primera = _pipeline(self.dir)
+        primera.run_id = 'mlb_pdd_202511_202512_20260201-100000'
+        save_run(primera)
+        time.sleep(0.01)
+        segunda = save_run(_pipeline(self.dir))
+
+        self.assertEqual(list_runs(self.dir)[0], segunda)
+        self.assertEqual(load_run('latest', self.dir)['run_id'], segunda)
+        with self.assertRaises(ReportError):
+            load_run('no_existe', self.dir)
+        with self.assertRaises(ReportError):
+            load_run('latest', os.path.join(self.dir, 'vacio'))
+
+    def test_rerender_writes_to_output_dir(self):
+        """Test a rerender of a moved run writes to the given directory, not the one it was saved with"""
+        original = os.path.join(self.dir, 'original')
+        run_id = save_run(_pipeline(original))
+        movido = os.path.join(self.dir, 'movido')
+        shutil.move(original, movido)
+        destinos = []
+
+        with mock.patch.object(ReportPipeline, 'reload_analysis'), \
+                mock.patch.object(ReportPipeline, 'render_html', lambda p: destinos.append(p.output_dir)), \
+                mock.patch.object(ReportPipeline, 'print_summary'), redirect_stdout(StringIO()):
+            rerender_report(run_id, movido)
+
+        self.assertEqual([str(d) for d in destinos], [movido])
+        self.assertFalse(os.path.exists(original))
+
+    def test_whatif_writes_to_output_dir(self):
+        """Test a what-if of a moved run writes its suffixed HTML to the given directory"""
+        original = os.path.join(self.dir, 'original')
+        run_id = save_run(_pipeline(original, commerce_group='FBM_SELLERS'))
+        movido = os.path.join(self.dir, 'movido')
+        shutil.move(original, movido)
+        totales = pd.DataFrame({'DRV_P1': [4000], 'DRV_P2': [5000]})
+        semanal = pd.DataFrame({'SEMANA': [], 'DRIVER': []})
+        destinos = []
+
+        with mock.patch('config.drivers_alternativos.evaluar_drivers_alternativos', return_value=(totales, semanal)), \
+                mock.patch.object(ReportPipeline, 'connect'), mock.patch.object(ReportPipeline, 'close'), \
+                mock.patch.object(ReportPipeline, 'apply_driver'), mock.patch.object(ReportPipeline, 'reload_analysis'), \
+                mock.patch.object(ReportPipeline, 'render_html',
+                                  lambda p: destinos.append((p.output_dir, p.output_suffix))), \
+                mock.patch.object(ReportPipeline, 'print_summary'), redirect_stdout(StringIO()):
+            whatif_report(run_id, 'retiro_requests', movido)
+
+        self.assertEqual([(str(d), sufijo) for d, sufijo in destinos], [(movido, '_whatif_retiro_requests')])
+        self.assertFalse(os.path.exists(original))
+
+    def test_run_id(self):
+        """Test run ids are readable and include the process filter"""
+        args = report_args(dict(PARAMS, process_name='FBM - Inventario'))
+
+        self.assertTrue(new_run_id(args).startswith('mlb_pdd_fbm__inventario_202511_202512_'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit Tests: test_stage_cache.py
+Purpose: Test the stage DAG keys and the on-disk stage memoization (TTL, refresh and invalidation)
+Author: Contact Rate Analysis Team
+Date: 2026-02-10
+Version: 1.0.0
+
+Run tests:
+    python -m pytest tests/test_stage_cache.py -v
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.query_cache import TTL_DEFAULT, TTL_PERIODO_CERRADO
+from utils.stage_cache import StageCache, node_keys
+
+SQLS = {
+    'total': "SELECT COUNT(*) FROM `p.d.BT_CX_CONTACTS` WHERE FECHA BETWEEN '2025-11-01' AND '2025-12-31'",
+    'dimension_CDU': "SELECT CDU, COUNT(*) FROM `p.d.BT_CX_CONTACTS` WHERE FECHA BETWEEN '2025-11-01' AND '2025-12-31' GROUP BY 1",
+    'dimension_PROCESO': "SELECT PROCESO, COUNT(*) FROM `p.d.BT_CX_CONTACTS` WHERE FECHA BETWEEN '2025-11-01' AND '2025-12-31' GROUP BY 1",
+}
+
+
+def _nodos(aperturas, site='MLB'):
+    nodos = {'total': {'jobs': ['total'], 'params': {'site': site}}}
+    for apertura in aperturas:
+        nodos[f'dimension:{apertura}'] = {'jobs': [f'dimension_{apertura}'], 'params': {'apertura': apertura},
+                                          'depende': ['total']}
+    return nodos
+
+
+class TestNodeKeys(unittest.TestCase):
+    """Test suite for node_keys"""
+
+    def test_new_node_keeps_existing_keys(self):
+        """Test adding an apertura only adds its node (the other keys do not change)"""
+        antes = node_keys(_nodos(['CDU']), SQLS)
+        despues = node_keys(_nodos(['CDU', 'PROCESO']), SQLS)
+
+        self.assertEqual(antes['dimension:CDU'], despues['dimension:CDU'])
+        self.assertEqual(antes['total'], despues['total'])
+        self.assertNotEqual(despues['dimension:CDU'][0], despues['dimension:PROCESO'][0])
+
+    def test_changes_propagate_downstream(self):
+        """Test a changed parameter or SQL invalidates the node and its dependents"""
+        base = node_keys(_nodos(['CDU']), SQLS)
+        otro_site = node_keys(_nodos(['CDU'], site='MLA'), SQLS)
+        otra_query = node_keys(_nodos(['CDU']), dict(SQLS, dimension_CDU=SQLS['dimension_CDU'] + ' ORDER BY 2'))
+        otro_backend = node_keys(_nodos(['CDU']), SQLS, namespace='duckdb')
+
+        self.assertNotEqual(base['dimension:CDU'], otro_site['dimension:CDU'])
+        self.assertEqual(base['total'], otra_query['total'])
+        self.assertNotEqual(base['dimension:CDU'], otra_query['dimension:CDU'])
+        self.assertNotEqual(base['total'], otro_backend['total'])
+
+    def test_ttl(self):
+        """Test closed periods get the long TTL and nodes without queries the default one"""
+        claves = node_keys(dict(_nodos(['CDU']), sintetico={'params': {}}), SQLS)
+
+        self.assertEqual(claves['dimension:CDU'][1], TTL_PERIODO_CERRADO)
+        self.assertEqual(claves['sintetico'][1], TTL_DEFAULT)
+
+    def test_cycle(self):
+        """Test a cyclic DAG is rejected"""
+        with self.assertRaises(ValueError):
+            node_keys({'a': {'depende': ['b']}, 'b': {'depende': ['a']}}, {})
+
+
+class TestStageCache(unittest.TestCase):
+    """Test suite for StageCache"""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = StageCache(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test the stored outputs load back and count as hits"""
+        df = pd.DataFrame({'DIMENSION_VAL': ['A', 'TOTAL'], 'INC_P1': [5, 5]})
+        self.cache.put('dimension:CDU', 'ab' * 32, 60, {'cuadro': df, 'queries': [{'nombre': 'CDU'}]})
+
+        salidas = self.cache.get('ab' * 32)
+        self.assertTrue(self.cache.contains('ab' * 32))
+        pd.testing.assert_frame_equal(salidas['cuadro'], df)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertIsNone(self.cache.get('cd' * 32))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_expired_and_refresh(self):
+        """Test expired entries and refresh mode recompute the node"""
+        self.cache.put('weekly', 'ab' * 32, 0, {'queries': []})
+        time.sleep(0.01)
+        self.assertIsNone(self.cache.get('ab' * 32))
+
+        self.cache.put('weekly', 'cd' * 32, 60, {'queries': []})
+        refresh = StageCache(self.dir, refresh=True)
+        self.assertFalse(refresh.contains('cd' * 32))
+        self.assertIsNone(refresh.get('cd' * 32))
+
+    def test_clear(self):
+        """Test clear removes every entry"""
+        self.cache.put('weekly', 'ab' * 32, 60, {'queries': []})
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get('ab' * 32))
+
+
+if __name__ == '__main__':
+    unittest.main()
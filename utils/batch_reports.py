@@ -0,0 +1,396 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+BATCH REPORTS - Barrido de reportes CR con lecturas compartidas (--batch)
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Genera muchos reportes (sites × commerce groups) leyendo una
+             sola vez las tablas grandes. Por cada juego de períodos (y
+             proceso) del batch:
+               - BT_CX_CONTACTS se lee una vez para la unión de sites,
+                 clasificando cada contacto en todos los commerce groups
+                 (utils.report_queries.build_batch_contacts_query)
+               - BT_ORD_ORDERS se lee una vez por site para los drivers
+                 totales y semanales (build_batch_orders_query)
+             Cada reporte recibe su porción de esas lecturas como resultados
+             compartidos de ReportPipeline (modo fusionado) y genera sus
+             cuadros, CSVs y HTML como una corrida individual; el muestreo de
+             conversaciones de todos los reportes corre en paralelo. Las queries
+             chicas de cada reporte (eventos, feriados, cross-site, drivers de
+             Shipping) se repiten entre reportes con el mismo SQL y salen de
+             la cache local.
+
+Spec (YAML o JSON):
+  p1_start: '2025-11-01'
+  p1_end: '2025-11-30'
+  p2_start: '2025-12-01'
+  p2_end: '2025-12-31'
+  aperturas: PROCESO,CDU
+  sites: [MLA, MLB, MLM, ROLA, HSP]
+  commerce_groups: ALL          # o lista; ALL = todos los reportables
+  skip_conversations: true      # cualquier otro parámetro de generate_report
+  reportes:                     # opcional: reportes puntuales (pisan las claves comunes)
+    - {site: MLB, commerce_group: PDD, aperturas: 'PROCESO,CDU,TIPIFICACION'}
+
+  Los flags de línea de comandos (ej: --backend duckdb) se aplican a todos
+  los reportes. Cada reporte escribe en <output_dir>/<site>_<commerce_group>.
+  --filter-driver-by-site se toma como confirmado (sin pregunta interactiva)
+  y --materialize-base no se usa (la lectura compartida lo reemplaza).
+
+Multi-site (--site MLA,MLB,MLM o --site ROLA --explode-group): un reporte
+por site con las mismas lecturas compartidas (site_reports + run_reports).
+
+Uso:
+  python generar_reporte_cr_universal_v6.3.6.py --batch cierre_mensual.yaml
+  python generar_reporte_cr_universal_v6.3.6.py --site MLA,MLB,MLM --commerce-group PDD ...
+
+  from utils.batch_reports import load_batch_spec, run_batch
+  resultados = run_batch(load_batch_spec('cierre_mensual.yaml'))
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from config.drivers_mapping import COMMERCE_GROUP_ALIASES, get_driver_config
+from config.site_groups import get_report_sites, get_site_list
+from utils.query_planner import QueryPlan
+from utils.query_scheduler import QueryScheduler
+from utils.report_cli import report_argv
+from utils.report_pipeline import ReportError, ReportPipeline, report_args
+from utils.report_queries import (
+    FIELD_MAPPING, COMMERCE_GROUP_FILTERS, build_batch_contacts_query, build_batch_orders_query,
+    build_process_filter, split_batch_contacts, split_batch_orders
+)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SPEC
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Claves del spec que definen el barrido (el resto son parámetros comunes)
+CLAVES_BARRIDO = ('sites', 'commerce_groups', 'reportes')
+
+
+def batch_commerce_groups() -> list:
+    """Commerce groups reportables (con filtro y driver configurado), uno por alias."""
+    grupos, normalizados = [], set()
+    for commerce_group in COMMERCE_GROUP_FILTERS:
+        normalizado = COMMERCE_GROUP_ALIASES.get(commerce_group, commerce_group)
+        try:
+            get_driver_config(commerce_group)
+        except KeyError:
+            continue
+        if normalizado not in normalizados:
+            normalizados.add(normalizado)
+            grupos.append(commerce_group)
+    return grupos
+
+
+def load_batch_spec(path) -> dict:
+    """
+    Lee el spec de un batch (.yaml / .yml con PyYAML, o .json).
+
+    Raises:
+        ReportError: Archivo inexistente, PyYAML no instalado o spec inválido
+    """
+    path = Path(path)
+    if not path.exists():
+        raise ReportError(f"No existe el spec del batch: {path}")
+    texto = path.read_text(encoding='utf-8')
+    if path.suffix.lower() == '.json':
+        spec = json.loads(texto)
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise ReportError("El spec YAML requiere PyYAML (pip install pyyaml) o usar un spec .json")
+        spec = yaml.safe_load(texto)
+    if not isinstance(spec, dict):
+        raise ReportError(f"Spec del batch inválido (se espera un mapeo de parámetros): {path}")
+    return spec
+
+
+def _slug(texto: str) -> str:
+    """Nombre de carpeta de un site / commerce group."""
+    return str(texto).lower().replace(' ', '_')
+
+
+def expand_batch_spec(spec: dict, cli_args=()) -> list:
+    """
+    Parámetros de cada reporte del batch.
+
+    Args:
+        spec: Spec del batch (ver load_batch_spec)
+        cli_args: Flags de línea de comandos aplicados a todos los reportes
+
+    Returns:
+        Lista de argparse.Namespace (modo fusionado, output_dir por reporte)
+
+    Raises:
+        ReportError: Spec sin reportes o parámetros inválidos
+    """
+    comunes = {k: v for k, v in spec.items() if k not in CLAVES_BARRIDO}
+    commerce_groups = spec.get('commerce_groups') or []
+    if commerce_groups in ('ALL', ['ALL']):
+        commerce_groups = batch_commerce_groups()
+    elif isinstance(commerce_groups, str):
+        commerce_groups = [cg.strip() for cg in commerce_groups.split(',')]
+
+    reportes = [{'site': site, 'commerce_group': cg}
+                for site in spec.get('sites') or [] for cg in commerce_groups]
+    reportes += list(spec.get('reportes') or [])
+    if not reportes:
+        raise ReportError("El spec del batch no define reportes (sites × commerce_groups o reportes)")
+
+    lista = []
+    for reporte in reportes:
+        args = report_args(report_argv(dict(comunes, **reporte)) + [str(a) for a in cli_args])
+        if args.commerce_group not in COMMERCE_GROUP_FILTERS:
+            raise ReportError(f"Commerce group '{args.commerce_group}' no tiene filtro definido")
+        for args_site in site_reports(args):
+            if 'output_dir' not in reporte:
+                args_site.output_dir = str(Path(args.output_dir) /
+                                           f"{_slug(args_site.site)}_{_slug(args.commerce_group)}")
+            lista.append(args_site)
+    return lista
+
+
+def site_reports(args) -> list:
+    """
+    Parámetros de un reporte por site de --site (lista separada por comas o
+    grupo con --explode-group; ver config.site_groups.get_report_sites).
+
+    Los reportes usan la lectura fusionada, sin --materialize-base, y el
+    mismo output_dir (los archivos llevan el site en el nombre).
+
+    Args:
+        args: Parámetros de la invocación (ver report_args)
+
+    Returns:
+        Lista de argparse.Namespace, uno por site o grupo
+    """
+    lista = []
+    for site in get_report_sites(args.site, args.explode_group):
+        args_site = report_args(args)
+        args_site.site = site
+        args_site.explode_group = False
+        args_site.fused_scan = True
+        args_site.materialize_base = False
+        args_site.contacts_cube = False
+        args_site.driver_store = False
+        lista.append(args_site)
+    return lista
+
+
+def _campos_reporte(pipeline) -> dict:
+    """Aperturas con campo mapeado del reporte (como en ReportPipeline.schedule_queries)."""
+    args = pipeline.args
+    if args.process_name is not None and 'NONE' in pipeline.aperturas_list:
+        return {}
+    return {a: FIELD_MAPPING[a] for a in pipeline.aperturas_list if a in FIELD_MAPPING}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJECUCIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def run_batch(spec: dict, cli_args=(), backend=None, query_cache=None) -> dict:
+    """
+    Genera todos los reportes del batch con lecturas compartidas.
+
+    Args:
+        spec: Spec del batch (ver load_batch_spec)
+        cli_args: Flags de línea de comandos aplicados a todos los reportes
+        backend, query_cache: Recursos compartidos (default: los de los flags)
+
+    Returns:
+        {'<site> <commerce_group>': ReportResult o excepción del reporte}
+    """
+    return run_reports(expand_batch_spec(spec, cli_args), backend=backend, query_cache=query_cache)
+
+
+def run_reports(reportes: list, backend=None, query_cache=None) -> dict:
+    """
+    Genera varios reportes con lecturas compartidas de contactos y órdenes.
+
+    PASO 0-3 de cada reporte salen de las lecturas compartidas; el muestreo de
+    conversaciones (PASO 4) de todos los reportes corre en paralelo y después
+    cada reporte genera sus CSVs y HTML. Un reporte que falla se informa y el
+    resto sigue.
+
+    Args:
+        reportes: Parámetros de cada reporte (expand_batch_spec / site_reports)
+        backend, query_cache: Recursos compartidos (default: los de los flags)
+
+    Returns:
+        {'<site> <commerce_group>': ReportResult o excepción del reporte}
+    """
+    pipelines = [ReportPipeline(args, backend=backend, query_cache=query_cache) for args in reportes]
+
+    print("="*80)
+    print(f"BATCH: {len(pipelines)} reportes con lecturas compartidas")
+    print("="*80 + "\n")
+
+    for pipeline in pipelines:
+        pipeline.configure()
+
+    # Backend, cache y presupuesto del primer reporte, compartidos por todo el batch
+    primero = pipelines[0]
+    primero.connect()
+    args = primero.args
+    for pipeline in pipelines[1:]:
+        pipeline.backend, pipeline.query_cache = primero.backend, primero.query_cache
+        pipeline.presupuesto = primero.presupuesto
+
+    # Lecturas compartidas: contactos por (períodos, proceso), órdenes por períodos
+    lecturas = {}
+    for pipeline in pipelines:
+        a = pipeline.args
+        periodos = (a.p1_start, a.p1_end, a.p2_start, a.p2_end)
+        lectura = lecturas.setdefault(periodos + (a.process_name,), {
+            'nombre': f'contactos_batch_{len(lecturas)}', 'periodos': periodos,
+            'sites': set(), 'commerce_groups': [], 'campos': {},
+        })
+        lectura['sites'].update(get_site_list(a.site))
+        if a.commerce_group not in lectura['commerce_groups']:
+            lectura['commerce_groups'].append(a.commerce_group)
+        lectura['campos'].update(_campos_reporte(pipeline))
+        pipeline.lectura_batch = lectura
+    ordenes = {}
+    for lectura in lecturas.values():
+        if lectura['periodos'] not in ordenes:
+            ordenes[lectura['periodos']] = f'ordenes_batch_{len(ordenes)}'
+
+    trabajos = []
+    for (_, _, _, _, process_name), lectura in lecturas.items():
+        trabajos.append((lectura['nombre'], build_batch_contacts_query(
+            sorted(lectura['sites']), lectura['commerce_groups'], lectura['campos'],
+            *lectura['periodos'], build_process_filter(process_name)
+        )))
+    for periodos, nombre in ordenes.items():
+        trabajos.append((nombre, build_batch_orders_query(*periodos)))
+
+    print(f"[BATCH] {len(lecturas)} lectura(s) de BT_CX_CONTACTS y {len(ordenes)} de BT_ORD_ORDERS "
+          f"para {len(pipelines)} reportes")
+    if args.plan:
+        plan = QueryPlan(primero.backend, cache=primero.query_cache, budget=primero.presupuesto)
+        for nombre, query in trabajos:
+            plan.add(nombre, query, 'metricas')
+        print(plan.format({'metricas': 'Lecturas compartidas del batch'}))
+        print()
+
+    scheduler = QueryScheduler(primero.backend, max_workers=args.max_concurrent_queries,
+                               default_timeout=args.query_timeout, cache=primero.query_cache,
+                               budget=primero.presupuesto)
+    estados = {}   # pipeline → ReportResult o excepción (los pendientes siguen en `activos`)
+    activos = []
+    try:
+        if not args.plan:
+            for nombre, query in trabajos:
+                scheduler.submit(nombre, query)
+
+        # PASO 0-3 de cada reporte desde las lecturas compartidas
+        for i, pipeline in enumerate(pipelines, 1):
+            a = pipeline.args
+            print("\n" + "="*80)
+            print(f"[BATCH] Reporte {i}/{len(pipelines)}: {_etiqueta(pipeline)}")
+            print("="*80 + "\n")
+            try:
+                if not a.plan:
+                    Path(a.output_dir).parent.mkdir(parents=True, exist_ok=True)
+                pipeline.shared_results.update(_resultados_compartidos(pipeline, scheduler, ordenes))
+                if pipeline.run_metrics():
+                    activos.append(pipeline)
+                else:
+                    estados[pipeline] = pipeline.result()
+            except Exception as e:
+                print(f"[ERROR] Reporte {_etiqueta(pipeline)}: {e}")
+                pipeline.checkpoint_error(e)
+                estados[pipeline] = e
+
+        # PASO 4: muestreo de conversaciones de todos los reportes en paralelo
+        con_muestreo = [p for p in activos if not p.args.skip_conversations]
+        if len(con_muestreo) > 1:
+            print(f"\n[BATCH] Muestreo de conversaciones de {len(con_muestreo)} reportes en paralelo...\n")
+            with ThreadPoolExecutor(max_workers=args.max_concurrent_queries) as pool:
+                errores = dict(zip(con_muestreo, pool.map(_muestrear, con_muestreo)))
+        else:
+            errores = {p: _muestrear(p) for p in con_muestreo}
+
+        # CSVs y HTML de cada reporte
+        for pipeline in activos:
+            try:
+                if errores.get(pipeline) is not None:
+                    raise errores[pipeline]
+                if pipeline.args.skip_conversations:
+                    pipeline.conversations()
+                pipeline.finish()
+                estados[pipeline] = pipeline.result()
+            except Exception as e:
+                print(f"[ERROR] Reporte {_etiqueta(pipeline)}: {e}")
+                pipeline.checkpoint_error(e)
+                estados[pipeline] = e
+    finally:
+        for pipeline in pipelines:
+            pipeline.close()
+        scheduler.shutdown()
+
+    resultados = {_etiqueta(p): estados[p] for p in pipelines}
+    _imprimir_resumen(resultados)
+    return resultados
+
+
+def _etiqueta(pipeline) -> str:
+    """Nombre de un reporte en el log y en el resultado del batch."""
+    return f"{pipeline.args.site} {pipeline.args.commerce_group}"
+
+
+def _muestrear(pipeline):
+    """PASO 4 de un reporte; retorna la excepción si falla (None si terminó OK)."""
+    try:
+        pipeline.conversations()
+    except Exception as e:
+        return e
+    return None
+
+
+def _resultados_compartidos(pipeline, scheduler, ordenes: dict) -> dict:
+    """
+    Porción de las lecturas compartidas de un reporte, por nombre de job de
+    ReportPipeline (en modo --plan solo importan los nombres).
+    """
+    a = pipeline.args
+    lectura = pipeline.lectura_batch
+    driver_config = get_driver_config(a.commerce_group)
+    nombres = ['contactos_fusionados', 'drivers_semanales']
+    if driver_config['type'] != 'shipping_drivers':
+        nombres.append('drivers_total')
+    if a.plan:
+        return dict.fromkeys(nombres)
+
+    sites = get_site_list(a.site)
+    compartidos = split_batch_orders(scheduler.result(ordenes[lectura['periodos']]),
+                                     sites if driver_config['filter_by_site'] else None)
+    compartidos['contactos_fusionados'] = split_batch_contacts(
+        scheduler.result(lectura['nombre']), lectura['commerce_groups'], a.commerce_group,
+        sites, list(_campos_reporte(pipeline))
+    )
+    return {nombre: compartidos[nombre] for nombre in nombres}
+
+
+def _imprimir_resumen(resultados: dict):
+    """Resumen del batch: reporte, estado y HTML generado."""
+    print("\n" + "="*80)
+    print("RESUMEN DEL BATCH")
+    print("="*80)
+    for etiqueta, resultado in resultados.items():
+        if isinstance(resultado, Exception):
+            print(f"  [ERROR] {etiqueta:<30} {resultado}")
+        else:
+            print(f"  [OK]    {etiqueta:<30} {resultado.html_path or '(sin HTML)'}")
+    errores = sum(isinstance(r, Exception) for r in resultados.values())
+    print(f"\n  {len(resultados) - errores} reportes generados, {errores} con error")
+    print("="*80 + "\n")
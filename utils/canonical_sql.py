@@ -0,0 +1,179 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+CANONICAL SQL - Queries normalizadas y parametrizadas
+══════════════════════════════════════════════════════════════════════════════
+Descripción: BigQuery reutiliza un resultado cacheado (24 h) solo si el texto
+             de la query es idéntico byte a byte. Las queries compartidas
+             (CTE de contactos, drivers, feriados, eventos) se construyen con
+             canonical_query(): el SQL se normaliza (sin comentarios, espacios
+             colapsados) y los valores de la corrida van como parámetros
+             (@p1_start, @sites, @commerce_group, ...) en lugar de
+             interpolarse. Así el mismo pedido lógico desde el generador
+             universal, run_analysis.py o analisis_cr_generico.py produce
+             siempre el mismo texto.
+
+CanonicalQuery:
+  Es un str con el SQL canónico y los valores como literales (lo que usan la
+  cache local, el planner, los logs y el backend DuckDB), más:
+    - .sql:    el mismo SQL con los parámetros (@nombre)
+    - .params: {nombre: valor}
+  BigQueryBackend envía .sql con query_parameters. Donde no hay parámetros
+  (CLI `bq query`, DuckDB) se ejecuta el str: también es canónico, así que el
+  mismo pedido lógico sigue generando el mismo texto.
+
+Tipos de parámetro:
+  date → DATE | bool → BOOL | int → INT64 | float → FLOAT64 | str → STRING
+  list / tuple de str → ARRAY<STRING> (usar como `COL IN UNNEST(@sites)`)
+
+Uso:
+  from utils.canonical_sql import canonical_query, fecha_param
+
+  query = canonical_query('''
+      SELECT COUNT(*) AS N
+      FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+      WHERE C.SIT_SITE_ID IN UNNEST(@sites)
+          AND C.CONTACT_DATE_ID BETWEEN @p1_start AND @p2_end
+  ''', sites=['MLA'], p1_start=fecha_param('2025-11-01'), p2_end=fecha_param('2025-12-31'))
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import re
+from datetime import date
+
+from utils.query_cache import normalize_sql
+
+
+_RE_PARAMETRO = re.compile(r'UNNEST\(\s*@(\w+)\s*\)|@(\w+)')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FUNCIONES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def fecha_param(fecha) -> date:
+    """Valor de parámetro DATE desde 'YYYY-MM-DD' (o Timestamp / date)."""
+    if isinstance(fecha, date):
+        return date(fecha.year, fecha.month, fecha.day)
+    return date.fromisoformat(str(fecha)[:10])
+
+
+def sites_param(sites) -> list:
+    """Valor de parámetro ARRAY<STRING> de sites, ordenado (mismo texto para el mismo grupo)."""
+    return sorted({s.upper() for s in sites})
+
+
+def param_type(valor) -> str:
+    """Tipo de BigQuery del valor de un parámetro."""
+    if isinstance(valor, bool):
+        return 'BOOL'
+    if isinstance(valor, int):
+        return 'INT64'
+    if isinstance(valor, float):
+        return 'FLOAT64'
+    if isinstance(valor, date):
+        return 'DATE'
+    if isinstance(valor, str):
+        return 'STRING'
+    if isinstance(valor, (list, tuple)):
+        return 'ARRAY<STRING>'
+    raise TypeError(f"Tipo de parámetro no soportado: {type(valor).__name__}")
+
+
+def sql_literal(valor) -> str:
+    """Literal SQL equivalente al valor de un parámetro."""
+    tipo = param_type(valor)
+    if tipo == 'BOOL':
+        return 'TRUE' if valor else 'FALSE'
+    if tipo in ('INT64', 'FLOAT64'):
+        return repr(valor)
+    if tipo == 'DATE':
+        return f"'{valor.isoformat()}'"
+    if tipo == 'STRING':
+        return "'" + valor.replace("'", "''") + "'"
+    return '[' + ', '.join(sql_literal(str(v)) for v in valor) + ']'
+
+
+def _segmentos(sql: str):
+    """Parte el SQL en (texto, es_literal) para no tocar strings entre comillas."""
+    i, n, inicio = 0, len(sql), 0
+    while i < n:
+        if sql[i] in ("'", '"'):
+            if i > inicio:
+                yield sql[inicio:i], False
+            j = i + 1
+            while j < n and sql[j] != sql[i]:
+                j += 2 if sql[j] == '\\' else 1
+            yield sql[i:j + 1], True
+            i = inicio = j + 1
+        else:
+            i += 1
+    if inicio < n:
+        yield sql[inicio:], False
+
+
+def parametros_usados(sql: str) -> list:
+    """Nombres de parámetros (@nombre) referenciados fuera de literales, en orden."""
+    nombres = []
+    for texto, es_literal in _segmentos(sql):
+        if not es_literal:
+            for m in _RE_PARAMETRO.finditer(texto):
+                nombres.append(m.group(1) or m.group(2))
+    return list(dict.fromkeys(nombres))
+
+
+def render_sql(sql: str, params: dict) -> str:
+    """
+    Reemplaza los parámetros por literales.
+
+    `UNNEST(@lista)` se reemplaza por `('a', 'b')` para que `IN UNNEST(@sites)`
+    quede como `IN ('MLA', 'MLB')`, válido en BigQuery y DuckDB.
+
+    Raises:
+        ValueError: Si un parámetro referenciado no tiene valor
+    """
+    def reemplazar(m):
+        nombre = m.group(1) or m.group(2)
+        if nombre not in params:
+            raise ValueError(f"Parámetro sin valor: @{nombre}")
+        valor = params[nombre]
+        if m.group(1):
+            return '(' + ', '.join(sql_literal(str(v)) for v in valor) + ')'
+        return sql_literal(valor)
+
+    return ''.join(texto if es_literal else _RE_PARAMETRO.sub(reemplazar, texto)
+                   for texto, es_literal in _segmentos(sql))
+
+
+class CanonicalQuery(str):
+    """
+    SQL canónico con literales (valor del str) y su versión parametrizada.
+
+    Las operaciones de str (concatenar, formatear) retornan str común: la
+    query resultante se ejecuta con literales, sin parámetros.
+    """
+
+    def __new__(cls, sql: str, params: dict):
+        usados = parametros_usados(sql)
+        params = {nombre: params[nombre] for nombre in usados if nombre in params}
+        obj = super().__new__(cls, render_sql(sql, params))
+        obj.sql = sql
+        obj.params = params
+        return obj
+
+
+def canonical_query(sql: str, **params) -> CanonicalQuery:
+    """
+    Normaliza el SQL y lo asocia a sus parámetros.
+
+    Args:
+        sql: Query con parámetros @nombre
+        **params: Valores de los parámetros (los no referenciados se descartan)
+
+    Returns:
+        CanonicalQuery
+    """
+    return CanonicalQuery(normalize_sql(sql), params)
+
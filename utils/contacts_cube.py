@@ -0,0 +1,276 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+CONTACTS CUBE - Cubo diario local de contactos (site × CG × dimensión × día)
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Casi todos los números de PASO 1-3 son sumas de contactos en
+             una ventana de días, agrupados por una dimensión de
+             FIELD_MAPPING. Con --contacts-cube el reporte guarda esas sumas
+             por día en Parquet local y responde PASO 1-3 desde ahí para
+             cualquier par de períodos:
+
+               - Solo los días que le faltan al cubo se leen de BT_CX_CONTACTS
+                 (build_daily_contacts_query, una query por corrida); el
+                 resto sale de disco en milisegundos.
+               - Cada dimensión lleva su propio registro de días cargados:
+                 agregar una apertura solo carga esa dimensión.
+               - Los últimos DIAS_ABIERTOS días todavía se completan en
+                 BT_CX_CONTACTS: se leen en cada corrida y no se guardan.
+
+             El resultado tiene la forma de split_fused_contacts() (total,
+             serie semanal y aperturas) con la misma semántica de períodos
+             que las queries de PASO 1-3 (mes de CONTACT_DATE_ID entre
+             inicio y fin del período).
+
+Estructura (un cubo por site, commerce group y --process-name):
+  {cube_dir}/{site}/{commerce_group}[/proceso_{hash}]/
+      manifest.json               → días cargados por dimensión
+      {DIMENSION}/{YYYY-MM}.parquet → FECHA, VALOR, CASOS (TOTAL sin VALOR)
+
+Uso:
+  from utils.contacts_cube import ContactsCube
+
+  cubo = ContactsCube('.cache/cube', 'MLB', 'PDD')
+  rangos = cubo.rangos(['PROCESO'], '2025-11-01', '2025-12-31')
+  faltante = cubo.missing_range(rangos)          # (inicio, fin, aperturas) o None
+  if faltante:
+      cubo.update(df_diario, *faltante)
+  partes = cubo.answer(['PROCESO'], '2025-11-01', '2025-11-30', '2025-12-01', '2025-12-31')
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import threading
+from datetime import date
+from pathlib import Path
+
+from utils.local_store import dias as _dias, escribir_parquet, guardar_manifest, leer_manifest, ultimo_cerrado
+from utils.report_queries import weekly_start
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_CUBE_DIR = '.cache/cube'
+
+# Cambiar al modificar el formato de las particiones (el cubo se vuelve a cargar)
+CUBE_VERSION = 1
+
+# Dimensión del total diario (sin apertura)
+TOTAL = 'TOTAL'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CUBO
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ContactsCube:
+    """
+    Cubo diario de contactos de un site, commerce group y proceso.
+
+    Thread-safe: los reportes de la cola del servidor pueden compartir el directorio.
+    """
+
+    def __init__(self, cube_dir: str, site: str, commerce_group: str, process_name: str = None,
+                 refresh: bool = False, hoy: date = None):
+        """
+        Args:
+            cube_dir: Directorio raíz de los cubos
+            site: Site o grupo (ej: 'MLB', 'ROLA')
+            commerce_group: Commerce group (ej: 'PDD')
+            process_name: Filtro --process-name (cubo aparte por proceso)
+            refresh: Considerar faltantes todos los días (se vuelven a leer y se sobrescriben)
+            hoy: Fecha de referencia de los días abiertos (default: hoy)
+        """
+        self.path = Path(cube_dir) / site / commerce_group
+        if process_name:
+            self.path = self.path / f"proceso_{hashlib.sha1(process_name.encode('utf-8')).hexdigest()[:12]}"
+        self.refresh = refresh
+        self.ultimo_cerrado = ultimo_cerrado(hoy).isoformat()
+        self.dias_leidos = 0
+        self._abiertos = {}   # dimensión → DataFrame de días abiertos leídos en esta corrida
+        self._lock = threading.Lock()
+
+    # ──────────────────────────────────────────────
+    # Días cargados
+    # ──────────────────────────────────────────────
+
+    def _manifest(self) -> dict:
+        """{dimensión: set de días cargados} (vacío si no existe o es de otra versión)."""
+        manifest = leer_manifest(self.path / 'manifest.json', {'version': CUBE_VERSION}, 'CUBO')
+        return {dimension: set(dias) for dimension, dias in manifest.get('dias', {}).items()}
+
+    def _guardar_manifest(self, cargados: dict):
+        guardar_manifest(self.path / 'manifest.json', {'version': CUBE_VERSION},
+                         dias={d: sorted(dias) for d, dias in cargados.items()})
+
+    @staticmethod
+    def rangos(aperturas: list, p1_start: str, p2_end: str) -> dict:
+        """
+        Días que necesita cada dimensión para PASO 1-3: el total también cubre
+        la serie semanal (25 semanas hasta p2_end).
+
+        Returns:
+            {dimensión: (inicio, fin)}
+        """
+        rangos = {TOTAL: (min(p1_start, weekly_start(p2_end)), p2_end)}
+        for apertura in aperturas:
+            rangos[apertura] = (p1_start, p2_end)
+        return rangos
+
+    def missing_range(self, rangos: dict):
+        """
+        Rango de días a leer de BigQuery para completar las dimensiones.
+
+        Args:
+            rangos: {dimensión: (inicio, fin)} (ver rangos)
+
+        Returns:
+            (inicio, fin, aperturas a leer) o None si el cubo ya tiene todo
+        """
+        cargados = {} if self.refresh else self._manifest()
+        faltantes = {}
+        for dimension, (inicio, fin) in rangos.items():
+            dias = [d for d in _dias(inicio, fin) if d not in cargados.get(dimension, ())]
+            if dias:
+                faltantes[dimension] = dias
+        if not faltantes:
+            return None
+        dias = [d for lista in faltantes.values() for d in lista]
+        return min(dias), max(dias), [d for d in rangos if d != TOTAL and d in faltantes]
+
+    # ──────────────────────────────────────────────
+    # Escritura
+    # ──────────────────────────────────────────────
+
+    def update(self, df, inicio: str, fin: str, aperturas: list):
+        """
+        Incorpora el resultado de build_daily_contacts_query para [inicio, fin].
+
+        Los días cerrados se guardan en las particiones mensuales (reemplazando
+        los que ya estuvieran) y se registran en el manifest; los días abiertos
+        solo quedan en memoria para esta corrida.
+
+        Args:
+            df: DataFrame con G_<apertura>, FECHA, DIM_<apertura>, CASOS
+            inicio, fin: Días leídos (inclusivos)
+            aperturas: Aperturas incluidas en la query
+        """
+        import pandas as pd
+
+        df = df.copy()
+        df['FECHA'] = pd.to_datetime(df['FECHA']).astype('datetime64[ns]')
+        dias = _dias(inicio, fin)
+        cerrados = [d for d in dias if d <= self.ultimo_cerrado]
+        self.dias_leidos += len(dias)
+
+        piezas = {}
+        flags = [f'G_{a}' for a in aperturas]
+        es_total = (df[flags] == 1).all(axis=1) if flags else pd.Series(True, index=df.index)
+        piezas[TOTAL] = df.loc[es_total, ['FECHA', 'CASOS']]
+        for apertura in aperturas:
+            filas = df[(df[f'G_{apertura}'] == 0) & df[f'DIM_{apertura}'].notna()]
+            piezas[apertura] = filas[['FECHA', f'DIM_{apertura}', 'CASOS']].rename(
+                columns={f'DIM_{apertura}': 'VALOR'})
+
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            cargados = self._manifest()
+            for dimension, pieza in piezas.items():
+                pieza = pieza.astype({'CASOS': 'float64'}).reset_index(drop=True)
+                if 'VALOR' in pieza:
+                    pieza['VALOR'] = pieza['VALOR'].astype(str)
+                abiertos = pieza['FECHA'] > pd.Timestamp(self.ultimo_cerrado)
+                self._abiertos[dimension] = pieza[abiertos]
+                self._escribir(dimension, pieza[~abiertos], cerrados)
+                cargados[dimension] = cargados.get(dimension, set()) | set(cerrados)
+            # El manifest se escribe al final: solo registra días cuyas particiones ya están en disco
+            self._guardar_manifest(cargados)
+
+    def _escribir(self, dimension: str, pieza, dias: list):
+        """Reemplaza los días de la pieza en las particiones mensuales de la dimensión (escritura atómica)."""
+        import pandas as pd
+
+        for mes in sorted({d[:7] for d in dias}):
+            path = self.path / dimension / f'{mes}.parquet'
+            path.parent.mkdir(parents=True, exist_ok=True)
+            dias_mes = pd.to_datetime([d for d in dias if d[:7] == mes])
+            nuevos = pieza[pieza['FECHA'].dt.strftime('%Y-%m') == mes]
+            if path.exists():
+                existentes = pd.read_parquet(path)
+                nuevos = pd.concat([existentes[~existentes['FECHA'].isin(dias_mes)], nuevos], ignore_index=True)
+            nuevos = nuevos.sort_values([c for c in ('FECHA', 'VALOR') if c in nuevos]).reset_index(drop=True)
+            escribir_parquet(nuevos, path)
+
+    # ──────────────────────────────────────────────
+    # Lectura
+    # ──────────────────────────────────────────────
+
+    def read(self, dimension: str, inicio: str, fin: str):
+        """
+        Filas diarias de la dimensión entre inicio y fin (particiones + días abiertos de esta corrida).
+
+        Returns:
+            DataFrame[FECHA, (VALOR,) CASOS]
+        """
+        import pandas as pd
+
+        partes = []
+        with self._lock:
+            for mes in sorted({d[:7] for d in _dias(inicio, fin)}):
+                path = self.path / dimension / f'{mes}.parquet'
+                if path.exists():
+                    partes.append(pd.read_parquet(path))
+            if dimension in self._abiertos:
+                partes.append(self._abiertos[dimension])
+        columnas = ['FECHA', 'CASOS'] if dimension == TOTAL else ['FECHA', 'VALOR', 'CASOS']
+        if not partes:
+            return pd.DataFrame({c: pd.Series(dtype='datetime64[ns]' if c == 'FECHA' else 'float64' if c == 'CASOS'
+                                              else 'object') for c in columnas})
+        df = pd.concat(partes, ignore_index=True)
+        return df[(df['FECHA'] >= pd.Timestamp(inicio)) & (df['FECHA'] <= pd.Timestamp(fin))][columnas]
+
+    def answer(self, aperturas: list, p1_start: str, p1_end: str, p2_start: str, p2_end: str) -> dict:
+        """
+        PASO 1-3 desde el cubo (mismo formato que split_fused_contacts).
+
+        Returns:
+            {'inc_p1': int, 'inc_p2': int, 'weekly': DataFrame[SEMANA, CASOS],
+             'dimensiones': {apertura: DataFrame[DIMENSION_VAL, INC_P1, INC_P2, VAR_INC, VAR_ABS]}}
+        """
+        import pandas as pd
+
+        def por_periodo(df):
+            """INC_P1 / INC_P2 por fila: el mes del día entre inicio y fin del período (como PERIODO en SQL)."""
+            periodo = df['FECHA'].dt.to_period('M').dt.start_time
+            df = df.assign(
+                INC_P1=df['CASOS'].where((periodo >= pd.Timestamp(p1_start)) & (periodo <= pd.Timestamp(p1_end)), 0.0),
+                INC_P2=df['CASOS'].where((periodo >= pd.Timestamp(p2_start)) & (periodo <= pd.Timestamp(p2_end)), 0.0),
+            )
+            return df
+
+        df_total = por_periodo(self.read(TOTAL, p1_start, p2_end))
+        inicio_semanal = weekly_start(p2_end)
+        df_semanal = self.read(TOTAL, inicio_semanal, p2_end)
+        df_semanal = df_semanal.assign(SEMANA=df_semanal['FECHA'] - pd.to_timedelta(df_semanal['FECHA'].dt.weekday, unit='D'))
+        df_semanal = df_semanal.groupby('SEMANA', as_index=False)['CASOS'].sum().sort_values('SEMANA').reset_index(drop=True)
+
+        dimensiones = {}
+        for apertura in aperturas:
+            df_dim = por_periodo(self.read(apertura, p1_start, p2_end))
+            df_dim = df_dim.groupby('VALOR', as_index=False)[['INC_P1', 'INC_P2']].sum().rename(
+                columns={'VALOR': 'DIMENSION_VAL'})
+            df_dim = df_dim[(df_dim['INC_P1'] > 0) | (df_dim['INC_P2'] > 0)].copy()
+            df_dim['VAR_INC'] = df_dim['INC_P2'] - df_dim['INC_P1']
+            df_dim['VAR_ABS'] = df_dim['VAR_INC'].abs()
+            dimensiones[apertura] = df_dim.sort_values('VAR_ABS', ascending=False, kind='stable').reset_index(drop=True)
+
+        return {
+            'inc_p1': int(df_total['INC_P1'].sum()),
+            'inc_p2': int(df_total['INC_P2'].sum()),
+            'weekly': df_semanal,
+            'dimensiones': dimensiones,
+        }
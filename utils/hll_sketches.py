@@ -0,0 +1,322 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+HLL SKETCHES - Conteos distintos de cualquier ventana desde sketches diarios
+══════════════════════════════════════════════════════════════════════════════
+Descripción: COUNT(DISTINCT ...) no se puede sumar entre días cuando un
+             identificador aparece en más de uno (casos con varios contactos,
+             clientes). Este módulo guarda por site y día un sketch
+             HyperLogLog de cada métrica de METRICAS_DISTINTAS (órdenes,
+             casos, clientes) y responde el conteo distinto de cualquier
+             semana, mes o ventana con un merge local (máximo por registro),
+             sin volver a leer la tabla.
+
+               - build_hll_registers_query calcula los registros en SQL
+                 (FARM_FINGERPRINT + operaciones de bits), portable a DuckDB:
+                 el merge local es exacto. Los bytes de HLL_COUNT.INIT de
+                 BigQuery no se pueden combinar fuera de BigQuery sin el
+                 formato de ZetaSketch.
+               - El conteo usa el estimador de Ertl (2017), sin tablas de
+                 corrección de sesgo: error relativo ~1.04 / sqrt(2^precision)
+                 (1.6% con HLL_PRECISION = 12).
+               - Como en el cubo de contactos, solo se leen los días que
+                 faltan y los últimos DIAS_ABIERTOS no se guardan.
+
+             Las órdenes tienen un único ORD_CLOSED_DT: su conteo distinto
+             exacto por ventana ya es la suma de los conteos diarios del
+             DriverStore (calculations/drivers_management.py). Los sketches
+             sirven para los identificadores que se repiten entre días.
+
+Estructura:
+  {sketch_dir}/{metrica}[/{commerce_group}]/p{precision}/
+      manifest.json                → días cargados
+      {YYYY-MM}.parquet            → FECHA, SIT_SITE_ID, REGISTRO, RHO
+
+Uso:
+  from utils.hll_sketches import SketchStore
+
+  store = SketchStore('.cache/sketches', 'customers', commerce_group='PDD')
+  store.load(backend, '2025-07-01', '2025-12-31')       # solo los días faltantes
+  store.distinct('MLB', '2025-12-01', '2025-12-31')     # clientes únicos de diciembre
+  store.weekly('ROLA', '2025-10-01', '2025-12-31')      # DataFrame[SEMANA, DISTINTOS]
+
+  En el reporte: --distinct-sketches (etapa distinct_counts de ReportPipeline)
+  agrega casos y clientes únicos de P1 y P2 a las cards y al resumen.
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import math
+import threading
+from datetime import date
+from pathlib import Path
+
+from config.site_groups import get_site_list
+from utils.local_store import dias as _dias, escribir_parquet, guardar_manifest, leer_manifest, ultimo_cerrado
+from utils.report_queries import METRICAS_DISTINTAS, build_hll_registers_query
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_SKETCH_DIR = '.cache/sketches'
+
+# Cambiar al modificar el formato de las particiones (los sketches se vuelven a cargar)
+SKETCH_VERSION = 1
+
+# Bits del índice de registro: 2^12 registros por sketch (error relativo ~1.6%)
+HLL_PRECISION = 12
+
+# Bits del hash (FARM_FINGERPRINT & 0x7FFFFFFFFFFFFFFF)
+HASH_BITS = 63
+
+
+def _sigma(x: float) -> float:
+    """σ(x) del estimador de Ertl (corrección de registros vacíos)."""
+    if x == 1.0:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_anterior = z
+        z += x * y
+        y += y
+        if z == z_anterior:
+            return z
+
+
+def _tau(x: float) -> float:
+    """τ(x) del estimador de Ertl (corrección de registros saturados)."""
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1.0 - x
+    while True:
+        x = math.sqrt(x)
+        z_anterior = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == z_anterior:
+            return z / 3
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SKETCH
+# ══════════════════════════════════════════════════════════════════════════════
+
+class HllSketch:
+    """
+    Registros HyperLogLog (un byte por registro) de un conjunto de identificadores.
+
+    El merge es el máximo por registro: sketch(A ∪ B) == sketch(A) | sketch(B).
+    """
+
+    def __init__(self, registros=None, precision: int = HLL_PRECISION):
+        import numpy as np
+
+        self.precision = precision
+        self.registros = (np.zeros(2 ** precision, dtype=np.uint8) if registros is None
+                          else np.asarray(registros, dtype=np.uint8))
+
+    @classmethod
+    def from_rows(cls, df, precision: int = HLL_PRECISION) -> 'HllSketch':
+        """Sketch de las filas REGISTRO / RHO de build_hll_registers_query (de uno o varios días y sites)."""
+        import numpy as np
+
+        sketch = cls(precision=precision)
+        np.maximum.at(sketch.registros, df['REGISTRO'].to_numpy(dtype=np.int64),
+                      df['RHO'].to_numpy(dtype=np.uint8))
+        return sketch
+
+    def merge(self, otro: 'HllSketch') -> 'HllSketch':
+        """Sketch de la unión de ambos conjuntos."""
+        import numpy as np
+
+        if otro.precision != self.precision:
+            raise ValueError(f"Sketches de distinta precisión: {self.precision} y {otro.precision}")
+        return HllSketch(np.maximum(self.registros, otro.registros), self.precision)
+
+    __or__ = merge
+
+    def estimate(self) -> float:
+        """Cantidad estimada de identificadores distintos (estimador mejorado de Ertl)."""
+        import numpy as np
+
+        m = len(self.registros)
+        q = HASH_BITS - self.precision
+        conteos = np.bincount(self.registros, minlength=q + 2)
+        z = m * _tau(1 - conteos[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + conteos[k])
+        z += m * _sigma(conteos[0] / m)
+        return m * m / (2 * math.log(2)) / z
+
+    def count(self) -> int:
+        """Estimación redondeada."""
+        return int(round(self.estimate()))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STORE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SketchStore:
+    """
+    Sketches diarios por site de una métrica (y commerce group, para contactos).
+
+    Thread-safe: los reportes de la cola del servidor pueden compartir el directorio.
+    """
+
+    def __init__(self, sketch_dir: str, metrica: str, commerce_group: str = None,
+                 precision: int = HLL_PRECISION, refresh: bool = False, hoy: date = None):
+        """
+        Args:
+            sketch_dir: Directorio raíz de los sketches
+            metrica: Key de METRICAS_DISTINTAS ('orders', 'cases', 'customers')
+            commerce_group: Solo contactos de este commerce group (métricas de contactos)
+            precision: Bits del índice de registro
+            refresh: Considerar faltantes todos los días (se vuelven a leer y se sobrescriben)
+            hoy: Fecha de referencia de los días abiertos (default: hoy)
+        """
+        if metrica not in METRICAS_DISTINTAS:
+            raise ValueError(f"Métrica '{metrica}' sin sketch (disponibles: {', '.join(METRICAS_DISTINTAS)})")
+        if commerce_group and METRICAS_DISTINTAS[metrica][0] != 'contacts':
+            raise ValueError(f"La métrica '{metrica}' no depende del commerce group")
+        self.metrica = metrica
+        self.commerce_group = commerce_group
+        self.precision = precision
+        self.path = Path(sketch_dir) / metrica
+        if commerce_group:
+            self.path = self.path / commerce_group
+        self.path = self.path / f'p{precision}'
+        self.refresh = refresh
+        self.ultimo_cerrado = ultimo_cerrado(hoy).isoformat()
+        self.dias_leidos = 0
+        self._abiertos = None   # DataFrame de días abiertos leídos en esta corrida
+        self._lock = threading.Lock()
+
+    # ──────────────────────────────────────────────
+    # Días cargados
+    # ──────────────────────────────────────────────
+
+    def _manifest(self) -> set:
+        """Días cargados (vacío si no existe o es de otra versión)."""
+        return set(leer_manifest(self.path / 'manifest.json', {'version': SKETCH_VERSION}, 'SKETCH').get('dias', []))
+
+    def _guardar_manifest(self, cargados: set):
+        guardar_manifest(self.path / 'manifest.json', {'version': SKETCH_VERSION}, dias=sorted(cargados))
+
+    def missing_range(self, inicio: str, fin: str):
+        """
+        Rango de días a leer para completar [inicio, fin].
+
+        Returns:
+            (inicio, fin) o None si el store ya tiene todo
+        """
+        cargados = set() if self.refresh else self._manifest()
+        faltantes = [d for d in _dias(inicio, fin) if d not in cargados]
+        return (faltantes[0], faltantes[-1]) if faltantes else None
+
+    # ──────────────────────────────────────────────
+    # Escritura
+    # ──────────────────────────────────────────────
+
+    def update(self, df, inicio: str, fin: str):
+        """
+        Incorpora el resultado de build_hll_registers_query para [inicio, fin].
+
+        Los días cerrados se guardan en las particiones mensuales (reemplazando
+        los que ya estuvieran); los abiertos solo quedan en memoria.
+        """
+        import pandas as pd
+
+        df = df[['FECHA', 'SIT_SITE_ID', 'REGISTRO', 'RHO']].copy()
+        df['FECHA'] = pd.to_datetime(df['FECHA']).astype('datetime64[ns]')
+        df = df.astype({'SIT_SITE_ID': str, 'REGISTRO': 'int16', 'RHO': 'uint8'})
+        dias = _dias(inicio, fin)
+        cerrados = [d for d in dias if d <= self.ultimo_cerrado]
+        abiertos = df['FECHA'] > pd.Timestamp(self.ultimo_cerrado)
+        self.dias_leidos += len(dias)
+
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._abiertos = df[abiertos].reset_index(drop=True)
+            for mes in sorted({d[:7] for d in cerrados}):
+                path = self.path / f'{mes}.parquet'
+                dias_mes = pd.to_datetime([d for d in cerrados if d[:7] == mes])
+                nuevos = df[~abiertos & (df['FECHA'].dt.strftime('%Y-%m') == mes)]
+                if path.exists():
+                    existentes = pd.read_parquet(path)
+                    nuevos = pd.concat([existentes[~existentes['FECHA'].isin(dias_mes)], nuevos], ignore_index=True)
+                nuevos = nuevos.sort_values(['FECHA', 'SIT_SITE_ID', 'REGISTRO']).reset_index(drop=True)
+                escribir_parquet(nuevos, path)
+            # El manifest se escribe al final: solo registra días cuyas particiones ya están en disco
+            self._guardar_manifest(self._manifest() | set(cerrados))
+
+    def load(self, backend, inicio: str, fin: str) -> bool:
+        """
+        Lee de la base los días que le faltan al store para [inicio, fin] (una query).
+
+        Returns:
+            True si se ejecutó una query
+        """
+        faltante = self.missing_range(inicio, fin)
+        if faltante is None:
+            return False
+        query = build_hll_registers_query(self.metrica, *faltante, self.precision, self.commerce_group)
+        self.update(backend.to_dataframe(query), *faltante)
+        return True
+
+    # ──────────────────────────────────────────────
+    # Lectura
+    # ──────────────────────────────────────────────
+
+    def read(self, site_or_group, inicio: str, fin: str):
+        """
+        Registros diarios de los sites (None = todos) entre inicio y fin.
+
+        Returns:
+            DataFrame[FECHA, SIT_SITE_ID, REGISTRO, RHO]
+        """
+        import pandas as pd
+
+        partes = []
+        with self._lock:
+            for mes in sorted({d[:7] for d in _dias(inicio, fin)}):
+                path = self.path / f'{mes}.parquet'
+                if path.exists():
+                    partes.append(pd.read_parquet(path))
+            if self._abiertos is not None:
+                partes.append(self._abiertos)
+        if not partes:
+            return pd.DataFrame({'FECHA': pd.Series(dtype='datetime64[ns]'), 'SIT_SITE_ID': pd.Series(dtype='object'),
+                                 'REGISTRO': pd.Series(dtype='int16'), 'RHO': pd.Series(dtype='uint8')})
+        df = pd.concat(partes, ignore_index=True)
+        filtro = (df['FECHA'] >= pd.Timestamp(inicio)) & (df['FECHA'] <= pd.Timestamp(fin))
+        if site_or_group is not None:
+            filtro &= df['SIT_SITE_ID'].isin(get_site_list(site_or_group))
+        return df[filtro]
+
+    def sketch(self, site_or_group, inicio: str, fin: str) -> HllSketch:
+        """Sketch de la ventana: merge de los sketches diarios de los sites."""
+        return HllSketch.from_rows(self.read(site_or_group, inicio, fin), self.precision)
+
+    def distinct(self, site_or_group, inicio: str, fin: str) -> int:
+        """Conteo distinto estimado de la ventana (site, grupo o None = todos los sites)."""
+        return self.sketch(site_or_group, inicio, fin).count()
+
+    def weekly(self, site_or_group, inicio: str, fin: str):
+        """
+        Conteo distinto por semana (lunes) entre inicio y fin.
+
+        Returns:
+            DataFrame[SEMANA, DISTINTOS]
+        """
+        import pandas as pd
+
+        df = self.read(site_or_group, inicio, fin)
+        df = df.assign(SEMANA=df['FECHA'] - pd.to_timedelta(df['FECHA'].dt.weekday, unit='D'))
+        filas = [{'SEMANA': semana, 'DISTINTOS': HllSketch.from_rows(grupo, self.precision).count()}
+                 for semana, grupo in df.groupby('SEMANA', sort=True)]
+        return pd.DataFrame(filas, columns=['SEMANA', 'DISTINTOS'])
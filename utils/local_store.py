@@ -0,0 +1,109 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+LOCAL STORE - Piezas comunes de los stores incrementales en disco
+══════════════════════════════════════════════════════════════════════════════
+Descripción: El cubo de contactos (utils/contacts_cube.py), el DriverStore
+             (calculations/drivers_management.py) y los sketches HLL
+             (utils/hll_sketches.py) guardan datos diarios en particiones
+             Parquet y registran en un manifest.json los días ya cargados.
+             Este módulo reúne lo que comparten:
+
+               - DIAS_ABIERTOS / ultimo_cerrado(): los días recientes que las
+                 tablas todavía completan no se guardan ni se cachean.
+               - dias(): días de un rango.
+               - leer_manifest() / guardar_manifest(): manifest versionado
+                 (una cabecera que no coincide invalida el store).
+               - escribir_atomico() / escribir_parquet(): escritura a un
+                 temporal + os.replace, sin archivos a medio escribir.
+
+Uso:
+  from utils.local_store import dias, guardar_manifest, leer_manifest, ultimo_cerrado
+
+  cargados = leer_manifest(path / 'manifest.json', {'version': 1}, 'CUBO').get('dias', [])
+  guardar_manifest(path / 'manifest.json', {'version': 1}, dias=sorted(cargados))
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Días recientes que las tablas todavía completan: se leen siempre y no se guardan
+DIAS_ABIERTOS = 2
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FUNCIONES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def dias(inicio: str, fin: str) -> list:
+    """Días YYYY-MM-DD entre inicio y fin (inclusivos)."""
+    desde, hasta = date.fromisoformat(inicio), date.fromisoformat(fin)
+    return [(desde + timedelta(days=i)).isoformat() for i in range((hasta - desde).days + 1)]
+
+
+def ultimo_cerrado(hoy: date = None) -> date:
+    """Último día completo en las tablas de origen (hoy menos los DIAS_ABIERTOS y el día en curso)."""
+    return (hoy or date.today()) - timedelta(days=DIAS_ABIERTOS + 1)
+
+
+def escribir_atomico(path: Path, escribir):
+    """
+    Escribe path a través de un temporal y lo reemplaza de una vez.
+
+    Args:
+        path: Archivo destino
+        escribir: callable(path_temporal) que escribe el contenido
+    """
+    tmp = path.with_suffix(f'.tmp{threading.get_ident()}')
+    try:
+        escribir(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def escribir_parquet(df, path: Path):
+    """Guarda el DataFrame como Parquet con escritura atómica."""
+    escribir_atomico(path, lambda tmp: df.to_parquet(tmp, index=False))
+
+
+def leer_manifest(path: Path, cabecera: dict, etiqueta: str) -> dict:
+    """
+    Lee un manifest.json versionado.
+
+    Args:
+        path: Ruta del manifest
+        cabecera: Campos que deben coincidir (ej: {'version': 1})
+        etiqueta: Prefijo de los mensajes (ej: 'CUBO')
+
+    Returns:
+        Contenido del manifest, o {} si no existe, es ilegible o la cabecera no coincide
+    """
+    if not path.exists():
+        return {}
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except Exception as e:
+        print(f"[{etiqueta}] Manifest ilegible en {path.parent}: {e}")
+        return {}
+    if any(manifest.get(campo) != valor for campo, valor in cabecera.items()):
+        return {}
+    return manifest
+
+
+def guardar_manifest(path: Path, cabecera: dict, **contenido):
+    """Escribe el manifest (cabecera + contenido) de forma atómica."""
+    datos = json.dumps({**cabecera, **contenido})
+    escribir_atomico(path, lambda tmp: tmp.write_text(datos, encoding='utf-8'))
@@ -0,0 +1,160 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+METRICS QUERIES - Queries de los generadores de métricas (metrics/)
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Queries de incoming de metrics/eventos/generar_correlaciones.py
+             y metrics/verticales/generar_agregados.py. Filtran el mes con
+             rangos sargables sobre CONTACT_DATE_ID y acotan el lado
+             DM_CX_POST_PURCHASE del JOIN por ORD_CLOSED_DT, para que
+             BigQuery lea solo las particiones necesarias
+             (ver utils.partition_predicates).
+
+Uso:
+  from utils.metrics_queries import build_verticales_query
+
+  query = build_verticales_query('MLA', '2025-12', commerce_group='PDD')
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+from config.site_groups import resolve_site_sql
+from utils.partition_predicates import month_bounds, month_predicate, post_purchase_predicate
+
+
+# Filtros de commerce group de los generadores de métricas (Post-Compra)
+COMMERCE_GROUP_METRICS_FILTERS = {
+    'PDD': "C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' OR C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others'",
+    'PNR': "C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' OR C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale'",
+}
+
+# Ventana de ORD_CLOSED_DT de las correlaciones con eventos: desde el mes
+# anterior hasta el mes posterior al período
+EVENTOS_MESES_ANTES = 1
+EVENTOS_MESES_DESPUES = 1
+
+# Clasificación PDD / PNR de los contactos
+_COMMERCE_GROUP_CASE = """CASE
+                WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' THEN 'PDD'
+                WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others' THEN 'PDD'
+                WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' THEN 'PNR'
+                WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale' THEN 'PNR'
+                ELSE 'OTRO'
+            END"""
+
+
+def build_commerce_groups_filter(commerce_groups) -> str:
+    """
+    Filtro AND (...) de uno o más commerce groups ('' si no hay ninguno conocido).
+
+    Args:
+        commerce_groups: Lista de commerce groups (ej: ['PDD', 'PNR'])
+    """
+    condiciones = [COMMERCE_GROUP_METRICS_FILTERS[cg] for cg in commerce_groups
+                   if cg in COMMERCE_GROUP_METRICS_FILTERS]
+    if not condiciones:
+        return ""
+    return f"AND ({' OR '.join(condiciones)})"
+
+
+def build_eventos_incoming_query(site: str, periodo: str, commerce_groups=()) -> str:
+    """
+    Incoming del mes con la fecha de cierre de la orden de cada claim
+    (metrics/eventos/generar_correlaciones.py).
+
+    Args:
+        site: Site o grupo
+        periodo: 'YYYY-MM'
+        commerce_groups: Commerce groups a filtrar (vacío = todos)
+
+    Returns:
+        SQL con columnas COMMERCE_GROUP, TIPIFICACION, PROCESO, PERIODO, ORD_CLOSED_DATE
+    """
+    inicio, fin = month_bounds(periodo)
+    return f"""
+    WITH BASE_CONTACTS AS (
+        SELECT
+            C.CLA_CLAIM_ID,
+            C.REASON_DETAIL_GROUP_REPORTING as TIPIFICACION,
+            C.PROCESS_NAME as PROCESO,
+            DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+            {_COMMERCE_GROUP_CASE} AS COMMERCE_GROUP
+        FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+        WHERE {resolve_site_sql(site, 'C.SIT_SITE_ID')}
+            AND {month_predicate('C.CONTACT_DATE_ID', periodo)}
+            AND C.PROCESS_BU_CR_REPORTING IN ('ME','ML')
+            AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
+            AND C.CLA_CLAIM_ID IS NOT NULL
+            AND C.REASON_DETAIL_GROUP_REPORTING IS NOT NULL
+            {build_commerce_groups_filter(commerce_groups)}
+    ),
+    ORDERS_DATA AS (
+        SELECT
+            PP.CLA_CLAIM_ID,
+            PP.ORD_CLOSED_DT as ORD_CLOSED_DATE
+        FROM `meli-bi-data.WHOWNER.DM_CX_POST_PURCHASE` PP
+        WHERE {post_purchase_predicate('PP.ORD_CLOSED_DT', inicio, fin,
+                                       EVENTOS_MESES_ANTES, EVENTOS_MESES_DESPUES)}
+    )
+    SELECT
+        B.COMMERCE_GROUP,
+        B.TIPIFICACION,
+        B.PROCESO,
+        B.PERIODO,
+        O.ORD_CLOSED_DATE
+    FROM BASE_CONTACTS B
+    LEFT JOIN ORDERS_DATA O ON B.CLA_CLAIM_ID = O.CLA_CLAIM_ID
+    """
+
+
+def build_verticales_query(site: str, periodo: str, commerce_group: str = 'ALL') -> str:
+    """
+    Incoming PDD / PNR del mes por vertical y dominio
+    (metrics/verticales/generar_agregados.py).
+
+    Args:
+        site: Site o grupo
+        periodo: 'YYYY-MM'
+        commerce_group: 'PDD', 'PNR' o 'ALL' (ambos)
+
+    Returns:
+        SQL con columnas SITE, PERIODO, COMMERCE_GROUP, VERTICAL, DOMINIO, INCOMING
+    """
+    inicio, fin = month_bounds(periodo)
+    return f"""
+    WITH BASE_CONTACTS AS (
+        SELECT
+            C.CLA_CLAIM_ID,
+            C.SIT_SITE_ID,
+            DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+            {_COMMERCE_GROUP_CASE} AS COMMERCE_GROUP
+        FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+        WHERE {resolve_site_sql(site, 'C.SIT_SITE_ID')}
+            AND {month_predicate('C.CONTACT_DATE_ID', periodo)}
+            AND C.PROCESS_BU_CR_REPORTING IN ('ME','ML')
+            AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
+            AND C.CLA_CLAIM_ID IS NOT NULL
+            {build_commerce_groups_filter([commerce_group])}
+    ),
+    VERTICALES_DATA AS (
+        SELECT
+            PP.CLA_CLAIM_ID,
+            PP.VERTICAL,
+            PP.DOM_DOMAIN_AGG1 as DOMINIO
+        FROM `meli-bi-data.WHOWNER.DM_CX_POST_PURCHASE` PP
+        WHERE PP.VERTICAL IS NOT NULL
+            AND {post_purchase_predicate('PP.ORD_CLOSED_DT', inicio, fin)}
+    )
+    SELECT
+        B.SIT_SITE_ID as SITE,
+        B.PERIODO,
+        B.COMMERCE_GROUP,
+        COALESCE(V.VERTICAL, 'SIN_VERTICAL') as VERTICAL,
+        COALESCE(V.DOMINIO, 'SIN_DOMINIO') as DOMINIO,
+        COUNT(DISTINCT B.CLA_CLAIM_ID) as INCOMING
+    FROM BASE_CONTACTS B
+    LEFT JOIN VERTICALES_DATA V ON B.CLA_CLAIM_ID = V.CLA_CLAIM_ID
+    WHERE B.COMMERCE_GROUP IN ('PDD', 'PNR')
+    GROUP BY 1, 2, 3, 4, 5
+    """
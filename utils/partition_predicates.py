@@ -0,0 +1,191 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+PARTITION PREDICATES - Filtros que permiten partition pruning en BigQuery
+══════════════════════════════════════════════════════════════════════════════
+Descripción: BigQuery solo descarta particiones (y bloques de clustering)
+             cuando el filtro compara la columna directamente contra
+             constantes. `DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) = '2025-12-01'`
+             envuelve la columna de partición en una función y obliga a leer
+             la tabla completa; `C.CONTACT_DATE_ID >= '2025-12-01' AND
+             C.CONTACT_DATE_ID < '2026-01-01'` lee solo el mes.
+
+Reglas:
+  - Rangos semiabiertos [inicio, fin) sobre la columna de partición, con
+    las fechas ya calculadas en Python (sin funciones sobre la columna).
+  - Todas las tablas particionadas de un JOIN llevan su propio rango (ej:
+    DM_CX_POST_PURCHASE se acota por ORD_CLOSED_DT), siempre que el rango
+    no descarte filas que la query necesita.
+  - Las columnas de clustering (SIT_SITE_ID) se comparan con = / IN.
+
+pruning_violations(sql) revisa una query generada y lista las tablas
+particionadas sin rango sargable y las columnas de partición o clustering
+envueltas en funciones dentro de una comparación. Es un chequeo textual (no
+un parser de SQL) pensado para los tests de las queries generadas.
+
+Uso:
+  from utils.partition_predicates import month_predicate, post_purchase_predicate
+
+  where = month_predicate('C.CONTACT_DATE_ID', '2025-12')
+  # "C.CONTACT_DATE_ID >= '2025-12-01' AND C.CONTACT_DATE_ID < '2026-01-01'"
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import re
+from datetime import date
+
+from utils.query_cache import normalize_sql
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Columna de partición de cada tabla de hechos
+PARTITION_COLUMNS = {
+    'BT_CX_CONTACTS': 'CONTACT_DATE_ID',
+    'BT_ORD_ORDERS': 'ORD_CLOSED_DT',
+    'BT_CX_DRIVERS_CR': 'MONTH_ID',
+    'DM_CX_POST_PURCHASE': 'ORD_CLOSED_DT',
+    'BT_CX_STUDIO_SAMPLE': 'ARRIVAL_DATE',
+}
+
+# Columnas de clustering (se filtran con = / IN, nunca dentro de funciones)
+CLUSTER_COLUMNS = {
+    'BT_CX_CONTACTS': ['SIT_SITE_ID'],
+    'BT_ORD_ORDERS': ['SIT_SITE_ID'],
+}
+
+# Cota de ORD_CLOSED_DT de DM_CX_POST_PURCHASE para los contactos de un
+# período: un claim se abre después del cierre de su orden, así que ninguna
+# orden de un claim del período cierra después de su fin (se deja un mes de
+# margen). No hay cota inferior segura: no existe un plazo máximo entre la
+# orden y el claim, y una cota arbitraria deja claims sin su orden
+POST_PURCHASE_MESES_DESPUES = 1
+
+# DM_CX_POST_PURCHASE se lee por claim: basta la cota superior de ORD_CLOSED_DT
+PARTITION_UPPER_BOUND_ONLY = {'DM_CX_POST_PURCHASE'}
+
+_PALABRAS_SQL = {'WHERE', 'ON', 'LEFT', 'RIGHT', 'INNER', 'FULL', 'CROSS', 'JOIN', 'GROUP',
+                 'ORDER', 'LIMIT', 'UNION', 'USING', 'QUALIFY', 'HAVING', 'WINDOW'}
+_RE_TABLA = re.compile(r'\b(?:FROM|JOIN)\s+`(?:[^`]*\.)?(\w+)`(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PREDICADOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def add_months(fecha: date, meses: int) -> date:
+    """Primer día del mes `meses` meses después (o antes) del mes de `fecha`."""
+    total = fecha.year * 12 + fecha.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def month_bounds(periodo: str) -> tuple:
+    """
+    Rango semiabierto de un mes.
+
+    Args:
+        periodo: 'YYYY-MM' (o 'YYYY-MM-DD', se toma el mes)
+
+    Returns:
+        (primer día del mes, primer día del mes siguiente)
+    """
+    inicio = date.fromisoformat(f"{str(periodo)[:7]}-01")
+    return inicio, add_months(inicio, 1)
+
+
+def date_range_predicate(columna: str, inicio, fin_exclusivo) -> str:
+    """
+    Predicado sargable `columna >= inicio AND columna < fin_exclusivo`.
+
+    Args:
+        columna: Columna con alias (ej: 'C.CONTACT_DATE_ID')
+        inicio: Fecha inicial incluida (date o 'YYYY-MM-DD')
+        fin_exclusivo: Fecha final excluida (date o 'YYYY-MM-DD')
+    """
+    return f"{columna} >= '{str(inicio)[:10]}' AND {columna} < '{str(fin_exclusivo)[:10]}'"
+
+
+def month_predicate(columna: str, periodo: str) -> str:
+    """Predicado sargable de un mes completo (reemplaza DATE_TRUNC(columna, MONTH) = periodo)."""
+    return date_range_predicate(columna, *month_bounds(periodo))
+
+
+def post_purchase_predicate(columna: str, inicio, fin_exclusivo, meses_antes: int = None,
+                            meses_despues: int = POST_PURCHASE_MESES_DESPUES) -> str:
+    """
+    Rango de ORD_CLOSED_DT para el lado DM_CX_POST_PURCHASE de un JOIN con
+    los contactos de [inicio, fin_exclusivo).
+
+    Args:
+        columna: Columna ORD_CLOSED_DT con alias (ej: 'PP.ORD_CLOSED_DT')
+        inicio, fin_exclusivo: Rango de los contactos
+        meses_antes: Meses completos antes del inicio (None = sin cota inferior,
+                     ver POST_PURCHASE_MESES_DESPUES)
+        meses_despues: Meses completos después del fin
+    """
+    inicio = date.fromisoformat(str(inicio)[:10])
+    fin_exclusivo = date.fromisoformat(str(fin_exclusivo)[:10])
+    fin_mes = add_months(fin_exclusivo, 0 if fin_exclusivo.day == 1 else 1)
+    if meses_antes is None:
+        return f"{columna} < '{add_months(fin_mes, meses_despues)}'"
+    return date_range_predicate(columna, add_months(inicio, -meses_antes),
+                                add_months(fin_mes, meses_despues))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# VERIFICACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _referencia(alias: str, columna: str) -> str:
+    """Regex de la columna calificada con el alias (o sin calificar)."""
+    if alias:
+        return rf'\b{re.escape(alias)}\.{columna}\b'
+    return rf'(?<![\w.]){columna}\b'
+
+
+def _tiene_rango(sql: str, ref: str, solo_superior: bool = False) -> bool:
+    """Hay un predicado sargable (BETWEEN, =, IN o cotas inferior y superior; solo_superior: basta la superior)."""
+    if re.search(ref + r'\s*(?:BETWEEN\b|=|IN\s*\()', sql, re.IGNORECASE):
+        return True
+    superior = re.search(ref + r'\s*<(?!>)', sql)
+    return bool(superior and (solo_superior or re.search(ref + r'\s*>', sql)))
+
+
+def _envuelta(sql: str, ref: str) -> bool:
+    """La columna aparece dentro de una función que se compara (ej: DATE_TRUNC(col, MONTH) = ...)."""
+    patron = r'\w+\s*\(\s*' + ref + r'[^()]*\)\s*(?:=|!=|<|>|BETWEEN\b|IN\s*\()'
+    return bool(re.search(patron, sql, re.IGNORECASE))
+
+
+def pruning_violations(sql: str) -> list:
+    """
+    Problemas de partition pruning de una query.
+
+    Args:
+        sql: Query generada
+
+    Returns:
+        Lista de descripciones (vacía si todas las tablas particionadas se
+        leen con rangos sargables)
+    """
+    sql = normalize_sql(sql)
+    violaciones = []
+    for m in _RE_TABLA.finditer(sql):
+        tabla, alias = m.group(1).upper(), m.group(2)
+        if tabla not in PARTITION_COLUMNS:
+            continue
+        if alias and alias.upper() in _PALABRAS_SQL:
+            alias = None
+        etiqueta = f"{tabla} {alias}" if alias else tabla
+        particion = PARTITION_COLUMNS[tabla]
+        ref = _referencia(alias, particion)
+        if not _tiene_rango(sql, ref, tabla in PARTITION_UPPER_BOUND_ONLY):
+            violaciones.append(f"{etiqueta}: sin rango sargable sobre {particion}")
+        for columna in [particion] + CLUSTER_COLUMNS.get(tabla, []):
+            if _envuelta(sql, _referencia(alias, columna)):
+                violaciones.append(f"{etiqueta}: {columna} envuelta en una función en un filtro")
+    return list(dict.fromkeys(violaciones))
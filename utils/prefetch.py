@@ -0,0 +1,257 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+PREFETCH - Precarga especulativa de los reportes probables siguientes
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Después de un reporte (ej: MLA PDD Nov-Dic) el pedido siguiente
+             casi siempre es uno de estos:
+               - otra apertura de primer nivel (PROCESO, CDU, TIPIFICACION)
+               - el mismo commerce group en otro site grande (MLA, MLB, MLM)
+               - el mes siguiente (P1 = el P2 actual)
+
+             Con --prefetch, mientras el reporte espera el análisis de las
+             conversaciones (wait_for_analysis), las queries de drivers
+             totales, incoming total, serie semanal y cuadros por apertura de
+             esos reportes se ejecutan en segundo plano y quedan en la cache
+             local de queries (utils/query_cache.py). El tiempo ocioso de la
+             espera se convierte en cache caliente: el reporte siguiente las
+             lee de disco.
+
+             El SQL se arma con los mismos builders y argumentos que
+             ReportPipeline.schedule_queries (las keys de la cache tienen que
+             coincidir). La precarga usa pocos workers, respeta --budget-gb y
+             lo que no terminó al cerrar el reporte se cancela.
+
+Uso:
+  python generar_reporte_cr_universal_v6.3.6.py --site MLA --commerce-group PDD \\
+      --aperturas PROCESO --p1-start 2025-11-01 --p1-end 2025-11-30 \\
+      --p2-start 2025-12-01 --p2-end 2025-12-31 --prefetch
+
+  from utils.prefetch import Prefetcher, prefetch_jobs
+  prefetcher = Prefetcher(backend, query_cache)
+  prefetcher.start(prefetch_jobs(args, ['PROCESO']))
+  ...
+  prefetcher.stop()
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from config.drivers_mapping import get_driver_config
+from config.site_groups import is_site_group
+from utils.query_scheduler import QueryScheduler
+from utils.report_queries import (
+    FIELD_MAPPING, COMMERCE_GROUP_FILTERS, build_process_filter, build_incoming_total_query,
+    build_drivers_total_query, build_weekly_query, build_dimension_query,
+    build_fused_contacts_query, build_weekly_drivers_query
+)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Aperturas de primer nivel que se precargan si el reporte no las incluye
+PREFETCH_APERTURAS = ['PROCESO', 'CDU', 'TIPIFICACION']
+
+# Sites con más pedidos de reportes (mismo commerce group en otro site)
+PREFETCH_SITES = ['MLA', 'MLB', 'MLM']
+
+# Queries precargadas como máximo por reporte y workers del pool de precarga
+PREFETCH_MAX_QUERIES = 12
+PREFETCH_WORKERS = 2
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# REPORTES PROBABLES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _mes_siguiente(args, hoy: date = None):
+    """(inicio, fin) del mes posterior a P2, o None si P2 no es un mes calendario o el mes no cerró."""
+    hoy = hoy or date.today()
+    p2_start, p2_end = date.fromisoformat(args.p2_start), date.fromisoformat(args.p2_end)
+    if p2_start.day != 1 or (p2_end + timedelta(days=1)).day != 1:
+        return None
+    inicio = p2_end + timedelta(days=1)
+    fin = (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    if fin >= hoy:
+        return None
+    return inicio.isoformat(), fin.isoformat()
+
+
+def likely_next_requests(args, aperturas: list, hoy: date = None) -> list:
+    """
+    Reportes que probablemente se pidan después de este, por prioridad.
+
+    Args:
+        args: Argumentos del reporte actual (ver report_args)
+        aperturas: Aperturas del reporte actual (normalizadas)
+        hoy: Fecha de referencia para el mes siguiente (default: hoy)
+
+    Returns:
+        [(motivo, args del reporte, aperturas, solo_aperturas)]; solo_aperturas
+        indica que del reporte solo cambian esas aperturas (el resto ya está en cache)
+    """
+    candidatos = []
+    for apertura in PREFETCH_APERTURAS:
+        if apertura not in aperturas:
+            candidatos.append((f'apertura {apertura}', args, aperturas + [apertura], [apertura]))
+
+    mes = _mes_siguiente(args, hoy)
+    if mes is not None:
+        siguiente = argparse.Namespace(**dict(vars(args), p1_start=args.p2_start, p1_end=args.p2_end,
+                                              p2_start=mes[0], p2_end=mes[1]))
+        candidatos.append((f'mes {mes[0][:7]}', siguiente, aperturas, None))
+
+    if not is_site_group(args.site):
+        for site in PREFETCH_SITES:
+            if site != args.site:
+                otro = argparse.Namespace(**dict(vars(args), site=site))
+                candidatos.append((f'site {site}', otro, aperturas, None))
+    return candidatos
+
+
+def report_metric_jobs(args, aperturas: list, solo_aperturas: list = None) -> list:
+    """
+    Queries de PASO 1-3 de un reporte, con el mismo SQL que ReportPipeline.schedule_queries.
+
+    Args:
+        args: Argumentos del reporte
+        aperturas: Aperturas del reporte
+        solo_aperturas: Si se indica, solo los cuadros de esas aperturas (modo una query por paso)
+
+    Returns:
+        [(nombre del job, SQL)]
+    """
+    commerce_filter = COMMERCE_GROUP_FILTERS[args.commerce_group]
+    process_filter = build_process_filter(args.process_name)
+    driver_config = get_driver_config(args.commerce_group)
+    modo_proceso_unico = (args.process_name is not None and 'NONE' in aperturas)
+    campos_aperturas = {} if modo_proceso_unico else {a: FIELD_MAPPING[a] for a in aperturas if a in FIELD_MAPPING}
+    periodos = (args.p1_start, args.p1_end, args.p2_start, args.p2_end)
+
+    if args.fused_scan:
+        return [
+            ('contactos_fusionados', build_fused_contacts_query(
+                args.site, args.commerce_group, commerce_filter, campos_aperturas, *periodos, process_filter
+            )),
+            ('drivers_semanales', build_weekly_drivers_query(args.site, args.p2_end, driver_config['filter_by_site'])),
+            ('drivers_total', build_drivers_total_query(args.site, driver_config, *periodos,
+                                                        args.filter_driver_by_site)),
+        ]
+
+    jobs = []
+    if solo_aperturas is None:
+        jobs += [
+            ('drivers_total', build_drivers_total_query(args.site, driver_config, *periodos,
+                                                        args.filter_driver_by_site)),
+            ('incoming_total', build_incoming_total_query(
+                args.site, args.commerce_group, commerce_filter, *periodos, process_filter
+            )),
+            ('weekly', build_weekly_query(
+                args.site, args.commerce_group, commerce_filter, args.p2_end,
+                driver_config['filter_by_site'], process_filter
+            )),
+        ]
+    for apertura, campo_bq in campos_aperturas.items():
+        if solo_aperturas is None or apertura in solo_aperturas:
+            jobs.append((f'dimension_{apertura}', build_dimension_query(
+                args.site, args.commerce_group, commerce_filter, campo_bq, *periodos, process_filter
+            )))
+    return jobs
+
+
+def prefetch_jobs(args, aperturas: list, hoy: date = None) -> list:
+    """
+    Queries a precargar para los reportes probables siguientes (ver likely_next_requests).
+
+    Returns:
+        [(nombre, SQL)] por prioridad, sin SQL repetidos (ej: drivers globales
+        de Shipping, iguales para todos los sites)
+    """
+    jobs, vistos = [], set()
+    for motivo, args_siguiente, aperturas_siguiente, solo_aperturas in likely_next_requests(args, aperturas, hoy):
+        for nombre, sql in report_metric_jobs(args_siguiente, aperturas_siguiente, solo_aperturas):
+            if sql not in vistos:
+                vistos.add(sql)
+                jobs.append((f'{motivo}: {nombre}', sql))
+    return jobs
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PRECARGA
+# ══════════════════════════════════════════════════════════════════════════════
+
+class Prefetcher:
+    """
+    Ejecuta en segundo plano queries que solo se guardan en la QueryCache.
+
+    Args:
+        backend: QueryBackend (el mismo del reporte)
+        cache: QueryCache donde quedan los resultados
+        budget: ByteBudget opcional (la precarga consume el presupuesto de la corrida)
+        max_workers: Queries de precarga simultáneas
+        max_queries: Queries a precargar como máximo (las primeras por prioridad)
+    """
+
+    def __init__(self, backend, cache, budget=None, max_workers: int = PREFETCH_WORKERS,
+                 max_queries: int = PREFETCH_MAX_QUERIES):
+        self.backend = backend
+        self.cache = cache
+        self.budget = budget
+        self.max_workers = max_workers
+        self.max_queries = max_queries
+        self.scheduler = None
+        self.nombres = []
+
+    def start(self, jobs: list) -> int:
+        """
+        Envía las queries que no están en la cache (no bloquea).
+
+        Args:
+            jobs: [(nombre, SQL)] por prioridad (ver prefetch_jobs)
+
+        Returns:
+            Cantidad de queries enviadas
+        """
+        pendientes = [(nombre, sql) for nombre, sql in jobs if not self.cache.contains(sql)]
+        enviar = pendientes[:self.max_queries]
+        excedentes = len(pendientes) - len(enviar)
+        print(f"[PREFETCH] Precargando {len(enviar)} queries de reportes probables en segundo plano "
+              f"({len(jobs) - len(pendientes)} ya en cache{f', {excedentes} fuera del máximo' if excedentes else ''})")
+        if not enviar:
+            return 0
+
+        self.scheduler = QueryScheduler(self.backend, max_workers=self.max_workers, cache=self.cache,
+                                        budget=self.budget)
+        for nombre, sql in enviar:
+            self.scheduler.submit(nombre, sql)
+            self.nombres.append(nombre)
+        return len(enviar)
+
+    def summary(self) -> dict:
+        """Queries precargadas, fallidas (ej: presupuesto) y pendientes hasta el momento."""
+        resumen = {'precargadas': 0, 'fallidas': 0, 'pendientes': 0}
+        for nombre in self.nombres:
+            info = self.scheduler.job_info(nombre)
+            if not info:
+                resumen['pendientes'] += 1
+            elif 'error' in info:
+                resumen['fallidas'] += 1
+            else:
+                resumen['precargadas'] += 1
+        return resumen
+
+    def stop(self) -> dict:
+        """Cancela las queries que no empezaron (las que están en curso terminan y se guardan) y resume."""
+        if self.scheduler is None:
+            return {'precargadas': 0, 'fallidas': 0, 'pendientes': 0}
+        self.scheduler.shutdown(cancel_pending=True)
+        resumen = self.summary()
+        detalle = ''.join(f", {resumen[clave]} {texto}" for clave, texto in
+                          (('fallidas', 'fallidas'), ('pendientes', 'canceladas o en curso')) if resumen[clave])
+        print(f"[PREFETCH] {resumen['precargadas']} queries precargadas en la cache local{detalle}")
+        return resumen
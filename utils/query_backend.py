@@ -0,0 +1,456 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+QUERY BACKEND - Ejecución de queries en BigQuery o en DuckDB local
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Abstracción del motor que ejecuta el SQL generado por los
+             scripts. Todos los backends exponen la misma interfaz que el
+             cliente de BigQuery:
+
+               job = backend.query(sql, job_config=None)
+               df = job.result(timeout=...).to_dataframe()
+
+             y dry_run(sql) para estimar los bytes que procesaría la query
+             sin ejecutarla (ver utils.query_planner).
+
+Backends:
+  - 'bigquery': google.cloud.bigquery.Client (producción)
+  - 'duckdb':   DuckDB sobre fixtures Parquet locales (una tabla por archivo,
+                ej: fixtures/BT_CX_CONTACTS.parquet). Permite correr, perfilar
+                y hacer pruebas de carga del pipeline completo sin red ni
+                credenciales. El SQL de BigQuery se traduce con to_duckdb_sql().
+
+Descarga Arrow (arrow=True):
+  Los resultados grandes (muestreo de conversaciones, incoming de eventos) se
+  descargan como pyarrow.Table (en BigQuery vía Storage Read API si está
+  instalado google-cloud-bigquery-storage) y se convierten con
+  arrow_to_dataframe(): columnas de dimensión como categóricas y texto como
+  strings Arrow (pd.StringDtype('pyarrow')), sin copiar los buffers.
+
+Fixtures: scripts/generar_fixtures_locales.py genera datos sintéticos con el
+esquema de BT_CX_CONTACTS, BT_ORD_ORDERS, BT_CX_DRIVERS_CR,
+BT_CX_STUDIO_SAMPLE, DM_CX_POST_PURCHASE, LK_TIM_HOLIDAYS y
+LK_MKP_PROMOTIONS_EVENT.
+
+Uso:
+  from utils.query_backend import add_backend_arguments, backend_from_args
+
+  add_backend_arguments(parser)          # --backend, --fixtures-dir
+  args = parser.parse_args()
+  backend = backend_from_args(args)
+  df = backend.to_dataframe(sql)
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+from utils.canonical_sql import param_type
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+BACKENDS = ('bigquery', 'duckdb')
+
+# Defaults sobrescribibles por variable de entorno (útil para correr todos los
+# scripts contra fixtures sin pasar flags)
+DEFAULT_BACKEND = os.environ.get('CR_QUERY_BACKEND', 'bigquery')
+DEFAULT_FIXTURES_DIR = os.environ.get('CR_FIXTURES_DIR', 'fixtures')
+
+_RE_TABLA = re.compile(r'`[\w-]+\.[\w-]+\.(\w+)`')
+
+# Partes de fecha de BigQuery → DuckDB
+_PARTES_FECHA = {
+    'DAY': 'day',
+    'WEEK': 'week',
+    'WEEK(MONDAY)': 'week',
+    'ISOWEEK': 'week',
+    'MONTH': 'month',
+    'QUARTER': 'quarter',
+    'YEAR': 'year',
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TRADUCCIÓN DE DIALECTO (BigQuery → DuckDB)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _split_args(texto: str) -> list:
+    """Separa los argumentos de una llamada respetando paréntesis y strings."""
+    args, actual, nivel, comilla = [], '', 0, None
+    for ch in texto:
+        if comilla:
+            actual += ch
+            if ch == comilla:
+                comilla = None
+            continue
+        if ch in ("'", '"'):
+            comilla = ch
+        elif ch == '(':
+            nivel += 1
+        elif ch == ')':
+            nivel -= 1
+        if ch == ',' and nivel == 0:
+            args.append(actual.strip())
+            actual = ''
+        else:
+            actual += ch
+    if actual.strip():
+        args.append(actual.strip())
+    return args
+
+
+def _buscar_llamada(patron, sql: str, pos: int):
+    """Primera coincidencia de patron desde pos que no esté dentro de un string."""
+    comilla = None
+    for i in range(pos, len(sql)):
+        ch = sql[i]
+        if comilla:
+            if ch == comilla:
+                comilla = None
+        elif ch in ("'", '"'):
+            comilla = ch
+        else:
+            m = patron.match(sql, i)
+            if m:
+                return m
+    return None
+
+
+def rewrite_function(sql: str, nombre: str, reescribir) -> str:
+    """
+    Reemplaza cada llamada nombre(...) por reescribir(args).
+
+    Soporta llamadas anidadas (los argumentos se reescriben primero) y no
+    modifica el contenido de los literales de string.
+
+    Args:
+        sql: Query SQL
+        nombre: Nombre de la función (case-insensitive)
+        reescribir: callable(lista_de_args) -> SQL de reemplazo
+
+    Returns:
+        SQL reescrito
+    """
+    patron = re.compile(r'(?<![\w.])' + nombre + r'\s*\(', re.I)
+    partes, pos = [], 0
+    while True:
+        m = _buscar_llamada(patron, sql, pos)
+        if not m:
+            partes.append(sql[pos:])
+            return ''.join(partes)
+        i = j = m.end()
+        nivel, comilla = 1, None
+        while j < len(sql) and nivel:
+            ch = sql[j]
+            if comilla:
+                if ch == comilla:
+                    comilla = None
+            elif ch in ("'", '"'):
+                comilla = ch
+            elif ch == '(':
+                nivel += 1
+            elif ch == ')':
+                nivel -= 1
+            j += 1
+        internos = rewrite_function(sql[i:j - 1], nombre, reescribir)
+        partes.append(sql[pos:m.start()])
+        partes.append(reescribir(_split_args(internos)))
+        pos = j
+
+
+def _date_trunc(args):
+    parte = _PARTES_FECHA[args[1].upper().replace(' ', '')]
+    return f"CAST(date_trunc('{parte}', CAST({args[0]} AS DATE)) AS DATE)"
+
+
+def _date_interval(operador):
+    def reescribir(args):
+        m = re.match(r'INTERVAL\s+(-?\d+)\s+(\w+)', args[1], re.I)
+        return f"CAST(CAST({args[0]} AS DATE) {operador} INTERVAL ({m.group(1)}) {m.group(2)} AS DATE)"
+    return reescribir
+
+
+def to_duckdb_sql(sql: str) -> str:
+    """
+    Traduce el SQL de BigQuery que generan los scripts al dialecto de DuckDB.
+
+    Cubre lo que usan las queries del repo:
+      - `proyecto.dataset.TABLA` → TABLA (vista sobre el fixture Parquet)
+      - DATE_TRUNC(x, MONTH | WEEK(MONDAY) | ...) → date_trunc('month', x)
+      - DATE_SUB / DATE_ADD(x, INTERVAL n UNIDAD) → x ∓ INTERVAL (n) UNIDAD
+      - DATE(x) → CAST(x AS DATE)
+      - JSON_VALUE(x, path) → json_extract_string(x, path)
+      - REGEXP_REPLACE(x, re, s) → reemplazo global (flag 'g')
+      - RAND() → random()
+      - FARM_FINGERPRINT(x) → hash(x) de 63 bits (mismo rango que el
+        FARM_FINGERPRINT & 0x7FFF... de los sketches HLL)
+      - literales raw r'...' → '...'
+      - DDL: se quitan CLUSTER BY y OPTIONS(...) de CREATE TABLE
+
+    Args:
+        sql: Query en dialecto BigQuery
+
+    Returns:
+        Query en dialecto DuckDB
+    """
+    sql = _RE_TABLA.sub(r'\1', sql)
+    sql = re.sub(r"(?<!\w)r'", "'", sql)
+    sql = re.sub(r'\bCLUSTER\s+BY\s+\w+(\s*,\s*\w+)*', '', sql, flags=re.I)
+    sql = rewrite_function(sql, 'OPTIONS', lambda a: '')
+    sql = rewrite_function(sql, 'DATE_TRUNC', _date_trunc)
+    sql = rewrite_function(sql, 'DATE_SUB', _date_interval('-'))
+    sql = rewrite_function(sql, 'DATE_ADD', _date_interval('+'))
+    sql = rewrite_function(sql, 'DATE', lambda a: f"CAST({a[0]} AS DATE)")
+    sql = rewrite_function(sql, 'JSON_VALUE', lambda a: f"json_extract_string({a[0]}, {a[1]})")
+    sql = rewrite_function(sql, 'REGEXP_REPLACE', lambda a: f"regexp_replace({', '.join(a)}, 'g')")
+    sql = rewrite_function(sql, 'RAND', lambda a: "random()")
+    sql = rewrite_function(sql, 'FARM_FINGERPRINT', lambda a: f"CAST(hash({a[0]}) >> 1 AS BIGINT)")
+    return sql
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BACKENDS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class QueryBackend:
+    """Interfaz común de los motores de ejecución de queries."""
+
+    name = None
+    # Dataset 'proyecto.dataset' para tablas de trabajo (ej: BASE_CONTACTS materializada)
+    scratch_dataset = None
+
+    def query(self, sql: str, job_config=None):
+        """Envía la query y retorna un job con result(timeout).to_dataframe()."""
+        raise NotImplementedError
+
+    def job_config(self, **kwargs):
+        """Configuración de job (QueryJobConfig en BigQuery)."""
+        return SimpleNamespace(**kwargs)
+
+    def dry_run(self, sql: str) -> int:
+        """Valida la query sin ejecutarla y retorna los bytes que procesaría."""
+        raise NotImplementedError
+
+    def fetch_arrow(self, rows):
+        """Descarga el resultado de un job terminado (job.result()) como pyarrow.Table."""
+        return rows.to_arrow()
+
+    def to_dataframe(self, sql: str, job_config=None, arrow: bool = False, categoricals=()):
+        """
+        Ejecuta la query y retorna el DataFrame (atajo).
+
+        Args:
+            sql: Query SQL
+            job_config: Configuración de job opcional
+            arrow: Descargar como Arrow y mapear dtypes (ver arrow_to_dataframe)
+            categoricals: Columnas a convertir en categóricas (solo con arrow=True)
+        """
+        rows = self.query(sql, job_config=job_config).result()
+        if not arrow:
+            return rows.to_dataframe()
+        return arrow_to_dataframe(self.fetch_arrow(rows), categoricals)
+
+
+class BigQueryBackend(QueryBackend):
+    """Backend de producción: google.cloud.bigquery.Client."""
+
+    name = 'bigquery'
+
+    def __init__(self, project: str = None):
+        """
+        Args:
+            project: Proyecto de facturación (default: el de las credenciales)
+        """
+        from google.cloud import bigquery
+        self._bigquery = bigquery
+        self.client = bigquery.Client(project=project) if project else bigquery.Client()
+        self._bqstorage_client = None
+        self._bqstorage_checked = False
+
+    def query(self, sql: str, job_config=None):
+        params = getattr(sql, 'params', None)
+        if params:
+            # CanonicalQuery: SQL parametrizado (mismo texto para el mismo pedido lógico).
+            # Los parámetros van en una copia: el job_config del caller se comparte entre jobs del scheduler
+            if job_config is None:
+                job_config = self._bigquery.QueryJobConfig()
+            else:
+                job_config = self._bigquery.QueryJobConfig.from_api_repr(job_config.to_api_repr())
+            job_config.query_parameters = self.query_parameters(params)
+            sql = sql.sql
+        return self.client.query(sql, job_config=job_config)
+
+    def query_parameters(self, params: dict) -> list:
+        """ScalarQueryParameter / ArrayQueryParameter de los parámetros de una CanonicalQuery."""
+        parametros = []
+        for nombre, valor in params.items():
+            tipo = param_type(valor)
+            if tipo.startswith('ARRAY<'):
+                parametros.append(self._bigquery.ArrayQueryParameter(nombre, tipo[6:-1], list(valor)))
+            else:
+                parametros.append(self._bigquery.ScalarQueryParameter(nombre, tipo, valor))
+        return parametros
+
+    def job_config(self, **kwargs):
+        return self._bigquery.QueryJobConfig(**kwargs)
+
+    def dry_run(self, sql: str) -> int:
+        config = self._bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+        return self.query(sql, job_config=config).total_bytes_processed or 0
+
+    @property
+    def bqstorage_client(self):
+        """Cliente de la Storage Read API compartido por todas las descargas (None si no está instalado)."""
+        if not self._bqstorage_checked:
+            self._bqstorage_checked = True
+            try:
+                from google.cloud import bigquery_storage
+                self._bqstorage_client = bigquery_storage.BigQueryReadClient(
+                    credentials=self.client._credentials
+                )
+            except ImportError:
+                print("[WARNING] google-cloud-bigquery-storage no instalado: descarga por REST")
+        return self._bqstorage_client
+
+    def fetch_arrow(self, rows):
+        return rows.to_arrow(bqstorage_client=self.bqstorage_client,
+                             create_bqstorage_client=False)
+
+
+class LocalQueryJob:
+    """Job ya ejecutado de un backend local (misma interfaz que QueryJob)."""
+
+    cache_hit = False
+
+    def __init__(self, cursor, total_bytes_processed: int = 0):
+        self._cursor = cursor
+        self.total_bytes_processed = total_bytes_processed
+
+    def result(self, timeout: float = None):
+        return self
+
+    def to_dataframe(self, **kwargs):
+        return self._cursor.df()
+
+    def to_arrow(self, **kwargs):
+        # duckdb >= 1.4 renombró fetch_arrow_table() a to_arrow_table()
+        fetch = getattr(self._cursor, 'to_arrow_table', None) or self._cursor.fetch_arrow_table
+        return fetch()
+
+    def cancel(self):
+        return False
+
+
+class DuckDBBackend(QueryBackend):
+    """
+    Backend local: DuckDB sobre fixtures Parquet.
+
+    Cada archivo {fixtures_dir}/{TABLA}.parquet se registra como vista TABLA.
+    Las queries se ejecutan en un cursor propio, por lo que el backend se
+    puede usar desde los workers del QueryScheduler.
+    """
+
+    name = 'duckdb'
+    # Las tablas de trabajo viven en la base en memoria (el dataset se ignora)
+    scratch_dataset = 'local.scratch'
+
+    def __init__(self, fixtures_dir: str = DEFAULT_FIXTURES_DIR):
+        """
+        Args:
+            fixtures_dir: Directorio con un Parquet por tabla
+        """
+        import duckdb
+
+        self.fixtures_dir = Path(fixtures_dir)
+        self.tablas = {p.stem: p for p in sorted(self.fixtures_dir.glob('*.parquet'))}
+        if not self.tablas:
+            raise FileNotFoundError(
+                f"No hay fixtures Parquet en {self.fixtures_dir}. "
+                f"Generarlos con: python scripts/generar_fixtures_locales.py --output-dir {self.fixtures_dir}"
+            )
+        self.con = duckdb.connect()
+        for tabla, path in self.tablas.items():
+            ruta = str(path.resolve()).replace("'", "''")
+            self.con.execute(f"CREATE VIEW {tabla} AS SELECT * FROM read_parquet('{ruta}')")
+
+    def _bytes_leidos(self, sql: str) -> int:
+        """Bytes "procesados": tamaño de los fixtures que lee la query."""
+        return sum(self.tablas[t].stat().st_size
+                   for t in set(_RE_TABLA.findall(sql)) if t in self.tablas)
+
+    def query(self, sql: str, job_config=None):
+        cursor = self.con.cursor().execute(to_duckdb_sql(sql))
+        return LocalQueryJob(cursor, total_bytes_processed=self._bytes_leidos(sql))
+
+    def dry_run(self, sql: str) -> int:
+        # EXPLAIN valida el SQL traducido y las tablas sin leer datos
+        self.con.cursor().execute(f"EXPLAIN {to_duckdb_sql(sql)}")
+        return self._bytes_leidos(sql)
+
+
+def arrow_to_dataframe(tabla, categoricals=()):
+    """
+    Convierte una pyarrow.Table en DataFrame con mapeo explícito de dtypes.
+
+    - Columnas en categoricals → pd.Categorical (dictionary encoding en Arrow)
+    - Resto de columnas de texto → pd.StringDtype('pyarrow'), que referencia
+      los buffers Arrow sin copiarlos a objetos Python
+
+    Args:
+        tabla: pyarrow.Table
+        categoricals: Columnas de dimensión (baja cardinalidad)
+
+    Returns:
+        DataFrame
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    for columna in categoricals:
+        if columna in tabla.column_names and not pa.types.is_dictionary(tabla.schema.field(columna).type):
+            i = tabla.column_names.index(columna)
+            tabla = tabla.set_column(i, columna, tabla.column(i).dictionary_encode())
+
+    texto = pd.StringDtype('pyarrow')
+    tipos = {pa.string(): texto, pa.large_string(): texto}
+    return tabla.to_pandas(types_mapper=tipos.get)
+
+
+def get_backend(nombre: str = DEFAULT_BACKEND, fixtures_dir: str = None, project: str = None) -> QueryBackend:
+    """
+    Crea el backend de ejecución.
+
+    Args:
+        nombre: 'bigquery' o 'duckdb'
+        fixtures_dir: Directorio de fixtures (solo duckdb)
+        project: Proyecto de BigQuery (solo bigquery)
+
+    Returns:
+        QueryBackend
+    """
+    if nombre == 'bigquery':
+        return BigQueryBackend(project=project)
+    if nombre == 'duckdb':
+        return DuckDBBackend(fixtures_dir or DEFAULT_FIXTURES_DIR)
+    raise ValueError(f"Backend desconocido: {nombre} (opciones: {', '.join(BACKENDS)})")
+
+
+def add_backend_arguments(parser):
+    """Agrega --backend y --fixtures-dir a un ArgumentParser."""
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help=f'Motor de ejecución de queries (default: {DEFAULT_BACKEND}). '
+                             f'duckdb usa fixtures Parquet locales, sin red ni credenciales')
+    parser.add_argument('--fixtures-dir', default=DEFAULT_FIXTURES_DIR,
+                        help=f'Directorio de fixtures Parquet para --backend duckdb (default: {DEFAULT_FIXTURES_DIR})')
+
+
+def backend_from_args(args, project: str = None) -> QueryBackend:
+    """Crea el backend indicado por los argumentos de add_backend_arguments()."""
+    return get_backend(args.backend, fixtures_dir=args.fixtures_dir, project=project)
@@ -0,0 +1,354 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+QUERY CACHE - Cache en disco de resultados de queries (Parquet)
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Guarda el resultado de cada query en un archivo Parquet cuyo
+             nombre es el hash del SQL normalizado (content-addressed).
+             Re-ejecutar el reporte con el mismo site / commerce group /
+             períodos no vuelve a pagar las mismas queries.
+
+Vigencia (TTL):
+  - Por tabla: cada tabla referenciada tiene un TTL (TTL_POR_TABLA); la
+    entrada vence con el menor TTL de las tablas que lee la query.
+  - Períodos cerrados: si todas las fechas de la query son días que las
+    tablas ya no completan (hasta hoy - DIAS_ABIERTOS - 1, ver
+    utils/local_store.py), los datos no cambian y se usa TTL_PERIODO_CERRADO.
+
+Tamaño: al superar max_bytes se eliminan las entradas usadas hace más
+tiempo (LRU). El último acceso es el mtime del archivo Parquet. El tamaño
+total se lleva en memoria: el directorio se recorre una vez por instancia
+y de nuevo solo cuando se supera el límite.
+
+Estructura:
+  {cache_dir}/{key[:2]}/{key}.parquet   → resultado
+  {cache_dir}/{key[:2]}/{key}.json      → metadata (tablas, creado, ttl)
+
+Uso:
+  from utils.query_cache import QueryCache
+
+  cache = QueryCache('.cache/queries', max_bytes=5 * 1024**3)
+  df = cache.get(sql)
+  if df is None:
+      df = client.query(sql).to_dataframe()
+      cache.put(sql, df)
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from utils.local_store import ultimo_cerrado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+HORA = 3600
+DIA = 24 * HORA
+
+# TTL por tabla (segundos) para queries que tocan el mes en curso
+TTL_POR_TABLA = {
+    'BT_CX_CONTACTS': 12 * HORA,
+    'BT_ORD_ORDERS': 12 * HORA,
+    'BT_CX_DRIVERS_CR': DIA,
+    'BT_CX_STUDIO_SAMPLE': 12 * HORA,
+    'DM_CX_POST_PURCHASE': 12 * HORA,
+    'LK_MKP_PROMOTIONS_EVENT': DIA,
+    'LK_TIM_HOLIDAYS': 30 * DIA,
+}
+TTL_DEFAULT = 12 * HORA
+
+# Períodos cerrados (todas las fechas en días que las tablas ya no completan)
+TTL_PERIODO_CERRADO = 30 * DIA
+
+DEFAULT_CACHE_DIR = '.cache/queries'
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+_RE_TABLA = re.compile(r'`[\w-]+\.[\w-]+\.(\w+)`')
+_RE_FECHA = re.compile(r"'(\d{4}-\d{2}-\d{2})'")
+_RE_DATE_ADD = re.compile(r"DATE_ADD\(\s*'(\d{4}-\d{2}-\d{2})'\s*,\s*INTERVAL\s+(\d+)\s+(DAY|WEEK|MONTH|YEAR)\s*\)", re.I)
+_DIAS_UNIDAD = {'DAY': 1, 'WEEK': 7, 'MONTH': 31, 'YEAR': 366}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FUNCIONES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normaliza el SQL para que diferencias de formato no cambien la key.
+
+    Elimina comentarios '--' y colapsa espacios fuera de literales de string.
+    Los literales se preservan tal cual.
+
+    Args:
+        sql: Query SQL
+
+    Returns:
+        SQL normalizado
+    """
+    partes = []
+    i, n = 0, len(sql)
+    espacio = False
+    while i < n:
+        ch = sql[i]
+        if ch in ("'", '"'):
+            j = i + 1
+            while j < n and sql[j] != ch:
+                j += 2 if sql[j] == '\\' else 1
+            if espacio and partes:
+                partes.append(' ')
+            espacio = False
+            partes.append(sql[i:j + 1])
+            i = j + 1
+        elif ch == '-' and sql.startswith('--', i):
+            fin = sql.find('\n', i)
+            i = n if fin == -1 else fin
+            espacio = True
+        elif ch.isspace():
+            espacio = True
+            i += 1
+        else:
+            if espacio and partes:
+                partes.append(' ')
+            espacio = False
+            partes.append(ch)
+            i += 1
+    return ''.join(partes)
+
+
+def cache_key(sql: str, namespace: str = '') -> str:
+    """
+    Key content-addressed de una query (sha256 del SQL normalizado).
+
+    Args:
+        sql: Query SQL
+        namespace: Prefijo opcional (ej: backend) para separar resultados
+
+    Returns:
+        Hash hexadecimal
+    """
+    return hashlib.sha256(f"{namespace}\n{normalize_sql(sql)}".encode('utf-8')).hexdigest()
+
+
+def tablas_referenciadas(sql: str) -> list:
+    """Tablas `proyecto.dataset.TABLA` referenciadas en la query."""
+    return sorted(set(_RE_TABLA.findall(sql)))
+
+
+def fecha_maxima(sql: str):
+    """
+    Fecha más reciente que puede leer la query según sus literales.
+
+    Considera DATE_ADD('fecha', INTERVAL n UNIDAD) como fecha + n unidades.
+
+    Returns:
+        date o None si la query no tiene fechas literales
+    """
+    fechas = [date.fromisoformat(f) for f in _RE_FECHA.findall(sql)]
+    for f, cantidad, unidad in _RE_DATE_ADD.findall(sql):
+        fechas.append(date.fromordinal(date.fromisoformat(f).toordinal()
+                                       + int(cantidad) * _DIAS_UNIDAD[unidad.upper()]))
+    return max(fechas) if fechas else None
+
+
+def ttl_for(sql: str, ttl_por_tabla: dict = None, hoy: date = None) -> int:
+    """
+    TTL en segundos de una query.
+
+    Args:
+        sql: Query SQL
+        ttl_por_tabla: Override de TTL_POR_TABLA
+        hoy: Fecha de referencia (default: hoy)
+
+    Returns:
+        Segundos de vigencia de la entrada
+    """
+    max_fecha = fecha_maxima(sql)
+    if max_fecha is not None and 'CURRENT_DATE' not in sql.upper() \
+            and max_fecha <= ultimo_cerrado(hoy):
+        return TTL_PERIODO_CERRADO
+
+    ttls = ttl_por_tabla or TTL_POR_TABLA
+    tablas = tablas_referenciadas(sql)
+    return min((ttls.get(t, TTL_DEFAULT) for t in tablas), default=TTL_DEFAULT)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class QueryCache:
+    """
+    Cache en disco de resultados de queries con TTL por tabla y LRU por tamaño.
+
+    Thread-safe: el scheduler de queries la usa desde varios workers.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_por_tabla: dict = None, refresh: bool = False, namespace: str = ''):
+        """
+        Args:
+            cache_dir: Directorio de la cache
+            max_bytes: Tamaño máximo total (LRU al superarlo)
+            ttl_por_tabla: Override de TTL_POR_TABLA
+            refresh: Ignorar entradas existentes (se re-ejecuta y se sobrescribe)
+            namespace: Separador de resultados (ej: backend de ejecución)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl_por_tabla = ttl_por_tabla
+        self.refresh = refresh
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None   # tamaño total de los resultados (None: directorio sin recorrer)
+        self._lock = threading.Lock()
+
+    def _paths(self, key: str):
+        base = self.cache_dir / key[:2]
+        return base / f"{key}.parquet", base / f"{key}.json"
+
+    def key(self, sql: str) -> str:
+        """Key de la query en esta cache."""
+        return cache_key(sql, self.namespace)
+
+    def contains(self, sql: str) -> bool:
+        """Indica si hay una entrada vigente para la query (sin leerla)."""
+        if self.refresh:
+            return False
+        return self._vigente(self.key(sql))
+
+    def _vigente(self, key: str) -> bool:
+        path_parquet, path_meta = self._paths(key)
+        if not path_parquet.exists() or not path_meta.exists():
+            return False
+        try:
+            meta = json.loads(path_meta.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        return time.time() - meta['creado'] <= meta['ttl']
+
+    def get(self, sql: str):
+        """
+        Retorna el DataFrame cacheado o None (no existe, vencido o refresh).
+
+        Args:
+            sql: Query SQL
+
+        Returns:
+            DataFrame o None
+        """
+        import pandas as pd
+
+        if self.refresh:
+            self.misses += 1
+            return None
+        key = self.key(sql)
+        path_parquet, _ = self._paths(key)
+        with self._lock:
+            if not self._vigente(key):
+                self.misses += 1
+                return None
+            try:
+                df = pd.read_parquet(path_parquet)
+                os.utime(path_parquet)  # último acceso (LRU)
+            except Exception as e:
+                print(f"[CACHE] Entrada ilegible {key[:12]}: {e}")
+                self.misses += 1
+                return None
+            self.hits += 1
+            return df
+
+    def put(self, sql: str, df):
+        """
+        Guarda el resultado de la query y aplica la evicción por tamaño.
+
+        Args:
+            sql: Query SQL
+            df: Resultado de la query
+        """
+        key = self.key(sql)
+        path_parquet, path_meta = self._paths(key)
+        meta = {
+            'creado': time.time(),
+            'ttl': ttl_for(sql, self.ttl_por_tabla),
+            'tablas': tablas_referenciadas(sql),
+            'filas': len(df),
+            'sql': normalize_sql(sql)[:500],
+        }
+        with self._lock:
+            path_parquet.parent.mkdir(parents=True, exist_ok=True)
+            anterior = path_parquet.stat().st_size if path_parquet.exists() else 0
+            tmp = path_parquet.with_suffix(f'.tmp{threading.get_ident()}')
+            try:
+                df.to_parquet(tmp, index=False)
+                os.replace(tmp, path_parquet)
+                path_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+            except Exception as e:
+                # Tipos no serializables a Parquet: se sigue sin cache para esta query
+                print(f"[CACHE] No se pudo guardar {key[:12]}: {e}")
+                tmp.unlink(missing_ok=True)
+                return
+            if self._bytes is None:
+                self._bytes = self.size_bytes()
+            else:
+                self._bytes += path_parquet.stat().st_size - anterior
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Elimina entradas vencidas y luego las menos usadas hasta quedar bajo max_bytes.
+
+        Recorre el directorio completo: recalcula el tamaño total (incluye lo
+        que escribieron otros procesos que comparten la cache).
+        """
+        entradas = []
+        total = 0
+        for path_parquet in self.cache_dir.glob('*/*.parquet'):
+            key = path_parquet.stem
+            try:
+                stat = path_parquet.stat()
+            except OSError:
+                continue
+            if not self._vigente(key):
+                self._remove(key)
+                continue
+            entradas.append((stat.st_mtime, stat.st_size, key))
+            total += stat.st_size
+
+        for _, size, key in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+        self._bytes = total
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        """Elimina todas las entradas de la cache."""
+        with self._lock:
+            for path_parquet in self.cache_dir.glob('*/*.parquet'):
+                self._remove(path_parquet.stem)
+            self._bytes = 0
+
+    def size_bytes(self) -> int:
+        """Tamaño total ocupado por los resultados cacheados."""
+        return sum(p.stat().st_size for p in self.cache_dir.glob('*/*.parquet'))
@@ -0,0 +1,218 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+QUERY PLANNER - Estimación de bytes (dry-run) y presupuesto por corrida
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Estima con dry-run los bytes que procesaría cada query de una
+             corrida, agrupados por etapa, y controla un presupuesto de bytes
+             por corrida para no exceder las cuotas de slots y facturación
+             (corridas de site groups como HSP o ROLA).
+
+Componentes:
+  - QueryPlan: dry-run de cada query registrada (nombre, etapa, SQL). Marca
+    las que serviría la cache local (no se facturan) y las que no se pueden
+    estimar antes de correr (ej: dependen de una tabla que todavía no existe).
+  - ByteBudget: presupuesto de bytes de la corrida. El QueryScheduler lo
+    descuenta antes de enviar cada query que no sale de la cache y rechaza
+    con QueryBudgetError las que no entran.
+
+Uso:
+  from utils.query_planner import ByteBudget, QueryPlan
+
+  budget = ByteBudget(backend, max_bytes=2 * 1024**4)
+  plan = QueryPlan(backend, cache=query_cache, budget=budget)
+  plan.add('incoming_total', query_incoming_total, 'metricas')
+  plan.add('feriados', query_feriados, 'contexto')
+  print(plan.format())
+
+  scheduler = QueryScheduler(backend, cache=query_cache, budget=budget)
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+
+from utils.query_cache import cache_key
+from utils.query_scheduler import QueryJobError
+
+
+class QueryBudgetError(QueryJobError):
+    """La query excede el presupuesto de bytes de la corrida."""
+
+
+def format_bytes(n) -> str:
+    """Bytes en la unidad más legible (ej: '12.3 GB'). None → 'n/d'."""
+    if n is None:
+        return 'n/d'
+    for unidad in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unidad}" if unidad == 'B' else f"{n:.1f} {unidad}"
+        n /= 1024
+    return f"{n:.2f} TB"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PRESUPUESTO
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ByteBudget:
+    """
+    Presupuesto de bytes procesados de una corrida.
+
+    Las estimaciones (dry-run) se guardan por SQL normalizado: una query ya
+    estimada en el plan no se vuelve a estimar al ejecutarla.
+    """
+
+    def __init__(self, backend, max_bytes: int):
+        """
+        Args:
+            backend: Backend de queries con dry_run(sql) (utils.query_backend)
+            max_bytes: Bytes máximos a procesar en la corrida
+        """
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.usado = 0
+        self._estimados = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, sql: str) -> int:
+        """Bytes que procesaría la query (dry-run, una vez por SQL)."""
+        key = cache_key(sql)
+        if key not in self._estimados:
+            self._estimados[key] = self.backend.dry_run(sql)
+        return self._estimados[key]
+
+    def restante(self) -> int:
+        """Bytes disponibles."""
+        return self.max_bytes - self.usado
+
+    def charge(self, nombre: str, sql: str) -> int:
+        """
+        Descuenta la estimación de la query del presupuesto.
+
+        Args:
+            nombre: Nombre del job (para el mensaje de error)
+            sql: Query SQL
+
+        Returns:
+            Bytes descontados
+
+        Raises:
+            QueryBudgetError: Si la query no entra en lo que queda del presupuesto
+        """
+        estimado = self.estimate(sql)
+        with self._lock:
+            if estimado > self.restante():
+                raise QueryBudgetError(
+                    f"Job '{nombre}' excede el presupuesto: estima {format_bytes(estimado)}, "
+                    f"quedan {format_bytes(self.restante())} de {format_bytes(self.max_bytes)}"
+                )
+            self.usado += estimado
+        return estimado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PLAN
+# ══════════════════════════════════════════════════════════════════════════════
+
+class QueryPlan:
+    """Estimación por query y por etapa de los bytes de una corrida."""
+
+    def __init__(self, backend, cache=None, budget: ByteBudget = None):
+        """
+        Args:
+            backend: Backend de queries con dry_run(sql)
+            cache: QueryCache opcional (las queries cacheadas no se facturan)
+            budget: ByteBudget opcional (comparte las estimaciones con la ejecución)
+        """
+        self.backend = backend
+        self.cache = cache
+        self.budget = budget
+        self.items = []
+
+    def add(self, nombre: str, sql: str, etapa: str) -> dict:
+        """
+        Estima una query con dry-run y la registra en el plan.
+
+        Los errores del dry-run no interrumpen el plan: la query queda como
+        no estimable con el motivo.
+
+        Returns:
+            dict con nombre, etapa, bytes (None si no estimable), cache y error
+        """
+        item = {
+            'nombre': nombre,
+            'etapa': etapa,
+            'bytes': None,
+            'cache': self.cache is not None and self.cache.contains(sql),
+            'error': None,
+        }
+        try:
+            item['bytes'] = self.budget.estimate(sql) if self.budget else self.backend.dry_run(sql)
+        except Exception as e:
+            item['error'] = str(e).strip().splitlines()[0][:120] if str(e).strip() else type(e).__name__
+        self.items.append(item)
+        return item
+
+    def add_pending(self, nombre: str, etapa: str, motivo: str) -> dict:
+        """Registra una query que solo se puede estimar al ejecutarla (ej: depende de resultados)."""
+        item = {'nombre': nombre, 'etapa': etapa, 'bytes': None, 'cache': False, 'error': motivo}
+        self.items.append(item)
+        return item
+
+    def billed_bytes(self, etapas=None) -> int:
+        """Bytes estimados a facturar (sin las queries cacheadas), opcionalmente de algunas etapas."""
+        return sum(item['bytes'] or 0 for item in self.items
+                   if not item['cache'] and (etapas is None or item['etapa'] in etapas))
+
+    def total_bytes(self) -> int:
+        """Bytes estimados de todas las queries, incluidas las cacheadas."""
+        return sum(item['bytes'] or 0 for item in self.items)
+
+    def by_stage(self) -> dict:
+        """Resumen por etapa (en orden de registro): queries, cacheadas, bytes y bytes facturables."""
+        etapas = {}
+        for item in self.items:
+            resumen = etapas.setdefault(item['etapa'], {'queries': 0, 'cache': 0, 'bytes': 0, 'facturable': 0})
+            resumen['queries'] += 1
+            resumen['cache'] += int(item['cache'])
+            resumen['bytes'] += item['bytes'] or 0
+            if not item['cache']:
+                resumen['facturable'] += item['bytes'] or 0
+        return etapas
+
+    def format(self, etiquetas: dict = None) -> str:
+        """
+        Tabla de texto del plan: queries por etapa, subtotales y total.
+
+        Args:
+            etiquetas: Descripción de cada etapa (etapa → texto), en el orden a mostrar
+        """
+        etiquetas = etiquetas or {}
+        ancho = max([len(item['nombre']) for item in self.items] + [20])
+        etapas = self.by_stage()
+        # Primero las etapas en el orden de etiquetas (prioridad), después el resto
+        orden = [e for e in etiquetas if e in etapas] + [e for e in etapas if e not in etiquetas]
+        lineas = []
+        for etapa in orden:
+            resumen = etapas[etapa]
+            titulo = etiquetas.get(etapa, etapa)
+            lineas.append(f"  [{etapa}] {titulo}" if titulo != etapa else f"  [{etapa}]")
+            for item in (i for i in self.items if i['etapa'] == etapa):
+                if item['cache']:
+                    detalle = 'cache local (no se factura)'
+                elif item['bytes'] is None:
+                    detalle = f"no estimable: {item['error']}"
+                else:
+                    detalle = ''
+                lineas.append(f"    {item['nombre']:<{ancho}} {format_bytes(item['bytes']):>10}  {detalle}".rstrip())
+            lineas.append(f"    {'Subtotal':<{ancho}} {format_bytes(resumen['bytes']):>10}  "
+                          f"(facturable: {format_bytes(resumen['facturable'])})")
+        cacheadas = sum(1 for item in self.items if item['cache'])
+        lineas.append(f"  TOTAL: {format_bytes(self.total_bytes())} estimados | "
+                      f"facturable: {format_bytes(self.billed_bytes())} | "
+                      f"{cacheadas} de {len(self.items)} queries desde cache local")
+        if self.budget is not None:
+            lineas.append(f"  PRESUPUESTO: {format_bytes(self.budget.max_bytes)}")
+        return '\n'.join(lineas)
@@ -0,0 +1,301 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+QUERY SCHEDULER - Ejecución concurrente de queries de BigQuery
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Envía juntas las queries independientes del reporte y entrega
+             los resultados a medida que terminan.
+
+Cada job tiene:
+  - nombre: identificador único (ej: 'incoming_total', 'dimension_PROCESO')
+  - query: SQL (str) o función que recibe {dep: DataFrame} y retorna el SQL
+  - depends_on: jobs que deben terminar antes de enviar este
+  - timeout: segundos máximos de espera del resultado (se cancela el job)
+  - use_cache: False para jobs con efectos (ej: CREATE TABLE), que no se cachean
+  - arrow / categoricals: descarga Arrow con mapeo de dtypes para resultados
+    grandes (ver utils.query_backend.arrow_to_dataframe)
+
+Con una QueryCache, los jobs cuyo SQL ya está cacheado se resuelven desde
+disco sin enviar la query (job_info()['cache_hit'] == 'local').
+
+Con un ByteBudget (utils.query_planner), cada query que no sale de la cache
+se estima con dry-run antes de enviarla; si no entra en el presupuesto el job
+falla con QueryBudgetError sin ejecutarse. reject() registra de antemano un
+job que no se va a ejecutar (ej: etapa descartada por presupuesto) y
+provide() uno cuyo resultado ya está calculado (ej: lectura compartida de
+un batch de reportes).
+
+shutdown() cierra el scheduler: los jobs que todavía no empezaron (en cola o
+esperando dependencias) fallan con CancelledError y no se envía ninguno más.
+
+Uso:
+  from utils.query_scheduler import QueryScheduler
+
+  scheduler = QueryScheduler(client, max_workers=6, default_timeout=600)
+  scheduler.submit('incoming_total', query_incoming_total)
+  scheduler.submit('drivers_total', query_drivers_total)
+  scheduler.submit('detalle', lambda deps: build_query(deps['incoming_total']),
+                   depends_on=['incoming_total'])
+
+  df_inc = scheduler.result('incoming_total')   # bloquea hasta que termine
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from utils.query_backend import arrow_to_dataframe
+
+
+class QueryJobError(Exception):
+    """Error de un job del scheduler (timeout, dependencia fallida o nombre inválido)."""
+
+
+class QueryScheduler:
+    """
+    Ejecuta queries de BigQuery en paralelo respetando un grafo de dependencias.
+
+    Los jobs sin dependencias se envían apenas se registran; los demás se
+    envían cuando todas sus dependencias terminaron OK. Si una dependencia
+    falla, el job dependiente falla con QueryJobError sin ejecutarse.
+    """
+
+    def __init__(self, client, max_workers: int = 6, default_timeout: float = None, cache=None,
+                 budget=None):
+        """
+        Args:
+            client: Backend de queries (utils.query_backend) o google.cloud.bigquery.Client
+            max_workers: Queries simultáneas como máximo
+            default_timeout: Timeout por job en segundos (None = sin límite)
+            cache: QueryCache opcional para resultados en disco
+            budget: ByteBudget opcional (presupuesto de bytes de la corrida)
+        """
+        self.client = client
+        self.default_timeout = default_timeout
+        self.cache = cache
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                            thread_name_prefix='bq-job')
+        self._lock = threading.Lock()
+        self._futures = {}      # nombre → Future con el DataFrame
+        self._pending = {}      # nombre → (query, depends_on, opciones del job)
+        self._dispatched = {}   # nombre → Future del executor (enviado al pool)
+        self._info = {}         # nombre → estadísticas del job
+        self._closed = False
+
+    # ──────────────────────────────────────────────
+    # Registro de jobs
+    # ──────────────────────────────────────────────
+
+    def submit(self, nombre: str, query, depends_on: list = None, timeout: float = None,
+               job_config=None, use_cache: bool = True, arrow: bool = False,
+               categoricals=()) -> Future:
+        """
+        Registra un job. Si no tiene dependencias pendientes se envía de inmediato.
+
+        Args:
+            nombre: Identificador único del job
+            query: SQL o callable(resultados_deps: dict) -> SQL
+            depends_on: Nombres de jobs de los que depende
+            timeout: Timeout en segundos (default: default_timeout)
+            job_config: QueryJobConfig opcional
+            use_cache: Consultar / guardar el resultado en la cache local
+            arrow: Descargar como Arrow (Storage Read API en BigQuery) y mapear dtypes
+            categoricals: Columnas de dimensión a convertir en categóricas (con arrow=True)
+
+        Returns:
+            Future que se resuelve con el DataFrame del job.
+        """
+        depends_on = list(depends_on or [])
+        with self._lock:
+            if nombre in self._futures:
+                raise QueryJobError(f"Job '{nombre}' ya fue registrado")
+            faltantes = [d for d in depends_on if d not in self._futures]
+            if faltantes:
+                raise QueryJobError(f"Job '{nombre}' depende de jobs no registrados: {faltantes}")
+
+            future = Future()
+            self._futures[nombre] = future
+            self._pending[nombre] = (query, depends_on, {
+                'timeout': self.default_timeout if timeout is None else timeout,
+                'job_config': job_config,
+                'use_cache': use_cache,
+                'arrow': arrow,
+                'categoricals': list(categoricals),
+            })
+
+        if depends_on:
+            for dep in depends_on:
+                self._futures[dep].add_done_callback(lambda _f, n=nombre: self._try_dispatch(n))
+        else:
+            self._try_dispatch(nombre)
+        return future
+
+    def reject(self, nombre: str, error: Exception) -> Future:
+        """
+        Registra un job que no se ejecutará: result() relanza el error y los
+        jobs que dependen de él fallan sin ejecutarse.
+
+        Args:
+            nombre: Identificador único del job
+            error: Excepción a relanzar (ej: QueryBudgetError)
+        """
+        with self._lock:
+            if nombre in self._futures:
+                raise QueryJobError(f"Job '{nombre}' ya fue registrado")
+            future = Future()
+            future.set_exception(error)
+            self._futures[nombre] = future
+            self._info[nombre] = {'segundos': 0, 'error': str(error)}
+        return future
+
+    def provide(self, nombre: str, df) -> Future:
+        """
+        Registra un job cuyo resultado ya se calculó fuera del scheduler (ej:
+        una lectura compartida por varios reportes): result() lo retorna sin
+        ejecutar ninguna query.
+
+        Args:
+            nombre: Identificador único del job
+            df: DataFrame del job
+        """
+        with self._lock:
+            if nombre in self._futures:
+                raise QueryJobError(f"Job '{nombre}' ya fue registrado")
+            future = Future()
+            future.set_result(df)
+            self._futures[nombre] = future
+            self._info[nombre] = {'segundos': 0, 'bytes_processed': 0, 'cache_hit': 'compartido',
+                                  'filas': len(df)}
+        return future
+
+    def _try_dispatch(self, nombre: str):
+        """Envía el job si todas sus dependencias terminaron (una sola vez)."""
+        with self._lock:
+            if nombre not in self._pending:
+                return
+            query, depends_on, opciones = self._pending[nombre]
+            deps = [self._futures[d] for d in depends_on]
+            if not all(f.done() for f in deps):
+                return
+            del self._pending[nombre]
+
+        future = self._futures[nombre]
+        fallidas = [d for d, f in zip(depends_on, deps) if f.exception() is not None]
+        if fallidas:
+            future.set_exception(QueryJobError(f"Job '{nombre}' no se ejecutó: fallaron {fallidas}"))
+            return
+
+        resultados_deps = {d: f.result() for d, f in zip(depends_on, deps)}
+        with self._lock:
+            if not self._closed:
+                self._dispatched[nombre] = self._executor.submit(
+                    self._run, nombre, query, resultados_deps, opciones, future)
+                return
+        self._cancel(nombre)
+
+    def _cancel(self, nombre: str):
+        """Falla el Future de un job que no llegó a ejecutarse porque el scheduler se cerró (sin job_info)."""
+        self._futures[nombre].set_exception(
+            CancelledError(f"Job '{nombre}' cancelado: el scheduler se cerró antes de ejecutarlo"))
+
+    def _fetch(self, rows, opciones: dict):
+        """Descarga el resultado de un job terminado (REST o Arrow según opciones)."""
+        if not opciones['arrow']:
+            return rows.to_dataframe()
+        fetch_arrow = getattr(self.client, 'fetch_arrow', None)
+        tabla = fetch_arrow(rows) if fetch_arrow else rows.to_arrow()
+        return arrow_to_dataframe(tabla, opciones['categoricals'])
+
+    def _run(self, nombre, query, resultados_deps, opciones, future):
+        """Ejecuta un job en un worker y resuelve su Future."""
+        inicio = time.time()
+        timeout = opciones['timeout']
+        cache = self.cache if opciones['use_cache'] else None
+        try:
+            sql = query(resultados_deps) if callable(query) else query
+            if cache is not None:
+                df = cache.get(sql)
+                if df is not None:
+                    self._info[nombre] = {
+                        'segundos': round(time.time() - inicio, 2),
+                        'bytes_processed': 0,
+                        'cache_hit': 'local',
+                        'filas': len(df),
+                    }
+                    future.set_result(df)
+                    return
+            if self.budget is not None:
+                self.budget.charge(nombre, sql)
+            query_job = self.client.query(sql, job_config=opciones['job_config'])
+            try:
+                rows = query_job.result(timeout=timeout)
+            except FutureTimeoutError:
+                query_job.cancel()
+                raise QueryJobError(f"Job '{nombre}' superó el timeout de {timeout}s (cancelado)")
+            df = self._fetch(rows, opciones)
+            self._info[nombre] = {
+                'segundos': round(time.time() - inicio, 2),
+                'bytes_processed': getattr(query_job, 'total_bytes_processed', None),
+                'cache_hit': getattr(query_job, 'cache_hit', None),
+                'filas': len(df),
+            }
+            if cache is not None:
+                cache.put(sql, df)
+            future.set_result(df)
+        except BaseException as e:
+            self._info[nombre] = {'segundos': round(time.time() - inicio, 2), 'error': str(e)}
+            future.set_exception(e)
+
+    # ──────────────────────────────────────────────
+    # Consulta de resultados
+    # ──────────────────────────────────────────────
+
+    def has_job(self, nombre: str) -> bool:
+        """Indica si el job fue registrado."""
+        return nombre in self._futures
+
+    def result(self, nombre: str, timeout: float = None):
+        """
+        Espera y retorna el DataFrame del job. Relanza la excepción si falló.
+
+        Args:
+            nombre: Nombre del job
+            timeout: Espera máxima adicional en segundos (None = hasta que termine)
+        """
+        if nombre not in self._futures:
+            raise QueryJobError(f"Job '{nombre}' no fue registrado")
+        return self._futures[nombre].result(timeout=timeout)
+
+    def job_info(self, nombre: str) -> dict:
+        """Estadísticas del job (segundos, bytes procesados, cache hit, filas)."""
+        return self._info.get(nombre, {})
+
+    def run(self, nombre: str, query, timeout: float = None, job_config=None,
+            depends_on: list = None, **opciones):
+        """Registra un job y espera su resultado (atajo para queries puntuales)."""
+        self.submit(nombre, query, depends_on=depends_on, timeout=timeout,
+                    job_config=job_config, **opciones)
+        return self.result(nombre)
+
+    def shutdown(self, cancel_pending: bool = True):
+        """
+        Detiene el pool de workers (los jobs en curso terminan).
+
+        Los jobs que esperan dependencias ya no se envían: fallan con
+        CancelledError, igual que los encolados sin empezar si cancel_pending.
+        """
+        with self._lock:
+            self._closed = True
+            sin_enviar = list(self._pending)
+            self._pending.clear()
+            encolados = list(self._dispatched.items()) if cancel_pending else []
+        for nombre in sin_enviar:
+            self._cancel(nombre)
+        for nombre, tarea in encolados:
+            if tarea.cancel():
+                self._cancel(nombre)
+        self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
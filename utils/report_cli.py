@@ -0,0 +1,213 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+REPORT CLI - Parámetros del reporte sin dependencias pesadas
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Parser, conversión dict → argumentos y validación de los
+             parámetros del reporte. Este módulo no importa pandas, pyarrow
+             ni clientes de BigQuery (tampoco indirectamente): --help y los
+             errores de argumentos del generador responden en milisegundos,
+             antes de cargar utils.report_pipeline y de autenticar el backend.
+
+             utils.report_pipeline solo importa lo que usa (ReportError,
+             report_args, validate_args) y no re-exporta este módulo: el
+             parser y el resto de los helpers del CLI se importan de
+             utils.report_cli directamente.
+             tests/test_report_cli.py controla con -X importtime que este
+             módulo siga siendo liviano.
+
+Uso:
+  from utils.report_cli import build_parser, validate_args, ReportError
+
+  args = build_parser().parse_args(argv)
+  validate_args(args)          # ReportError: fechas, commerce group, flags
+  from utils.report_pipeline import ReportPipeline   # recién acá: pandas, backend
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import os
+from datetime import date
+
+from utils.query_backend import add_backend_arguments
+from utils.query_cache import DEFAULT_CACHE_DIR
+from utils.report_queries import COMMERCE_GROUP_FILTERS
+from utils.stage_cache import DEFAULT_STAGE_CACHE_DIR
+from utils.contacts_cube import DEFAULT_CUBE_DIR
+from utils.hll_sketches import DEFAULT_SKETCH_DIR
+from calculations.drivers_management import DEFAULT_STORE_DIR
+
+
+# Commerce groups de Shipping: driver GLOBAL salvo override explícito (--filter-driver-by-site)
+SHIPPING_COMMERCE_GROUPS = ['FBM_SELLERS', 'ME_PREDESPACHO', 'ME_DISTRIBUCION', 'ME_DRIVERS']
+
+
+class ReportError(Exception):
+    """Error que impide generar el reporte (parámetros, backend o presupuesto)."""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PARÁMETROS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def build_parser() -> argparse.ArgumentParser:
+    """Parser de argumentos del reporte (CLI del generador y parámetros de generate_report)."""
+    parser = argparse.ArgumentParser(description='Generador Universal de Reportes CR v6.1')
+
+    # Parámetros obligatorios
+    parser.add_argument('--site', required=True,
+                       help='Site a analizar (ej: MLA, MLB, MLC), grupo (ROLA, HSP) o lista separada por comas '
+                            '(MLA,MLB,MLM: un reporte por site con una sola lectura agrupada por site)')
+    parser.add_argument('--explode-group', action='store_true', default=False,
+                       help='Con --site de grupo (ROLA, HSP): un reporte por site del grupo en lugar de uno agregado')
+    parser.add_argument('--p1-start', required=True, help='Fecha inicio período 1 (YYYY-MM-DD)')
+    parser.add_argument('--p1-end', required=True, help='Fecha fin período 1 (YYYY-MM-DD)')
+    parser.add_argument('--p2-start', required=True, help='Fecha inicio período 2 (YYYY-MM-DD)')
+    parser.add_argument('--p2-end', required=True, help='Fecha fin período 2 (YYYY-MM-DD)')
+    parser.add_argument('--commerce-group', required=True, 
+                       help='Commerce group a analizar (PDD, PNR, PCF_COMPRADOR, PCF_VENDEDOR, ME_PREDESPACHO, etc.)')
+
+    # Parámetros opcionales
+    parser.add_argument('--aperturas', required=True,
+                       help='Dimensiones a analizar separadas por coma (ej: PROCESO,TIPIFICACION,ENVIRONMENT,CLA_REASON_DETAIL)')
+    parser.add_argument('--process-name', default=None,
+                       help='Filtro adicional por proceso específico (ej: "Despacho Ventas y Publicaciones")')
+    parser.add_argument('--output-dir', default='output', help='Directorio de salida')
+    parser.add_argument('--open-report', action='store_true', help='Abrir reporte al finalizar')
+    parser.add_argument('--skip-conversations', action='store_true', help='Saltar análisis de conversaciones')
+    parser.add_argument('--export-only', action='store_true',
+                       help='Solo exportar CSVs de conversaciones sin generar HTML (para análisis con Cursor AI)')
+    parser.add_argument('--preview', action='store_true', default=False,
+                       help='Con --open-report, abrir el HTML apenas están las métricas cuantitativas (cards, serie semanal, '
+                            'cuadros, eventos y feriados) en lugar de al final; se actualiza solo hasta el reporte completo')
+    parser.add_argument('--muestreo-dimension', default=None,
+                       help='Dimensión para muestreo de conversaciones (auto-detecta la más granular si no se especifica)')
+    parser.add_argument('--filter-driver-by-site', action='store_true', default=False,
+                       help='[OVERRIDE] Filtrar driver de Shipping por site (no estándar, requiere confirmación)')
+    parser.add_argument('--fused-scan', action='store_true', default=False,
+                       help='Calcular PASO 1-3 (total, semanal y aperturas) con una sola lectura de BT_CX_CONTACTS')
+    parser.add_argument('--contacts-cube', action='store_true', default=False,
+                       help='Calcular PASO 1-3 desde un cubo diario local de contactos en Parquet (site × commerce group '
+                            '× dimensión × día); solo se leen de BT_CX_CONTACTS los días que le faltan')
+    parser.add_argument('--cube-dir', default=DEFAULT_CUBE_DIR,
+                       help=f'Directorio del cubo diario de --contacts-cube (default: {DEFAULT_CUBE_DIR})')
+    parser.add_argument('--driver-store', action='store_true', default=False,
+                       help='Leer los drivers (órdenes y Shipping) de un store local compartido por todos los commerce '
+                            'groups y el cuadro cross-site; solo se leen de BigQuery los días / meses que le faltan')
+    parser.add_argument('--driver-store-dir', default=DEFAULT_STORE_DIR,
+                       help=f'Directorio del store de --driver-store (default: {DEFAULT_STORE_DIR})')
+    parser.add_argument('--distinct-sketches', action='store_true', default=False,
+                       help='Agregar casos y clientes únicos de cada período, estimados con sketches HyperLogLog '
+                            'diarios guardados en local; solo se leen de BT_CX_CONTACTS los días que les faltan')
+    parser.add_argument('--sketch-dir', default=DEFAULT_SKETCH_DIR,
+                       help=f'Directorio de los sketches de --distinct-sketches (default: {DEFAULT_SKETCH_DIR})')
+    parser.add_argument('--max-concurrent-queries', type=int, default=6,
+                       help='Queries de BigQuery simultáneas (default: 6; 1 = ejecución secuencial)')
+    add_backend_arguments(parser)
+    parser.add_argument('--query-timeout', type=int, default=600,
+                       help='Timeout por query en segundos (default: 600)')
+    parser.add_argument('--materialize-base', action='store_true', default=False,
+                       help='Materializar una vez los contactos filtrados del reporte (tabla BASE_CONTACTS) '
+                            'y leer PASO 1-3 y el muestreo desde esa tabla')
+    parser.add_argument('--scratch-dataset', default=os.environ.get('CR_SCRATCH_DATASET'),
+                       help='Dataset "proyecto.dataset" para la tabla BASE_CONTACTS de --materialize-base '
+                            '(default: $CR_SCRATCH_DATASET)')
+    parser.add_argument('--no-cache', action='store_true', default=False,
+                       help='No usar la cache local de resultados de queries ni la de etapas (ni leer ni guardar)')
+    parser.add_argument('--refresh', action='store_true', default=False,
+                       help='Ignorar la cache local y re-ejecutar todas las queries y etapas (actualiza la cache; con --contacts-cube / --driver-store / --distinct-sketches, relee sus días)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                       help=f'Directorio de la cache local de queries (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--stage-cache-dir', default=DEFAULT_STAGE_CACHE_DIR,
+                       help=f'Directorio de la cache de etapas memoizadas de PASO 1-3 (default: {DEFAULT_STAGE_CACHE_DIR})')
+    parser.add_argument('--prefetch', action='store_true', default=False,
+                       help='Mientras se espera el análisis de conversaciones, precargar en la cache local las queries '
+                            'de los reportes probables siguientes (otra apertura, otro site, mes siguiente)')
+    parser.add_argument('--cache-max-gb', type=float, default=5.0,
+                       help='Tamaño máximo de la cache local en GB; se eliminan las entradas menos usadas (default: 5)')
+    parser.add_argument('--plan', action='store_true', default=False,
+                       help='Estimar con dry-run los bytes de cada query y etapa (y cuáles salen de la cache) sin ejecutar nada')
+    parser.add_argument('--budget-gb', type=float,
+                       default=float(os.environ['CR_BUDGET_GB']) if os.environ.get('CR_BUDGET_GB') else None,
+                       help='Presupuesto de GB procesados por corrida: las etapas que no entran se degradan '
+                            'o se descartan, y la corrida se rechaza si no entran PASO 1-3 (default: $CR_BUDGET_GB)')
+    return parser
+
+
+def report_argv(params: dict) -> list:
+    """
+    Argumentos de línea de comandos equivalentes a un dict de parámetros.
+
+    Args:
+        params: Mismas claves que los flags ('p1_start' o 'p1-start'; True
+                activa un flag, None / False se omiten, listas se unen con comas)
+    """
+    argv = []
+    for clave, valor in params.items():
+        if valor is None or valor is False:
+            continue
+        flag = '--' + clave.replace('_', '-')
+        if valor is True:
+            argv.append(flag)
+        elif isinstance(valor, (list, tuple)):
+            argv += [flag, ','.join(str(v) for v in valor)]
+        else:
+            argv += [flag, str(valor)]
+    return argv
+
+
+def report_args(params) -> argparse.Namespace:
+    """
+    Argumentos del reporte con los defaults del CLI.
+
+    Args:
+        params: argparse.Namespace, lista de argumentos de línea de comandos
+                o dict de parámetros (ver report_argv)
+
+    Returns:
+        argparse.Namespace (copia: el pipeline lo modifica)
+    """
+    if isinstance(params, argparse.Namespace):
+        return argparse.Namespace(**vars(params))
+    if isinstance(params, (list, tuple)):
+        argv = [str(p) for p in params]
+    else:
+        argv = report_argv(params)
+    try:
+        return build_parser().parse_args(argv)
+    except SystemExit:
+        raise ReportError(f"Parámetros del reporte inválidos: {' '.join(argv)}")
+
+
+def validate_args(args: argparse.Namespace):
+    """
+    Validaciones de los parámetros que no necesitan datos ni backend.
+
+    Raises:
+        ReportError: Fechas inválidas o invertidas, commerce group sin filtro
+                     definido o flags incompatibles
+    """
+    try:
+        p1_start, p1_end, p2_start, p2_end = (
+            date.fromisoformat(f) for f in (args.p1_start, args.p1_end, args.p2_start, args.p2_end)
+        )
+    except ValueError as e:
+        raise ReportError(f"Fechas inválidas (formato YYYY-MM-DD): {e}")
+    if p1_start > p1_end or p2_start > p2_end:
+        raise ReportError("Fechas inválidas: el inicio de un período es posterior a su fin")
+
+    if args.commerce_group not in COMMERCE_GROUP_FILTERS:
+        raise ReportError(f"Commerce group '{args.commerce_group}' no tiene filtro definido "
+                          f"(disponibles: {', '.join(COMMERCE_GROUP_FILTERS)})")
+    if args.preview and args.export_only:
+        raise ReportError("--preview abre el HTML: no se combina con --export-only")
+    if args.contacts_cube and (args.fused_scan or args.materialize_base):
+        raise ReportError("--contacts-cube reemplaza la lectura de contactos de PASO 1-3: no se combina con "
+                          "--fused-scan ni con --materialize-base")
+    if args.distinct_sketches and args.process_name:
+        raise ReportError("--distinct-sketches cuenta todo el commerce group: no se combina con --process-name")
+    if args.prefetch and (args.no_cache or args.materialize_base):
+        raise ReportError("--prefetch precarga la cache local de queries: no se combina con --no-cache "
+                          "ni con --materialize-base")
@@ -0,0 +1,2528 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+REPORT HTML - PASO 5 del reporte CR universal
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Resumen ejecutivo (3 bullets), hallazgo principal, análisis
+             comparativo de conversaciones (generado con scripts/ si hay
+             JSONs de Claude) y HTML completo del reporte, a partir de lo
+             que calcularon las etapas de ReportPipeline.
+
+Uso:
+  from utils.report_html import generar_html_reporte
+
+  salida = generar_html_reporte(pipeline)   # ReportPipeline ya ejecutado hasta save_csvs
+  salida['html_path']
+
+  Con pipeline.secciones_pendientes (ReportPipeline.checkpoint_html) se
+  genera un reporte parcial: las secciones de etapas que todavía no
+  terminaron quedan como placeholders en el mismo archivo.
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import html
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from utils.report_pipeline import (
+    REPO_DIR, MAX_TOTAL_CONVERSATIONS, METRICAS_SKETCH, UMBRAL_MINIMO_CONVERSACIONES,
+    UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO
+)
+
+# Secciones que puede tener pendientes un reporte parcial (etapa de ReportPipeline → sección del HTML)
+SECCIONES_PARCIALES = {
+    'weekly': 'evolución semanal',
+    'dimension_tables': 'cuadros por dimensión',
+    'conversations': 'análisis de conversaciones',
+}
+
+
+def _seccion_pendiente(seccion: str, pendientes: list, error: str = None) -> str:
+    """Placeholder de una sección de un reporte parcial ('' si la sección ya está completa)."""
+    if seccion not in pendientes:
+        return ''
+    estado = 'no disponible: la corrida falló antes de esta etapa' if error else 'en curso, se completa automáticamente'
+    return f'\n            <p class="note">⏳ {SECCIONES_PARCIALES[seccion].capitalize()}: {estado}</p>'
+
+
+def generar_html_reporte(reporte) -> dict:
+    """
+    Genera y guarda el HTML del reporte.
+
+    Args:
+        reporte: ReportPipeline con las etapas de datos ya ejecutadas
+
+    Returns:
+        dict con html_path, html_content, bullet_1/2/3, hallazgo_explicaciones,
+        analisis_comp, orden_contribucion y analisis_comparativo_path
+    """
+    args = reporte.args
+    aperturas_list = reporte.aperturas_list
+    color_config = reporte.color_config
+    p1_start_dt, p2_start_dt = reporte.p1_start_dt, reporte.p2_start_dt
+    output_dir = reporte.output_dir
+    use_claude_analysis = reporte.use_claude_analysis
+
+    m = reporte.metrics_consolidadas
+    inc_p1_total, inc_p2_total, var_inc_total = m['inc_p1'], m['inc_p2'], m['var_inc']
+    drv_p1_total, drv_p2_total = m['drv_p1'], m['drv_p2']
+    cr_p1, cr_p2, var_cr = m['cr_p1'], m['cr_p2'], m['var_cr']
+    var_inc_pct, var_cr_pct = m['var_inc_pct'], m['var_cr_pct']
+    driver_config, driver_desc = reporte.driver_config, reporte.driver_desc
+
+    df_weekly = reporte.df_weekly
+    # Sin CR semanal (serie del driver alternativo incompleta): nota en lugar del gráfico
+    grafico_semanal = df_weekly is None or df_weekly.empty or df_weekly['CR'].notna().any()
+    nota_semanal = f'\n            <p class="note">ℹ️ {reporte.nota_semanal}</p>' if reporte.nota_semanal else ''
+    contenedor_semanal = ('\n            <div class="chart-container">\n                <canvas id="weeklyChart"></canvas>'
+                          '\n            </div>') if grafico_semanal else ''
+    cuadros_cuantitativos = reporte.cuadros_cuantitativos
+    conversaciones_por_proceso = reporte.conversaciones_por_proceso
+    conteos_distintos = reporte.conteos_distintos
+    queries_ejecutadas = reporte.queries_ejecutadas
+    eventos_comerciales, eventos_fuente = reporte.eventos_comerciales, reporte.eventos_fuente
+    eventos_html, feriados_html = reporte.eventos_html, reporte.feriados_html
+    total_casos_correlacionados = reporte.total_casos_correlacionados
+
+    # HTML progresivo: etapas que todavía no terminaron (placeholders) y error de la corrida
+    pendientes = reporte.secciones_pendientes
+    error_parcial = reporte.error_parcial
+
+    # Análisis comparativo: solo existe si hay JSONs de Claude para ambos períodos
+    analisis_comp = {}
+    orden_contribucion = None
+
+    # Generar HTML
+    if not pendientes:
+        print("[HTML] Generando reporte HTML...")
+
+    # Preparar datos para template
+    p1_label = f"{p1_start_dt.strftime('%b %Y')}"
+    p2_label = f"{p2_start_dt.strftime('%b %Y')}"
+
+    # Determinar color de variación
+    var_cr_class = 'negative' if var_cr > 0 else 'positive'
+    var_inc_class = 'negative' if var_inc_total > 0 else 'positive'
+
+    # Cards de casos y clientes únicos (--distinct-sketches)
+    cards_distintos = ''
+    for metrica, conteo in conteos_distintos.items():
+        var_distintos = conteo['p2'] - conteo['p1']
+        var_distintos_class = 'negative' if var_distintos > 0 else 'positive'
+        cards_distintos += f'''
+            <div class="card">
+                <div class="card-label">{METRICAS_SKETCH[metrica]} {p1_label}</div>
+                <div class="card-value">{conteo['p1']:,}</div>
+                <div class="card-change">estimado HLL</div>
+            </div>
+            <div class="card {var_distintos_class}">
+                <div class="card-label">{METRICAS_SKETCH[metrica]} {p2_label}</div>
+                <div class="card-value">{conteo['p2']:,}</div>
+                <div class="card-change {var_distintos_class}">{var_distintos:+,} (estimado HLL)</div>
+            </div>'''
+
+    # ========================================
+    # GENERAR RESUMEN EJECUTIVO (3 BULLETS ESTRUCTURADOS - v6.3)
+    # ========================================
+
+    # BULLET 1: Variación de CR + Métricas Consolidadas
+    direccion_cr = "empeoró" if var_cr > 0 else "mejoró"
+    signo_cr = "+" if var_cr > 0 else ""
+    bullet_1 = f"CR {direccion_cr} {signo_cr}{var_cr:.4f} pp ({signo_cr}{var_cr_pct:.1f}%) | {p1_start_dt.strftime('%b')}: {cr_p1:.4f} pp → {p2_start_dt.strftime('%b')}: {cr_p2:.4f} pp | {signo_cr}{var_inc_total:,} casos de {args.commerce_group} en {args.site}"
+
+    # BULLET 2: Principal elemento + contribución + causa raíz (si existe análisis de conversaciones)
+    # Usar dimensión de muestreo cuando hay análisis, para que los elementos coincidan con conversaciones_por_proceso
+    bullet_2 = ""
+    if len(cuadros_cuantitativos) > 0:
+        if conversaciones_por_proceso and args.muestreo_dimension and args.muestreo_dimension.upper() in cuadros_cuantitativos:
+            apertura_bullets = args.muestreo_dimension.upper()
+        else:
+            apertura_bullets = list(cuadros_cuantitativos.keys())[0]
+        df_primera = cuadros_cuantitativos[apertura_bullets]
+
+        df_sin_total = df_primera[
+            (~df_primera['DIMENSION_VAL'].str.contains('TOTAL', na=False)) &
+            (~df_primera['DIMENSION_VAL'].str.contains('Otros', na=False))
+        ].copy()
+
+        if len(df_sin_total) > 0:
+            df_sin_total = df_sin_total.sort_values('CONTRIB_ABS', ascending=False)
+            top_elemento = df_sin_total.iloc[0]
+            top_nombre = top_elemento['DIMENSION_VAL']
+            top_var_inc = int(top_elemento['VAR_INC'])
+            top_contrib = top_elemento['CONTRIB_ABS']
+
+            # Buscar si existe análisis de conversaciones para este elemento
+            causa_raiz_texto = ""
+            if top_nombre in conversaciones_por_proceso:
+                analisis_llm = conversaciones_por_proceso[top_nombre].get('analisis_llm', {})
+                # Aceptar tanto 'causas_raiz' como 'causas' (retrocompatibilidad)
+                causas_list = analisis_llm.get('causas_raiz') or analisis_llm.get('causas')
+                if causas_list and len(causas_list) > 0:
+                    causa_top = causas_list[0]
+                    causa_desc = causa_top.get('descripcion', '')
+                    # Extraer primera oración como descripción corta
+                    causa_desc_corta = causa_desc.split('.')[0] if causa_desc else ''
+                    causa_raiz_texto = f" | Causa raíz principal: {causa_top.get('causa', 'N/A')} ({causa_top.get('porcentaje', 0)}% de casos) - {causa_desc_corta}"
+
+            bullet_2 = f"{top_nombre} lidera la variación ({top_contrib:.0f}% de contribución, {signo_cr}{top_var_inc:,} casos){causa_raiz_texto}"
+
+    # BULLET 3: Segundo elemento o hallazgo adicional relevante
+    # Misma dimensión que bullet_2 para que causas raíz coincidan con conversaciones_por_proceso
+    bullet_3 = ""
+    if len(cuadros_cuantitativos) > 0:
+        if conversaciones_por_proceso and args.muestreo_dimension and args.muestreo_dimension.upper() in cuadros_cuantitativos:
+            apertura_bullets = args.muestreo_dimension.upper()
+        else:
+            apertura_bullets = list(cuadros_cuantitativos.keys())[0]
+        df_primera = cuadros_cuantitativos[apertura_bullets]
+
+        df_sin_total = df_primera[
+            (~df_primera['DIMENSION_VAL'].str.contains('TOTAL', na=False)) &
+            (~df_primera['DIMENSION_VAL'].str.contains('Otros', na=False))
+        ].copy()
+
+        if len(df_sin_total) > 1:
+            df_sin_total = df_sin_total.sort_values('CONTRIB_ABS', ascending=False)
+            segundo_elemento = df_sin_total.iloc[1]
+            segundo_nombre = segundo_elemento['DIMENSION_VAL']
+            segundo_var_inc = int(segundo_elemento['VAR_INC'])
+            segundo_var_inc_pct = ((segundo_elemento['INC_P2'] - segundo_elemento['INC_P1']) / segundo_elemento['INC_P1'] * 100) if segundo_elemento['INC_P1'] > 0 else 0
+
+            # Buscar si existe análisis de conversaciones para este segundo elemento
+            causa_raiz_texto_2 = ""
+            if segundo_nombre in conversaciones_por_proceso:
+                analisis_llm_2 = conversaciones_por_proceso[segundo_nombre].get('analisis_llm', {})
+                # Aceptar tanto 'causas_raiz' como 'causas' (retrocompatibilidad)
+                causas_list_2 = analisis_llm_2.get('causas_raiz') or analisis_llm_2.get('causas')
+                if causas_list_2 and len(causas_list_2) > 0:
+                    # Tomar la causa principal (mayor porcentaje)
+                    causa_critica = causas_list_2[0]
+
+                    causa_desc_2 = causa_critica.get('descripcion', '')
+                    causa_desc_corta_2 = causa_desc_2.split('.')[0] if causa_desc_2 else ''
+
+                    causa_raiz_texto_2 = f" | Causa crítica: {causa_critica.get('causa', 'N/A')} ({causa_critica.get('porcentaje', 0)}% casos) - {causa_desc_corta_2}"
+
+            # Determinar si es crecimiento o reducción según el signo
+            termino_variacion = "crecimiento" if segundo_var_inc_pct >= 0 else "reducción"
+            bullet_3 = f"{segundo_nombre} muestra la mayor {termino_variacion} relativa ({signo_cr}{abs(segundo_var_inc_pct):.0f}% vs periodo anterior){causa_raiz_texto_2}"
+        elif len(eventos_comerciales) > 0:
+            # Si no hay segundo elemento, usar eventos comerciales
+            evento_top = list(eventos_comerciales.values())[0]
+            bullet_3 = f"Eventos relevantes: {evento_top['nombre']} explica {evento_top['porcentaje']:.1f}% de los casos ({evento_top['casos']:,} casos correlacionados)"
+        elif df_weekly is not None and len(df_weekly) > 0:
+            # Si no hay eventos, usar análisis de picos semanales
+            promedio_incoming = df_weekly['INCOMING'].mean()
+            std_incoming = df_weekly['INCOMING'].std()
+            umbral_pico = promedio_incoming + (1.5 * std_incoming)
+            df_picos = df_weekly[df_weekly['INCOMING'] > umbral_pico].copy()
+
+            if len(df_picos) > 0:
+                df_picos = df_picos.sort_values('INCOMING', ascending=False).head(2)
+                picos_info = []
+                for _, row in df_picos.iterrows():
+                    fecha = row['SEMANA'].strftime('%d-%b')
+                    casos = int(row['INCOMING'])
+                    picos_info.append(f"{fecha} ({casos:,} casos)")
+
+                picos_str = " y ".join(picos_info)
+                bullet_3 = f"Días pico: {picos_str} registraron valores por encima del promedio de {int(promedio_incoming):,} casos/semana"
+
+    # Asegurar que siempre tengamos 3 bullets
+    if not bullet_2:
+        bullet_2 = f"Incoming total aumentó {signo_cr}{var_inc_total:,} casos ({signo_cr}{var_inc_pct:.1f}%) mientras los drivers se mantuvieron estables"
+    if not bullet_3:
+        total_conversaciones = sum(d.get('analisis_llm', {}).get('total_conversaciones', 0) for d in conversaciones_por_proceso.values()) if conversaciones_por_proceso else 0
+        bullet_3 = f"Análisis basado en {len(cuadros_cuantitativos)} dimensiones y {total_conversaciones} conversaciones muestreadas"
+
+    # ========================================
+    # GENERAR HALLAZGO PRINCIPAL (v6.4.1 - Interpretación de Negocio Automática)
+    # ========================================
+
+    # Detectar contexto temporal
+    meses_temporada_alta = [11, 12]  # Nov, Dic (Black Friday, Navidad)
+    meses_post_temporada = [1, 2]    # Ene, Feb (normalización)
+    meses_hot_sale = [5, 6]          # May, Jun (Hot Sale en LATAM)
+
+    p1_mes = p1_start_dt.month
+    p2_mes = p2_start_dt.month
+
+    # Determinar si hay efecto de temporada
+    es_post_temporada = (p1_mes in meses_temporada_alta and p2_mes in meses_post_temporada)
+    es_durante_temporada = (p1_mes not in meses_temporada_alta and p2_mes in meses_temporada_alta)
+    es_hot_sale = (p2_mes in meses_hot_sale)
+
+    # Calcular variación porcentual del incoming
+    var_inc_abs = abs(var_inc_pct)
+
+    # Determinar patrones según datos
+    cr_mejoro = var_cr < 0
+    incoming_bajo = var_inc_pct < 0
+    incoming_subio = var_inc_pct > 0
+    variacion_significativa = abs(var_cr_pct) >= 10  # Cambio >= 10%
+
+    # Generar lista de explicaciones basadas en el contexto
+    hallazgo_explicaciones = []
+
+    # 1. Análisis del cambio de volumen
+    if incoming_bajo and var_inc_abs >= 20:
+        if es_post_temporada:
+            hallazgo_explicaciones.append(f"Menor volumen de incoming ({var_inc_pct:.0f}% casos) post-temporada alta (Black Friday + Navidad)")
+        else:
+            hallazgo_explicaciones.append(f"Reducción significativa del volumen de incoming ({var_inc_pct:.0f}% casos)")
+    elif incoming_subio and var_inc_abs >= 20:
+        if es_durante_temporada:
+            hallazgo_explicaciones.append(f"Aumento de volumen ({var_inc_pct:+.0f}% casos) por temporada alta (Black Friday/Navidad)")
+        elif es_hot_sale:
+            hallazgo_explicaciones.append(f"Incremento de incoming ({var_inc_pct:+.0f}% casos) durante campaña Hot Sale")
+        else:
+            hallazgo_explicaciones.append(f"Crecimiento en volumen de incoming ({var_inc_pct:+.0f}% casos)")
+
+    # 2. Análisis de patrones logísticos/operativos según commerce group
+    commerce_group_upper = args.commerce_group.upper()
+    if commerce_group_upper in ['PNR', 'PDD']:
+        if cr_mejoro and es_post_temporada:
+            hallazgo_explicaciones.append("Normalización logística de transportistas después del pico de diciembre")
+        elif not cr_mejoro and es_durante_temporada:
+            hallazgo_explicaciones.append("Saturación logística por alto volumen de órdenes en temporada pico")
+    elif 'ME' in commerce_group_upper or 'FBM' in commerce_group_upper or 'SHIPPING' in commerce_group_upper:
+        if cr_mejoro:
+            hallazgo_explicaciones.append("Menor saturación en fulfillment y envíos rápidos")
+        else:
+            hallazgo_explicaciones.append("Mayor presión operativa en fulfillment y distribución")
+    elif 'PAGOS' in commerce_group_upper or 'MP' in commerce_group_upper:
+        if cr_mejoro:
+            hallazgo_explicaciones.append("Estabilización en procesamiento de pagos y flujos transaccionales")
+        else:
+            hallazgo_explicaciones.append("Incremento en consultas relacionadas a transacciones y disputas de pagos")
+
+    # 3. Buscar patrones en las causas raíz del análisis de conversaciones
+    if conversaciones_por_proceso:
+        causas_principales = []
+        for proceso, data in conversaciones_por_proceso.items():
+            analisis_llm = data.get('analisis_llm', {})
+            causas_list = analisis_llm.get('causas_raiz') or analisis_llm.get('causas', [])
+            for causa in causas_list[:2]:  # Top 2 causas por proceso
+                causa_nombre = causa.get('causa', '')
+                causa_pct = causa.get('porcentaje', 0)
+                if causa_pct >= 20:  # Solo causas con >= 20% de menciones
+                    causas_principales.append(f"{causa_nombre} ({causa_pct}%)")
+
+        if causas_principales:
+            # Eliminar duplicados manteniendo orden
+            causas_unicas = list(dict.fromkeys(causas_principales))[:3]
+            if len(causas_unicas) > 0:
+                hallazgo_explicaciones.append(f"Causas raíz predominantes: {', '.join(causas_unicas)}")
+
+    # 4. Integrar eventos comerciales relevantes (v6.4.2)
+    if eventos_comerciales:
+        # Encontrar el evento con mayor impacto (mayor correlación)
+        evento_top = max(eventos_comerciales.values(), key=lambda x: x.get('casos_total', 0))
+        pct_correlacion = (evento_top.get('porcentaje_p1', 0) + evento_top.get('porcentaje_p2', 0)) / 2
+
+        if pct_correlacion >= 3:  # Solo mencionar si es significativo (≥3%)
+            delta_evento = evento_top.get('delta_casos', 0)
+
+            if es_post_temporada and delta_evento < 0:
+                # Post-temporada con menos casos correlacionados = efecto positivo
+                hallazgo_explicaciones.append(
+                    f"Efecto post-{evento_top['nombre']}: reducción de {abs(delta_evento):,} casos correlacionados vs período anterior ({pct_correlacion:.1f}% del incoming)"
+                )
+            elif es_durante_temporada and delta_evento > 0:
+                # Durante temporada con más casos = presión
+                hallazgo_explicaciones.append(
+                    f"Impacto de {evento_top['nombre']}: +{delta_evento:,} casos adicionales correlacionados con el evento ({pct_correlacion:.1f}% del incoming)"
+                )
+            elif pct_correlacion >= 5:
+                # Alta correlación general
+                hallazgo_explicaciones.append(
+                    f"Correlación con {evento_top['nombre']}: {evento_top.get('casos_total', 0):,} casos ({pct_correlacion:.1f}% del incoming) originados durante el evento"
+                )
+
+    # 5. Si no hay suficientes explicaciones, agregar una genérica basada en métricas
+    if len(hallazgo_explicaciones) < 2:
+        if cr_mejoro:
+            hallazgo_explicaciones.append(f"Mejora operativa reflejada en reducción del CR ({var_cr:.4f} pp)")
+        else:
+            hallazgo_explicaciones.append(f"Incremento de contactos que requiere atención ({var_cr:+.4f} pp)")
+
+    # Generar texto introductorio del hallazgo
+    if cr_mejoro:
+        hallazgo_intro = f"La <strong>mejora del {abs(var_cr_pct):.1f}%</strong> en CR se explica principalmente por:"
+    else:
+        hallazgo_intro = f"El <strong>empeoramiento del {abs(var_cr_pct):.1f}%</strong> en CR se debe principalmente a:"
+
+    # Generar HTML del hallazgo principal
+    hallazgo_items_html = "\n                ".join([f"<li>{exp}</li>" for exp in hallazgo_explicaciones])
+
+    hallazgo_principal_html = f"""
+        <!-- HALLAZGO PRINCIPAL - v6.4.1 -->
+        <div class="hallazgo-principal">
+            <h3><span class="emoji">💡</span> Hallazgo Principal</h3>
+            <p class="intro">{hallazgo_intro}</p>
+            <ul>
+                {hallazgo_items_html}
+            </ul>
+        </div>
+"""
+
+    # Reporte parcial: aviso con lo pendiente y recarga periódica mientras la corrida sigue
+    parcial_meta = ''
+    parcial_html = ''
+    if pendientes:
+        secciones = ', '.join(SECCIONES_PARCIALES[s] for s in pendientes)
+        if error_parcial:
+            titulo = 'REPORTE INCOMPLETO: La corrida falló'
+            descripcion = f"Error: {html.escape(error_parcial)}. Secciones sin datos: {secciones}."
+        else:
+            parcial_meta = '\n    <meta http-equiv="refresh" content="30">'
+            titulo = 'REPORTE PARCIAL: Generación en curso'
+            descripcion = (f"Pendiente: {secciones}. Esta página se recarga cada 30 segundos "
+                           f"y se reemplaza por el reporte completo cuando termina.")
+        parcial_html = f"""
+        <div class="warning-banner">
+            <div class="icon">⏳</div>
+            <div class="text">
+                <div class="title">{titulo}</div>
+                <div class="description">{descripcion}</div>
+            </div>
+        </div>
+"""
+
+    # Generar HTML inline (sin Jinja2 por ahora)
+    html_content = f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">{parcial_meta}
+    <title>CR Report v6.3 - {args.commerce_group} {args.site}</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
+    <link href="https://fonts.googleapis.com/css2?family=Nunito+Sans:wght@400;600;700;800&display=swap" rel="stylesheet">
+    <style>
+        /* ========================================
+           DISEÑO MELI INSTITUCIONAL v2.0 - PROFESIONAL
+           Paleta: Amarillo #FFE600, Azul #3483FA, Verde #00A650
+           Tipografía: Nunito Sans (similar a Proxima Nova)
+           ======================================== */
+        
+        :root {{
+            --meli-yellow: #FFE600;
+            --meli-blue: #3483FA;
+            --meli-green: #00A650;
+            --meli-red: #F23D4F;
+            --meli-dark: #333333;
+            --meli-gray: #666666;
+            --meli-light: #EDEDED;
+            --meli-white: #FFFFFF;
+            --meli-bg: #F5F5F5;
+            --shadow-sm: 0 1px 3px rgba(0,0,0,0.08);
+            --shadow-md: 0 2px 6px rgba(0,0,0,0.1);
+            --radius: 8px;
+        }}
+        
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        
+        body {{ 
+            font-family: 'Nunito Sans', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
+            background: var(--meli-light); 
+            color: var(--meli-dark); 
+            line-height: 1.6;
+            font-size: 14px;
+        }}
+        
+        .container {{ max-width: 1400px; margin: 0 auto; padding: 24px; }}
+        
+        /* ========== HEADER ========== */
+        .header {{ 
+            background: var(--meli-yellow); 
+            color: var(--meli-dark); 
+            padding: 32px 40px; 
+            border-radius: var(--radius); 
+            margin-bottom: 24px; 
+            box-shadow: var(--shadow-sm);
+        }}
+        .header h1 {{ font-size: 28px; margin-bottom: 8px; font-weight: 800; letter-spacing: -0.5px; }}
+        .header .subtitle {{ font-size: 15px; opacity: 0.8; font-weight: 400; }}
+        
+        /* ========== CARDS KPI ========== */
+        .cards-grid {{ 
+            display: grid; 
+            grid-template-columns: repeat(4, 1fr); 
+            gap: 16px; 
+            margin-bottom: 24px; 
+        }}
+        .card {{ 
+            background: var(--meli-white); 
+            padding: 20px 24px; 
+            border-radius: var(--radius); 
+            box-shadow: var(--shadow-sm);
+            border-top: 3px solid var(--meli-blue);
+            transition: transform 0.2s, box-shadow 0.2s;
+        }}
+        .card:hover {{ transform: translateY(-2px); box-shadow: var(--shadow-md); }}
+        .card.negative {{ border-top-color: var(--meli-red); }}
+        .card.positive {{ border-top-color: var(--meli-green); }}
+        .card-label {{ 
+            font-size: 11px; 
+            color: var(--meli-gray); 
+            text-transform: uppercase; 
+            letter-spacing: 1px; 
+            margin-bottom: 8px; 
+            font-weight: 700; 
+        }}
+        .card-value {{ 
+            font-size: 26px; 
+            font-weight: 800; 
+            color: var(--meli-dark); 
+            line-height: 1.1;
+            letter-spacing: -0.5px;
+        }}
+        .card-change {{ font-size: 13px; margin-top: 8px; font-weight: 600; }}
+        .card-change.positive {{ color: var(--meli-green); }}
+        .card-change.negative {{ color: var(--meli-red); }}
+        
+        /* ========== SECCIONES ========== */
+        .section {{ 
+            background: var(--meli-white); 
+            padding: 28px 32px; 
+            border-radius: var(--radius); 
+            margin-bottom: 24px; 
+            box-shadow: var(--shadow-sm);
+        }}
+        .section h2 {{ 
+            color: var(--meli-dark); 
+            margin-bottom: 24px; 
+            font-size: 20px; 
+            padding-bottom: 12px; 
+            border-bottom: 2px solid var(--meli-yellow); 
+            font-weight: 700;
+            display: flex;
+            align-items: center;
+            gap: 10px;
+        }}
+        .section h3 {{ 
+            color: var(--meli-dark); 
+            margin: 20px 0 16px 0; 
+            font-size: 16px; 
+            font-weight: 700; 
+        }}
+        
+        .chart-container {{ position: relative; height: 400px; margin: 24px 0; }}
+        
+        /* ========== TABLAS UNIFICADAS ========== */
+        table {{ 
+            width: 100%; 
+            border-collapse: separate;
+            border-spacing: 0;
+            margin: 16px 0; 
+            font-size: 13px;
+            border-radius: var(--radius);
+            overflow: hidden;
+            box-shadow: var(--shadow-sm);
+        }}
+        thead {{ background: var(--meli-dark); }}
+        thead th {{ 
+            color: white; 
+            padding: 14px 16px; 
+            text-align: left; 
+            font-weight: 700; 
+            font-size: 11px; 
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+        }}
+        thead th:first-child {{ border-radius: var(--radius) 0 0 0; }}
+        thead th:last-child {{ border-radius: 0 var(--radius) 0 0; }}
+        tbody td {{ 
+            padding: 12px 16px; 
+            border-bottom: 1px solid var(--meli-light);
+            background: var(--meli-white);
+        }}
+        tbody tr:last-child td {{ border-bottom: none; }}
+        tbody tr:last-child td:first-child {{ border-radius: 0 0 0 var(--radius); }}
+        tbody tr:last-child td:last-child {{ border-radius: 0 0 var(--radius) 0; }}
+        td.number {{ text-align: right; font-family: 'Consolas', 'Monaco', monospace; font-weight: 600; }}
+        td.positive {{ color: var(--meli-green); font-weight: 700; }}
+        td.negative {{ color: var(--meli-red); font-weight: 700; }}
+        tbody tr:hover td {{ background: var(--meli-bg); }}
+        tbody tr.row-otros td {{ background: var(--meli-bg); color: var(--meli-gray); font-style: italic; }}
+        tbody tr.row-total td {{ background: var(--meli-dark); color: white; font-weight: 700; }}
+        
+        /* ========== NOTAS Y ALERTAS ========== */
+        .note {{ 
+            background: var(--meli-bg); 
+            border-left: 3px solid var(--meli-blue); 
+            padding: 14px 18px; 
+            margin: 16px 0; 
+            border-radius: 0 var(--radius) var(--radius) 0; 
+            font-size: 13px; 
+        }}
+        
+        .badge-pico {{ 
+            display: inline-block; 
+            background: var(--meli-red); 
+            color: white; 
+            padding: 3px 10px; 
+            border-radius: 12px; 
+            font-size: 10px; 
+            font-weight: 700; 
+            text-transform: uppercase; 
+            letter-spacing: 0.5px; 
+        }}
+        .badge-normal {{ 
+            display: inline-block; 
+            background: var(--meli-gray); 
+            color: white; 
+            padding: 3px 10px; 
+            border-radius: 12px; 
+            font-size: 10px; 
+            font-weight: 700; 
+            text-transform: uppercase; 
+        }}
+        
+        .case-header {{ 
+            display: flex; 
+            align-items: center; 
+            margin-bottom: 8px; 
+            padding-bottom: 8px; 
+            border-bottom: 1px solid var(--meli-light); 
+        }}
+        .case-info {{ color: var(--meli-dark); font-size: 12px; font-weight: 700; }}
+        .case-fecha {{ color: var(--meli-gray); font-size: 11px; margin-left: 12px; }}
+        
+        /* ========== RESUMEN EJECUTIVO ========== */
+        .resumen-ejecutivo {{ 
+            background: var(--meli-white); 
+            padding: 28px 32px; 
+            border-radius: var(--radius); 
+            margin-bottom: 24px; 
+            box-shadow: var(--shadow-sm);
+            border-top: 3px solid var(--meli-yellow);
+        }}
+        .resumen-ejecutivo h2 {{ 
+            color: var(--meli-dark); 
+            font-size: 20px; 
+            font-weight: 700; 
+            margin-bottom: 20px; 
+            padding-bottom: 12px; 
+            border-bottom: 2px solid var(--meli-yellow);
+        }}
+        .resumen-ejecutivo ul {{ list-style: none; padding: 0; margin: 0; }}
+        .resumen-ejecutivo li {{ 
+            margin-bottom: 16px; 
+            padding-left: 24px; 
+            position: relative; 
+            font-size: 14px; 
+            line-height: 1.7; 
+        }}
+        .resumen-ejecutivo li:before {{ 
+            content: ''; 
+            position: absolute; 
+            left: 0; 
+            top: 7px; 
+            width: 8px; 
+            height: 8px; 
+            background: var(--meli-blue); 
+            border-radius: 50%; 
+        }}
+        .resumen-ejecutivo li strong {{ font-weight: 700; }}
+        
+        /* ========== HALLAZGO PRINCIPAL ========== */
+        .hallazgo-principal {{ 
+            background: linear-gradient(135deg, #F0F7FF 0%, #E8F4FC 100%);
+            border-left: 4px solid var(--meli-blue); 
+            padding: 24px 28px; 
+            border-radius: 0 var(--radius) var(--radius) 0; 
+            margin-bottom: 24px;
+        }}
+        .hallazgo-principal h3 {{ 
+            color: var(--meli-blue); 
+            font-size: 16px; 
+            font-weight: 700; 
+            margin-bottom: 14px; 
+        }}
+        .hallazgo-principal .intro {{ font-size: 14px; color: var(--meli-dark); margin-bottom: 12px; }}
+        .hallazgo-principal ul {{ list-style: none; padding: 0; margin: 0; }}
+        .hallazgo-principal li {{ 
+            margin-bottom: 10px; 
+            padding-left: 22px; 
+            position: relative; 
+            font-size: 13px; 
+            line-height: 1.6; 
+        }}
+        .hallazgo-principal li:before {{ 
+            content: '✓'; 
+            position: absolute; 
+            left: 0; 
+            color: var(--meli-green); 
+            font-weight: 700; 
+        }}
+        
+        /* ========== EVENTOS COMERCIALES ========== */
+        .eventos-comerciales {{ 
+            background: var(--meli-white); 
+            padding: 28px 32px; 
+            border-radius: var(--radius); 
+            margin-bottom: 24px; 
+            box-shadow: var(--shadow-sm);
+        }}
+        .eventos-comerciales h2 {{ 
+            color: var(--meli-dark); 
+            font-size: 20px; 
+            font-weight: 700; 
+            margin-bottom: 16px; 
+            padding-bottom: 12px; 
+            border-bottom: 2px solid var(--meli-yellow);
+        }}
+        .eventos-comerciales .info-box {{ 
+            background: var(--meli-bg); 
+            border-left: 3px solid var(--meli-blue); 
+            padding: 10px 14px; 
+            margin-bottom: 16px; 
+            border-radius: 0 var(--radius) var(--radius) 0; 
+            font-size: 12px; 
+        }}
+        .eventos-comerciales .evento-nombre {{ font-weight: 600; }}
+        .eventos-comerciales .badge {{ 
+            display: inline-block; 
+            padding: 3px 8px; 
+            border-radius: 10px; 
+            font-size: 10px; 
+            font-weight: 700; 
+        }}
+        .eventos-comerciales .badge-positive {{ background: #D4EDDA; color: var(--meli-green); }}
+        .eventos-comerciales .badge-negative {{ background: #F8D7DA; color: var(--meli-red); }}
+        .eventos-comerciales .badge-neutral {{ background: var(--meli-light); color: var(--meli-gray); }}
+        .eventos-comerciales .summary {{ 
+            background: var(--meli-bg); 
+            padding: 12px 16px; 
+            border-radius: var(--radius); 
+            margin-top: 16px; 
+            font-size: 13px;
+        }}
+        .eventos-comerciales .no-data {{ text-align: center; padding: 24px; color: var(--meli-gray); font-style: italic; }}
+        
+        /* ========== FERIADOS DEL PERÍODO ========== */
+        .feriados-periodo {{ 
+            background: var(--meli-white); 
+            padding: 28px 32px; 
+            border-radius: var(--radius); 
+            margin-bottom: 24px; 
+            box-shadow: var(--shadow-sm);
+        }}
+        .feriados-periodo h2 {{ 
+            color: var(--meli-dark); 
+            font-size: 20px; 
+            font-weight: 700; 
+            margin-bottom: 16px; 
+            padding-bottom: 12px; 
+            border-bottom: 2px solid var(--meli-yellow);
+        }}
+        .feriados-periodo .info-box {{ 
+            background: var(--meli-bg); 
+            border-left: 3px solid var(--meli-blue); 
+            padding: 10px 14px; 
+            margin-bottom: 16px; 
+            border-radius: 0 var(--radius) var(--radius) 0; 
+            font-size: 12px; 
+        }}
+        .feriados-periodo .feriado-nombre {{ font-weight: 600; }}
+        .feriados-periodo .badge {{ 
+            display: inline-block; 
+            padding: 3px 8px; 
+            border-radius: 10px; 
+            font-size: 10px; 
+            font-weight: 700; 
+        }}
+        .feriados-periodo .badge-pre {{ background: #FFF3CD; color: #856404; }}
+        .feriados-periodo .badge-p1 {{ background: #D4EDDA; color: var(--meli-green); }}
+        .feriados-periodo .badge-p2 {{ background: #CCE5FF; color: var(--meli-blue); }}
+        .feriados-periodo .summary {{ 
+            background: var(--meli-bg); 
+            padding: 12px 16px; 
+            border-radius: var(--radius); 
+            margin-top: 16px; 
+            font-size: 13px;
+        }}
+        
+        /* ========== WARNING BANNER ========== */
+        .warning-banner {{ 
+            background: var(--meli-yellow); 
+            color: var(--meli-dark); 
+            padding: 14px 20px; 
+            border-radius: var(--radius); 
+            margin-bottom: 16px; 
+            display: flex; 
+            align-items: center; 
+            gap: 12px;
+        }}
+        .warning-banner .title {{ font-weight: 700; font-size: 14px; margin-bottom: 4px; }}
+        .warning-banner .description {{ font-size: 13px; opacity: 0.85; }}
+        
+        /* ========== FOOTER ========== */
+        .footer-container {{ margin-top: 32px; }}
+        .footer-toggle {{ 
+            background: var(--meli-dark); 
+            color: white; 
+            cursor: pointer; 
+            padding: 16px 24px; 
+            border: none; 
+            text-align: left; 
+            width: 100%; 
+            font-size: 15px; 
+            font-weight: 700; 
+            border-radius: var(--radius); 
+            transition: background 0.2s; 
+            display: flex; 
+            justify-content: space-between; 
+            align-items: center;
+        }}
+        .footer-toggle:hover {{ background: #444; }}
+        .footer-toggle:after {{ content: '▼'; font-size: 12px; }}
+        .footer-toggle.active:after {{ content: '▲'; }}
+        .footer-content {{ max-height: 0; overflow: hidden; transition: max-height 0.3s ease-out; }}
+        .footer {{ 
+            background: var(--meli-dark); 
+            color: var(--meli-light); 
+            padding: 28px 32px; 
+            border-radius: 0 0 var(--radius) var(--radius); 
+            font-size: 12px; 
+            line-height: 1.8;
+        }}
+        .footer h4 {{ color: var(--meli-yellow); margin: 12px 0 8px 0; font-size: 14px; font-weight: 700; }}
+        
+        /* ========== CARDS COLAPSABLES ANÁLISIS ========== */
+        .analysis-card {{ 
+            background: var(--meli-white); 
+            border-radius: var(--radius); 
+            box-shadow: var(--shadow-sm); 
+            margin-bottom: 16px; 
+            overflow: hidden; 
+            transition: box-shadow 0.2s;
+            border: 1px solid var(--meli-light);
+        }}
+        .analysis-card:hover {{ box-shadow: var(--shadow-md); }}
+        .analysis-card-header {{ 
+            padding: 18px 24px; 
+            cursor: pointer; 
+            display: flex; 
+            justify-content: space-between; 
+            align-items: center; 
+            transition: background 0.2s;
+        }}
+        .analysis-card-header:hover {{ background: var(--meli-bg); }}
+        .analysis-card-header.expanded {{ background: #FFF9E0; border-bottom: 2px solid var(--meli-yellow); }}
+        .analysis-card-header-left {{ display: flex; align-items: center; gap: 14px; flex: 1; }}
+        .analysis-card-rank {{ 
+            width: 36px; 
+            height: 36px; 
+            background: var(--meli-blue); 
+            color: white; 
+            border-radius: 50%; 
+            display: flex; 
+            align-items: center; 
+            justify-content: center; 
+            font-weight: 800; 
+            font-size: 14px;
+        }}
+        .analysis-card-rank.top-3 {{ background: var(--meli-yellow); color: var(--meli-dark); }}
+        .analysis-card-title {{ font-size: 15px; font-weight: 700; color: var(--meli-dark); }}
+        .analysis-card-badges {{ display: flex; gap: 8px; flex-wrap: wrap; }}
+        .analysis-card-badge {{ 
+            padding: 4px 10px; 
+            border-radius: 12px; 
+            font-size: 11px; 
+            font-weight: 700;
+        }}
+        .analysis-card-badge.contrib {{ background: #E8F4FC; color: var(--meli-blue); }}
+        .analysis-card-badge.positive {{ background: #D4EDDA; color: var(--meli-green); }}
+        .analysis-card-badge.negative {{ background: #F8D7DA; color: var(--meli-red); }}
+        .analysis-card-badge.conv {{ background: var(--meli-light); color: var(--meli-dark); }}
+        .analysis-card-toggle {{ 
+            width: 32px; 
+            height: 32px; 
+            border-radius: 50%; 
+            background: var(--meli-light); 
+            display: flex; 
+            align-items: center; 
+            justify-content: center; 
+            transition: all 0.2s;
+        }}
+        .analysis-card-toggle svg {{ transition: transform 0.3s; width: 12px; height: 12px; }}
+        .analysis-card-header.expanded .analysis-card-toggle {{ background: var(--meli-blue); }}
+        .analysis-card-header.expanded .analysis-card-toggle svg {{ transform: rotate(180deg); fill: white; }}
+        .analysis-card-content {{ max-height: 0; overflow: hidden; transition: max-height 0.4s ease-out; }}
+        .analysis-card-content.expanded {{ max-height: 5000px; transition: max-height 0.6s ease-in; }}
+        .analysis-card-content-inner {{ padding: 24px; background: var(--meli-bg); }}
+        
+        /* ========== TABLAS DE CAUSAS (UNIFICADAS) ========== */
+        .causa-table {{ 
+            width: 100%; 
+            border-collapse: separate;
+            border-spacing: 0;
+            margin: 16px 0; 
+            font-size: 13px;
+            border-radius: var(--radius);
+            overflow: hidden;
+            box-shadow: var(--shadow-sm);
+        }}
+        .causa-table thead tr:first-child th {{ background: var(--meli-dark); color: white; }}
+        .causa-table thead tr:first-child th:first-child {{ border-radius: var(--radius) 0 0 0; }}
+        .causa-table thead tr:first-child th:last-child {{ border-radius: 0 var(--radius) 0 0; }}
+        .causa-table thead th {{ 
+            padding: 12px 14px; 
+            text-align: center; 
+            font-weight: 700; 
+            font-size: 11px; 
+            text-transform: uppercase;
+            letter-spacing: 0.3px;
+            border: none;
+        }}
+        .causa-table thead th.col-periodo {{ background: var(--meli-yellow); color: var(--meli-dark); }}
+        .causa-table thead th.col-subheader {{ background: #444; color: white; font-size: 10px; }}
+        .causa-table tbody td {{ 
+            padding: 11px 14px; 
+            border-bottom: 1px solid var(--meli-light);
+            background: var(--meli-white);
+            text-align: center;
+        }}
+        .causa-table tbody td:first-child {{ text-align: left; font-weight: 600; color: var(--meli-dark); }}
+        .causa-table tbody tr:last-child td {{ border-bottom: none; }}
+        .causa-table tbody tr:last-child td:first-child {{ border-radius: 0 0 0 var(--radius); }}
+        .causa-table tbody tr:last-child td:last-child {{ border-radius: 0 0 var(--radius) 0; }}
+        .causa-table tbody tr:hover td {{ background: var(--meli-bg); }}
+        .causa-table tbody tr.row-total td {{ background: var(--meli-dark); color: white; font-weight: 700; }}
+        .causa-table .val-positive {{ color: var(--meli-green); font-weight: 700; }}
+        .causa-table .val-negative {{ color: var(--meli-red); font-weight: 700; }}
+        .causa-table .val-neutral {{ color: var(--meli-gray); }}
+        
+        /* ========== INSIGHT BOX ========== */
+        .insight-box {{
+            background: linear-gradient(135deg, #FFF9E0 0%, #FFF3CD 100%);
+            border-left: 4px solid var(--meli-yellow);
+            padding: 16px 20px;
+            margin: 16px 0;
+            border-radius: 0 var(--radius) var(--radius) 0;
+        }}
+        .insight-box strong {{ color: var(--meli-dark); font-size: 14px; }}
+        .insight-box p {{ margin: 8px 0 0 0; color: #5a4a00; line-height: 1.6; font-size: 13px; }}
+        
+        /* ========== MINI CARDS MÉTRICAS ========== */
+        .metrics-row {{ display: flex; gap: 16px; margin-bottom: 20px; flex-wrap: wrap; }}
+        .metric-box {{ 
+            background: var(--meli-bg); 
+            padding: 16px 20px; 
+            border-radius: var(--radius); 
+            flex: 1; 
+            min-width: 160px;
+            border-top: 3px solid var(--meli-blue);
+        }}
+        .metric-box.variation-positive {{ background: #D4EDDA; border-top-color: var(--meli-green); }}
+        .metric-box.variation-negative {{ background: #F8D7DA; border-top-color: var(--meli-red); }}
+        .metric-box.contrib {{ background: #E8F4FC; border-top-color: var(--meli-blue); }}
+        .metric-box-label {{ font-size: 11px; color: var(--meli-gray); margin-bottom: 6px; text-transform: uppercase; letter-spacing: 0.5px; font-weight: 600; }}
+        .metric-box-value {{ font-size: 20px; font-weight: 800; color: var(--meli-dark); }}
+        .metric-box.variation-positive .metric-box-value {{ color: var(--meli-green); }}
+        .metric-box.variation-negative .metric-box-value {{ color: var(--meli-red); }}
+        .metric-box.contrib .metric-box-value {{ color: var(--meli-blue); }}
+        
+        /* ========== ALERT BOX ========== */
+        .alert-box {{
+            background: #FFF3CD;
+            border-left: 4px solid var(--meli-yellow);
+            padding: 14px 18px;
+            margin: 14px 0;
+            border-radius: 0 var(--radius) var(--radius) 0;
+        }}
+        .alert-box strong {{ color: #856404; font-size: 13px; }}
+        .alert-box p {{ margin: 6px 0 0 0; color: #856404; line-height: 1.5; font-size: 12px; }}
+        
+        /* ========== RESPONSIVE ========== */
+        @media (max-width: 1200px) {{
+            .cards-grid {{ grid-template-columns: repeat(2, 1fr); }}
+        }}
+        @media (max-width: 768px) {{
+            .cards-grid {{ grid-template-columns: 1fr; }}
+            .container {{ padding: 16px; }}
+        }}
+        @media print {{ 
+            body {{ background: white; }} 
+            .section, .card {{ box-shadow: none; }} 
+            .footer-container {{ display: none; }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📊 Contact Rate Analysis - {args.commerce_group}{f' - {args.process_name}' if args.process_name else ''} {args.site}</h1>
+            <div class="subtitle">
+                Período: {p1_label} vs {p2_label} | Commerce Group: {args.commerce_group}{f' | Proceso: {args.process_name}' if args.process_name else ''} | Site: {args.site}
+            </div>
+        </div>
+        {parcial_html}
+        {'<!-- WARNING BANNER: DRIVER OVERRIDE -->' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+        {'<div class="warning-banner">' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+            {'<div class="icon">⚠️</div>' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+            {'<div class="text">' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+                {'<div class="title">MODO OVERRIDE ACTIVO: Driver Filtrado por Site</div>' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+                {f'<div class="description">Este reporte usa driver de Shipping filtrado por {args.site} (no estándar). La regla oficial indica que el driver debe ser GLOBAL (todos los sites). Ver docs/SHIPPING_DRIVERS.md para más información.</div>' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+            {'</div>' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+        {'</div>' if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site else ''}
+        
+        <!-- RESUMEN EJECUTIVO -->
+        <div class="resumen-ejecutivo">
+            <h2>📊 Resumen Ejecutivo</h2>
+            <ul>
+                <li><strong>{bullet_1}</strong></li>
+                <li><strong>{bullet_2}</strong></li>
+                <li><strong>{bullet_3}</strong></li>
+            </ul>
+        </div>
+        
+        {hallazgo_principal_html}
+        
+        <!-- CARDS (8 en orden v6.1) -->
+        <div class="cards-grid">
+            <div class="card">
+                <div class="card-label">CR {p1_label}</div>
+                <div class="card-value">{cr_p1:.4f}</div>
+                <div class="card-change">pp</div>
+            </div>
+            <div class="card {var_cr_class}">
+                <div class="card-label">CR {p2_label}</div>
+                <div class="card-value">{cr_p2:.4f}</div>
+                <div class="card-change {var_cr_class}">{var_cr:+.4f} pp</div>
+            </div>
+            <div class="card {var_cr_class}">
+                <div class="card-label">Variación CR</div>
+                <div class="card-value">{var_cr:+.4f}</div>
+                <div class="card-change {var_cr_class}">pp ({var_cr_pct:+.1f}%)</div>
+            </div>
+            <div class="card {var_inc_class}">
+                <div class="card-label">Variación Incoming</div>
+                <div class="card-value">{var_inc_total:+,}</div>
+                <div class="card-change {var_inc_class}">casos ({var_inc_pct:+.1f}%)</div>
+            </div>
+            
+            <div class="card">
+                <div class="card-label">Incoming {p1_label}</div>
+                <div class="card-value">{inc_p1_total:,}</div>
+                <div class="card-change">casos</div>
+            </div>
+            <div class="card {var_inc_class}">
+                <div class="card-label">Incoming {p2_label}</div>
+                <div class="card-value">{inc_p2_total:,}</div>
+                <div class="card-change {var_inc_class}">{var_inc_total:+,} casos</div>
+            </div>
+            <div class="card">
+                <div class="card-label">Driver {p1_label}</div>
+                <div class="card-value">{drv_p1_total:,.0f}</div>
+                <div class="card-change">órdenes</div>
+            </div>
+            <div class="card">
+                <div class="card-label">Driver {p2_label}</div>
+                <div class="card-value">{drv_p2_total:,.0f}</div>
+                <div class="card-change">órdenes</div>
+            </div>{cards_distintos}
+        </div>
+        
+        <!-- GRÁFICO SEMANAL -->
+        <div class="section">
+            <h2>📈 Evolución Semanal CR</h2>{_seccion_pendiente('weekly', pendientes, error_parcial)}{nota_semanal}{contenedor_semanal}
+        </div>
+        
+        <!-- EVENTOS COMERCIALES -->
+        {eventos_html}
+        
+        <!-- FERIADOS DEL PERÍODO -->
+        {feriados_html}
+        
+        <!-- CUADROS CUANTITATIVOS -->
+        <div class="section">
+            <h2>📊 Cuadros Cuantitativos por Dimensión</h2>{_seccion_pendiente('dimension_tables', pendientes, error_parcial)}
+"""
+
+    # Agregar cada cuadro cuantitativo
+    for dimension, df in cuadros_cuantitativos.items():
+        # Ordenar por |VAR_CR| descendente (mayor impacto en CR primero)
+        # Mantener "Otros" y "TOTAL" al final
+        df_elementos = df[~df['DIMENSION_VAL'].str.contains('Otros|TOTAL', case=False, na=False)].copy()
+        df_otros = df[df['DIMENSION_VAL'].str.contains('Otros', case=False, na=False)]
+        df_total = df[df['DIMENSION_VAL'] == 'TOTAL']
+
+        # Ordenar elementos por VAR_CR absoluto (mayor variación primero)
+        df_elementos = df_elementos.sort_values('VAR_CR', key=lambda x: abs(x), ascending=False)
+
+        # Reconstruir DataFrame ordenado: elementos + otros + total
+        df_ordenado = pd.concat([df_elementos, df_otros, df_total], ignore_index=True)
+
+        html_content += f"""
+            <h3>🔹 Dimensión: {dimension}</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th>{dimension}</th>
+                        <th class="number">Casos {p1_label}</th>
+                        <th class="number">Casos {p2_label}</th>
+                        <th class="number">CR {p1_label} (pp)</th>
+                        <th class="number">CR {p2_label} (pp)</th>
+                        <th class="number">Var CR (pp)</th>
+                        <th class="number">Contrib %</th>
+                    </tr>
+                </thead>
+                <tbody>
+"""
+
+        for idx, row in df_ordenado.iterrows():
+            is_otros = 'Otros' in str(row['DIMENSION_VAL'])
+            is_total = row['DIMENSION_VAL'] == 'TOTAL'
+
+            row_class = ''
+            if is_otros:
+                row_class = 'row-otros'
+            elif is_total:
+                row_class = 'row-total'
+
+            var_class = 'negative' if row['VAR_CR'] > 0 else 'positive' if row['VAR_CR'] < 0 else ''
+
+            html_content += f"""
+                    <tr class="{row_class}">
+                        <td><strong>{row['DIMENSION_VAL']}</strong></td>
+                        <td class="number">{int(row['INC_P1']):,}</td>
+                        <td class="number">{int(row['INC_P2']):,}</td>
+                        <td class="number">{row['CR_P1']:.4f}</td>
+                        <td class="number">{row['CR_P2']:.4f}</td>
+                        <td class="number {var_class}">{row['VAR_CR']:+.4f}</td>
+                        <td class="number {var_class}">{row['CONTRIB_ABS']:.1f}%</td>
+                    </tr>
+"""
+
+        html_content += """
+                </tbody>
+            </table>
+"""
+
+    html_content += """
+        </div>
+"""
+
+    if 'conversations' in pendientes:
+        html_content += f"""
+        <div class="section">
+            <h2>🔍 Análisis de Conversaciones</h2>{_seccion_pendiente('conversations', pendientes, error_parcial)}
+        </div>
+"""
+
+    # ========================================
+    # AGREGAR ANÁLISIS COMPARATIVO DE PATRONES (v6.3.2)
+    # ========================================
+    p1_mes = args.p1_start[:7]  # YYYY-MM
+    p2_mes = args.p2_start[:7]  # YYYY-MM
+    analisis_comparativo_path = output_dir / f"analisis_conversaciones_comparativo_claude_{args.site.lower()}_{args.commerce_group.lower()}_{args.muestreo_dimension.lower()}_{p1_mes}_{p2_mes}{reporte.output_suffix}.json"
+
+    # Definir cuadro_dimension_path para todos los bloques (v6.4.0)
+    cuadro_dimension_path = Path("output") / f"cuadro_{args.muestreo_dimension.lower()}_{args.site.lower()}_{p1_start_dt.strftime('%Y%m')}.csv"
+
+    # ========================================
+    # v6.4.10 FIX: Siempre regenerar análisis comparativo fresco
+    # ========================================
+    # Se deshabilitó la carga de comparativos pre-existentes del disco.
+    # Motivo: el archivo podía contener datos de una dimensión diferente (ej: PROCESO vs CDU),
+    # causando que las keys no matchearan con el cuadro cuantitativo y la sección quedara vacía.
+    # Ahora siempre se regenera desde los JSONs separados (P1/P2) para garantizar consistencia.
+    # ========================================
+    if False:  # v6.4.10: DESHABILITADO - siempre regenerar fresco, nunca cargar comparativos stale
+        analisis_comp = {}  # Dead code - nunca se ejecuta
+
+        # Obtener orden por contribución desde el cuadro de dimensión (v6.4.0)
+        df_orden_existente = None
+        if cuadro_dimension_path.exists():
+            try:
+                df_orden_existente = pd.read_csv(cuadro_dimension_path)
+                df_orden_existente = df_orden_existente[~df_orden_existente['DIMENSION_VAL'].str.contains('Otros|TOTAL', case=False, na=False)]
+                # Ordenar por |VAR_CR| descendente (mayor impacto en CR primero) - v6.4.9
+                df_orden_existente = df_orden_existente.sort_values('VAR_CR', key=lambda x: abs(x), ascending=False)
+                orden_contribucion_existente = df_orden_existente['DIMENSION_VAL'].tolist()
+            except:
+                orden_contribucion_existente = list(analisis_comp.keys())
+        else:
+            orden_contribucion_existente = list(analisis_comp.keys())
+
+        dimension_label_existente = aperturas_list[-1] if aperturas_list else "Elemento"
+
+        html_content += f"""
+        <!-- ANÁLISIS COMPARATIVO CON CARDS COLAPSABLES - v6.4.0 -->
+        <div class="section">
+            <h2>🔍 Análisis Comparativo por {dimension_label_existente}</h2>
+            <p style="margin-bottom: 20px; font-size: 15px; color: #555;">
+                Cada card representa un elemento de <strong>{dimension_label_existente}</strong>, ordenado por su <strong>contribución a la variación de CR</strong>.
+                Haz clic para expandir el análisis detallado.
+            </p>
+        
+        <script>
+            function toggleAnalysisCard(cardId) {{
+                var header = document.getElementById('header_' + cardId);
+                var content = document.getElementById('content_' + cardId);
+                var isExpanded = header.classList.contains('expanded');
+                
+                if (isExpanded) {{
+                    header.classList.remove('expanded');
+                    content.classList.remove('expanded');
+                }} else {{
+                    header.classList.add('expanded');
+                    content.classList.add('expanded');
+                }}
+            }}
+            
+            function toggleCitas(procesoid) {{
+                var elem = document.getElementById('citas_' + procesoid);
+                var btn = document.getElementById('btn_' + procesoid);
+                if (elem.style.display === 'none') {{
+                    elem.style.display = 'block';
+                    btn.innerHTML = 'Ocultar citas adicionales ▲';
+                }} else {{
+                    elem.style.display = 'none';
+                    btn.innerHTML = 'Ver citas adicionales ▼';
+                }}
+            }}
+            
+            function expandAllCards() {{
+                var headers = document.querySelectorAll('.analysis-card-header');
+                var contents = document.querySelectorAll('.analysis-card-content');
+                headers.forEach(function(h) {{ h.classList.add('expanded'); }});
+                contents.forEach(function(c) {{ c.classList.add('expanded'); }});
+            }}
+            
+            function collapseAllCards() {{
+                var headers = document.querySelectorAll('.analysis-card-header');
+                var contents = document.querySelectorAll('.analysis-card-content');
+                headers.forEach(function(h) {{ h.classList.remove('expanded'); }});
+                contents.forEach(function(c) {{ c.classList.remove('expanded'); }});
+            }}
+        </script>
+        
+        <div style="margin-bottom: 20px; display: flex; gap: 10px;">
+            <button onclick="expandAllCards()" style="background: #3498db; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; font-weight: 600;">
+                📂 Expandir todas
+            </button>
+            <button onclick="collapseAllCards()" style="background: #95a5a6; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; font-weight: 600;">
+                📁 Colapsar todas
+            </button>
+        </div>
+"""
+
+        # Iterar por cada elemento en orden de contribución (v6.4.0)
+        rank_existente = 0
+        for proceso_key in orden_contribucion_existente:
+            if proceso_key not in analisis_comp:
+                continue
+            data = analisis_comp[proceso_key]
+            if data['conversaciones_nov'] == 0 and data['conversaciones_dic'] == 0:
+                continue
+
+            rank_existente += 1
+            proceso = data['proceso']
+            proceso_id = proceso.replace(' ', '_').replace('-', '_').replace('[', '').replace(']', '').replace('(', '').replace(')', '')
+            inc_nov = data['incoming_nov']
+            inc_dic = data['incoming_dic']
+            var_casos = data['variacion_casos']
+            var_pct = data['variacion_pct']
+            total_conv = data['conversaciones_nov'] + data['conversaciones_dic']
+
+            # Obtener datos de contribución
+            contrib_pct_exist = 0
+            if df_orden_existente is not None and len(df_orden_existente) > 0:
+                row = df_orden_existente[df_orden_existente['DIMENSION_VAL'] == proceso_key]
+                if len(row) > 0:
+                    contrib_pct_exist = row['CONTRIB_ABS'].values[0] if pd.notna(row['CONTRIB_ABS'].values[0]) else 0
+
+            # Verificar si hay muestra insuficiente
+            muestra_insuficiente = total_conv < UMBRAL_MINIMO_CONVERSACIONES
+
+            # Calcular cobertura promedio
+            cobertura_nov = data['causas_nov'][0].get('porcentaje', 0) if len(data['causas_nov']) > 0 else 0
+            cobertura_total = sum([c['porcentaje'] for c in data['causas_nov'][:4]]) if len(data['causas_nov']) > 0 else 100
+
+            is_top_3_exist = rank_existente <= 3
+            is_expanded_exist = rank_existente == 1
+            expanded_class_exist = "expanded" if is_expanded_exist else ""
+            rank_class_exist = "top-3" if is_top_3_exist else ""
+
+            if var_casos < 0:
+                var_badge_class_exist = "positive"
+                var_badge_text_exist = f"✅ {var_casos:,} casos"
+            else:
+                var_badge_class_exist = "negative"
+                var_badge_text_exist = f"🔴 +{var_casos:,} casos"
+
+            html_content += f"""
+            <!-- CARD #{rank_existente}: {proceso} -->
+            <div class="analysis-card">
+                <div id="header_{proceso_id}" class="analysis-card-header {expanded_class_exist}" onclick="toggleAnalysisCard('{proceso_id}')">
+                    <div class="analysis-card-header-left">
+                        <div class="analysis-card-rank {rank_class_exist}">#{rank_existente}</div>
+                        <div>
+                            <div class="analysis-card-title">{proceso}</div>
+                            <div class="analysis-card-badges">
+                                <span class="analysis-card-badge contrib">📊 Contrib: {contrib_pct_exist:.1f}%</span>
+                                <span class="analysis-card-badge {var_badge_class_exist}">{var_badge_text_exist}</span>
+                                <span class="analysis-card-badge conv">💬 {total_conv} conv.</span>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="analysis-card-toggle">
+                        <svg width="16" height="16" viewBox="0 0 16 16" fill="#555">
+                            <path d="M4 6l4 4 4-4H4z"/>
+                        </svg>
+                    </div>
+                </div>
+                <div id="content_{proceso_id}" class="analysis-card-content {expanded_class_exist}">
+                    <div class="analysis-card-content-inner">
+                        <div class="metrics-row">
+                            <div class="metric-box">
+                                <div class="metric-box-label">Incoming {p1_label}</div>
+                                <div class="metric-box-value">{inc_nov:,}</div>
+                            </div>
+                            <div class="metric-box">
+                                <div class="metric-box-label">Incoming {p2_label}</div>
+                                <div class="metric-box-value">{inc_dic:,}</div>
+                            </div>
+                            <div class="metric-box {'variation-positive' if var_casos < 0 else 'variation-negative'}">
+                                <div class="metric-box-label">Variación</div>
+                                <div class="metric-box-value">{var_casos:+,} ({var_pct:+.1f}%)</div>
+                            </div>
+                            <div class="metric-box contrib">
+                                <div class="metric-box-label">Contrib. a Δ CR</div>
+                                <div class="metric-box-value">{contrib_pct_exist:.1f}%</div>
+                            </div>
+                        </div>
+"""
+
+            # Agregar alerta si muestra insuficiente
+            if muestra_insuficiente:
+                html_content += f"""
+                <div class="alert-box">
+                    <strong>⚠️ ADVERTENCIA - Muestra Insuficiente:</strong>
+                    <p>Se encontraron solo {total_conv} conversaciones (mínimo requerido: {UMBRAL_MINIMO_CONVERSACIONES}).
+                        Los patrones identificados pueden no ser representativos. Recomendamos validar con datos cuantitativos.</p>
+                </div>
+"""
+
+            # Continuar con insight principal solo si NO es muestra insuficiente
+            if not muestra_insuficiente and 'analisis_comparativo' in data:
+                html_content += f"""
+                <div class="insight-box">
+                    <strong>💡 Insight Principal:</strong>
+                    <p>{data['analisis_comparativo']['insight_principal']}</p>
+                </div>
+                
+                <table class="causa-table">
+                    <thead>
+                        <tr>
+                            <th rowspan="2">Patrón / Causa Raíz</th>
+                            <th colspan="2" class="col-periodo">{p1_label}</th>
+                            <th colspan="2" class="col-periodo">{p2_label}</th>
+                            <th rowspan="2">Var Casos</th>
+                            <th rowspan="2">Var %</th>
+                            <th rowspan="2">Δ Prop</th>
+                            <th rowspan="2">Contrib Δ</th>
+                            <th rowspan="2">Contrib CR</th>
+                        </tr>
+                        <tr>
+                            <th class="col-subheader">%</th>
+                            <th class="col-subheader">Casos</th>
+                            <th class="col-subheader">%</th>
+                            <th class="col-subheader">Casos</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+            # Crear diccionario para mapear causas entre períodos
+            causas_dict = {}
+
+            for causa_nov in data['causas_nov']:
+                causas_dict[causa_nov['causa']] = {
+                    'nov_pct': causa_nov['porcentaje'],
+                    'nov_casos': causa_nov['casos_estimados'],
+                    'dic_pct': 0,
+                    'dic_casos': 0,
+                    'causa_data_nov': causa_nov  # Guardar data completa
+                }
+
+            for causa_dic in data['causas_dic']:
+                if causa_dic['causa'] in causas_dict:
+                    causas_dict[causa_dic['causa']]['dic_pct'] = causa_dic['porcentaje']
+                    causas_dict[causa_dic['causa']]['dic_casos'] = causa_dic['casos_estimados']
+                    causas_dict[causa_dic['causa']]['causa_data_dic'] = causa_dic
+                else:
+                    causas_dict[causa_dic['causa']] = {
+                        'nov_pct': 0,
+                        'nov_casos': 0,
+                        'dic_pct': causa_dic['porcentaje'],
+                        'dic_casos': causa_dic['casos_estimados'],
+                        'causa_data_dic': causa_dic
+                    }
+
+            # v6.4.5: Ordenar por % de aparición en P2 (período más reciente) - mayor participación primero
+            causas_sorted = sorted(causas_dict.items(), key=lambda x: x[1]['dic_pct'], reverse=True)
+
+            # v6.4.7: Calcular suma de casos muestreados (no incoming total)
+            sum_casos_nov = sum(v['nov_casos'] for _, v in causas_sorted)
+            sum_casos_dic = sum(v['dic_casos'] for _, v in causas_sorted)
+            var_total_muestra = sum_casos_dic - sum_casos_nov  # v6.4.8: Para calcular contribuciones
+
+            for causa_nombre, valores in causas_sorted:
+                var_abs = valores['dic_casos'] - valores['nov_casos']
+                var_pct_causa = ((valores['dic_casos'] - valores['nov_casos']) / valores['nov_casos'] * 100) if valores['nov_casos'] > 0 else (100 if valores['dic_casos'] > 0 else 0)
+                cambio_prop = valores['dic_pct'] - valores['nov_pct']
+
+                # v6.4.8: Calcular contribuciones
+                contrib_delta = (var_abs / var_total_muestra * 100) if var_total_muestra != 0 else 0
+                contrib_cr_global = contrib_delta * contrib_pct_exist / 100 if contrib_pct_exist else 0
+
+                # Determinar clase CSS y color
+                if var_abs < 0:
+                    clase_var = "positive"
+                    color_var = "#00A650"
+                elif var_abs > 0:
+                    clase_var = "negative"
+                    color_var = "#E74C3C"
+                else:
+                    clase_var = ""
+                    color_var = "#666"
+
+                signo_abs = "" if var_abs < 0 else "+"
+                signo_prop = "" if cambio_prop < 0 else "+"
+
+                html_content += f"""
+                        <tr style="border-bottom: 1px solid #ddd;">
+                            <td style="padding: 10px; font-weight: 600; color: #2c3e50; border: 1px solid #ddd;">{causa_nombre}</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['nov_pct']}%</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['nov_casos']:,}</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['dic_pct']}%</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['dic_casos']:,}</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{signo_abs}{var_abs:,}</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{var_pct_causa:+.1f}%</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{signo_prop}{cambio_prop:+.0f} pp</td>
+                            <td style="padding: 10px; text-align: center; font-weight: 600; border: 1px solid #ddd;">{contrib_delta:.1f}%</td>
+                            <td style="padding: 10px; text-align: center; font-weight: 600; color: #3483FA; border: 1px solid #ddd;">{contrib_cr_global:.1f}%</td>
+                        </tr>
+"""
+
+            # Fila de totales (v6.4.7: usar suma de casos muestreados)
+            var_casos_muestra = sum_casos_dic - sum_casos_nov
+            var_pct_muestra = ((sum_casos_dic - sum_casos_nov) / sum_casos_nov * 100) if sum_casos_nov > 0 else 0
+            html_content += f"""
+                        <tr style="background: #f0f0f0; font-weight: bold; border-top: 2px solid #2c3e50;">
+                            <td style="padding: 12px; border: 1px solid #ddd;">TOTAL</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">100%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">{sum_casos_nov:,}</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">100%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">{sum_casos_dic:,}</td>
+                            <td style="padding: 12px; text-align: center; font-weight: bold; color: #00A650; border: 1px solid #ddd;">{var_casos_muestra:,}</td>
+                            <td style="padding: 12px; text-align: center; font-weight: bold; color: #00A650; border: 1px solid #ddd;">{var_pct_muestra:.1f}%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">-</td>
+                            <td style="padding: 12px; text-align: center; font-weight: 600; border: 1px solid #ddd;">100.0%</td>
+                            <td style="padding: 12px; text-align: center; font-weight: 600; color: #3483FA; border: 1px solid #ddd;">{contrib_pct_exist:.1f}%</td>
+                        </tr>
+                    </tbody>
+                </table>
+                
+                <div style="margin-top: 20px;">
+                    <h4 style="color: #2c3e50; margin-bottom: 12px; font-size: 16px;">📌 Evidencia Cualitativa con Citas</h4>
+"""
+
+            # Mostrar evidencia de las TOP causas (ordenadas por impacto)
+            causas_con_evidencia = []
+            for causa_nombre, valores in causas_sorted[:4]:  # Top 4 causas por impacto
+                # Buscar la causa en nov o dic para obtener citas
+                causa_data = valores.get('causa_data_nov') or valores.get('causa_data_dic')
+                if causa_data and 'citas' in causa_data and len(causa_data['citas']) > 0:
+                    causas_con_evidencia.append((causa_nombre, causa_data, valores))
+
+            # Mostrar primera cita de las top 2 causas
+            for i, (causa_nombre, causa_data, valores) in enumerate(causas_con_evidencia[:2]):
+                cita = causa_data['citas'][0]
+                fecha_str = f" ({cita['fecha']})" if 'fecha' in cita else ""
+
+                html_content += f"""
+                    <div style="background: white; padding: 15px; margin: 10px 0; border-left: 3px solid #3498db; border-radius: 5px;">
+                        <strong style="color: #2c3e50; font-size: 14px;">{causa_nombre}</strong>
+                        <p style="margin: 8px 0; font-size: 13px; color: #666;">{causa_data['descripcion']}</p>
+                        <div style="background: #f9f9f9; padding: 10px; margin-top: 8px; border-radius: 3px; font-size: 12px; font-style: italic; color: #555;">
+                            <span style="color: #3498db; font-weight: bold; font-style: normal;">Caso {cita['case_id']}{fecha_str}:</span> 
+                            {cita['texto']}
+                        </div>
+                    </div>
+"""
+
+            # Toggle para ver más citas
+            if len(causas_con_evidencia) > 2:
+                html_content += f"""
+                    <button id="btn_{proceso_id}" onclick="toggleCitas('{proceso_id}')" style="background: #3498db; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin: 15px 0; font-size: 13px;">
+                        Ver citas adicionales ▼
+                    </button>
+                    
+                    <div id="citas_{proceso_id}" style="display: none; margin-top: 15px;">
+"""
+
+                # Mostrar citas adicionales (causa 3, 4 y más citas de las top)
+                for i, (causa_nombre, causa_data, valores) in enumerate(causas_con_evidencia[2:], start=3):
+                    for cita in causa_data.get('citas', [])[:2]:  # Máx 2 citas por causa adicional
+                        fecha_str = f" ({cita['fecha']})" if 'fecha' in cita else ""
+                        html_content += f"""
+                        <div style="background: white; padding: 15px; margin: 10px 0; border-left: 3px solid #95a5a6; border-radius: 5px;">
+                            <strong style="color: #2c3e50; font-size: 14px;">{causa_nombre}</strong>
+                            <p style="margin: 8px 0; font-size: 13px; color: #666;">{causa_data['descripcion']}</p>
+                            <div style="background: #f9f9f9; padding: 10px; margin-top: 8px; border-radius: 3px; font-size: 12px; font-style: italic; color: #555;">
+                                <span style="color: #95a5a6; font-weight: bold; font-style: normal;">Caso {cita['case_id']}{fecha_str}:</span> 
+                                {cita['texto']}
+                            </div>
+                        </div>
+"""
+
+                html_content += """
+                    </div>
+"""
+
+            # Cerrar la card colapsable: analysis-card-content-inner, analysis-card-content, analysis-card
+            html_content += """
+                    </div>
+                </div>
+            </div>
+"""
+
+        html_content += """
+        </div>
+"""
+
+        print(f"[COMPARATIVO] Análisis comparativo con cards colapsables cargado (v6.4.0)")
+    else:
+        # ========================================
+        # GENERAR ANÁLISIS COMPARATIVO AUTOMÁTICAMENTE (v6.3.8 / v6.4.10)
+        # ========================================
+        if not pendientes:
+            print(f"\n[COMPARATIVO] Generando análisis comparativo fresco desde JSONs separados (v6.4.10)...")
+
+        # Verificar si existen análisis separados por período (v6.3.8)
+        json_p1_path = Path("output") / f"analisis_conversaciones_claude_{args.site.lower()}_{args.commerce_group.lower()}_{args.muestreo_dimension.lower()}_p1_{p1_mes}.json"
+        json_p2_path = Path("output") / f"analisis_conversaciones_claude_{args.site.lower()}_{args.commerce_group.lower()}_{args.muestreo_dimension.lower()}_p2_{p2_mes}.json"
+
+        # Fallback: verificar análisis básico conjunto (legacy)
+        json_basico_path = Path("output") / f"analisis_conversaciones_claude_{args.site.lower()}_{args.commerce_group.lower()}_{args.muestreo_dimension.lower()}_{p1_mes}_{p2_mes}.json"
+
+        # Cuadro de dimensión (necesario en ambos casos)
+        cuadro_dimension_path = Path("output") / f"cuadro_{args.muestreo_dimension.lower()}_{args.site.lower()}_{p1_start_dt.strftime('%Y%m')}.csv"
+
+        # PRIORIDAD 1: Usar análisis separados si existen (v6.3.8 - Detección de cambios reales)
+        if json_p1_path.exists() and json_p2_path.exists() and cuadro_dimension_path.exists() and len(conversaciones_por_proceso) > 0:
+            try:
+
+                scripts_dir = REPO_DIR / "scripts"
+                if str(scripts_dir) not in sys.path:
+                    sys.path.insert(0, str(scripts_dir))
+
+                from generar_analisis_comparativo_desde_separados import generar_comparativo
+
+                periodo_p1_str = f"{p1_start_dt.year}-{p1_start_dt.month:02d}"
+                periodo_p2_str = f"{p2_start_dt.year}-{p2_start_dt.month:02d}"
+
+                print(f"[AUTO-GEN] Usando análisis separados (v6.3.8 - detección de cambios de patrones)")
+
+                # Sanitizar BOM de JSONs antes de pasarlos al combinador externo
+                for _json_path in [json_p1_path, json_p2_path]:
+                    with open(_json_path, 'rb') as _f:
+                        _raw = _f.read()
+                    if _raw.startswith(b'\xef\xbb\xbf'):
+                        with open(_json_path, 'wb') as _f:
+                            _f.write(_raw[3:])
+                        print(f"[FIX] BOM removido de {_json_path.name}")
+
+                # Generar análisis comparativo desde análisis separados
+                analisis_comp = generar_comparativo(
+                    json_p1_path,
+                    json_p2_path,
+                    cuadro_dimension_path,
+                    periodo_p1_str,
+                    periodo_p2_str
+                )
+
+                # Guardar JSON comparativo
+                with open(analisis_comparativo_path, 'w', encoding='utf-8') as f:
+                    json.dump(analisis_comp, f, indent=2, ensure_ascii=False)
+
+                print(f"[AUTO-GEN] ✅ Análisis comparativo generado: {len(analisis_comp)} elementos")
+                print(f"[AUTO-GEN] Guardado en: {analisis_comparativo_path.name}")
+                print(f"[INFO] Porcentajes dinámicos por período (detecta cambios reales de patrones)")
+
+                # Ahora agregar al HTML con cards colapsables ordenadas por contribución (v6.4.0)
+
+                # Obtener orden por contribución desde el cuadro de dimensión
+                df_orden = None
+                if cuadro_dimension_path.exists():
+                    try:
+                        df_orden = pd.read_csv(cuadro_dimension_path)
+                        # Excluir "Otros" y "TOTAL" del ordenamiento
+                        df_orden = df_orden[~df_orden['DIMENSION_VAL'].str.contains('Otros|TOTAL', case=False, na=False)]
+                        # Ordenar por |VAR_CR| descendente (mayor impacto en CR primero) - v6.4.9
+                        df_orden = df_orden.sort_values('VAR_CR', key=lambda x: abs(x), ascending=False)
+                        orden_contribucion = df_orden['DIMENSION_VAL'].tolist()
+                    except Exception as e:
+                        print(f"[WARNING] No se pudo leer orden de contribución: {e}")
+                        orden_contribucion = list(analisis_comp.keys())
+                else:
+                    orden_contribucion = list(analisis_comp.keys())
+
+                # Determinar qué dimensión se está analizando
+                dimension_label = aperturas_list[-1] if aperturas_list else "Elemento"  # La última apertura es la más granular
+
+                html_content += f"""
+        <!-- ANÁLISIS COMPARATIVO DE PATRONES EN CARDS COLAPSABLES - v6.4.0 -->
+        <div class="section">
+            <h2>🔍 Análisis Comparativo por {dimension_label}</h2>
+            <p style="margin-bottom: 20px; font-size: 15px; color: #555;">
+                Cada card representa un elemento de <strong>{dimension_label}</strong>, ordenado por su <strong>contribución a la variación de CR</strong> (de mayor a menor impacto).
+                Haz clic en cada card para expandir el análisis detallado con causas raíz y evidencia cualitativa.
+            </p>
+        
+        <script>
+            function toggleAnalysisCard(cardId) {{
+                var header = document.getElementById('header_' + cardId);
+                var content = document.getElementById('content_' + cardId);
+                var isExpanded = header.classList.contains('expanded');
+                
+                if (isExpanded) {{
+                    header.classList.remove('expanded');
+                    content.classList.remove('expanded');
+                }} else {{
+                    header.classList.add('expanded');
+                    content.classList.add('expanded');
+                }}
+            }}
+            
+            function toggleCitas(procesoid) {{
+                var elem = document.getElementById('citas_' + procesoid);
+                var btn = document.getElementById('btn_' + procesoid);
+                if (elem.style.display === 'none') {{
+                    elem.style.display = 'block';
+                    btn.innerHTML = 'Ocultar citas adicionales ▲';
+                }} else {{
+                    elem.style.display = 'none';
+                    btn.innerHTML = 'Ver citas adicionales ▼';
+                }}
+            }}
+            
+            function expandAllCards() {{
+                var headers = document.querySelectorAll('.analysis-card-header');
+                var contents = document.querySelectorAll('.analysis-card-content');
+                headers.forEach(function(h) {{ h.classList.add('expanded'); }});
+                contents.forEach(function(c) {{ c.classList.add('expanded'); }});
+            }}
+            
+            function collapseAllCards() {{
+                var headers = document.querySelectorAll('.analysis-card-header');
+                var contents = document.querySelectorAll('.analysis-card-content');
+                headers.forEach(function(h) {{ h.classList.remove('expanded'); }});
+                contents.forEach(function(c) {{ c.classList.remove('expanded'); }});
+            }}
+        </script>
+        
+        <div style="margin-bottom: 20px; display: flex; gap: 10px;">
+            <button onclick="expandAllCards()" style="background: #3498db; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; font-weight: 600;">
+                📂 Expandir todas
+            </button>
+            <button onclick="collapseAllCards()" style="background: #95a5a6; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; font-weight: 600;">
+                📁 Colapsar todas
+            </button>
+        </div>
+"""
+
+                # Iterar por cada elemento en orden de contribución
+                rank = 0
+                for proceso_key in orden_contribucion:
+                    if proceso_key not in analisis_comp:
+                        continue
+                    data = analisis_comp[proceso_key]
+                    if data['conversaciones_nov'] == 0 and data['conversaciones_dic'] == 0:
+                        continue
+
+                    rank += 1
+                    proceso = data['proceso']
+                    proceso_id = proceso.replace(' ', '_').replace('-', '_').replace('[', '').replace(']', '').replace('(', '').replace(')', '')
+                    inc_nov = data['incoming_nov']
+                    inc_dic = data['incoming_dic']
+                    var_casos = data['variacion_casos']
+                    var_pct = data['variacion_pct']
+                    total_conv = data['conversaciones_nov'] + data['conversaciones_dic']
+
+                    # Obtener datos de contribución del cuadro
+                    contrib_pct = 0
+                    var_cr_pp = 0
+                    if df_orden is not None and len(df_orden) > 0:
+                        row = df_orden[df_orden['DIMENSION_VAL'] == proceso_key]
+                        if len(row) > 0:
+                            contrib_pct = row['CONTRIB_ABS'].values[0] if pd.notna(row['CONTRIB_ABS'].values[0]) else 0
+                            var_cr_pp = row['VAR_CR'].values[0] * 100 if pd.notna(row['VAR_CR'].values[0]) else 0  # Convertir a pp
+
+                    # Verificar si hay muestra insuficiente
+                    muestra_insuficiente = total_conv < UMBRAL_MINIMO_CONVERSACIONES
+
+                    # Calcular cobertura promedio
+                    cobertura_nov = data['causas_nov'][0].get('porcentaje', 0) if len(data['causas_nov']) > 0 else 0
+                    cobertura_total = sum([c['porcentaje'] for c in data['causas_nov'][:4]]) if len(data['causas_nov']) > 0 else 100
+
+                    # Determinar si es top 3 y estado expandido (solo el primero expandido por defecto)
+                    is_top_3 = rank <= 3
+                    is_expanded = rank == 1  # Solo el primero expandido
+                    expanded_class = "expanded" if is_expanded else ""
+                    rank_class = "top-3" if is_top_3 else ""
+
+                    # Badge de variación
+                    if var_casos < 0:
+                        var_badge_class = "positive"
+                        var_badge_text = f"✅ {var_casos:,} casos"
+                    else:
+                        var_badge_class = "negative"
+                        var_badge_text = f"🔴 +{var_casos:,} casos"
+
+                    html_content += f"""
+            <!-- CARD #{rank}: {proceso} -->
+            <div class="analysis-card">
+                <div id="header_{proceso_id}" class="analysis-card-header {expanded_class}" onclick="toggleAnalysisCard('{proceso_id}')">
+                    <div class="analysis-card-header-left">
+                        <div class="analysis-card-rank {rank_class}">#{rank}</div>
+                        <div>
+                            <div class="analysis-card-title">{proceso}</div>
+                            <div class="analysis-card-badges">
+                                <span class="analysis-card-badge contrib">📊 Contrib: {contrib_pct:.1f}%</span>
+                                <span class="analysis-card-badge {var_badge_class}">{var_badge_text}</span>
+                                <span class="analysis-card-badge conv">💬 {total_conv} conv.</span>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="analysis-card-toggle">
+                        <svg width="16" height="16" viewBox="0 0 16 16" fill="#555">
+                            <path d="M4 6l4 4 4-4H4z"/>
+                        </svg>
+                    </div>
+                </div>
+                <div id="content_{proceso_id}" class="analysis-card-content {expanded_class}">
+                    <div class="analysis-card-content-inner">
+                        <div class="metrics-row">
+                            <div class="metric-box">
+                                <div class="metric-box-label">Incoming {p1_label}</div>
+                                <div class="metric-box-value">{inc_nov:,}</div>
+                            </div>
+                            <div class="metric-box">
+                                <div class="metric-box-label">Incoming {p2_label}</div>
+                                <div class="metric-box-value">{inc_dic:,}</div>
+                            </div>
+                            <div class="metric-box {'variation-positive' if var_casos < 0 else 'variation-negative'}">
+                                <div class="metric-box-label">Variación</div>
+                                <div class="metric-box-value">{var_casos:+,} ({var_pct:+.1f}%)</div>
+                            </div>
+                            <div class="metric-box contrib">
+                                <div class="metric-box-label">Contrib. a Δ CR</div>
+                                <div class="metric-box-value">{contrib_pct:.1f}%</div>
+                            </div>
+                        </div>
+"""
+
+                    # Agregar alerta si muestra insuficiente
+                    if muestra_insuficiente:
+                        html_content += f"""
+                <div class="alert-box">
+                    <strong>⚠️ ADVERTENCIA - Muestra Insuficiente:</strong>
+                    <p>Se encontraron solo {total_conv} conversaciones (mínimo requerido: {UMBRAL_MINIMO_CONVERSACIONES}).
+                        Los patrones identificados pueden no ser representativos. Recomendamos validar con datos cuantitativos.</p>
+                </div>
+"""
+
+                    # Continuar con insight principal solo si NO es muestra insuficiente
+                    if not muestra_insuficiente and 'analisis_comparativo' in data:
+                        html_content += f"""
+                <div class="insight-box">
+                    <strong>💡 Insight Principal:</strong>
+                    <p>{data['analisis_comparativo']['insight_principal']}</p>
+                </div>
+"""
+
+                    # Generar tabla comparativa
+                    html_content += f"""
+                <table class="causa-table">
+                    <thead>
+                        <tr>
+                            <th rowspan="2">Patrón / Causa Raíz</th>
+                            <th colspan="2" class="col-periodo">{p1_label}</th>
+                            <th colspan="2" class="col-periodo">{p2_label}</th>
+                            <th rowspan="2">Var Casos</th>
+                            <th rowspan="2">Var %</th>
+                            <th rowspan="2">Δ Prop</th>
+                            <th rowspan="2">Contrib Δ</th>
+                            <th rowspan="2">Contrib CR</th>
+                        </tr>
+                        <tr>
+                            <th class="col-subheader">%</th>
+                            <th class="col-subheader">Casos</th>
+                            <th class="col-subheader">%</th>
+                            <th class="col-subheader">Casos</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+                    # Crear diccionario para mapear causas entre períodos
+                    causas_dict = {}
+
+                    for causa_nov in data['causas_nov']:
+                        causas_dict[causa_nov['causa']] = {
+                            'nov_pct': causa_nov['porcentaje'],
+                            'nov_casos': causa_nov['casos_estimados'],
+                            'dic_pct': 0,
+                            'dic_casos': 0,
+                            'causa_data_nov': causa_nov
+                        }
+
+                    for causa_dic in data['causas_dic']:
+                        if causa_dic['causa'] in causas_dict:
+                            causas_dict[causa_dic['causa']]['dic_pct'] = causa_dic['porcentaje']
+                            causas_dict[causa_dic['causa']]['dic_casos'] = causa_dic['casos_estimados']
+                            causas_dict[causa_dic['causa']]['causa_data_dic'] = causa_dic
+                        else:
+                            causas_dict[causa_dic['causa']] = {
+                                'nov_pct': 0,
+                                'nov_casos': 0,
+                                'dic_pct': causa_dic['porcentaje'],
+                                'dic_casos': causa_dic['casos_estimados'],
+                                'causa_data_dic': causa_dic
+                            }
+
+                    # v6.4.5: Ordenar por % de aparición en P2 (período más reciente) - mayor participación primero
+                    causas_sorted = sorted(causas_dict.items(), key=lambda x: x[1]['dic_pct'], reverse=True)
+
+                    # v6.4.7: Calcular suma de casos muestreados (no incoming total)
+                    sum_casos_nov = sum(v['nov_casos'] for _, v in causas_sorted)
+                    sum_casos_dic = sum(v['dic_casos'] for _, v in causas_sorted)
+                    var_total_muestra = sum_casos_dic - sum_casos_nov  # v6.4.8: Para calcular contribuciones
+
+                    for causa_nombre, valores in causas_sorted:
+                        var_abs = valores['dic_casos'] - valores['nov_casos']
+                        var_pct_causa = ((valores['dic_casos'] - valores['nov_casos']) / valores['nov_casos'] * 100) if valores['nov_casos'] > 0 else (100 if valores['dic_casos'] > 0 else 0)
+                        cambio_prop = valores['dic_pct'] - valores['nov_pct']
+
+                        # v6.4.8: Calcular contribuciones
+                        contrib_delta = (var_abs / var_total_muestra * 100) if var_total_muestra != 0 else 0
+                        contrib_cr_global = contrib_delta * contrib_pct / 100 if contrib_pct else 0
+
+                        if var_abs < 0:
+                            color_var = "#00A650"
+                        elif var_abs > 0:
+                            color_var = "#E74C3C"
+                        else:
+                            color_var = "#666"
+
+                        signo_abs = "" if var_abs < 0 else "+"
+                        signo_prop = "" if cambio_prop < 0 else "+"
+
+                        html_content += f"""
+                        <tr style="border-bottom: 1px solid #ddd;">
+                            <td style="padding: 10px; font-weight: 600; color: #2c3e50; border: 1px solid #ddd;">{causa_nombre}</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['nov_pct']}%</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['nov_casos']:,}</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['dic_pct']}%</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['dic_casos']:,}</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{signo_abs}{var_abs:,}</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{var_pct_causa:+.1f}%</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{signo_prop}{cambio_prop:+.0f} pp</td>
+                            <td style="padding: 10px; text-align: center; font-weight: 600; border: 1px solid #ddd;">{contrib_delta:.1f}%</td>
+                            <td style="padding: 10px; text-align: center; font-weight: 600; color: #3483FA; border: 1px solid #ddd;">{contrib_cr_global:.1f}%</td>
+                        </tr>
+"""
+
+                    # Fila totales (v6.4.7: usar suma de casos muestreados)
+                    var_casos_muestra = sum_casos_dic - sum_casos_nov
+                    var_pct_muestra = ((sum_casos_dic - sum_casos_nov) / sum_casos_nov * 100) if sum_casos_nov > 0 else 0
+                    html_content += f"""
+                        <tr style="background: #f0f0f0; font-weight: bold; border-top: 2px solid #2c3e50;">
+                            <td style="padding: 12px; border: 1px solid #ddd;">TOTAL</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">100%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">{sum_casos_nov:,}</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">100%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">{sum_casos_dic:,}</td>
+                            <td style="padding: 12px; text-align: center; font-weight: bold; color: #00A650; border: 1px solid #ddd;">{var_casos_muestra:,}</td>
+                            <td style="padding: 12px; text-align: center; font-weight: bold; color: #00A650; border: 1px solid #ddd;">{var_pct_muestra:.1f}%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">-</td>
+                            <td style="padding: 12px; text-align: center; font-weight: 600; border: 1px solid #ddd;">100.0%</td>
+                            <td style="padding: 12px; text-align: center; font-weight: 600; color: #3483FA; border: 1px solid #ddd;">{contrib_pct:.1f}%</td>
+                        </tr>
+                    </tbody>
+                </table>
+                
+                <div style="margin-top: 20px;">
+                    <h4 style="color: #2c3e50; margin-bottom: 12px; font-size: 16px;">📌 Evidencia Cualitativa con Citas</h4>
+"""
+
+                    # Evidencia con citas (top 2 causas visibles)
+                    causas_con_evidencia = []
+                    for causa_nombre, valores in causas_sorted[:4]:
+                        causa_data = valores.get('causa_data_nov') or valores.get('causa_data_dic')
+                        if causa_data and 'citas' in causa_data and len(causa_data['citas']) > 0:
+                            causas_con_evidencia.append((causa_nombre, causa_data, valores))
+
+                    for i, (causa_nombre, causa_data, valores) in enumerate(causas_con_evidencia[:2]):
+                        cita = causa_data['citas'][0]
+                        fecha_str = f" ({cita['fecha']})" if 'fecha' in cita else ""
+
+                        html_content += f"""
+                    <div style="background: white; padding: 15px; margin: 10px 0; border-left: 3px solid #3498db; border-radius: 5px;">
+                        <strong style="color: #2c3e50; font-size: 14px;">{causa_nombre}</strong>
+                        <p style="margin: 8px 0; font-size: 13px; color: #666;">{causa_data['descripcion']}</p>
+                        <div style="background: #f9f9f9; padding: 10px; margin-top: 8px; border-radius: 3px; font-size: 12px; font-style: italic; color: #555;">
+                            <span style="color: #3498db; font-weight: bold; font-style: normal;">Caso {cita['case_id']}{fecha_str}:</span> 
+                            {cita['texto']}
+                        </div>
+                    </div>
+"""
+
+                    if len(causas_con_evidencia) > 2:
+                        html_content += f"""
+                    <button id="btn_{proceso_id}" onclick="toggleCitas('{proceso_id}')" style="background: #3498db; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin: 15px 0; font-size: 13px;">
+                        Ver citas adicionales ▼
+                    </button>
+                    <div id="citas_{proceso_id}" style="display: none; margin-top: 15px;">
+"""
+                        for i, (causa_nombre, causa_data, valores) in enumerate(causas_con_evidencia[2:], start=3):
+                            for cita in causa_data.get('citas', [])[:2]:
+                                fecha_str = f" ({cita['fecha']})" if 'fecha' in cita else ""
+                                html_content += f"""
+                        <div style="background: white; padding: 15px; margin: 10px 0; border-left: 3px solid #95a5a6; border-radius: 5px;">
+                            <strong style="color: #2c3e50; font-size: 14px;">{causa_nombre}</strong>
+                            <p style="margin: 8px 0; font-size: 13px; color: #666;">{causa_data['descripcion']}</p>
+                            <div style="background: #f9f9f9; padding: 10px; margin-top: 8px; border-radius: 3px; font-size: 12px; font-style: italic; color: #555;">
+                                <span style="color: #95a5a6; font-weight: bold; font-style: normal;">Caso {cita['case_id']}{fecha_str}:</span> 
+                                {cita['texto']}
+                            </div>
+                        </div>
+"""
+                        html_content += """
+                    </div>
+"""
+
+                    # Cerrar la card colapsable: analysis-card-content-inner, analysis-card-content, analysis-card
+                    html_content += """
+                    </div>
+                </div>
+            </div>
+"""
+
+                html_content += """
+        </div>
+"""
+
+                print(f"[COMPARATIVO] Análisis comparativo con cards colapsables agregado al reporte (v6.4.0)")
+
+            except Exception as e:
+                print(f"[ERROR] No se pudo generar análisis comparativo automáticamente: {e}")
+                print(f"[INFO] Continuando sin análisis comparativo")
+
+        # FALLBACK: Usar análisis básico conjunto (legacy - asume patrones constantes)
+        elif json_basico_path.exists() and cuadro_dimension_path.exists() and len(conversaciones_por_proceso) > 0:
+            try:
+
+                scripts_dir = REPO_DIR / "scripts"
+                if str(scripts_dir) not in sys.path:
+                    sys.path.insert(0, str(scripts_dir))
+
+                from generar_analisis_comparativo_auto import generar_analisis_comparativo
+
+                periodo_p1_str = f"{p1_start_dt.year}-{p1_start_dt.month:02d}"
+                periodo_p2_str = f"{p2_start_dt.year}-{p2_start_dt.month:02d}"
+
+                print(f"[AUTO-GEN] Usando análisis conjunto (legacy - sin detección de cambios de patrones)")
+                print(f"[WARNING] Para análisis mejorado, usa análisis separado por período (v6.3.8+)")
+
+                # Generar análisis comparativo desde análisis conjunto
+                analisis_comp = generar_analisis_comparativo(
+                    json_basico_path,
+                    cuadro_dimension_path,
+                    Path("output"),
+                    periodo_p1_str,
+                    periodo_p2_str
+                )
+
+                # Guardar JSON comparativo
+                with open(analisis_comparativo_path, 'w', encoding='utf-8') as f:
+                    json.dump(analisis_comp, f, indent=2, ensure_ascii=False)
+
+                print(f"[AUTO-GEN] ⚠️  Análisis comparativo generado: {len(analisis_comp)} elementos")
+                print(f"[AUTO-GEN] Guardado en: {analisis_comparativo_path.name}")
+
+                # Obtener orden por contribución desde el cuadro de dimensión (v6.4.0 legacy)
+                df_orden_legacy = None
+                if cuadro_dimension_path.exists():
+                    try:
+                        df_orden_legacy = pd.read_csv(cuadro_dimension_path)
+                        df_orden_legacy = df_orden_legacy[~df_orden_legacy['DIMENSION_VAL'].str.contains('Otros|TOTAL', case=False, na=False)]
+                        # Ordenar por |VAR_CR| descendente (mayor impacto en CR primero) - v6.4.9
+                        df_orden_legacy = df_orden_legacy.sort_values('VAR_CR', key=lambda x: abs(x), ascending=False)
+                        orden_contribucion_legacy = df_orden_legacy['DIMENSION_VAL'].tolist()
+                    except:
+                        orden_contribucion_legacy = list(analisis_comp.keys())
+                else:
+                    orden_contribucion_legacy = list(analisis_comp.keys())
+
+                dimension_label_legacy = aperturas_list[-1] if aperturas_list else "Elemento"
+
+                # Ahora agregar al HTML con cards colapsables (v6.4.0)
+                html_content += f"""
+        <!-- ANÁLISIS COMPARATIVO CON CARDS COLAPSABLES - v6.4.0 LEGACY -->
+        <div class="section">
+            <h2>🔍 Análisis Comparativo por {dimension_label_legacy}</h2>
+            <p style="margin-bottom: 20px; font-size: 15px; color: #555;">
+                Cada card representa un elemento de <strong>{dimension_label_legacy}</strong>, ordenado por su <strong>contribución a la variación de CR</strong>.
+                Haz clic para expandir el análisis detallado.
+            </p>
+        
+        <script>
+            function toggleAnalysisCard(cardId) {{
+                var header = document.getElementById('header_' + cardId);
+                var content = document.getElementById('content_' + cardId);
+                var isExpanded = header.classList.contains('expanded');
+                
+                if (isExpanded) {{
+                    header.classList.remove('expanded');
+                    content.classList.remove('expanded');
+                }} else {{
+                    header.classList.add('expanded');
+                    content.classList.add('expanded');
+                }}
+            }}
+            
+            function toggleCitas(procesoid) {{
+                var elem = document.getElementById('citas_' + procesoid);
+                var btn = document.getElementById('btn_' + procesoid);
+                if (elem.style.display === 'none') {{
+                    elem.style.display = 'block';
+                    btn.innerHTML = 'Ocultar citas adicionales ▲';
+                }} else {{
+                    elem.style.display = 'none';
+                    btn.innerHTML = 'Ver citas adicionales ▼';
+                }}
+            }}
+            
+            function expandAllCards() {{
+                var headers = document.querySelectorAll('.analysis-card-header');
+                var contents = document.querySelectorAll('.analysis-card-content');
+                headers.forEach(function(h) {{ h.classList.add('expanded'); }});
+                contents.forEach(function(c) {{ c.classList.add('expanded'); }});
+            }}
+            
+            function collapseAllCards() {{
+                var headers = document.querySelectorAll('.analysis-card-header');
+                var contents = document.querySelectorAll('.analysis-card-content');
+                headers.forEach(function(h) {{ h.classList.remove('expanded'); }});
+                contents.forEach(function(c) {{ c.classList.remove('expanded'); }});
+            }}
+        </script>
+        
+        <div style="margin-bottom: 20px; display: flex; gap: 10px;">
+            <button onclick="expandAllCards()" style="background: #3498db; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; font-weight: 600;">
+                📂 Expandir todas
+            </button>
+            <button onclick="collapseAllCards()" style="background: #95a5a6; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; font-weight: 600;">
+                📁 Colapsar todas
+            </button>
+        </div>
+"""
+
+                # Iterar por cada elemento en orden de contribución (v6.4.0)
+                rank_legacy = 0
+                for proceso_key in orden_contribucion_legacy:
+                    if proceso_key not in analisis_comp:
+                        continue
+                    data = analisis_comp[proceso_key]
+                    if data['conversaciones_nov'] == 0 and data['conversaciones_dic'] == 0:
+                        continue
+
+                    rank_legacy += 1
+                    proceso = data['proceso']
+                    proceso_id = proceso.replace(' ', '_').replace('-', '_').replace('[', '').replace(']', '').replace('(', '').replace(')', '')
+                    inc_nov = data['incoming_nov']
+                    inc_dic = data['incoming_dic']
+                    var_casos = data['variacion_casos']
+                    var_pct = data['variacion_pct']
+                    total_conv = data['conversaciones_nov'] + data['conversaciones_dic']
+
+                    # Obtener datos de contribución
+                    contrib_pct_legacy = 0
+                    if df_orden_legacy is not None and len(df_orden_legacy) > 0:
+                        row = df_orden_legacy[df_orden_legacy['DIMENSION_VAL'] == proceso_key]
+                        if len(row) > 0:
+                            contrib_pct_legacy = row['CONTRIB_ABS'].values[0] if pd.notna(row['CONTRIB_ABS'].values[0]) else 0
+
+                    # Verificar si hay muestra insuficiente
+                    muestra_insuficiente = total_conv < UMBRAL_MINIMO_CONVERSACIONES
+
+                    # Calcular cobertura promedio
+                    cobertura_nov = data['causas_nov'][0].get('porcentaje', 0) if len(data['causas_nov']) > 0 else 0
+                    cobertura_total = sum([c['porcentaje'] for c in data['causas_nov'][:4]]) if len(data['causas_nov']) > 0 else 100
+
+                    is_top_3_legacy = rank_legacy <= 3
+                    is_expanded_legacy = rank_legacy == 1
+                    expanded_class_legacy = "expanded" if is_expanded_legacy else ""
+                    rank_class_legacy = "top-3" if is_top_3_legacy else ""
+
+                    if var_casos < 0:
+                        var_badge_class_legacy = "positive"
+                        var_badge_text_legacy = f"✅ {var_casos:,} casos"
+                    else:
+                        var_badge_class_legacy = "negative"
+                        var_badge_text_legacy = f"🔴 +{var_casos:,} casos"
+
+                    html_content += f"""
+            <!-- CARD #{rank_legacy}: {proceso} (LEGACY) -->
+            <div class="analysis-card">
+                <div id="header_{proceso_id}" class="analysis-card-header {expanded_class_legacy}" onclick="toggleAnalysisCard('{proceso_id}')">
+                    <div class="analysis-card-header-left">
+                        <div class="analysis-card-rank {rank_class_legacy}">#{rank_legacy}</div>
+                        <div>
+                            <div class="analysis-card-title">{proceso}</div>
+                            <div class="analysis-card-badges">
+                                <span class="analysis-card-badge contrib">📊 Contrib: {contrib_pct_legacy:.1f}%</span>
+                                <span class="analysis-card-badge {var_badge_class_legacy}">{var_badge_text_legacy}</span>
+                                <span class="analysis-card-badge conv">💬 {total_conv} conv.</span>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="analysis-card-toggle">
+                        <svg width="16" height="16" viewBox="0 0 16 16" fill="#555">
+                            <path d="M4 6l4 4 4-4H4z"/>
+                        </svg>
+                    </div>
+                </div>
+                <div id="content_{proceso_id}" class="analysis-card-content {expanded_class_legacy}">
+                    <div class="analysis-card-content-inner">
+                        <div class="metrics-row">
+                            <div class="metric-box">
+                                <div class="metric-box-label">Incoming {p1_label}</div>
+                                <div class="metric-box-value">{inc_nov:,}</div>
+                            </div>
+                            <div class="metric-box">
+                                <div class="metric-box-label">Incoming {p2_label}</div>
+                                <div class="metric-box-value">{inc_dic:,}</div>
+                            </div>
+                            <div class="metric-box {'variation-positive' if var_casos < 0 else 'variation-negative'}">
+                                <div class="metric-box-label">Variación</div>
+                                <div class="metric-box-value">{var_casos:+,} ({var_pct:+.1f}%)</div>
+                            </div>
+                            <div class="metric-box contrib">
+                                <div class="metric-box-label">Contrib. a Δ CR</div>
+                                <div class="metric-box-value">{contrib_pct_legacy:.1f}%</div>
+                            </div>
+                        </div>
+"""
+
+                    # Agregar alerta si muestra insuficiente
+                    if muestra_insuficiente:
+                        html_content += f"""
+                <div class="alert-box">
+                    <strong>⚠️ ADVERTENCIA - Muestra Insuficiente:</strong>
+                    <p>Se encontraron solo {total_conv} conversaciones (mínimo requerido: {UMBRAL_MINIMO_CONVERSACIONES}).
+                        Los patrones identificados pueden no ser representativos. Recomendamos validar con datos cuantitativos.</p>
+                </div>
+"""
+
+                    # Continuar con insight principal solo si NO es muestra insuficiente
+                    if not muestra_insuficiente and 'analisis_comparativo' in data:
+                        html_content += f"""
+                <div class="insight-box">
+                    <strong>💡 Insight Principal:</strong>
+                    <p>{data['analisis_comparativo']['insight_principal']}</p>
+                </div>
+"""
+
+                    # Generar tabla comparativa (mismo código que líneas 1534-1678)
+                    html_content += f"""
+                <table class="causa-table">
+                    <thead>
+                        <tr>
+                            <th rowspan="2">Patrón / Causa Raíz</th>
+                            <th colspan="2" class="col-periodo">{p1_label}</th>
+                            <th colspan="2" class="col-periodo">{p2_label}</th>
+                            <th rowspan="2">Var Casos</th>
+                            <th rowspan="2">Var %</th>
+                            <th rowspan="2">Δ Prop</th>
+                            <th rowspan="2">Contrib Δ</th>
+                            <th rowspan="2">Contrib CR</th>
+                        </tr>
+                        <tr>
+                            <th class="col-subheader">%</th>
+                            <th class="col-subheader">Casos</th>
+                            <th class="col-subheader">%</th>
+                            <th class="col-subheader">Casos</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+"""
+
+                    # Crear diccionario para mapear causas entre períodos
+                    causas_dict = {}
+
+                    for causa_nov in data['causas_nov']:
+                        causas_dict[causa_nov['causa']] = {
+                            'nov_pct': causa_nov['porcentaje'],
+                            'nov_casos': causa_nov['casos_estimados'],
+                            'dic_pct': 0,
+                            'dic_casos': 0,
+                            'causa_data_nov': causa_nov
+                        }
+
+                    for causa_dic in data['causas_dic']:
+                        if causa_dic['causa'] in causas_dict:
+                            causas_dict[causa_dic['causa']]['dic_pct'] = causa_dic['porcentaje']
+                            causas_dict[causa_dic['causa']]['dic_casos'] = causa_dic['casos_estimados']
+                            causas_dict[causa_dic['causa']]['causa_data_dic'] = causa_dic
+                        else:
+                            causas_dict[causa_dic['causa']] = {
+                                'nov_pct': 0,
+                                'nov_casos': 0,
+                                'dic_pct': causa_dic['porcentaje'],
+                                'dic_casos': causa_dic['casos_estimados'],
+                                'causa_data_dic': causa_dic
+                            }
+
+                    # v6.4.5: Ordenar por % de aparición en P2 (período más reciente) - mayor participación primero
+                    causas_sorted = sorted(causas_dict.items(), key=lambda x: x[1]['dic_pct'], reverse=True)
+
+                    # v6.4.7: Calcular suma de casos muestreados (no incoming total)
+                    sum_casos_nov = sum(v['nov_casos'] for _, v in causas_sorted)
+                    sum_casos_dic = sum(v['dic_casos'] for _, v in causas_sorted)
+                    var_total_muestra = sum_casos_dic - sum_casos_nov  # v6.4.8: Para calcular contribuciones
+
+                    for causa_nombre, valores in causas_sorted:
+                        var_abs = valores['dic_casos'] - valores['nov_casos']
+                        var_pct_causa = ((valores['dic_casos'] - valores['nov_casos']) / valores['nov_casos'] * 100) if valores['nov_casos'] > 0 else (100 if valores['dic_casos'] > 0 else 0)
+                        cambio_prop = valores['dic_pct'] - valores['nov_pct']
+
+                        # v6.4.8: Calcular contribuciones
+                        contrib_delta = (var_abs / var_total_muestra * 100) if var_total_muestra != 0 else 0
+                        contrib_cr_global = contrib_delta * contrib_pct_legacy / 100 if contrib_pct_legacy else 0
+
+                        if var_abs < 0:
+                            color_var = "#00A650"
+                        elif var_abs > 0:
+                            color_var = "#E74C3C"
+                        else:
+                            color_var = "#666"
+
+                        signo_abs = "" if var_abs < 0 else "+"
+                        signo_prop = "" if cambio_prop < 0 else "+"
+
+                        html_content += f"""
+                        <tr style="border-bottom: 1px solid #ddd;">
+                            <td style="padding: 10px; font-weight: 600; color: #2c3e50; border: 1px solid #ddd;">{causa_nombre}</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['nov_pct']}%</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['nov_casos']:,}</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['dic_pct']}%</td>
+                            <td style="padding: 10px; text-align: center; border: 1px solid #ddd;">{valores['dic_casos']:,}</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{signo_abs}{var_abs:,}</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{var_pct_causa:+.1f}%</td>
+                            <td style="padding: 10px; text-align: center; font-weight: bold; color: {color_var}; border: 1px solid #ddd;">{signo_prop}{cambio_prop:+.0f} pp</td>
+                            <td style="padding: 10px; text-align: center; font-weight: 600; border: 1px solid #ddd;">{contrib_delta:.1f}%</td>
+                            <td style="padding: 10px; text-align: center; font-weight: 600; color: #3483FA; border: 1px solid #ddd;">{contrib_cr_global:.1f}%</td>
+                        </tr>
+"""
+
+                    # Fila totales (v6.4.7: usar suma de casos muestreados)
+                    var_casos_muestra = sum_casos_dic - sum_casos_nov
+                    var_pct_muestra = ((sum_casos_dic - sum_casos_nov) / sum_casos_nov * 100) if sum_casos_nov > 0 else 0
+                    html_content += f"""
+                        <tr style="background: #f0f0f0; font-weight: bold; border-top: 2px solid #2c3e50;">
+                            <td style="padding: 12px; border: 1px solid #ddd;">TOTAL</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">100%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">{sum_casos_nov:,}</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">100%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">{sum_casos_dic:,}</td>
+                            <td style="padding: 12px; text-align: center; font-weight: bold; color: #00A650; border: 1px solid #ddd;">{var_casos_muestra:,}</td>
+                            <td style="padding: 12px; text-align: center; font-weight: bold; color: #00A650; border: 1px solid #ddd;">{var_pct_muestra:.1f}%</td>
+                            <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">-</td>
+                            <td style="padding: 12px; text-align: center; font-weight: 600; border: 1px solid #ddd;">100.0%</td>
+                            <td style="padding: 12px; text-align: center; font-weight: 600; color: #3483FA; border: 1px solid #ddd;">{contrib_pct_legacy:.1f}%</td>
+                        </tr>
+                    </tbody>
+                </table>
+                
+                <div style="margin-top: 20px;">
+                    <h4 style="color: #2c3e50; margin-bottom: 12px; font-size: 16px;">📌 Evidencia Cualitativa con Citas</h4>
+"""
+
+                    # Evidencia con citas (top 2 causas visibles)
+                    causas_con_evidencia = []
+                    for causa_nombre, valores in causas_sorted[:4]:
+                        causa_data = valores.get('causa_data_nov') or valores.get('causa_data_dic')
+                        if causa_data and 'citas' in causa_data and len(causa_data['citas']) > 0:
+                            causas_con_evidencia.append((causa_nombre, causa_data, valores))
+
+                    for i, (causa_nombre, causa_data, valores) in enumerate(causas_con_evidencia[:2]):
+                        cita = causa_data['citas'][0]
+                        fecha_str = f" ({cita['fecha']})" if 'fecha' in cita else ""
+
+                        html_content += f"""
+                    <div style="background: white; padding: 15px; margin: 10px 0; border-left: 3px solid #3498db; border-radius: 5px;">
+                        <strong style="color: #2c3e50; font-size: 14px;">{causa_nombre}</strong>
+                        <p style="margin: 8px 0; font-size: 13px; color: #666;">{causa_data['descripcion']}</p>
+                        <div style="background: #f9f9f9; padding: 10px; margin-top: 8px; border-radius: 3px; font-size: 12px; font-style: italic; color: #555;">
+                            <span style="color: #3498db; font-weight: bold; font-style: normal;">Caso {cita['case_id']}{fecha_str}:</span> 
+                            {cita['texto']}
+                        </div>
+                    </div>
+"""
+
+                    if len(causas_con_evidencia) > 2:
+                        html_content += f"""
+                    <button id="btn_{proceso_id}" onclick="toggleCitas('{proceso_id}')" style="background: #3498db; color: white; border: none; padding: 10px 20px; border-radius: 5px; cursor: pointer; margin: 15px 0; font-size: 13px;">
+                        Ver citas adicionales ▼
+                    </button>
+                    <div id="citas_{proceso_id}" style="display: none; margin-top: 15px;">
+"""
+                        for i, (causa_nombre, causa_data, valores) in enumerate(causas_con_evidencia[2:], start=3):
+                            for cita in causa_data.get('citas', [])[:2]:
+                                fecha_str = f" ({cita['fecha']})" if 'fecha' in cita else ""
+                                html_content += f"""
+                        <div style="background: white; padding: 15px; margin: 10px 0; border-left: 3px solid #95a5a6; border-radius: 5px;">
+                            <strong style="color: #2c3e50; font-size: 14px;">{causa_nombre}</strong>
+                            <p style="margin: 8px 0; font-size: 13px; color: #666;">{causa_data['descripcion']}</p>
+                            <div style="background: #f9f9f9; padding: 10px; margin-top: 8px; border-radius: 3px; font-size: 12px; font-style: italic; color: #555;">
+                                <span style="color: #95a5a6; font-weight: bold; font-style: normal;">Caso {cita['case_id']}{fecha_str}:</span> 
+                                {cita['texto']}
+                            </div>
+                        </div>
+"""
+                        html_content += """
+                    </div>
+"""
+
+                    # Cerrar la card colapsable: analysis-card-content-inner, analysis-card-content, analysis-card
+                    html_content += """
+                    </div>
+                </div>
+            </div>
+"""
+
+                html_content += """
+        </div>
+"""
+
+                print(f"[COMPARATIVO] Análisis comparativo con cards colapsables (legacy) agregado (v6.4.0)")
+
+            except Exception as e:
+                # FIX #8: Control de errores robusto con información detallada
+                print(f"[ERROR] No se pudo generar análisis comparativo automáticamente")
+                print(f"[ERROR] Tipo: {type(e).__name__}")
+                print(f"[ERROR] Detalle: {str(e)}")
+
+                import traceback
+                print(f"\n[DEBUG] Traceback completo:")
+                traceback.print_exc()
+
+                print(f"\n[INFO] Diagnóstico de archivos:")
+                print(f"  OK JSON básico: {json_basico_path.name}")
+                print(f"    - Existe: {'OK SI' if json_basico_path.exists() else 'X NO'}")
+                if json_basico_path.exists():
+                    print(f"    - Tamaño: {json_basico_path.stat().st_size:,} bytes")
+
+                print(f"  OK Cuadro dimensión: {cuadro_dimension_path.name}")
+                print(f"    - Existe: {'OK SI' if cuadro_dimension_path.exists() else 'X NO'}")
+                if cuadro_dimension_path.exists():
+                    print(f"    - Tamaño: {cuadro_dimension_path.stat().st_size:,} bytes")
+
+                print(f"  OK Conversaciones: {len(conversaciones_por_proceso)} elementos priorizados")
+
+                print(f"\n[INFO] El reporte se generará sin análisis comparativo detallado")
+                print(f"[INFO] Los insights cualitativos estarán disponibles en el resumen ejecutivo")
+        elif not pendientes:
+            # Diagnóstico de por qué no se puede generar
+            print(f"[INFO] No hay suficientes datos para generar análisis comparativo automático")
+            print(f"[INFO] Diagnóstico:")
+            print(f"  - JSON básico: {'OK existe' if json_basico_path.exists() else 'X falta'}")
+            print(f"  - Cuadro dimensión: {'OK existe' if cuadro_dimension_path.exists() else 'X falta'}")
+            print(f"  - Conversaciones priorizadas: {len(conversaciones_por_proceso)} elementos")
+            print(f"[INFO] El reporte se generará con el análisis básico en el resumen ejecutivo")
+
+    # ========================================
+    # SECCIÓN "ANÁLISIS DE CONVERSACIONES" ELIMINADA (v6.3.2)
+    # ========================================
+    # La información cualitativa ahora está integrada en "Análisis Comparativo de Patrones"
+    # que incluye: sentimiento, citas con fechas, cobertura y comparación temporal
+
+    # ========================================
+    # FOOTER COLAPSABLE
+    # ========================================
+
+    html_content += """
+        
+        <!-- FOOTER COLAPSABLE -->
+        <div class="footer-container">
+            <button class="footer-toggle" onclick="toggleFooter()">
+                📋 Metadata Técnica del Reporte v6.3.7
+            </button>
+            <div class="footer-content" id="footerContent">
+                <div class="footer">
+                    <h4>Configuración del Análisis</h4>
+                    <ul style="list-style: none; padding-left: 0;">
+                        <li>▸ Site: """ + args.site + """</li>
+                        <li>▸ Commerce Group: """ + args.commerce_group + """</li>""" + (f"""
+                        <li>▸ Proceso específico: {args.process_name}</li>""" if args.process_name else "") + """
+                        <li>▸ Período 1: """ + args.p1_start + """ a """ + args.p1_end + """</li>
+                        <li>▸ Período 2: """ + args.p2_start + """ a """ + args.p2_end + """</li>
+                        <li>▸ Aperturas: """ + ', '.join(aperturas_list) + """</li>
+                        <li>▸ Análisis conversaciones: """ + ('OK Claude (Cursor AI)' if use_claude_analysis else 'X Manual (ver CSVs)') + """</li>
+                    </ul>
+                    <h4 style="margin-top: 20px;">Métricas</h4>
+                    <ul style="list-style: none; padding-left: 0;">
+                        <li>▸ Fórmula CR: (Incoming / Driver) × 100</li>
+                        <li>▸ Driver: """ + driver_desc + """</li>
+                        <li>▸ Regla 80%: Aplicada en todas las dimensiones</li>
+                        <li>▸ Muestreo v6.4.9 Por CONTRIB_ABS: Máx """ + str(MAX_TOTAL_CONVERSATIONS) + """ conversaciones distribuidas por contribución % a variación de CR (mín 20/elemento-período, 70% picos + 30% normales)</li>
+                        <li>▸ Eventos Comerciales v6.4.2: """ + (f'OK {eventos_fuente} ({len(eventos_comerciales)} eventos, {total_casos_correlacionados:,} casos correlacionados)' if len(eventos_comerciales) > 0 else 'NO Sin datos disponibles') + """</li>
+"""
+
+    if len(conversaciones_por_proceso) > 0 and use_claude_analysis:
+        total_conv_analizadas = sum(d.get('analisis_llm', {}).get('total_conversaciones', 0) for d in conversaciones_por_proceso.values())
+        html_content += f"""
+                        <li>▸ Conversaciones analizadas: {total_conv_analizadas} casos (umbral mínimo validez: {UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO} por elemento-período)</li>
+"""
+
+    if len(eventos_comerciales) > 0:
+        # Listar eventos identificados
+        eventos_nombres = ', '.join([e['nombre'] for e in list(eventos_comerciales.values())[:5]])
+        html_content += f"""
+                        <li>▸ Eventos identificados: {eventos_nombres}</li>
+"""
+
+    html_content += """
+                    </ul>
+                    <h4 style="margin-top: 20px;">Queries Ejecutadas</h4>
+                    <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; margin-top: 10px;">
+"""
+
+    # Agregar cada query ejecutada
+    for idx, query_info in enumerate(queries_ejecutadas, 1):
+        html_content += f"""
+                        <div style="margin-bottom: 15px; padding: 12px; background: white; border-left: 4px solid #00a650; border-radius: 4px;">
+                            <div style="font-weight: 700; color: #2c3e50; margin-bottom: 5px;">
+                                {idx}. {query_info['nombre']}
+                            </div>
+                            <div style="font-size: 13px; color: #555; margin-bottom: 5px;">
+                                📋 {query_info.get('descripcion', '')}
+                            </div>
+                            <div style="font-size: 12px; color: #7f8c8d;">
+                                <span style="background: #e8f5e9; padding: 2px 8px; border-radius: 3px; margin-right: 10px;">
+                                    📊 {query_info.get('tabla', '')}
+                                </span>
+                                <span style="color: #00a650;">
+                                    OK {query_info['output']}
+                                </span>
+                            </div>
+                        </div>
+"""
+
+    # Gráfico semanal: se omite si el driver no tiene serie semanal completa (ver ReportPipeline.apply_driver)
+    js_semanal = ""
+    if grafico_semanal:
+        js_semanal = """        
+        // Weekly Chart
+        var ctx = document.getElementById('weeklyChart').getContext('2d');
+        var weeklyChart = new Chart(ctx, {
+            type: 'line',
+            data: {
+                labels: """ + str(df_weekly['SEMANA_LABEL'].tolist() if df_weekly is not None else []) + """,
+                datasets: [{
+                    label: 'CR (pp)',
+                    data: """ + str(df_weekly['CR'].round(4).tolist() if df_weekly is not None else []) + """,
+                    borderColor: '""" + color_config['primary'] + """',
+                    backgroundColor: 'rgba(0, 166, 80, 0.1)',
+                    tension: 0.4,
+                    fill: true,
+                    borderWidth: 3,
+                    pointRadius: 5
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: { display: true }
+                },
+                scales: {
+                    y: { 
+                        beginAtZero: false,
+                        title: { display: true, text: 'CR (pp)' }
+                    }
+                }
+            }
+        });
+"""
+
+    html_content += """
+                    </div>
+                    <p style="margin-top: 30px; text-align: center; font-size: 12px;">
+                        <strong>Generado:</strong> """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """ | 
+                        <strong>Script:</strong> generar_reporte_cr_universal_v6.3.6.py | 
+                        <strong>Versión:</strong> v6.3.2
+                    </p>
+                </div>
+            </div>
+        </div>
+    </div>
+    
+    <script>
+        function toggleFooter() {
+            var toggle = document.querySelector('.footer-toggle');
+            var content = document.getElementById('footerContent');
+            
+            toggle.classList.toggle('active');
+            if (content.style.maxHeight) {
+                content.style.maxHeight = null;
+            } else {
+                content.style.maxHeight = content.scrollHeight + "px";
+            }
+        }
+""" + js_semanal + """    </script>
+</body>
+</html>
+"""
+
+    # Guardar HTML
+    process_suffix = f"_{args.process_name.lower().replace(' ', '_').replace('-', '')}" if args.process_name else ""
+    html_filename = f"reporte_cr_{args.commerce_group.lower()}{process_suffix}_{args.site.lower()}_{p1_start_dt.strftime('%b').lower()}_{p2_start_dt.strftime('%b').lower()}_{p1_start_dt.year}_v6.3{reporte.output_suffix}.html"
+    html_path = output_dir / html_filename
+
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+    if pendientes:
+        print(f"[HTML] Reporte parcial actualizado: {html_path} (pendiente: {', '.join(pendientes)})")
+    else:
+        print(f"[OK] HTML generado: {html_path}")
+    print()
+
+    return {
+        'html_path': html_path,
+        'html_content': html_content,
+        'bullet_1': bullet_1,
+        'bullet_2': bullet_2,
+        'bullet_3': bullet_3,
+        'hallazgo_explicaciones': hallazgo_explicaciones,
+        'analisis_comp': analisis_comp,
+        'orden_contribucion': orden_contribucion,
+        'analisis_comparativo_path': analisis_comparativo_path,
+    }
@@ -0,0 +1,4027 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+REPORT PIPELINE - Reporte CR universal como API importable
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Flujo completo de generar_reporte_cr_universal_v6.3.6.py
+             (hard metrics, programación de queries, eventos, feriados,
+             cross-site, PASO 1-4, CSVs y HTML) como etapas explícitas de
+             ReportPipeline. Cada etapa deja sus dataframes y artefactos en
+             la instancia, así un notebook, un scheduler o un proceso que
+             genera varios reportes pueden ejecutar etapas sueltas y compartir
+             el backend y la cache de queries entre corridas.
+
+             El script del generador es un wrapper de línea de comandos sobre
+             este módulo: parsea argumentos, pide la confirmación interactiva
+             del override de driver y llama a ReportPipeline.run().
+
+Uso:
+  from utils.report_pipeline import generate_report, whatif_report
+
+  resultado = generate_report({
+      'site': 'MLA', 'commerce_group': 'PDD', 'aperturas': 'PROCESO,CDU',
+      'p1_start': '2025-11-01', 'p1_end': '2025-11-30',
+      'p2_start': '2025-12-01', 'p2_end': '2025-12-31',
+      'skip_conversations': True,
+  })
+  resultado.html_path, resultado.metrics['var_cr'], resultado.cuadros['CDU']
+
+  # Proceso que genera varios reportes: mismo backend y cache para todos
+  pipeline = ReportPipeline(params, backend=backend, query_cache=cache)
+  pipeline.configure()
+  pipeline.connect()
+  ...
+
+  # Sensibilidad al driver: misma corrida con un driver alternativo, sin queries de contactos
+  whatif_report('latest', 'retiro_requests')
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+import webbrowser
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from config.drivers_mapping import get_driver_config, get_driver_description
+from config.site_groups import (
+    resolve_site_sql, get_site_list, get_report_sites, is_site_group, get_site_display_name
+)
+from utils.report_queries import (
+    FIELD_MAPPING, COMMERCE_GROUP_FILTERS, COMMERCE_GROUP_EVENTS_FILTERS, build_process_filter, build_incoming_total_query,
+    build_drivers_total_query, build_weekly_query, build_dimension_query, build_feriados_query,
+    build_base_contacts_table,
+    build_eventos_fallback_query, build_cross_site_incoming_query, build_global_drivers_query,
+    build_fused_contacts_query, split_fused_contacts, build_weekly_drivers_query, build_daily_contacts_query,
+    build_daily_orders_query, build_shipping_drivers_query, build_hll_registers_query, weekly_start
+)
+from utils.query_scheduler import QueryScheduler
+from utils.query_cache import QueryCache
+from utils.stage_cache import StageCache, node_keys
+from utils.contacts_cube import ContactsCube
+from utils.hll_sketches import SketchStore
+from calculations.drivers_management import ORDERS, SHIPPING_MEASURES, DriverStore, driver_type
+from utils.prefetch import Prefetcher, prefetch_jobs
+from utils.query_backend import backend_from_args
+from utils.report_cli import ReportError, report_args, validate_args
+from utils.query_planner import ByteBudget, QueryBudgetError, QueryPlan, format_bytes
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Raíz del repositorio (output/ de los análisis de Claude y scripts/ auxiliares)
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# SISTEMA DE ANÁLISIS DE CONVERSACIONES v2.2 (Auto-detección de Dimensión)
+# ================================================================
+# Este script usa análisis pre-generados por Claude (Cursor AI) que están guardados
+# en output/analisis_conversaciones_claude_{site}_{commerce_group}_{dimension}_{p1_periodo}_{p2_periodo}.json
+#
+# CÓMO FUNCIONA:
+# 1. El script detecta automáticamente la dimensión más granular de las aperturas solicitadas
+# 2. Exporta CSVs con conversaciones muestreadas (distribuidas por impacto hasta 500 total, ponderadas por picos)
+# 3. Claude (en Cursor) lee los CSVs y genera análisis estructurados con:
+#    - Causas raíz específicas (cobertura ≥80%)
+#    - Frecuencias y porcentajes
+#    - Citas textuales con CASE_IDs reales
+#    - Sentimiento por causa (frustración/satisfacción)
+# 4. Los análisis se guardan en el JSON con nombre específico por análisis (incluye dimensión)
+# 5. El script los carga automáticamente y los incluye en el HTML
+#
+# JERARQUÍA DE GRANULARIDAD (auto-detecta la más específica):
+# CLA_REASON_DETAIL > SOLUTION_ID/CHANNEL_ID/SOURCE_ID > ENVIRONMENT > TIPIFICACION > CDU > PROCESO
+#
+# ACTUALIZAR ANÁLISIS:
+# Si querés agregar o actualizar análisis para nuevos procesos/períodos:
+# 1. Ejecutar este script con --export-only (generará CSVs en output/)
+# 2. Pedir a Claude (Cursor AI) que analice los CSVs y cree el JSON con el nombre específico
+# 3. Re-ejecutar el script sin --export-only → el reporte incluirá los análisis actualizados
+#
+# NOTA: La búsqueda de JSON es dinámica y se configura DESPUÉS de parsear argumentos
+# ================================================================
+
+# ========================================
+# CONFIGURACIÓN DE MUESTREO DINÁMICO v6.4.9
+# ========================================
+MAX_TOTAL_CONVERSATIONS = 500  # Límite máximo optimizado para balance calidad/performance
+UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO = 20  # Mínimo por elemento-período para análisis cualitativo válido
+
+# Compatibilidad hacia atrás para validaciones globales
+UMBRAL_MINIMO_CONVERSACIONES = UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO
+
+# Etapas en orden de prioridad para el presupuesto (--budget-gb)
+ETAPAS_QUERIES = {
+    'base': 'Tabla BASE_CONTACTS materializada',
+    'metricas': 'PASO 1-2: incoming, drivers y semanal',
+    'aperturas': 'PASO 3: cuadros por dimensión',
+    'contexto': 'Eventos, feriados, cross-site y conteos distintos (opcionales)',
+    'muestreo': 'PASO 4: muestreo de conversaciones (opcional)',
+}
+ETAPAS_REQUERIDAS = ('base', 'metricas', 'aperturas')
+
+# Conteos distintos de --distinct-sketches: métrica de METRICAS_DISTINTAS → etiqueta
+METRICAS_SKETCH = {'cases': 'Casos únicos', 'customers': 'Clientes únicos'}
+
+# DAG de etapas (PASO 0 → HTML): cada nodo declara los jobs de queries que lee
+# (los que no aplican a la corrida se ignoran), los argumentos que usa y las
+# etapas previas de las que depende. Los nodos 'memo' se memoizan en la cache de
+# etapas bajo el hash de esas entradas (ver utils/stage_cache.py); dimension_tables
+# se expande en un nodo dimension:{APERTURA} por apertura.
+DAG_ETAPAS = {
+    'load_hard_metrics': {},
+    'commercial_events': {'depende': ['load_hard_metrics'], 'jobs': ['eventos_fallback']},
+    'holidays': {'depende': ['commercial_events'], 'jobs': ['feriados']},
+    'cross_site': {'depende': ['commercial_events'], 'jobs': ['cross_site_incoming', 'cross_site_drivers']},
+    'distinct_counts': {'jobs': ['sketch_cases', 'sketch_customers']},
+    'consolidated_metrics': {'jobs': ['incoming_total', 'contactos_fusionados', 'contactos_diarios', 'drivers_total'],
+                             'params': ['site', 'commerce_group', 'filter_driver_by_site'], 'memo': True},
+    'weekly': {'jobs': ['weekly', 'contactos_fusionados', 'contactos_diarios', 'drivers_semanales'],
+               'params': ['commerce_group'], 'memo': True},
+    'dimension_tables': {'depende': ['consolidated_metrics'],
+                         'jobs': ['dimension_{apertura}', 'contactos_fusionados', 'contactos_diarios'],
+                         'params': ['apertura'], 'memo': True},
+    'conversations': {'depende': ['dimension_tables'], 'jobs': ['muestreo_conversaciones']},
+    'render_html': {'depende': ['commercial_events', 'holidays', 'cross_site', 'distinct_counts', 'weekly',
+                                'conversations']},
+}
+
+# Colores por commerce group
+COLORS = {
+    'PDD': {'primary': '#00a650', 'badge': '#00a650'},  # Verde
+    'PNR': {'primary': '#00a650', 'badge': '#00a650'},  # Verde
+    'PCF_COMPRADOR': {'primary': '#00a650', 'badge': '#00a650'},  # Verde
+    'PCF_VENDEDOR': {'primary': '#00a650', 'badge': '#00a650'},  # Verde
+    'ME_PREDESPACHO': {'primary': '#3483fa', 'badge': '#3483fa'},  # Azul
+    'ME_DISTRIBUCION': {'primary': '#3483fa', 'badge': '#3483fa'},  # Azul
+    'ME_DRIVERS': {'primary': '#7c3aed', 'badge': '#7c3aed'},  # Morado (Shipping Drivers)
+    'FBM Sellers': {'primary': '#3483fa', 'badge': '#3483fa'},  # Azul (Shipping FBM)
+    'FBM_SELLERS': {'primary': '#3483fa', 'badge': '#3483fa'},  # Azul (Shipping FBM)
+    'GENERALES_COMPRA': {'primary': '#2196f3', 'badge': '#2196f3'},  # Azul Marketplace
+    'MODERACIONES': {'primary': '#2196f3', 'badge': '#2196f3'},  # Azul Marketplace
+    'PAGOS': {'primary': '#ec4899', 'badge': '#ec4899'},  # Rosa (Pagos)
+}
+
+# ========================================
+# FUNCIÓN DE DISTRIBUCIÓN POR IMPACTO v6.4.9
+# ========================================
+def calcular_distribucion_por_impacto(df_elementos, max_total=500, min_por_elemento_periodo=20):
+    """
+    Distribuye muestra de conversaciones según CONTRIB_ABS (contribución real a variación de CR).
+    
+    Fórmula: CONTRIB_ABS = VAR_CR_individual / VAR_CR_total × 100
+    - Elementos con mayor contribución porcentual a la variación de CR reciben más conversaciones
+    - Garantiza mínimo de 20 conversaciones por elemento-período
+    - Respeta límite global de 500 conversaciones
+    - Mantiene ponderación 70% picos + 30% normales en query SQL
+    
+    Args:
+        df_elementos: DataFrame con columnas DIMENSION_VAL, CONTRIB_ABS, INC_P1, INC_P2
+        max_total: Presupuesto total de conversaciones (default: 500)
+        min_por_elemento_periodo: Mínimo garantizado por elemento-período (default: 20)
+    
+    Returns:
+        dict: {elemento: {'p1': casos_p1, 'p2': casos_p2, 'total': total, 'contribucion': valor}}
+    """
+    if len(df_elementos) == 0:
+        return {}
+    
+    # Usar CONTRIB_ABS directamente (contribución porcentual real a la variación de casos)
+    # Esto asegura que el muestreo sea proporcional al impacto en CR, no al incoming
+    df_elementos = df_elementos.copy()
+    df_elementos['CONTRIBUCION'] = df_elementos['CONTRIB_ABS'].fillna(0).abs()
+    
+    # Calcular peso relativo de cada elemento
+    total_contribucion = df_elementos['CONTRIBUCION'].sum()
+    
+    if total_contribucion == 0:
+        # Fallback: distribución equitativa si no hay variación
+        peso_uniforme = 1.0 / len(df_elementos)
+        df_elementos['PESO'] = peso_uniforme
+    else:
+        df_elementos['PESO'] = df_elementos['CONTRIBUCION'] / total_contribucion
+    
+    # Calcular muestra ideal por elemento (distribuida entre 2 períodos)
+    df_elementos['MUESTRA_IDEAL_TOTAL'] = (df_elementos['PESO'] * max_total).round().astype(int)
+    
+    # Distribuir entre P1 y P2 según proporción de incoming
+    df_elementos['PROPORCION_P1'] = df_elementos['INC_P1'] / (df_elementos['INC_P1'] + df_elementos['INC_P2'])
+    df_elementos['MUESTRA_P1'] = (df_elementos['MUESTRA_IDEAL_TOTAL'] * df_elementos['PROPORCION_P1']).round().astype(int)
+    df_elementos['MUESTRA_P2'] = df_elementos['MUESTRA_IDEAL_TOTAL'] - df_elementos['MUESTRA_P1']
+    
+    # Aplicar mínimo por período
+    df_elementos['MUESTRA_P1'] = df_elementos['MUESTRA_P1'].clip(lower=min_por_elemento_periodo)
+    df_elementos['MUESTRA_P2'] = df_elementos['MUESTRA_P2'].clip(lower=min_por_elemento_periodo)
+    df_elementos['MUESTRA_TOTAL_AJUSTADA'] = df_elementos['MUESTRA_P1'] + df_elementos['MUESTRA_P2']
+    
+    # Verificar si excede presupuesto
+    total_asignado = df_elementos['MUESTRA_TOTAL_AJUSTADA'].sum()
+    
+    if total_asignado > max_total:
+        # Recortar de elementos que están por encima del mínimo
+        exceso = total_asignado - max_total
+        
+        # Identificar elementos ajustables (aquellos con más del mínimo en algún período)
+        df_elementos['AJUSTABLE_P1'] = df_elementos['MUESTRA_P1'] > min_por_elemento_periodo
+        df_elementos['AJUSTABLE_P2'] = df_elementos['MUESTRA_P2'] > min_por_elemento_periodo
+        df_elementos['ES_AJUSTABLE'] = df_elementos['AJUSTABLE_P1'] | df_elementos['AJUSTABLE_P2']
+        
+        if df_elementos['ES_AJUSTABLE'].sum() > 0:
+            # Calcular excedente ajustable por elemento
+            df_elementos['EXCEDENTE_P1'] = (df_elementos['MUESTRA_P1'] - min_por_elemento_periodo).clip(lower=0)
+            df_elementos['EXCEDENTE_P2'] = (df_elementos['MUESTRA_P2'] - min_por_elemento_periodo).clip(lower=0)
+            df_elementos['EXCEDENTE_TOTAL'] = df_elementos['EXCEDENTE_P1'] + df_elementos['EXCEDENTE_P2']
+            
+            total_excedente = df_elementos['EXCEDENTE_TOTAL'].sum()
+            
+            if total_excedente > 0:
+                # Factor de reducción proporcional
+                factor_reduccion = max(0, (total_excedente - exceso) / total_excedente)
+                
+                # Aplicar reducción proporcional al excedente
+                df_elementos['REDUCCION_P1'] = (df_elementos['EXCEDENTE_P1'] * (1 - factor_reduccion)).round().astype(int)
+                df_elementos['REDUCCION_P2'] = (df_elementos['EXCEDENTE_P2'] * (1 - factor_reduccion)).round().astype(int)
+                
+                df_elementos['MUESTRA_P1'] = df_elementos['MUESTRA_P1'] - df_elementos['REDUCCION_P1']
+                df_elementos['MUESTRA_P2'] = df_elementos['MUESTRA_P2'] - df_elementos['REDUCCION_P2']
+                df_elementos['MUESTRA_TOTAL_AJUSTADA'] = df_elementos['MUESTRA_P1'] + df_elementos['MUESTRA_P2']
+    
+    # Crear diccionario de resultado
+    distribucion = {}
+    for idx, row in df_elementos.iterrows():
+        elemento = row['DIMENSION_VAL']
+        distribucion[elemento] = {
+            'p1': int(row['MUESTRA_P1']),
+            'p2': int(row['MUESTRA_P2']),
+            'total': int(row['MUESTRA_TOTAL_AJUSTADA']),
+            'contribucion': float(row['CONTRIBUCION']),
+            'peso': float(row['PESO'])
+        }
+    
+    return distribucion
+
+# ========================================
+# CONFIGURAR BÚSQUEDA DINÁMICA DE ANÁLISIS
+# ========================================
+def validar_coherencia_analisis(json_procesos, elementos_priorizados):
+    """
+    Valida que los procesos en el JSON coincidan con los elementos priorizados actuales.
+    
+    Args:
+        json_procesos: Lista de procesos en el JSON
+        elementos_priorizados: Lista de elementos priorizados (regla 80%)
+    
+    Returns:
+        tuple: (es_coherente: bool, mensaje: str)
+    """
+    json_set = set(json_procesos)
+    priorizados_set = set(elementos_priorizados)
+    
+    if json_set == priorizados_set:
+        return True, "Procesos coinciden perfectamente"
+    
+    missing_in_json = priorizados_set - json_set
+    extra_in_json = json_set - priorizados_set
+    
+    mensaje_partes = []
+    if missing_in_json:
+        mensaje_partes.append(f"Faltan en JSON: {', '.join(missing_in_json)}")
+    if extra_in_json:
+        mensaje_partes.append(f"Sobran en JSON: {', '.join(extra_in_json)}")
+    
+    mensaje = " | ".join(mensaje_partes)
+    return False, mensaje
+
+
+# ========================================
+# FUNCIÓN DE ESPERA AUTOMÁTICA PARA ANÁLISIS
+# ========================================
+
+def esperar_analisis_conversaciones(json_path, elementos_priorizados, timeout_seconds=600, check_interval=5, 
+                                   site='', commerce_group='', p1_label='P1', p2_label='P2', 
+                                   analisis_separado=True):
+    """
+    Espera automáticamente hasta que se genere el JSON de análisis de conversaciones.
+    
+    Args:
+        json_path: Path al JSON esperado (análisis básico - DEPRECADO si analisis_separado=True)
+        elementos_priorizados: Lista de elementos que deben estar en el JSON
+        timeout_seconds: Tiempo máximo de espera en segundos (default: 600 = 10 min)
+        check_interval: Intervalo de verificación en segundos (default: 5)
+        site: Site (MLA, MLB, etc.)
+        commerce_group: Commerce group (PDD, PNR, etc.)
+        p1_label: Label del período 1 (ej: "Dic 2025")
+        p2_label: Label del período 2 (ej: "Ene 2026")
+        analisis_separado: Si True, espera 2 JSONs separados por período (v6.3.8+)
+    
+    Returns:
+        bool: True si se detectó el JSON (o ambos JSONs), False si hubo timeout
+    """
+    import time
+    
+    if not analisis_separado:
+        # Comportamiento legacy (análisis conjunto)
+        print("\n" + "="*80)
+        print("📊 ANÁLISIS DE CONVERSACIONES EN PROGRESO")
+        print("="*80)
+        print()
+        print(f"[CURSOR AI] Por favor, analiza las conversaciones exportadas con este prompt:")
+        print(f"━" * 80)
+        print(f"Analiza las conversaciones de los CSVs exportados en output/.")
+        print(f"Genera el JSON: {json_path.name}")
+        print(f"━" * 80)
+        print()
+        print(f"[ESPERANDO] Monitoreando carpeta output/ esperando el JSON...")
+        print(f"[ARCHIVO] {json_path.name}")
+        print(f"[TIMEOUT] {timeout_seconds // 60} minutos máximo")
+        print()
+        
+        elapsed = 0
+        progress_interval = 30
+        
+        while not json_path.exists() and elapsed < timeout_seconds:
+            time.sleep(check_interval)
+            elapsed += check_interval
+            
+            if elapsed % progress_interval == 0:
+                mins = elapsed // 60
+                print(f"  ⏳ Esperando análisis... ({mins} min transcurridos)")
+        
+        if json_path.exists():
+            print(f"\n✅ [OK] JSON detectado: {json_path.name}")
+            print(f"[CONTINUANDO] Cargando análisis y generando reporte completo...\n")
+            return True
+        else:
+            print(f"\n⚠️ [TIMEOUT] No se detectó el JSON después de {timeout_seconds//60} minutos")
+            print(f"[INFO] El reporte se generará sin análisis comparativo de conversaciones")
+            print(f"[SUGERENCIA] Genera el JSON y re-ejecuta el script para incluir el análisis")
+            print()
+            return False
+    
+    # ========================================
+    # NUEVO: Análisis Separado por Período (v6.3.8)
+    # ========================================
+    
+    # Construir nombres de JSON por período
+    p1_mes = json_path.stem.split('_')[-2]  # Extraer YYYY-MM de P1
+    p2_mes = json_path.stem.split('_')[-1]  # Extraer YYYY-MM de P2
+    
+    # Patrones de nombre para JSONs separados
+    json_p1_name = json_path.name.replace(f'_{p1_mes}_{p2_mes}.json', f'_p1_{p1_mes}.json')
+    json_p2_name = json_path.name.replace(f'_{p1_mes}_{p2_mes}.json', f'_p2_{p2_mes}.json')
+    
+    json_p1_path = json_path.parent / json_p1_name
+    json_p2_path = json_path.parent / json_p2_name
+    
+    print("\n" + "="*80)
+    print("📊 ANÁLISIS DE CONVERSACIONES POR PERÍODO (v6.3.8 - Detección de Cambios)")
+    print("="*80)
+    print()
+    print(f"[CURSOR AI] Analiza las conversaciones SEPARADAMENTE por período:")
+    print(f"━" * 80)
+    print()
+    print(f"🔹 PASO 1: Analizar conversaciones de {p1_label}")
+    print(f"   Archivos: conversaciones_*_p1_{p1_mes}.csv")
+    print(f"   Generar JSON: {json_p1_name}")
+    print()
+    print(f"🔹 PASO 2: Analizar conversaciones de {p2_label}")
+    print(f"   Archivos: conversaciones_*_p2_{p2_mes}.csv")
+    print(f"   Generar JSON: {json_p2_name}")
+    print()
+    print(f"━" * 80)
+    print()
+    print(f"💡 PROMPT SUGERIDO:")
+    print(f"━" * 80)
+    print(f"""
+Analiza las conversaciones de {site} - {commerce_group} SEPARADAS POR PERÍODO:
+
+**PASO 1 - Análisis {p1_label}:**
+1. Lee SOLO los CSVs con sufijo `_p1_{p1_mes}.csv` 
+2. Para cada elemento, identifica causas raíz, porcentajes, sentimiento y citas
+3. Genera: `{json_p1_name}`
+
+**PASO 2 - Análisis {p2_label}:**
+1. Lee SOLO los CSVs con sufijo `_p2_{p2_mes}.csv`
+2. Para cada elemento, identifica causas raíz, porcentajes, sentimiento y citas  
+3. Genera: `{json_p2_name}`
+
+**Formato JSON requerido (para cada período):**
+{{
+  "Elemento 1": {{
+    "proceso": "Nombre del Elemento",
+    "commerce_group": "{commerce_group}",
+    "site": "{site}",
+    "periodo": "{p1_label}" o "{p2_label}",
+    "total_conversaciones": N,
+    "causas": [
+      {{
+        "causa": "Título corto 6-10 palabras",
+        "porcentaje": X,
+        "casos_estimados": Y,
+        "descripcion": "Contexto específico 20-30 palabras",
+        "sentimiento": {{"frustracion": X, "satisfaccion": Y}},
+        "citas": [{{"case_id": "123456789", "fecha": "YYYY-MM-DD", "texto": "Texto de la conversación..."}}]
+      }}
+    ],
+    "cobertura": {{"target_pct": 80, "covered_pct": 100, "remainder_pct": 0}},
+    "hallazgo_principal": "Resumen ejecutivo con las causas raíz principales identificadas"
+  }}
+}}
+
+**⚠️ IMPORTANTE - Campo 'fecha' OBLIGATORIO:**
+- Cada cita DEBE incluir el campo "fecha" en formato YYYY-MM-DD
+- La fecha se obtiene de la columna CONTACT_DATE_ID del CSV
+- Formato final en reporte: "Caso 123456789 (2025-03-15): texto..."
+""")
+    print(f"━" * 80)
+    print()
+    print(f"[ESPERANDO] Monitoreando carpeta output/ esperando los 2 JSONs...")
+    print(f"[ARCHIVOS P1] {json_p1_name}")
+    print(f"[ARCHIVOS P2] {json_p2_name}")
+    print(f"[TIMEOUT] {timeout_seconds // 60} minutos máximo")
+    print()
+    
+    elapsed = 0
+    progress_interval = 30
+    json_p1_detectado = False
+    json_p2_detectado = False
+    
+    while (not (json_p1_path.exists() and json_p2_path.exists())) and elapsed < timeout_seconds:
+        time.sleep(check_interval)
+        elapsed += check_interval
+        
+        # Verificar progreso y notificar
+        if not json_p1_detectado and json_p1_path.exists():
+            print(f"  ✅ [OK] JSON P1 detectado: {json_p1_name}")
+            json_p1_detectado = True
+        
+        if not json_p2_detectado and json_p2_path.exists():
+            print(f"  ✅ [OK] JSON P2 detectado: {json_p2_name}")
+            json_p2_detectado = True
+        
+        # Mostrar progreso periódico
+        if elapsed % progress_interval == 0:
+            mins = elapsed // 60
+            pendientes = []
+            if not json_p1_detectado:
+                pendientes.append("P1")
+            if not json_p2_detectado:
+                pendientes.append("P2")
+            
+            if pendientes:
+                print(f"  ⏳ Esperando análisis de: {', '.join(pendientes)}... ({mins} min transcurridos)")
+    
+    # Verificar resultado final
+    ambos_existen = json_p1_path.exists() and json_p2_path.exists()
+    
+    if ambos_existen:
+        print(f"\n✅ [OK] Ambos JSONs detectados:")
+        print(f"   - {json_p1_name}")
+        print(f"   - {json_p2_name}")
+        print(f"[CONTINUANDO] Generando análisis comparativo y reporte completo...\n")
+        return True
+    else:
+        print(f"\n⚠️ [TIMEOUT] No se detectaron todos los JSONs después de {timeout_seconds//60} minutos")
+        print(f"[STATUS] P1: {'✅ OK' if json_p1_path.exists() else '❌ Falta'}")
+        print(f"[STATUS] P2: {'✅ OK' if json_p2_path.exists() else '❌ Falta'}")
+        print(f"[INFO] El reporte se generará sin análisis comparativo de conversaciones")
+        print(f"[SUGERENCIA] Completa ambos análisis y re-ejecuta el script")
+        print()
+        return False
+
+
+# ========================================
+# DETECCIÓN AUTOMÁTICA DE DIMENSIÓN
+# ========================================
+
+def detectar_dimension_muestreo(aperturas_list):
+    """
+    Detecta automáticamente la dimensión más granular de las aperturas solicitadas.
+    
+    Jerarquía de granularidad (de más a menos específica):
+    CLA_REASON_DETAIL > SOLUTION_ID/CHANNEL_ID/SOURCE_ID > ENVIRONMENT > TIPIFICACION > CDU > PROCESO
+    
+    Args:
+        aperturas_list: Lista de dimensiones solicitadas (ej: ['PROCESO', 'CDU'])
+    
+    Returns:
+        str: Dimensión más granular encontrada
+    """
+    jerarquia_granularidad = {
+        'CLA_REASON_DETAIL': 6,
+        'SOLUTION_ID': 5,
+        'CHANNEL_ID': 5,
+        'SOURCE_ID': 5,
+        'ENVIRONMENT': 4,
+        'TIPIFICACION': 3,
+        'CDU': 2,
+        'PROCESO': 1
+    }
+    
+    # Filtrar solo dimensiones reconocidas
+    dimensiones_validas = [d for d in aperturas_list if d in jerarquia_granularidad]
+    
+    if not dimensiones_validas:
+        return 'PROCESO'  # Fallback por defecto
+    
+    # Retornar la más granular (mayor valor numérico)
+    return max(dimensiones_validas, key=lambda d: jerarquia_granularidad[d])
+
+
+# ========================================
+# REGLA 80% (PASO 3 y --whatif-driver)
+# ========================================
+
+def priorizar_elementos(df_dimension, m):
+    """
+    Cuadro cuantitativo de una apertura: regla 80% + Otros + TOTAL.
+
+    Los drivers son globales para todos los elementos (los de las métricas
+    consolidadas). --whatif-driver vuelve a aplicar la regla sobre el
+    incoming guardado de la corrida con otro denominador.
+
+    Args:
+        df_dimension: Incoming por elemento (DIMENSION_VAL, INC_P1, INC_P2, VAR_INC, VAR_ABS)
+        m: Métricas consolidadas (ver ReportPipeline.consolidated_metrics)
+
+    Returns:
+        DataFrame con los elementos priorizados, la fila Otros (si aplica) y TOTAL
+    """
+    inc_p1_total, inc_p2_total, var_inc_total = m['inc_p1'], m['inc_p2'], m['var_inc']
+    drv_p1_total, drv_p2_total = m['drv_p1'], m['drv_p2']
+    cr_p1, cr_p2, var_cr = m['cr_p1'], m['cr_p2'], m['var_cr']
+    df_dimension = df_dimension.copy()
+
+    # Regla 80% — Contribución % = VAR_CR_individual / VAR_CR_total × 100
+    _var_cr_elem = (df_dimension['INC_P2'] / drv_p2_total - df_dimension['INC_P1'] / drv_p1_total) * 100
+    df_dimension['CONTRIB_ABS'] = (_var_cr_elem / var_cr * 100) if var_cr != 0 else 0
+    df_dimension = df_dimension.sort_values('CONTRIB_ABS', key=abs, ascending=False).reset_index(drop=True)
+    df_dimension['CONTRIB_CUMSUM'] = df_dimension['CONTRIB_ABS'].abs().cumsum()
+
+    # Calcular variación porcentual (VAR_INC_PCT) - Requerido por análisis comparativo
+    df_dimension['VAR_INC_PCT'] = (df_dimension['VAR_INC'] / df_dimension['INC_P1']) * 100
+
+    df_80 = df_dimension[df_dimension['CONTRIB_CUMSUM'] <= 80].copy()
+    df_otros = df_dimension[df_dimension['CONTRIB_CUMSUM'] > 80].copy()
+
+    # Si regla 80% no cubre suficiente, tomar al menos top 3
+    if len(df_80) < 3 and len(df_dimension) >= 3:
+        df_80 = df_dimension.head(3).copy()
+        df_otros = df_dimension.iloc[3:].copy()
+
+    # Agregar drivers (globales para todos los elementos)
+    df_80['DRV_P1'] = drv_p1_total
+    df_80['DRV_P2'] = drv_p2_total
+    df_80['CR_P1'] = (df_80['INC_P1'] / df_80['DRV_P1']) * 100
+    df_80['CR_P2'] = (df_80['INC_P2'] / df_80['DRV_P2']) * 100
+    df_80['VAR_CR'] = df_80['CR_P2'] - df_80['CR_P1']
+
+    # Fila "Otros" si aplica
+    if len(df_otros) > 0:
+        inc_p1_otros = df_otros['INC_P1'].sum()
+        inc_p2_otros = df_otros['INC_P2'].sum()
+        var_inc_otros = df_otros['VAR_INC'].sum()
+
+        fila_otros = {
+            'DIMENSION_VAL': f"Otros ({len(df_otros)} agrupados)",
+            'INC_P1': inc_p1_otros,
+            'INC_P2': inc_p2_otros,
+            'VAR_INC': var_inc_otros,
+            'VAR_ABS': df_otros['VAR_ABS'].sum(),
+            'CONTRIB_ABS': df_otros['CONTRIB_ABS'].sum(),
+            'VAR_INC_PCT': (var_inc_otros / inc_p1_otros) * 100 if inc_p1_otros > 0 else 0,
+            'DRV_P1': drv_p1_total,
+            'DRV_P2': drv_p2_total,
+            'CR_P1': (inc_p1_otros / drv_p1_total) * 100,
+            'CR_P2': (inc_p2_otros / drv_p2_total) * 100,
+            'VAR_CR': ((inc_p2_otros / drv_p2_total) - (inc_p1_otros / drv_p1_total)) * 100
+        }
+        df_80 = pd.concat([df_80, pd.DataFrame([fila_otros])], ignore_index=True)
+
+    # Fila TOTAL
+    fila_total = {
+        'DIMENSION_VAL': 'TOTAL',
+        'INC_P1': inc_p1_total,
+        'INC_P2': inc_p2_total,
+        'VAR_INC': var_inc_total,
+        'VAR_ABS': abs(var_inc_total),
+        'CONTRIB_ABS': 100.0,
+        'VAR_INC_PCT': (var_inc_total / inc_p1_total) * 100 if inc_p1_total > 0 else 0,
+        'DRV_P1': drv_p1_total,
+        'DRV_P2': drv_p2_total,
+        'CR_P1': cr_p1,
+        'CR_P2': cr_p2,
+        'VAR_CR': var_cr
+    }
+    df_80 = pd.concat([df_80, pd.DataFrame([fila_total])], ignore_index=True)
+
+    return df_80
+
+
+# ========================================
+# CARGA DE HARD METRICS
+# ========================================
+
+def cargar_hard_metrics(site, year, month):
+    """Intenta cargar hard metrics de eventos para un período dado.
+    Para site groups (ROLA, HSP), carga y combina métricas de cada site individual.
+    Solo combina si TODOS los sites del grupo tienen métricas; si falta alguno → fallback.
+    """
+    if is_site_group(site):
+        # Para grupos: cargar cada site individual y combinar
+        sites = get_site_list(site)
+        dfs = []
+        for s in sites:
+            metrics_path = Path(f'metrics/eventos/data/correlacion_{s.lower()}_{year}_{month:02d}.parquet')
+            if metrics_path.exists():
+                try:
+                    df = pd.read_parquet(metrics_path)
+                    dfs.append(df)
+                    print(f"[OK] Hard metrics cargadas: {metrics_path.name} ({len(df)} registros)")
+                except Exception as e:
+                    print(f"[WARNING] Error al cargar {metrics_path.name}: {e}")
+            else:
+                print(f"[INFO] No existen hard metrics para {s} {year}-{month:02d}")
+        
+        if len(dfs) == len(sites):
+            # TODAS las métricas disponibles: combinar con pd.concat
+            combined = pd.concat(dfs, ignore_index=True)
+            print(f"[OK] Hard metrics combinadas para {get_site_display_name(site)}: {len(combined)} registros totales")
+            return combined
+        elif len(dfs) > 0:
+            # Solo algunas disponibles → fallback (no usar datos parciales)
+            print(f"[WARNING] Solo {len(dfs)}/{len(sites)} sites tienen hard metrics para {site}. Usando fallback.")
+            return None
+        else:
+            print(f"[INFO] No existen hard metrics para ningún site de {site} {year}-{month:02d}")
+            return None
+    else:
+        # Site individual: comportamiento original (sin cambios)
+        metrics_path = Path(f'metrics/eventos/data/correlacion_{site.lower()}_{year}_{month:02d}.parquet')
+        if metrics_path.exists():
+            try:
+                df = pd.read_parquet(metrics_path)
+                print(f"[OK] Hard metrics cargadas: {metrics_path.name} ({len(df)} registros)")
+                return df
+            except Exception as e:
+                print(f"[WARNING] Error al cargar {metrics_path.name}: {e}")
+                return None
+        else:
+            print(f"[INFO] No existen hard metrics para {site} {year}-{month:02d}")
+            return None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RESULTADO
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReportResult:
+    """
+    Resultado de una corrida de ReportPipeline.
+
+    Atributos:
+        args: Parámetros efectivos (Namespace)
+        metrics: Métricas consolidadas (incoming, drivers, CR y variaciones)
+        df_weekly: CR semanal
+        cuadros: {dimensión: DataFrame del cuadro cuantitativo}
+        conversaciones: {elemento: muestreo y análisis de conversaciones}
+        eventos: {evento: casos por período}
+        feriados: Lista de feriados del rango extendido
+        queries: Queries registradas para el footer técnico
+        plan: QueryPlan (solo con --plan o --budget-gb)
+        csv_paths: CSVs escritos
+        html_path: Reporte HTML (None con --plan o --export-only)
+    """
+
+    def __init__(self, pipeline):
+        self.args = pipeline.args
+        self.metrics = pipeline.metrics_consolidadas
+        self.df_weekly = pipeline.df_weekly
+        self.cuadros = pipeline.cuadros_cuantitativos
+        self.conversaciones = pipeline.conversaciones_por_proceso
+        self.eventos = pipeline.eventos_comerciales
+        self.feriados = pipeline.feriados_data
+        self.queries = pipeline.queries_ejecutadas
+        self.plan = pipeline.plan
+        self.csv_paths = list(pipeline.csv_paths)
+        self.html_path = pipeline.html_path
+
+    def __repr__(self):
+        return (f"ReportResult(site={self.args.site!r}, commerce_group={self.args.commerce_group!r}, "
+                f"html_path={str(self.html_path) if self.html_path else None!r})")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PIPELINE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReportPipeline:
+    """
+    Reporte CR universal por etapas.
+
+    run() ejecuta todas las etapas en orden; también se pueden llamar una a
+    una (cada etapa usa lo que dejaron las anteriores en la instancia):
+
+        configure → connect → load_hard_metrics → schedule_queries →
+        commercial_events → holidays → cross_site → distinct_counts →
+        consolidated_metrics → weekly → dimension_tables → conversations →
+        save_csvs → wait_for_analysis → render_html → print_summary
+
+    Desde consolidated_metrics, run_metrics() escribe el HTML parcial después
+    de cada etapa (checkpoint_html): el archivo del reporte existe desde
+    temprano y una falla posterior no pierde lo ya calculado.
+
+    Las etapas forman un DAG (DAG_ETAPAS): PASO 1-3 se memoizan en la cache
+    de etapas bajo el hash de sus entradas, así re-ejecutar un reporte que
+    falló o agregar una apertura solo calcula los nodos que faltan.
+
+    Con --contacts-cube, PASO 1-3 se responden desde un cubo diario local en
+    Parquet (utils.contacts_cube) y a BigQuery solo van los días que le faltan.
+
+    Con --driver-store, drivers totales, semanales y cross-site se suman desde
+    un store local de órdenes diarias y drivers de Shipping por site
+    (calculations.drivers_management.DriverStore), compartido por todos los
+    reportes del proceso; a BigQuery solo van los días / meses que le faltan.
+
+    Con --distinct-sketches, distinct_counts agrega casos y clientes únicos
+    de cada período, estimados con sketches HyperLogLog diarios en local
+    (utils.hll_sketches); a BigQuery solo van los días que les faltan.
+
+    Con --prefetch, la espera del análisis de conversaciones (wait_for_analysis)
+    precarga en la cache de queries las de los reportes probables siguientes
+    (utils.prefetch); close() cancela las que no llegaron a empezar.
+
+    run_metrics() agrupa las etapas hasta dimension_tables y finish() las
+    posteriores a conversations (utils.batch_reports muestrea las
+    conversaciones de varios reportes en paralelo entre ambas).
+
+    Args:
+        params: Parámetros del reporte (ver report_args)
+        backend: QueryBackend ya inicializado (default: el de --backend)
+        query_cache: QueryCache compartida entre corridas (default: la de --cache-dir)
+        budget: ByteBudget de la corrida (default: el de --budget-gb)
+        shared_results: {nombre de job: DataFrame} ya calculados por una lectura
+                        compartida entre reportes (ver utils.batch_reports);
+                        esos jobs no se envían al backend
+    """
+
+    def __init__(self, params, backend=None, query_cache=None, budget=None, shared_results=None):
+        self.args = report_args(params)
+        self.backend = backend
+        self.query_cache = query_cache
+        self.stage_cache = None
+        self.contacts_cube = None
+        self.driver_store = None
+        self.sketch_stores = {}
+        self.presupuesto = budget
+        self.shared_results = dict(shared_results or {})
+        self.scheduler = None
+        self.prefetcher = None
+        self.aperturas_list = None
+
+        # Análisis de conversaciones pre-generados (ver configurar_analisis_claude)
+        self.analisis_claude_path = None
+        self.use_claude_analysis = False
+        self.analisis_preexistentes = {}
+
+        # Resultados de las etapas
+        self.queries_ejecutadas = []
+        self.claves_nodos = {}
+        self.memo = {}
+        self.plan = None
+        self.rechazados = {}
+        self.fusionado_por_presupuesto = False   # --budget-gb cambió PASO 1-3 a una sola lectura de contactos
+        self.metrics_consolidadas = {}
+        self.resultado_fusionado = None
+        self.cubo_faltante = None
+        self.drivers_faltantes = {}
+        self.sketches_faltantes = {}
+        self.conteos_distintos = {}
+        self.df_weekly = None
+        self.cuadros_cuantitativos = {}
+        self.dimensiones_completas = {}
+        self.conversaciones_por_proceso = {}
+        self.eventos_comerciales = {}
+        self.eventos_html = ""
+        self.feriados_data = []
+        self.feriados_html = ""
+        self.csv_paths = []
+        self.output_suffix = ''     # sufijo del HTML y del comparativo (--whatif-driver no pisa el reporte original)
+        self.nota_semanal = None    # nota del gráfico semanal (driver what-if mensual o sin serie completa)
+        self.html_path = None
+        self.html_content = None
+        self.secciones_pendientes = []
+        self.error_parcial = None
+        self.html_parcial = None
+        self.preview_path = None
+        self.run_id = None
+
+    def run(self) -> ReportResult:
+        """
+        Ejecuta todas las etapas.
+
+        Returns:
+            ReportResult (con --plan solo trae el plan; con --export-only, sin HTML)
+
+        Raises:
+            ReportError: Parámetros inválidos, backend no disponible o corrida
+                         rechazada por presupuesto
+        """
+        if self.aperturas_list is None:
+            self.configure()
+        try:
+            if self.run_metrics():
+                self.conversations()
+                self.finish()
+            return self.result()
+        except Exception as e:
+            self.checkpoint_error(e)
+            raise
+        finally:
+            self.close()
+
+    def run_metrics(self) -> bool:
+        """
+        Etapas cuantitativas (PASO 0-3): contexto, métricas, serie semanal y cuadros,
+        con el HTML parcial actualizado después de cada una.
+
+        Returns:
+            False en modo --plan (no queda nada por ejecutar)
+        """
+        if self.scheduler is None:
+            self.connect()
+        self.load_hard_metrics()
+        self.schedule_queries()
+        if self.args.plan:
+            return False
+
+        self.commercial_events()
+        self.holidays()
+        self.cross_site()
+        self.distinct_counts()
+        self.consolidated_metrics()
+        self.checkpoint_html(['weekly', 'dimension_tables', 'conversations'])
+        self.weekly()
+        self.checkpoint_html(['dimension_tables', 'conversations'])
+        self.dimension_tables()
+        if not self.args.skip_conversations:
+            self.checkpoint_html(['conversations'])
+            if self.args.preview and self.args.open_report and self.preview_path is None:
+                self.preview_path = self.html_path
+                print("[OPEN] Abriendo vista previa en navegador...")
+                webbrowser.open(str(self.preview_path.absolute()))
+                print()
+        return True
+
+    def finish(self):
+        """Etapas de salida (después de PASO 4): CSVs, espera del análisis y HTML o resumen de --export-only."""
+        self.save_csvs()
+        self.wait_for_analysis()
+        if self.args.export_only:
+            self.export_only_summary()
+            return
+
+        self.render_html()
+        self.print_summary()
+
+    def result(self) -> ReportResult:
+        """Resultado con lo calculado hasta el momento."""
+        return ReportResult(self)
+
+    def close(self):
+        """Cancela las queries pendientes (también las de --prefetch) y libera los pools (el backend y la cache quedan abiertos)."""
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+
+    def configure(self):
+        """Valida fechas y aperturas, detecta la dimensión de muestreo y resuelve el site."""
+        args = self.args
+
+        # Validar fechas, commerce group y flags (ver utils/report_cli.py)
+        validate_args(args)
+        p1_start_dt = pd.to_datetime(args.p1_start)
+        p1_end_dt = pd.to_datetime(args.p1_end)
+        p2_start_dt = pd.to_datetime(args.p2_start)
+        p2_end_dt = pd.to_datetime(args.p2_end)
+
+        # Parsear aperturas
+        aperturas_list = [a.strip().upper() for a in args.aperturas.split(',')]
+
+        # Auto-detectar dimensión de muestreo si no fue especificada
+        if args.muestreo_dimension is None:
+            args.muestreo_dimension = detectar_dimension_muestreo(aperturas_list)
+            print(f"[AUTO] Dimensión de muestreo detectada automáticamente: {args.muestreo_dimension}")
+        else:
+            args.muestreo_dimension = args.muestreo_dimension.upper()
+
+        # ========================================
+        # RESOLUCIÓN DE SITE GROUPS (ROLA, HSP)
+        # ========================================
+        # Normalizar site a uppercase
+        args.site = args.site.upper()
+        if len(get_report_sites(args.site, args.explode_group)) > 1:
+            raise ReportError(f"--site {args.site} genera un reporte por site: usar la CLI o "
+                              f"utils.batch_reports.run_reports(site_reports(args))")
+
+        # Pre-computar display name para site groups
+        site_display = get_site_display_name(args.site)
+        if is_site_group(args.site):
+            print(f"[CONFIG] Site Group: {site_display}")
+            print(f"[CONFIG] Sites incluidos: {', '.join(get_site_list(args.site))}")
+        else:
+            print(f"[CONFIG] Site: {args.site}")
+
+        print(f"[CONFIG] Período 1: {args.p1_start} a {args.p1_end}")
+        print(f"[CONFIG] Período 2: {args.p2_start} a {args.p2_end}")
+        print(f"[CONFIG] Commerce Group: {args.commerce_group}")
+        if args.process_name:
+            print(f"[CONFIG] Proceso específico: {args.process_name}")
+        print(f"[CONFIG] Aperturas: {', '.join(aperturas_list)}")
+        print(f"[CONFIG] Dimensión muestreo: {args.muestreo_dimension}")
+        print()
+
+        self.p1_start_dt, self.p1_end_dt = p1_start_dt, p1_end_dt
+        self.p2_start_dt, self.p2_end_dt = p2_start_dt, p2_end_dt
+        self.aperturas_list = aperturas_list
+        self.site_display = site_display
+        self.color_config = COLORS.get(args.commerce_group, {'primary': '#00a650', 'badge': '#00a650'})
+
+    def connect(self):
+        """Inicializa backend, cache local, presupuesto y scheduler (usa los recibidos en el constructor si los hay)."""
+        args = self.args
+
+        if self.backend is None:
+            print(f"[INIT] Inicializando backend de queries ({args.backend})...")
+            try:
+                self.backend = backend_from_args(args)
+                print(f"[OK] Backend {self.backend.name} inicializado\n")
+            except Exception as e:
+                raise ReportError(f"No se pudo inicializar el backend {args.backend}: {e}")
+        backend = self.backend
+
+        # Cache local de resultados (Parquet, key = hash del SQL normalizado)
+        if args.no_cache:
+            self.query_cache = None
+        elif self.query_cache is None:
+            self.query_cache = QueryCache(args.cache_dir, max_bytes=int(args.cache_max_gb * 1024**3),
+                                          refresh=args.refresh, namespace=backend.name)
+            print(f"[CACHE] Cache local: {args.cache_dir}{' (refresh: se re-ejecutan todas las queries)' if args.refresh else ''}")
+
+        # Cache de etapas: salidas de PASO 1-3 memoizadas por hash de sus entradas (ver DAG_ETAPAS)
+        if args.no_cache:
+            self.stage_cache = None
+        elif self.stage_cache is None:
+            self.stage_cache = StageCache(args.stage_cache_dir, refresh=args.refresh)
+
+        # Cubo diario local de contactos: PASO 1-3 desde Parquet, a BigQuery solo los días faltantes
+        if args.contacts_cube:
+            self.contacts_cube = ContactsCube(args.cube_dir, args.site, args.commerce_group, args.process_name,
+                                              refresh=args.refresh)
+            print(f"[CUBO] Cubo diario de contactos: {self.contacts_cube.path}")
+
+        # Store de drivers: uno por directorio y proceso, compartido por todos los reportes
+        if args.driver_store:
+            self.driver_store = DriverStore.shared(args.driver_store_dir)
+            print(f"[DRIVERS] Store de drivers: {self.driver_store.path}")
+
+        # Sketches HLL diarios: casos y clientes únicos por período sin releer los días guardados
+        if args.distinct_sketches:
+            self.sketch_stores = {metrica: SketchStore(args.sketch_dir, metrica, args.commerce_group,
+                                                       refresh=args.refresh)
+                                  for metrica in METRICAS_SKETCH}
+            print(f"[DISTINTOS] Sketches HLL: {args.sketch_dir}")
+
+        # Presupuesto de bytes de la corrida (cada query se estima con dry-run antes de enviarla)
+        if self.presupuesto is None and args.budget_gb:
+            self.presupuesto = ByteBudget(backend, int(args.budget_gb * 1024**3))
+            print(f"[PRESUPUESTO] Máximo {format_bytes(self.presupuesto.max_bytes)} procesados en esta corrida")
+
+        # Scheduler de queries: las independientes se envían juntas (ver schedule_queries)
+        self.scheduler = QueryScheduler(backend, max_workers=args.max_concurrent_queries,
+                                        default_timeout=args.query_timeout, cache=self.query_cache,
+                                        budget=self.presupuesto)
+
+    def _nodos_dag(self, campos_aperturas) -> dict:
+        """
+        DAG_ETAPAS de esta corrida: dimension_tables se expande en un nodo
+        dimension:{APERTURA} por apertura con campo mapeado.
+
+        Returns:
+            {nodo: {'jobs': [...], 'params': {...}, 'depende': [...], 'memo': bool}}
+        """
+        args = self.args
+        expansion = {'dimension_tables': {f'dimension:{a}': a for a in campos_aperturas}}
+        nodos = {}
+        for etapa, definicion in DAG_ETAPAS.items():
+            for nodo, apertura in expansion.get(etapa, {etapa: None}).items():
+                nodos[nodo] = {
+                    'jobs': [j.format(apertura=apertura) for j in definicion.get('jobs', [])],
+                    'params': {p: apertura if p == 'apertura' else getattr(args, p)
+                               for p in definicion.get('params', [])},
+                    'depende': [n for d in definicion.get('depende', []) for n in expansion.get(d, [d])],
+                    'memo': definicion.get('memo', False),
+                }
+        return nodos
+
+    def _memo(self, nodo):
+        """Salidas del nodo restauradas de la cache de etapas (None si hay que calcularlo)."""
+        salidas = self.memo.get(nodo)
+        if salidas is not None:
+            print(f"[MEMO] {nodo}: reutilizado de la cache de etapas ({self.claves_nodos[nodo][0][:12]})")
+        return salidas
+
+    def _memorizar(self, nodo, **salidas):
+        """Guarda las salidas de un nodo recién calculado en la cache de etapas."""
+        if self.stage_cache is None or nodo not in self.claves_nodos or nodo in self.memo:
+            return
+        key, ttl = self.claves_nodos[nodo]
+        self.stage_cache.put(nodo, key, ttl, salidas)
+
+    def _fusionado(self):
+        """Total, semanal y aperturas de la lectura fusionada o del cubo diario (None sin --fused-scan ni --contacts-cube)."""
+        if self.contacts_cube is not None and self.resultado_fusionado is None:
+            if self.scheduler.has_job('contactos_diarios'):
+                self.contacts_cube.update(self.scheduler.result('contactos_diarios'), *self.cubo_faltante)
+            args = self.args
+            self.resultado_fusionado = self.contacts_cube.answer(
+                list(self.campos_aperturas), args.p1_start, args.p1_end, args.p2_start, args.p2_end
+            )
+        elif self._lectura_fusionada() and self.resultado_fusionado is None:
+            self.resultado_fusionado = split_fused_contacts(
+                self.scheduler.result('contactos_fusionados'), list(self.campos_aperturas)
+            )
+        return self.resultado_fusionado
+
+    def _drivers(self, nombre, driver_config=None, periodos=None):
+        """
+        Resultado de un job de drivers ('drivers_total', 'drivers_semanales' o
+        'cross_site_drivers'): del scheduler o, con --driver-store, sumado desde
+        el DriverStore (antes incorpora los días / meses leídos en esta corrida).
+
+        Args:
+            driver_config: Configuración del driver (default: la del commerce group)
+            periodos: (p1_start, p1_end, p2_start, p2_end) (default: los de la corrida)
+        """
+        if self.driver_store is None:
+            return self.scheduler.result(nombre)
+        for fuente, (job, inicio, fin) in list(self.drivers_faltantes.items()):
+            self.driver_store.update(fuente, self.scheduler.result(job), inicio, fin)
+            del self.drivers_faltantes[fuente]
+
+        args = self.args
+        driver_config = driver_config or self.driver_config
+        if nombre == 'drivers_semanales':
+            return self.driver_store.weekly(args.site if driver_config['filter_by_site'] else None, args.p2_end)
+
+        # Mismo site que build_drivers_total_query (None = global); cross-site siempre global
+        tipo = driver_type(driver_config)
+        if nombre == 'cross_site_drivers':
+            sitio = None
+        elif tipo == ORDERS:
+            sitio = args.site if driver_config['filter_by_site'] else None
+        else:
+            sitio = args.site if args.filter_driver_by_site else None
+        p1_start, p1_end, p2_start, p2_end = periodos or (args.p1_start, args.p1_end, args.p2_start, args.p2_end)
+        return pd.DataFrame({
+            'DRV_P1': [self.driver_store.drv(sitio, p1_start, p1_end, tipo)],
+            'DRV_P2': [self.driver_store.drv(sitio, p2_start, p2_end, tipo)],
+        })
+
+    def _resultado(self, nombre, query, **kwargs):
+        """Retorna el resultado de un job ya programado, o ejecuta la query si no lo estaba."""
+        if self.scheduler.has_job(nombre):
+            return self.scheduler.result(nombre)
+        return self.scheduler.run(nombre, query, **kwargs)
+
+    def load_hard_metrics(self):
+        """PASO 0: hard metrics de eventos pre-calculadas (metrics/eventos/data) para ambos períodos."""
+        args = self.args
+        p1_start_dt, p2_start_dt = self.p1_start_dt, self.p2_start_dt
+        queries_ejecutadas = self.queries_ejecutadas
+
+        print("="*80)
+        print("PASO 0: HARD METRICS")
+        print("="*80 + "\n")
+
+        # Cargar métricas para ambos períodos
+        p1_year, p1_month = p1_start_dt.year, p1_start_dt.month
+        p2_year, p2_month = p2_start_dt.year, p2_start_dt.month
+
+        df_metrics_p1 = cargar_hard_metrics(args.site, p1_year, p1_month)
+        df_metrics_p2 = cargar_hard_metrics(args.site, p2_year, p2_month)
+
+        use_hard_metrics = (df_metrics_p1 is not None and df_metrics_p2 is not None)
+
+        if use_hard_metrics:
+            print(f"[OK] Hard metrics disponibles para ambos períodos")
+
+            # Registrar en queries ejecutadas
+            queries_ejecutadas.append({
+                'nombre': 'Hard Metrics - Eventos Comerciales',
+                'descripcion': f'Correlación pre-calculada entre incoming y eventos (P1: {len(df_metrics_p1)} registros, P2: {len(df_metrics_p2)} registros)',
+                'tabla': 'metrics/eventos/data/*.parquet',
+                'output': f'Fuente: WHOWNER.LK_MKP_PROMOTIONS_EVENT'
+            })
+        else:
+            print(f"[INFO] Usando análisis fallback (sin hard metrics)")
+
+        print()
+
+        self.df_metrics_p1, self.df_metrics_p2 = df_metrics_p1, df_metrics_p2
+        self.use_hard_metrics = use_hard_metrics
+        return use_hard_metrics
+
+    def schedule_queries(self):
+        """
+        Arma las queries de la corrida y las envía al scheduler.
+
+        Las queries de eventos, feriados, cross-site y PASO 1-3 no dependen
+        entre sí: se envían todas juntas y cada etapa toma su resultado cuando
+        lo necesita. Con --plan / --budget-gb primero se estiman con dry-run.
+
+        Los jobs que se envían salen de _jobs_corrida (etapas memoizadas,
+        DriverStore y resultados compartidos) y, con --budget-gb, de
+        _degradar_por_presupuesto.
+
+        Returns:
+            QueryPlan (None sin --plan ni --budget-gb)
+        """
+        args = self.args
+        aperturas_list = self.aperturas_list
+        p1_start_dt, p1_end_dt = self.p1_start_dt, self.p1_end_dt
+        p2_start_dt, p2_end_dt = self.p2_start_dt, self.p2_end_dt
+        backend, presupuesto = self.backend, self.presupuesto
+        scheduler = self.scheduler
+        use_hard_metrics = self.use_hard_metrics
+
+        # Obtener filtro del commerce group
+        commerce_filter = COMMERCE_GROUP_FILTERS.get(args.commerce_group)
+        if not commerce_filter:
+            raise ReportError(f"Commerce group '{args.commerce_group}' no tiene filtro definido")
+
+        # Filtro de proceso si está especificado
+        process_filter = build_process_filter(args.process_name)
+
+        # Configuración de driver para este commerce group
+        driver_config = get_driver_config(args.commerce_group)
+
+        # Modo proceso único: --process-name con --aperturas NONE (cuadro sintético, sin queries por apertura)
+        modo_proceso_unico = (args.process_name is not None and 'NONE' in aperturas_list)
+
+        # Rango extendido de feriados: 15 días antes de P1 hasta fin de P2 (cubre efectos retardados)
+        feriados_lookback_start = (p1_start_dt - timedelta(days=15)).strftime('%Y-%m-%d')
+        feriados_range_end = p2_end_dt.strftime('%Y-%m-%d')
+        query_feriados = build_feriados_query(args.site, feriados_lookback_start, feriados_range_end)
+
+        query_eventos = build_eventos_fallback_query(
+            args.site,
+            p1_start_dt.strftime('%Y-%m-%d'),
+            p1_end_dt.strftime('%Y-%m-%d'),
+            p2_start_dt.strftime('%Y-%m-%d'),
+            p2_end_dt.strftime('%Y-%m-%d'),
+            COMMERCE_GROUP_EVENTS_FILTERS.get(args.commerce_group, "")
+        )
+
+        # Aperturas con campo mapeado (las demás se informan y saltan en PASO 3)
+        campos_aperturas = {} if modo_proceso_unico else {
+            a: FIELD_MAPPING[a] for a in aperturas_list if a in FIELD_MAPPING
+        }
+
+        # Tabla BASE_CONTACTS materializada: PASO 1-3 y el muestreo leen esta tabla
+        # chica en lugar de BT_CX_CONTACTS (se crea una vez y se reutiliza mientras no expire)
+        base_contacts_table = None
+        deps_contactos = []
+        if args.materialize_base:
+            scratch_dataset = args.scratch_dataset or backend.scratch_dataset
+            if not scratch_dataset:
+                raise ReportError("--materialize-base requiere --scratch-dataset (o CR_SCRATCH_DATASET)")
+            base_contacts_table, query_base_contacts = build_base_contacts_table(
+                args.site, args.commerce_group, commerce_filter,
+                list(campos_aperturas.values()) + list(FIELD_MAPPING.values()),
+                args.p1_start, args.p2_end, scratch_dataset, process_filter
+            )
+            print(f"[BASE] Materializando contactos filtrados en {base_contacts_table}")
+            deps_contactos = ['base_contacts']
+
+        query_drivers_total = build_drivers_total_query(
+            args.site, driver_config, args.p1_start, args.p1_end, args.p2_start, args.p2_end,
+            args.filter_driver_by_site
+        )
+
+        # Cubo diario local (--contacts-cube): días que le faltan para las aperturas de la corrida
+        cubo_faltante = None
+        if self.contacts_cube is not None:
+            cubo_faltante = self.contacts_cube.missing_range(
+                ContactsCube.rangos(list(campos_aperturas), args.p1_start, args.p2_end)
+            )
+
+        self.commerce_filter, self.process_filter = commerce_filter, process_filter
+        self.driver_config = driver_config
+        self.modo_proceso_unico = modo_proceso_unico
+        self.feriados_lookback_start, self.feriados_range_end = feriados_lookback_start, feriados_range_end
+        self.query_feriados, self.query_eventos = query_feriados, query_eventos
+        self.campos_aperturas = campos_aperturas
+        self.cubo_faltante = cubo_faltante
+        self.base_contacts_table, self.deps_contactos = base_contacts_table, deps_contactos
+
+        trabajos_comunes = []
+        if args.materialize_base:
+            trabajos_comunes.append(('base_contacts', 'base', query_base_contacts, {'use_cache': False}))
+        if not use_hard_metrics:
+            trabajos_comunes.append(('eventos_fallback', 'contexto', query_eventos, {}))
+        trabajos_comunes.append(('feriados', 'contexto', query_feriados, {}))
+        trabajos_comunes.append(('cross_site_incoming', 'contexto', build_cross_site_incoming_query(
+            args.commerce_group, commerce_filter,
+            args.p1_start, args.p1_end, args.p2_start, args.p2_end, process_filter
+        ), {}))
+        trabajos_comunes.append(('cross_site_drivers', 'contexto', build_global_drivers_query(
+            driver_config, args.p1_start, args.p1_end, args.p2_start, args.p2_end
+        ), {}))
+        trabajos_comunes.append(('drivers_total', 'metricas', query_drivers_total, {}))
+
+        # Sketches HLL (--distinct-sketches): una query por métrica con los días que le faltan
+        sketches_faltantes = {}
+        for metrica, store in self.sketch_stores.items():
+            faltante = store.missing_range(args.p1_start, args.p2_end)
+            if faltante is None:
+                continue
+            sketches_faltantes[metrica] = (f'sketch_{metrica}',) + faltante
+            trabajos_comunes.append((f'sketch_{metrica}', 'contexto', build_hll_registers_query(
+                metrica, *faltante, store.precision, args.commerce_group
+            ), {}))
+        self.sketches_faltantes = sketches_faltantes
+
+        corrida = self._jobs_corrida(trabajos_comunes, args.fused_scan)
+        rechazados = {}   # nombre → QueryBudgetError (etapas opcionales que no entran)
+
+        if args.plan or presupuesto is not None:
+            print(f"[PLAN] Estimando bytes con dry-run en {backend.name}...")
+            self.plan = self._planificar(corrida[0])
+            if presupuesto is not None:
+                corrida, self.plan, rechazados = self._degradar_por_presupuesto(trabajos_comunes, corrida, self.plan)
+        trabajos, self.claves_nodos, self.memo, self.drivers_faltantes = corrida
+        self.rechazados = rechazados
+
+        if self.plan is not None:
+            print("\n" + "="*80)
+            print("PLAN DE QUERIES")
+            print("="*80)
+            print(self.plan.format(ETAPAS_QUERIES))
+            for error in rechazados.values():
+                print(f"  [PRESUPUESTO] {error}")
+            for nodo in self.memo:
+                print(f"  [MEMO] {nodo}: memoizada, sus queries no se ejecutan")
+            print()
+
+            if args.plan:
+                print("[PLAN] Modo --plan: no se ejecutó ninguna query")
+                return self.plan
+        elif self.memo:
+            print(f"[MEMO] Etapas reutilizadas de la cache de etapas (sin queries): {', '.join(self.memo)}")
+        print(f"[SCHEDULER] Enviando queries independientes (máx {args.max_concurrent_queries} simultáneas, timeout {args.query_timeout}s)...")
+
+        for nombre, etapa, query, opciones in trabajos:
+            if nombre in rechazados:
+                scheduler.reject(nombre, rechazados[nombre])
+            else:
+                scheduler.submit(nombre, query, **opciones)
+        for nombre, df in self.shared_results.items():
+            scheduler.provide(nombre, df)
+
+        print()
+        return self.plan
+
+    def _jobs_por_paso(self) -> list:
+        """Jobs de PASO 1-3 con una query por paso."""
+        args = self.args
+        commerce_filter, process_filter = self.commerce_filter, self.process_filter
+        base_contacts_table, deps_contactos = self.base_contacts_table, self.deps_contactos
+
+        query_incoming_total = build_incoming_total_query(
+            args.site, args.commerce_group, commerce_filter,
+            args.p1_start, args.p1_end, args.p2_start, args.p2_end, process_filter,
+            base_table=base_contacts_table
+        )
+        query_weekly = build_weekly_query(
+            args.site, args.commerce_group, commerce_filter, args.p2_end,
+            self.driver_config['filter_by_site'], process_filter, base_table=base_contacts_table
+        )
+        trabajos = [
+            ('incoming_total', 'metricas', query_incoming_total, {'depends_on': deps_contactos}),
+            ('weekly', 'metricas', query_weekly, {'depends_on': deps_contactos}),
+        ]
+        for apertura, campo_bq in self.campos_aperturas.items():
+            trabajos.append((f'dimension_{apertura}', 'aperturas', build_dimension_query(
+                args.site, args.commerce_group, commerce_filter, campo_bq,
+                args.p1_start, args.p1_end, args.p2_start, args.p2_end, process_filter,
+                base_table=base_contacts_table
+            ), {'depends_on': deps_contactos}))
+        return trabajos
+
+    def _jobs_contactos(self, fused_scan: bool) -> list:
+        """Jobs de PASO 1-3 sobre contactos: cubo diario, una lectura fusionada o una query por paso."""
+        args = self.args
+        commerce_filter, process_filter = self.commerce_filter, self.process_filter
+        driver_config, campos_aperturas = self.driver_config, self.campos_aperturas
+
+        if self.contacts_cube is not None:
+            # Cubo diario: a BigQuery solo van los días que le faltan (ver utils/contacts_cube.py)
+            trabajos = [('drivers_semanales', 'metricas', build_weekly_drivers_query(
+                args.site, args.p2_end, driver_config['filter_by_site']
+            ), {})]
+            if self.cubo_faltante is not None:
+                inicio, fin, aperturas_faltantes = self.cubo_faltante
+                trabajos.insert(0, ('contactos_diarios', 'metricas', build_daily_contacts_query(
+                    args.site, args.commerce_group, commerce_filter,
+                    {a: campos_aperturas[a] for a in aperturas_faltantes}, inicio, fin, process_filter
+                ), {}))
+            return trabajos
+        if fused_scan:
+            # Modo fusionado: total, semanal y aperturas salen de una sola lectura de BT_CX_CONTACTS
+            query_fusionada = build_fused_contacts_query(
+                args.site, args.commerce_group, commerce_filter, campos_aperturas,
+                args.p1_start, args.p1_end, args.p2_start, args.p2_end, process_filter,
+                base_table=self.base_contacts_table
+            )
+            return [
+                ('contactos_fusionados', 'metricas', query_fusionada, {'depends_on': self.deps_contactos}),
+                ('drivers_semanales', 'metricas', build_weekly_drivers_query(
+                    args.site, args.p2_end, driver_config['filter_by_site']
+                ), {}),
+            ]
+        return self._jobs_por_paso()
+
+    def _jobs_corrida(self, trabajos_comunes: list, fused_scan: bool) -> tuple:
+        """
+        Jobs a enviar: los comunes más los de contactos, sin los de etapas
+        memoizadas, con las cargas del DriverStore y sin los ya compartidos.
+
+        Returns:
+            (jobs, {nodo: (key, ttl)}, {nodo: salidas memoizadas}, {fuente: (job de carga, inicio, fin)})
+        """
+        trabajos, claves, memo = self._sin_memoizados(trabajos_comunes + self._jobs_contactos(fused_scan))
+        trabajos, drivers_faltantes = self._con_driver_store(trabajos)
+        return self._sin_compartidos(trabajos), claves, memo, drivers_faltantes
+
+    def _planificar(self, trabajos: list) -> QueryPlan:
+        """Dry-run de los jobs de la corrida (el muestreo se estima recién al ejecutarlo)."""
+        plan = QueryPlan(self.backend, cache=self.query_cache, budget=self.presupuesto)
+        for nombre, etapa, query, _ in trabajos:
+            plan.add(nombre, query, etapa)
+        if not self.args.skip_conversations:
+            plan.add_pending('muestreo_conversaciones', 'muestreo',
+                             'depende de los cuadros de PASO 3 (se estima al ejecutarla)')
+        return plan
+
+    def _con_driver_store(self, trabajos: list) -> tuple:
+        """
+        Con --driver-store, los jobs de drivers que quedan se reemplazan por la
+        carga de lo que le falta al DriverStore (una query por fuente) y PASO 2
+        solo lee el incoming semanal.
+
+        Returns:
+            (jobs, {fuente: (job de carga, inicio, fin)})
+        """
+        if self.driver_store is None:
+            return trabajos, {}
+        args, driver_config = self.args, self.driver_config
+        fuente = 'orders' if driver_type(driver_config) == ORDERS else 'shipping'
+        rangos = {}
+        nombres = {t[0] for t in trabajos}
+        if nombres & {'drivers_total', 'cross_site_drivers'}:
+            rangos[fuente] = (args.p1_start, args.p2_end)
+        if nombres & {'drivers_semanales', 'weekly'}:
+            inicio = min(weekly_start(args.p2_end), rangos.get('orders', (args.p2_end,))[0])
+            rangos['orders'] = (inicio, args.p2_end)
+
+        cargas, faltantes = [], {}
+        for nombre_fuente, (inicio, fin) in rangos.items():
+            faltante = self.driver_store.missing_range(nombre_fuente, inicio, fin, refresh=args.refresh)
+            if faltante is None:
+                continue
+            if nombre_fuente == 'orders':
+                cargas.append(('drivers_diarios', 'metricas', build_daily_orders_query(*faltante), {}))
+            else:
+                cargas.append(('drivers_envios', 'metricas',
+                               build_shipping_drivers_query(*faltante, SHIPPING_MEASURES), {}))
+            faltantes[nombre_fuente] = (cargas[-1][0],) + faltante
+
+        resultado = []
+        for nombre, etapa, query, opciones in trabajos:
+            if nombre in ('drivers_total', 'drivers_semanales', 'cross_site_drivers'):
+                resultado.extend(cargas)
+                cargas = []
+            elif nombre == 'weekly':
+                resultado.append((nombre, etapa, build_weekly_query(
+                    args.site, args.commerce_group, self.commerce_filter, args.p2_end,
+                    driver_config['filter_by_site'], self.process_filter, base_table=self.base_contacts_table,
+                    include_drivers=False
+                ), opciones))
+            else:
+                resultado.append((nombre, etapa, query, opciones))
+        return resultado + cargas, faltantes
+
+    def _sin_compartidos(self, trabajos: list) -> list:
+        """Jobs que hay que ejecutar (los de shared_results ya tienen resultado)."""
+        return [t for t in trabajos if t[0] not in self.shared_results]
+
+    def _sin_memoizados(self, trabajos: list) -> tuple:
+        """
+        Jobs que lee alguna etapa sin memoizar: las etapas memoizadas (DAG_ETAPAS)
+        se restauran de la cache de etapas y sus queries no se envían.
+
+        Returns:
+            (jobs, {nodo: (key, ttl)}, {nodo: salidas memoizadas})
+        """
+        if self.stage_cache is None:
+            return trabajos, {}, {}
+        nodos = self._nodos_dag(self.campos_aperturas)
+        sqls = {nombre: query for nombre, _, query, _ in trabajos}
+        if self.contacts_cube is not None:
+            # El SQL del cubo depende de los días que le faltan: la identidad de los nodos
+            # es la de las queries por paso que el cubo reemplaza (mismas keys que sin cubo)
+            sqls.pop('contactos_diarios', None)
+            sqls.update({nombre: query for nombre, _, query, _ in self._jobs_por_paso()})
+        claves = node_keys({n: d for n, d in nodos.items() if d['memo']}, sqls, namespace=self.backend.name)
+        memo = {}
+        for nodo, (key, _) in claves.items():
+            salidas = self.stage_cache.get(key)
+            if salidas is not None:
+                memo[nodo] = salidas
+
+        declarados = {j for d in nodos.values() for j in d['jobs']}
+        necesarios = {j for n, d in nodos.items() if n not in memo for j in d['jobs']}
+        necesarios |= {t[0] for t in trabajos if t[0] not in declarados}
+        # Dependencias de los jobs que quedan (ej: base_contacts)
+        necesarios |= {d for t in trabajos if t[0] in necesarios for d in t[3].get('depends_on', [])}
+        return [t for t in trabajos if t[0] in necesarios], claves, memo
+
+    def _degradar_por_presupuesto(self, trabajos_comunes: list, corrida: tuple, plan: QueryPlan) -> tuple:
+        """
+        Ajusta los jobs de la corrida al presupuesto (--budget-gb).
+
+        1. Si PASO 1-3 no entran con una query por paso, se usa la lectura
+           fusionada cuando estima menos (queda en fusionado_por_presupuesto;
+           args.fused_scan conserva lo que pidió el usuario).
+        2. Si PASO 1-3 siguen sin entrar, se rechaza la corrida.
+        3. Las queries de contexto que no entran en lo que queda se descartan
+           (el reporte omite esa sección).
+
+        Args:
+            trabajos_comunes: Jobs que no dependen del modo de lectura de contactos
+            corrida: Resultado de _jobs_corrida
+            plan: QueryPlan de corrida
+
+        Returns:
+            (corrida, plan, {nombre: QueryBudgetError de los jobs descartados})
+
+        Raises:
+            ReportError: PASO 1-3 no entran en el presupuesto
+        """
+        args, presupuesto = self.args, self.presupuesto
+
+        # Degradación 1: una query por paso no entra → una sola lectura de contactos (como --fused-scan)
+        if (not args.fused_scan and self.contacts_cube is None
+                and plan.billed_bytes(ETAPAS_REQUERIDAS) > presupuesto.max_bytes):
+            corrida_fusionada = self._jobs_corrida(trabajos_comunes, True)
+            plan_fusionado = self._planificar(corrida_fusionada[0])
+            if plan_fusionado.billed_bytes(ETAPAS_REQUERIDAS) < plan.billed_bytes(ETAPAS_REQUERIDAS):
+                print(f"[PRESUPUESTO] PASO 1-3 estiman {format_bytes(plan.billed_bytes(ETAPAS_REQUERIDAS))}: "
+                      f"se usa lectura fusionada ({format_bytes(plan_fusionado.billed_bytes(ETAPAS_REQUERIDAS))})")
+                self.fusionado_por_presupuesto = True
+                corrida, plan = corrida_fusionada, plan_fusionado
+
+        # PASO 1-3 son obligatorios: si no entran se rechaza la corrida
+        requerido = plan.billed_bytes(ETAPAS_REQUERIDAS)
+        if requerido > presupuesto.max_bytes:
+            print(plan.format(ETAPAS_QUERIES))
+            print()
+            raise ReportError(f"PASO 1-3 estiman {format_bytes(requerido)} y el presupuesto es "
+                              f"{format_bytes(presupuesto.max_bytes)} (--budget-gb). Corrida rechazada.")
+
+        # Degradación 2: queries de contexto que no entran se descartan (el reporte omite esa sección)
+        rechazados = {}
+        disponible = presupuesto.max_bytes - requerido
+        for item in plan.items:
+            if item['etapa'] != 'contexto' or item['cache']:
+                continue
+            if (item['bytes'] or 0) > disponible:
+                rechazados[item['nombre']] = QueryBudgetError(
+                    f"Job '{item['nombre']}' descartado por presupuesto: estima {format_bytes(item['bytes'])}, "
+                    f"quedan {format_bytes(disponible)}"
+                )
+            else:
+                disponible -= item['bytes'] or 0
+        return corrida, plan, rechazados
+
+    def _lectura_fusionada(self) -> bool:
+        """PASO 1-3 salen de una sola lectura de contactos (--fused-scan o degradación por presupuesto)."""
+        return self.args.fused_scan or self.fusionado_por_presupuesto
+
+    def commercial_events(self):
+        """Eventos comerciales de ambos períodos: hard metrics o query fallback on-the-fly (v6.4.2)."""
+        args = self.args
+        p1_start_dt, p2_start_dt = self.p1_start_dt, self.p2_start_dt
+        use_hard_metrics = self.use_hard_metrics
+        df_metrics_p1, df_metrics_p2 = self.df_metrics_p1, self.df_metrics_p2
+        query_eventos = self.query_eventos
+        queries_ejecutadas = self.queries_ejecutadas
+
+        eventos_comerciales = {}
+        eventos_comerciales_p1 = {}
+        eventos_comerciales_p2 = {}
+        eventos_html = ""
+        eventos_fuente = "No disponible"
+        total_casos_correlacionados = 0
+        porcentaje_correlacion_global = 0
+
+        # Intentar usar hard metrics primero
+        eventos_from_hard_metrics = False
+
+        if use_hard_metrics:
+            print("[EVENTOS] Intentando cargar desde hard metrics...")
+
+            # Combinar ambos períodos
+            df_metrics_combined = pd.concat([df_metrics_p1, df_metrics_p2], ignore_index=True)
+
+            # Filtrar por commerce group actual
+            df_eventos_cg = df_metrics_combined[
+                df_metrics_combined['COMMERCE_GROUP'] == args.commerce_group
+            ]
+
+
+            if len(df_eventos_cg) > 0 and 'EVENTO' in df_eventos_cg.columns:
+                eventos_from_hard_metrics = True
+                eventos_fuente = "Hard Metrics (pre-calculadas)"
+
+                # Separar por período
+                for _, row in df_eventos_cg.iterrows():
+                    fecha_inicio = row.get('FECHA_INICIO', '')
+                    fecha_fin = row.get('FECHA_FIN', '')
+
+                    if hasattr(fecha_inicio, 'strftime'):
+                        fecha_inicio_str = fecha_inicio.strftime('%Y-%m-%d')
+                    else:
+                        fecha_inicio_str = str(fecha_inicio).split(' ')[0] if fecha_inicio else ''
+
+                    if hasattr(fecha_fin, 'strftime'):
+                        fecha_fin_str = fecha_fin.strftime('%Y-%m-%d')
+                    else:
+                        fecha_fin_str = str(fecha_fin).split(' ')[0] if fecha_fin else ''
+
+                    evento_key = row['EVENTO']
+
+                    # Excluir eventos de prueba/test
+                    if evento_key and ('PRUEBA' in str(evento_key).upper() or 'TEST' in str(evento_key).upper()):
+                        continue
+
+                    casos = int(row.get('CASOS', 0))
+                    porcentaje = float(row.get('PORCENTAJE', 0))
+
+                    # Determinar período basado en fechas
+                    if fecha_inicio_str <= args.p1_end:
+                        if evento_key not in eventos_comerciales_p1:
+                            eventos_comerciales_p1[evento_key] = {
+                                'nombre': evento_key,
+                                'fecha_inicio': fecha_inicio_str,
+                                'fecha_fin': fecha_fin_str,
+                                'casos': 0,
+                                'porcentaje': 0
+                            }
+                        eventos_comerciales_p1[evento_key]['casos'] += casos
+                        eventos_comerciales_p1[evento_key]['porcentaje'] = porcentaje
+                    else:
+                        if evento_key not in eventos_comerciales_p2:
+                            eventos_comerciales_p2[evento_key] = {
+                                'nombre': evento_key,
+                                'fecha_inicio': fecha_inicio_str,
+                                'fecha_fin': fecha_fin_str,
+                                'casos': 0,
+                                'porcentaje': 0
+                            }
+                        eventos_comerciales_p2[evento_key]['casos'] += casos
+                        eventos_comerciales_p2[evento_key]['porcentaje'] = porcentaje
+
+                print(f"[OK] Eventos cargados desde hard metrics: P1={len(eventos_comerciales_p1)}, P2={len(eventos_comerciales_p2)}")
+
+        # Fallback: Query on-the-fly si no hay hard metrics o no tienen datos de eventos
+
+        if not eventos_from_hard_metrics:
+            print("[EVENTOS] Ejecutando query fallback on-the-fly...")
+
+            try:
+                # Ejecutar query usando cliente Python de BigQuery (fix v6.3.9.2 - compatible Windows)
+                # Antes usaba subprocess.run(['bq', ...]) que fallaba en Windows con WinError 2
+                print(f"[QUERY] Ejecutando query de eventos comerciales...")
+
+                df_eventos = self._resultado('eventos_fallback', query_eventos)
+
+                if len(df_eventos) > 0:
+                    eventos_fuente = "Query On-the-fly (WHOWNER.LK_MKP_PROMOTIONS_EVENT)"
+
+                    # Procesar resultados por período
+                    for _, row in df_eventos.iterrows():
+                        evento_key = row['EVENT_NAME']
+                        periodo = row['periodo']
+
+                        evento_data = {
+                            'nombre': evento_key,
+                            'fecha_inicio': str(row['fecha_inicio']),
+                            'fecha_fin': str(row['fecha_fin']),
+                            'casos': int(row['casos']),
+                            'porcentaje': float(row['porcentaje'])
+                        }
+
+                        if periodo == 'P1':
+                            eventos_comerciales_p1[evento_key] = evento_data
+                        else:
+                            eventos_comerciales_p2[evento_key] = evento_data
+
+                    print(f"[OK] Eventos desde query fallback: P1={len(eventos_comerciales_p1)}, P2={len(eventos_comerciales_p2)}")
+
+                    # Registrar query ejecutada
+                    queries_ejecutadas.append({
+                        'nombre': 'Eventos Comerciales (Fallback)',
+                        'query': query_eventos[:500] + '...',
+                        'output': f'{len(df_eventos)} eventos correlacionados'
+                    })
+                else:
+                    print(f"[INFO] No se encontraron eventos comerciales para el período analizado")
+
+            except Exception as e:
+                print(f"[WARNING] Error en query fallback de eventos: {e}")
+
+        # Consolidar eventos de ambos períodos
+        all_eventos = set(list(eventos_comerciales_p1.keys()) + list(eventos_comerciales_p2.keys()))
+
+        for evento_key in all_eventos:
+            p1_data = eventos_comerciales_p1.get(evento_key, {'casos': 0, 'porcentaje': 0})
+            p2_data = eventos_comerciales_p2.get(evento_key, {'casos': 0, 'porcentaje': 0})
+
+            # Usar datos del período que tenga info de fechas
+            base_data = p1_data if p1_data.get('fecha_inicio') else p2_data
+
+            eventos_comerciales[evento_key] = {
+                'nombre': evento_key,
+                'fecha_inicio': base_data.get('fecha_inicio', ''),
+                'fecha_fin': base_data.get('fecha_fin', ''),
+                'casos_p1': p1_data.get('casos', 0),
+                'casos_p2': p2_data.get('casos', 0),
+                'casos_total': p1_data.get('casos', 0) + p2_data.get('casos', 0),
+                'porcentaje_p1': p1_data.get('porcentaje', 0),
+                'porcentaje_p2': p2_data.get('porcentaje', 0),
+                'delta_casos': p2_data.get('casos', 0) - p1_data.get('casos', 0)
+            }
+
+        # Calcular totales globales
+        total_casos_correlacionados = sum(e['casos_total'] for e in eventos_comerciales.values())
+
+        # Generar HTML de eventos mejorado (v6.4.2)
+        # Definir etiquetas de período para eventos (antes de usarlas en HTML)
+        p1_label_eventos = f"{p1_start_dt.strftime('%b %Y')}"
+        p2_label_eventos = f"{p2_start_dt.strftime('%b %Y')}"
+
+        if len(eventos_comerciales) > 0:
+            # Filtrar eventos con al menos 1% de correlación en algún período
+            eventos_relevantes = {k: v for k, v in eventos_comerciales.items() 
+                                  if v['porcentaje_p1'] >= 1.0 or v['porcentaje_p2'] >= 1.0}
+
+            if len(eventos_relevantes) > 0:
+                # Ordenar por total de casos
+                eventos_ordenados = sorted(eventos_relevantes.items(), key=lambda x: x[1]['casos_total'], reverse=True)[:10]
+
+                # Determinar iconos por tipo de evento
+                def get_evento_icon(nombre):
+                    nombre_lower = nombre.lower()
+                    if 'black' in nombre_lower or 'friday' in nombre_lower:
+                        return '🛒'
+                    elif 'cyber' in nombre_lower:
+                        return '💻'
+                    elif 'natal' in nombre_lower or 'navidad' in nombre_lower or 'christmas' in nombre_lower:
+                        return '🎄'
+                    elif 'hot' in nombre_lower or 'sale' in nombre_lower:
+                        return '🔥'
+                    elif 'dia' in nombre_lower or 'madre' in nombre_lower or 'padre' in nombre_lower:
+                        return '🎁'
+                    else:
+                        return '📅'
+
+                eventos_html = f"""
+        <div class="eventos-comerciales">
+            <h2>🎉 Correlación con Eventos Comerciales</h2>
+            <div class="info-box">
+                ℹ️ Análisis basado en fecha de cierre de orden (ORD_CLOSED_DT). 
+                Fuente: {eventos_fuente}
+            </div>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Evento</th>
+                        <th>Período del Evento</th>
+                        <th>Casos {p1_label_eventos}</th>
+                        <th>Casos {p2_label_eventos}</th>
+                        <th>Δ Casos</th>
+                        <th>% Correlación</th>
+                    </tr>
+                </thead>
+                <tbody>
+        """
+
+                for evento_nombre, evento_data in eventos_ordenados:
+                    icon = get_evento_icon(evento_nombre)
+                    delta = evento_data['delta_casos']
+
+                    # Badge de variación
+                    if delta > 0:
+                        badge_class = "badge-negative"
+                        delta_text = f"+{delta:,}"
+                    elif delta < 0:
+                        badge_class = "badge-positive"
+                        delta_text = f"{delta:,}"
+                    else:
+                        badge_class = "badge-neutral"
+                        delta_text = "0"
+
+                    # Porcentaje promedio
+                    pct_avg = (evento_data['porcentaje_p1'] + evento_data['porcentaje_p2']) / 2 if evento_data['porcentaje_p1'] > 0 and evento_data['porcentaje_p2'] > 0 else max(evento_data['porcentaje_p1'], evento_data['porcentaje_p2'])
+
+                    eventos_html += f"""
+                    <tr>
+                        <td class="evento-nombre"><span class="evento-icon">{icon}</span>{evento_data['nombre']}</td>
+                        <td>{evento_data['fecha_inicio']} → {evento_data['fecha_fin']}</td>
+                        <td class="number">{evento_data['casos_p1']:,}</td>
+                        <td class="number">{evento_data['casos_p2']:,}</td>
+                        <td class="number"><span class="badge {badge_class}">{delta_text}</span></td>
+                        <td class="number">{pct_avg:.1f}%</td>
+                    </tr>
+            """
+
+                eventos_html += """
+                </tbody>
+            </table>
+            <div class="summary">
+                <span class="summary-icon">💡</span>
+                <span class="summary-text">
+        """
+                eventos_html += f"<strong>{total_casos_correlacionados:,}</strong> casos del incoming están correlacionados con eventos comerciales del período analizado."
+                eventos_html += """
+                </span>
+            </div>
+        </div>
+        """
+
+                print(f"[OK] HTML de eventos generado con {len(eventos_ordenados)} eventos relevantes")
+            else:
+                # v6.4.3: Ocultar sección si no hay eventos con correlación significativa
+                print("[INFO] No se encontraron eventos con correlacion >=1% - sección oculta")
+                eventos_html = ""
+        else:
+            # v6.4.3: Ocultar sección si no hay datos de eventos comerciales
+            print("[INFO] No hay datos de eventos comerciales disponibles - sección oculta")
+            eventos_html = ""
+
+        print()
+
+        self.eventos_comerciales = eventos_comerciales
+        self.eventos_comerciales_p1, self.eventos_comerciales_p2 = eventos_comerciales_p1, eventos_comerciales_p2
+        self.eventos_html, self.eventos_fuente = eventos_html, eventos_fuente
+        self.total_casos_correlacionados = total_casos_correlacionados
+        self.p1_label_eventos, self.p2_label_eventos = p1_label_eventos, p2_label_eventos
+        return eventos_comerciales
+
+    def holidays(self):
+        """Feriados desde 15 días antes de P1 hasta el fin de P2 (v6.4.10)."""
+        p1_start_dt, p1_end_dt, p2_end_dt = self.p1_start_dt, self.p1_end_dt, self.p2_end_dt
+        p1_label_eventos, p2_label_eventos = self.p1_label_eventos, self.p2_label_eventos
+        feriados_lookback_start, feriados_range_end = self.feriados_lookback_start, self.feriados_range_end
+        query_feriados = self.query_feriados
+        queries_ejecutadas = self.queries_ejecutadas
+
+        print("="*80)
+        print("FERIADOS EN PERÍODO ANALIZADO")
+        print("="*80 + "\n")
+
+        feriados_html = ""
+        feriados_data = []
+
+        try:
+            print(f"[QUERY] Consultando feriados desde {feriados_lookback_start} hasta {feriados_range_end}...")
+            df_feriados = self._resultado('feriados', query_feriados)
+
+            if len(df_feriados) > 0:
+                df_feriados['Fecha_feriado'] = pd.to_datetime(df_feriados['Fecha_feriado'])
+
+                for _, row in df_feriados.iterrows():
+                    fecha = row['Fecha_feriado']
+                    fecha_str = fecha.strftime('%Y-%m-%d')
+                    desc = row['HOLIDAY_DESC']
+                    site = row['SIT_SITE_ID']
+
+                    if fecha < p1_start_dt:
+                        ubicacion = "Pre-período (15d previos)"
+                    elif fecha <= p1_end_dt:
+                        ubicacion = f"P1 ({p1_label_eventos})"
+                    elif fecha <= p2_end_dt:
+                        ubicacion = f"P2 ({p2_label_eventos})"
+                    else:
+                        ubicacion = "Fuera de rango"
+
+                    feriados_data.append({
+                        'fecha': fecha_str,
+                        'descripcion': desc,
+                        'site': site,
+                        'ubicacion': ubicacion,
+                        'dia_semana': fecha.strftime('%A')
+                    })
+
+                print(f"[OK] {len(feriados_data)} feriados encontrados en el rango extendido")
+
+                queries_ejecutadas.append({
+                    'nombre': 'Feriados del Período',
+                    'query': query_feriados[:500] + '...',
+                    'output': f'{len(feriados_data)} feriados encontrados'
+                })
+            else:
+                print("[INFO] No se encontraron feriados en el rango analizado")
+
+        except Exception as e:
+            print(f"[WARNING] Error al consultar feriados: {e}")
+
+        # Generar HTML de feriados
+        if len(feriados_data) > 0:
+            DIAS_ES = {
+                'Monday': 'Lunes', 'Tuesday': 'Martes', 'Wednesday': 'Miércoles',
+                'Thursday': 'Jueves', 'Friday': 'Viernes', 'Saturday': 'Sábado', 'Sunday': 'Domingo'
+            }
+
+            feriados_pre = [f for f in feriados_data if f['ubicacion'].startswith('Pre-período')]
+            feriados_p1 = [f for f in feriados_data if f['ubicacion'].startswith('P1')]
+            feriados_p2 = [f for f in feriados_data if f['ubicacion'].startswith('P2')]
+
+            feriados_html = f"""
+        <div class="feriados-periodo">
+            <h2>🗓️ Feriados en el Período Analizado</h2>
+            <div class="info-box">
+                ℹ️ Se incluyen feriados desde 15 días previos al inicio de P1 ({feriados_lookback_start})
+                hasta el fin de P2 ({feriados_range_end}). Los feriados previos al período pueden generar
+                efectos retardados en el incoming (ej: demoras de entrega que se contactan días después).
+            </div>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Fecha</th>
+                        <th>Día</th>
+                        <th>Feriado</th>
+                        <th>Site</th>
+                        <th>Ubicación</th>
+                    </tr>
+                </thead>
+                <tbody>
+    """
+
+            for f in feriados_data:
+                dia_es = DIAS_ES.get(f['dia_semana'], f['dia_semana'])
+
+                if f['ubicacion'].startswith('Pre-período'):
+                    badge_class = "badge-pre"
+                elif f['ubicacion'].startswith('P1'):
+                    badge_class = "badge-p1"
+                else:
+                    badge_class = "badge-p2"
+
+                feriados_html += f"""
+                    <tr>
+                        <td class="number">{f['fecha']}</td>
+                        <td>{dia_es}</td>
+                        <td class="feriado-nombre">🏛️ {f['descripcion']}</td>
+                        <td>{f['site']}</td>
+                        <td><span class="badge {badge_class}">{f['ubicacion']}</span></td>
+                    </tr>
+        """
+
+            feriados_html += """
+                </tbody>
+            </table>
+            <div class="summary">
+                <span class="summary-icon">💡</span>
+                <span class="summary-text">
+    """
+            feriados_html += f"<strong>{len(feriados_pre)}</strong> feriados en los 15 días previos a P1, "
+            feriados_html += f"<strong>{len(feriados_p1)}</strong> en P1, "
+            feriados_html += f"<strong>{len(feriados_p2)}</strong> en P2. "
+            feriados_html += "Los feriados pueden impactar el incoming por cierres operativos, demoras acumuladas y cambios en patrones de contacto."
+            feriados_html += """
+                </span>
+            </div>
+        </div>
+    """
+
+            print(f"[OK] HTML de feriados generado con {len(feriados_data)} registros")
+        else:
+            print("[INFO] Sin feriados para mostrar en el reporte")
+
+        print()
+
+        self.feriados_data, self.feriados_html = feriados_data, feriados_html
+        return feriados_data
+
+    def _cuadro_cross_site(self, commerce_group, p1_start, p1_end, p2_start, p2_end, process_name=None):
+        """
+    Genera un cuadro cuantitativo cross-site con métricas de CR desglosadas por site.
+    
+    Muestra una tabla en consola con sites en filas (MLA, MLB, MLM, ROLA, TOTAL)
+    y métricas en columnas (Incoming, Variación, CR, Variación CR).
+    
+    Además, genera una sección HTML que se inyecta automáticamente en el reporte
+    a través de self.eventos_html (aparece después de Eventos Comerciales
+    y antes de los Cuadros Cuantitativos por Dimensión).
+    
+    Driver: SIEMPRE global (sin filtro de site) independientemente del commerce group.
+    
+    Este cuadro es ADITIVO al flujo existente y NO modifica ninguna funcionalidad.
+    Si ocurre un error, se loguea y el flujo principal continúa sin interrupción.
+    
+    Las queries se toman del scheduler (jobs 'cross_site_incoming' y 'cross_site_drivers').
+    
+    Args:
+        commerce_group: Nombre del commerce group (ej: 'PDD', 'PNR', 'ME_DISTRIBUCION')
+        p1_start: Fecha inicio P1 (str YYYY-MM-DD)
+        p1_end: Fecha fin P1 (str YYYY-MM-DD)
+        p2_start: Fecha inicio P2 (str YYYY-MM-DD)
+        p2_end: Fecha fin P2 (str YYYY-MM-DD)
+        process_name: Nombre del proceso específico (opcional)
+    """
+        # Obtener filtro del commerce group
+        commerce_filter = COMMERCE_GROUP_FILTERS.get(commerce_group)
+        if not commerce_filter:
+            print(f"[CROSS-SITE] Commerce group '{commerce_group}' no tiene filtro definido - saltando cuadro cross-site")
+            return
+
+        # Obtener configuración de driver
+        try:
+            driver_config = get_driver_config(commerce_group)
+        except KeyError:
+            print(f"[CROSS-SITE] Commerce group '{commerce_group}' no tiene driver configurado - saltando cuadro cross-site")
+            return
+
+        # Filtro de proceso (si aplica)
+        process_filter_sql = build_process_filter(process_name)
+
+        print("=" * 80)
+        print("CUADRO CROSS-SITE (Vista Comparativa)")
+        print("=" * 80 + "\n")
+
+        # ─────────────────────────────────────────────────
+        # Query 1: Incoming por site (GROUP BY SIT_SITE_ID)
+        # ─────────────────────────────────────────────────
+        print("[CROSS-SITE] Calculando incoming por site...")
+
+        query_incoming_cross = build_cross_site_incoming_query(
+            commerce_group, commerce_filter, p1_start, p1_end, p2_start, p2_end, process_filter_sql
+        )
+
+        try:
+            df_inc_cross = self._resultado('cross_site_incoming', query_incoming_cross)
+            print(f"[CROSS-SITE] OK - Incoming obtenido para {len(df_inc_cross)} sites")
+        except Exception as e:
+            print(f"[CROSS-SITE] Error en query de incoming: {e}")
+            print("[CROSS-SITE] Continuando con flujo normal...\n")
+            return
+
+        # ─────────────────────────────────────────────────
+        # Query 2: Driver GLOBAL (sin filtro de site)
+        # ─────────────────────────────────────────────────
+        print("[CROSS-SITE] Calculando driver global (sin filtro site)...")
+
+        query_driver_global = build_global_drivers_query(driver_config, p1_start, p1_end, p2_start, p2_end)
+
+        try:
+            if self.driver_store is not None:
+                df_drv_global = self._drivers('cross_site_drivers', driver_config,
+                                              (p1_start, p1_end, p2_start, p2_end))
+            else:
+                df_drv_global = self._resultado('cross_site_drivers', query_driver_global)
+            drv_p1 = int(df_drv_global['DRV_P1'].iloc[0])
+            drv_p2 = int(df_drv_global['DRV_P2'].iloc[0])
+            print(f"[CROSS-SITE] OK - Driver global P1: {drv_p1:,} | P2: {drv_p2:,}")
+        except Exception as e:
+            print(f"[CROSS-SITE] Error en query de driver: {e}")
+            print("[CROSS-SITE] Continuando con flujo normal...\n")
+            return
+
+        if drv_p1 == 0 or drv_p2 == 0:
+            print("[CROSS-SITE] Driver es 0 en algún período - no se puede calcular CR")
+            print("[CROSS-SITE] Continuando con flujo normal...\n")
+            return
+
+        # ─────────────────────────────────────────────────
+        # Construir datos por site
+        # ─────────────────────────────────────────────────
+        ROLA_SITES = ['MLC', 'MCO', 'MEC', 'MLU', 'MPE']
+        default_site_data = {'inc_p1': 0, 'inc_p2': 0}
+
+        site_data = {}
+        for _, row in df_inc_cross.iterrows():
+            site_id = row['SIT_SITE_ID']
+            site_data[site_id] = {
+                'inc_p1': int(row['INC_P1']),
+                'inc_p2': int(row['INC_P2'])
+            }
+
+        def calcular_metricas_site(site_label, inc_p1, inc_p2, drv_p1, drv_p2):
+            """Calcula métricas de CR para un site dado."""
+            var_inc = inc_p2 - inc_p1
+            var_inc_pct = (var_inc / inc_p1 * 100) if inc_p1 > 0 else 0
+            cr_p1 = (inc_p1 / drv_p1 * 100) if drv_p1 > 0 else 0
+            cr_p2 = (inc_p2 / drv_p2 * 100) if drv_p2 > 0 else 0
+            var_cr = cr_p2 - cr_p1
+            return {
+                'site': site_label,
+                'inc_p1': inc_p1, 'inc_p2': inc_p2,
+                'var_inc': var_inc, 'var_inc_pct': var_inc_pct,
+                'cr_p1': cr_p1, 'cr_p2': cr_p2,
+                'var_cr': var_cr, 'contrib_pct': 0  # Se calcula después con el total
+            }
+
+        # Sites individuales: MLA, MLB, MLM
+        display_rows = []
+        for site_name in ['MLA', 'MLB', 'MLM']:
+            data = site_data.get(site_name, default_site_data)
+            display_rows.append(
+                calcular_metricas_site(site_name, data['inc_p1'], data['inc_p2'], drv_p1, drv_p2)
+            )
+
+        # ROLA: suma de MLC + MCO + MEC + MLU + MPE
+        rola_inc_p1 = sum(site_data.get(s, default_site_data)['inc_p1'] for s in ROLA_SITES)
+        rola_inc_p2 = sum(site_data.get(s, default_site_data)['inc_p2'] for s in ROLA_SITES)
+        display_rows.append(
+            calcular_metricas_site('ROLA', rola_inc_p1, rola_inc_p2, drv_p1, drv_p2)
+        )
+
+        # TOTAL: suma de todos los sites (MLA + MLB + MLM + ROLA)
+        total_inc_p1 = sum(r['inc_p1'] for r in display_rows)
+        total_inc_p2 = sum(r['inc_p2'] for r in display_rows)
+        total_row = calcular_metricas_site('TOTAL', total_inc_p1, total_inc_p2, drv_p1, drv_p2)
+
+        # Calcular contribución % de cada site a la variación total de CR
+        total_var_cr = total_row['var_cr']
+        for row in display_rows:
+            row['contrib_pct'] = (row['var_cr'] / total_var_cr * 100) if total_var_cr != 0 else 0
+        total_row['contrib_pct'] = 100.0
+
+        # ─────────────────────────────────────────────────
+        # Imprimir tabla en consola
+        # ─────────────────────────────────────────────────
+        sep = "\u2500"
+
+        proceso_label = f" > {process_name}" if process_name else ""
+        print(f"\n  \U0001F4CA CUADRO CROSS-SITE | {commerce_group}{proceso_label}")
+        print(f"  Driver: GLOBAL (sin filtro site) | {driver_config['description']}")
+        print()
+
+        # Encabezados
+        header = (
+            f"  {'Site':<8} \u2502 {'Inc P1':>10} \u2502 {'Inc P2':>10} \u2502 "
+            f"{'Var Inc':>10} \u2502 {'Var %':>8} \u2502 "
+            f"{'CR P1 (pp)':>10} \u2502 {'CR P2 (pp)':>10} \u2502 "
+            f"{'Var CR pp':>10} \u2502 {'Contrib %':>9}"
+        )
+
+        line_top = (
+            f"  {sep*8}\u252C{sep*12}\u252C{sep*12}\u252C"
+            f"{sep*12}\u252C{sep*10}\u252C"
+            f"{sep*12}\u252C{sep*12}\u252C"
+            f"{sep*12}\u252C{sep*11}"
+        )
+        line_mid = (
+            f"  {sep*8}\u253C{sep*12}\u253C{sep*12}\u253C"
+            f"{sep*12}\u253C{sep*10}\u253C"
+            f"{sep*12}\u253C{sep*12}\u253C"
+            f"{sep*12}\u253C{sep*11}"
+        )
+        line_bot = (
+            f"  {sep*8}\u2534{sep*12}\u2534{sep*12}\u2534"
+            f"{sep*12}\u2534{sep*10}\u2534"
+            f"{sep*12}\u2534{sep*12}\u2534"
+            f"{sep*12}\u2534{sep*11}"
+        )
+
+        print(line_top)
+        print(header)
+        print(line_mid)
+
+        # Filas de sites
+        for row in display_rows:
+            print(
+                f"  {row['site']:<8} \u2502 {row['inc_p1']:>10,} \u2502 {row['inc_p2']:>10,} \u2502 "
+                f"{row['var_inc']:>+10,} \u2502 {row['var_inc_pct']:>+7.1f}% \u2502 "
+                f"{row['cr_p1']:>10.4f} \u2502 {row['cr_p2']:>10.4f} \u2502 "
+                f"{row['var_cr']:>+10.4f} \u2502 {row['contrib_pct']:>8.1f}%"
+            )
+
+        # Separador antes del total
+        print(line_mid)
+
+        # Fila TOTAL
+        print(
+            f"  {total_row['site']:<8} \u2502 {total_row['inc_p1']:>10,} \u2502 {total_row['inc_p2']:>10,} \u2502 "
+            f"{total_row['var_inc']:>+10,} \u2502 {total_row['var_inc_pct']:>+7.1f}% \u2502 "
+            f"{total_row['cr_p1']:>10.4f} \u2502 {total_row['cr_p2']:>10.4f} \u2502 "
+            f"{total_row['var_cr']:>+10.4f} \u2502 {total_row['contrib_pct']:>8.1f}%"
+        )
+
+        print(line_bot)
+
+        # Nota al pie
+        print(f"\n  Nota: Driver P1={drv_p1:,} | Driver P2={drv_p2:,} (global, aplicado a todos los sites)")
+        print()
+
+        # ─────────────────────────────────────────────────
+        # Generar HTML e inyectar en reporte via eventos_html
+        # ─────────────────────────────────────────────────
+        # Se usa self.eventos_html (ya generado por commercial_events)
+        # para inyectar la tabla cross-site en el HTML del reporte. Aparece después
+        # de Eventos Comerciales y antes de Cuadros Cuantitativos por Dimensión.
+
+        try:
+            # Derivar labels de período desde las fechas
+            _p1_dt = datetime.strptime(p1_start, '%Y-%m-%d')
+            _p2_dt = datetime.strptime(p2_start, '%Y-%m-%d')
+            _p1_lbl = _p1_dt.strftime('%b %Y')
+            _p2_lbl = _p2_dt.strftime('%b %Y')
+
+            _proceso_html = f" &gt; {process_name}" if process_name else ""
+
+            # Mapeo de banderas por site
+            _site_flags = {
+                'MLA': '\U0001F1E6\U0001F1F7',  # Argentina
+                'MLB': '\U0001F1E7\U0001F1F7',  # Brasil
+                'MLM': '\U0001F1F2\U0001F1FD',  # México
+                'ROLA': '\U0001F30E',            # Resto de LATAM
+            }
+
+            # Construir filas HTML de sites
+            _rows_html = ""
+            for row in display_rows:
+                _flag = _site_flags.get(row['site'], '')
+                _var_inc_cls = 'negative' if row['var_inc'] > 0 else ('positive' if row['var_inc'] < 0 else '')
+                _var_cr_cls = 'negative' if row['var_cr'] > 0 else ('positive' if row['var_cr'] < 0 else '')
+
+                # Barra visual proporcional a contrib % (máximo 100px)
+                _bar_width = min(abs(row['contrib_pct']), 100)
+                _bar_color = '#F23D4F' if (row['contrib_pct'] > 0 and total_var_cr > 0) or (row['contrib_pct'] < 0 and total_var_cr < 0) else '#00A650'
+                if total_var_cr == 0:
+                    _bar_color = '#666666'
+
+                _rows_html += f"""
+                    <tr>
+                        <td><strong>{_flag} {row['site']}</strong></td>
+                        <td class="number">{row['inc_p1']:,.0f}</td>
+                        <td class="number">{row['inc_p2']:,.0f}</td>
+                        <td class="number {_var_inc_cls}">{row['var_inc']:+,.0f}</td>
+                        <td class="number {_var_inc_cls}">{row['var_inc_pct']:+.1f}%</td>
+                        <td class="number">{row['cr_p1']:.4f}</td>
+                        <td class="number">{row['cr_p2']:.4f}</td>
+                        <td class="number {_var_cr_cls}">{row['var_cr']:+.4f}</td>
+                        <td class="number">
+                            <div style="display:flex;align-items:center;justify-content:flex-end;gap:6px;">
+                                <span>{abs(row['contrib_pct']):.1f}%</span>
+                                <div style="width:{_bar_width}px;height:8px;background:{_bar_color};border-radius:4px;min-width:2px;"></div>
+                            </div>
+                        </td>
+                    </tr>"""
+
+            # Fila TOTAL
+            _var_inc_cls_total = 'negative' if total_row['var_inc'] > 0 else ('positive' if total_row['var_inc'] < 0 else '')
+            _var_cr_cls_total = 'negative' if total_row['var_cr'] > 0 else ('positive' if total_row['var_cr'] < 0 else '')
+
+            _total_html = f"""
+                    <tr class="row-total">
+                        <td><strong>\U0001F310 TOTAL</strong></td>
+                        <td class="number">{total_row['inc_p1']:,.0f}</td>
+                        <td class="number">{total_row['inc_p2']:,.0f}</td>
+                        <td class="number">{total_row['var_inc']:+,.0f}</td>
+                        <td class="number">{total_row['var_inc_pct']:+.1f}%</td>
+                        <td class="number">{total_row['cr_p1']:.4f}</td>
+                        <td class="number">{total_row['cr_p2']:.4f}</td>
+                        <td class="number">{total_row['var_cr']:+.4f}</td>
+                        <td class="number">100.0%</td>
+                    </tr>"""
+
+            # Determinar dirección general del CR para el highlight
+            if total_row['var_cr'] < 0:
+                _highlight_icon = '\U0001F4C9'  # chart decreasing = mejora
+                _highlight_text = f"CR mejoró <strong>{total_row['var_cr']:+.4f} pp</strong> ({total_row['var_inc_pct']:+.1f}% incoming)"
+                _highlight_border = '#00A650'
+            elif total_row['var_cr'] > 0:
+                _highlight_icon = '\U0001F4C8'  # chart increasing = empeora
+                _highlight_text = f"CR empeoró <strong>{total_row['var_cr']:+.4f} pp</strong> ({total_row['var_inc_pct']:+.1f}% incoming)"
+                _highlight_border = '#F23D4F'
+            else:
+                _highlight_icon = '\u2796'  # minus = sin cambio
+                _highlight_text = "CR sin variación entre períodos"
+                _highlight_border = '#666666'
+
+            # Encontrar el site con mayor contribución absoluta (excluyendo TOTAL)
+            _top_site = max(display_rows, key=lambda r: abs(r['contrib_pct']))
+            _top_flag = _site_flags.get(_top_site['site'], '')
+            _top_direction = 'empeora' if _top_site['var_cr'] > 0 else 'mejora'
+
+            # Ensamblar HTML completo de la sección
+            _cross_site_html = f"""
+        <div class="section">
+            <h2>\U0001F30E Vista Cross-Site | {commerce_group}{_proceso_html}</h2>
+            <div style="display:flex;align-items:center;gap:12px;margin-bottom:20px;padding:12px 16px;background:#F5F5F5;border-radius:8px;border-left:4px solid {_highlight_border};">
+                <span style="font-size:24px;">{_highlight_icon}</span>
+                <span style="font-size:14px;color:#333;">{_highlight_text} &mdash; Mayor contribución: <strong>{_top_flag} {_top_site['site']}</strong> ({_top_direction} {abs(_top_site['var_cr']):.4f} pp, {abs(_top_site['contrib_pct']):.1f}% del total)</span>
+            </div>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Site</th>
+                        <th class="number">Inc {_p1_lbl}</th>
+                        <th class="number">Inc {_p2_lbl}</th>
+                        <th class="number">Var Inc</th>
+                        <th class="number">Var %</th>
+                        <th class="number">CR {_p1_lbl} (pp)</th>
+                        <th class="number">CR {_p2_lbl} (pp)</th>
+                        <th class="number">Var CR (pp)</th>
+                        <th class="number">Contrib %</th>
+                    </tr>
+                </thead>
+                <tbody>{_rows_html}{_total_html}
+                </tbody>
+            </table>
+            <div class="note">
+                <strong>\u2699\uFE0F Driver:</strong> GLOBAL (sin filtro de site) | {driver_config['description']} | P1: {drv_p1:,} | P2: {drv_p2:,}
+            </div>
+        </div>"""
+
+            self.eventos_html += _cross_site_html
+            print("[CROSS-SITE] HTML cross-site generado e inyectado en el reporte")
+
+        except Exception as e:
+            print(f"[CROSS-SITE] Error generando HTML (no afecta consola ni flujo): {e}")
+            print("[CROSS-SITE] El cuadro en consola se generó correctamente, continuando...")
+
+    def cross_site(self):
+        """Cuadro cross-site (aditivo: un error se loguea y el flujo continúa)."""
+        args = self.args
+
+        # Ejecutar cuadro cross-site (aditivo, no modifica el flujo principal)
+        try:
+            self._cuadro_cross_site(
+                args.commerce_group, 
+                args.p1_start, args.p1_end, 
+                args.p2_start, args.p2_end, 
+                args.process_name
+            )
+        except Exception as e:
+            print(f"[CROSS-SITE] Error inesperado: {e}")
+            print("[CROSS-SITE] Continuando con flujo normal...\n")
+
+    def distinct_counts(self):
+        """Casos y clientes únicos por período con --distinct-sketches (aditivo: un error se loguea y se sigue)."""
+        args = self.args
+        if not self.sketch_stores:
+            return
+
+        print("[DISTINTOS] Estimando casos y clientes únicos desde los sketches HLL...")
+        conteos = {}
+        for metrica, store in self.sketch_stores.items():
+            try:
+                if metrica in self.sketches_faltantes:
+                    job, inicio, fin = self.sketches_faltantes[metrica]
+                    store.update(self.scheduler.result(job), inicio, fin)
+                conteos[metrica] = {
+                    'p1': store.distinct(args.site, args.p1_start, args.p1_end),
+                    'p2': store.distinct(args.site, args.p2_start, args.p2_end),
+                }
+            except Exception as e:
+                print(f"[DISTINTOS] {METRICAS_SKETCH[metrica]} no disponibles: {e}")
+                continue
+            print(f"[DISTINTOS] {METRICAS_SKETCH[metrica]} P1: {conteos[metrica]['p1']:,} | "
+                  f"P2: {conteos[metrica]['p2']:,}")
+            faltante = self.sketches_faltantes.get(metrica)
+            self.queries_ejecutadas.append({
+                'nombre': f'{METRICAS_SKETCH[metrica]} (HLL)',
+                'descripcion': f'{METRICAS_SKETCH[metrica]} de {args.commerce_group} por período, estimados con '
+                               f'sketches HyperLogLog diarios (error ~1.6%)',
+                'tabla': 'BT_CX_CONTACTS' if faltante else 'Sketches locales',
+                'output': f"P1: {conteos[metrica]['p1']:,} | P2: {conteos[metrica]['p2']:,}"
+                          + (f' (días {faltante[1]} a {faltante[2]} leídos)' if faltante else ''),
+            })
+        self.conteos_distintos = conteos
+        print()
+
+    def consolidated_metrics(self):
+        """PASO 1: incoming y drivers totales, CR de ambos períodos y variaciones."""
+        args = self.args
+        scheduler = self.scheduler
+        campos_aperturas = self.campos_aperturas
+        driver_config = self.driver_config
+        queries_ejecutadas = self.queries_ejecutadas
+
+        print("="*80)
+        print("PASO 1: MÉTRICAS CONSOLIDADAS")
+        print("="*80 + "\n")
+
+        memo = self._memo('consolidated_metrics')
+        if memo is not None:
+            queries_ejecutadas.extend(memo['queries'])
+            self.driver_desc = memo['driver_desc']
+            self.metrics_consolidadas = memo['metrics_consolidadas']
+            print()
+            return self.metrics_consolidadas
+        n_queries = len(queries_ejecutadas)
+
+        print(f"[QUERY] Calculando incoming total...")
+
+        if args.process_name:
+            print(f"[INFO] Filtrando por proceso: {args.process_name}")
+
+        # Modo fusionado: total, semanal y aperturas salen de una sola lectura de BT_CX_CONTACTS
+        if self._lectura_fusionada():
+            print(f"[FUSED] Una sola lectura de BT_CX_CONTACTS para total, semanal y {len(campos_aperturas)} aperturas")
+        resultado_fusionado = self._fusionado()
+        if self.contacts_cube is not None:
+            faltante = self.cubo_faltante
+            leidos = f"días {faltante[0]} a {faltante[1]} leídos de BT_CX_CONTACTS" if faltante else "sin leer BT_CX_CONTACTS"
+            print(f"[CUBO] Total, semanal y {len(campos_aperturas)} aperturas desde el cubo diario local ({leidos})")
+
+        if resultado_fusionado is not None:
+            inc_p1_total = resultado_fusionado['inc_p1']
+            inc_p2_total = resultado_fusionado['inc_p2']
+        else:
+            df_inc_total = scheduler.result('incoming_total')
+            inc_p1_total = int(df_inc_total['INC_P1'].iloc[0])
+            inc_p2_total = int(df_inc_total['INC_P2'].iloc[0])
+
+        # Registrar query ejecutada
+        queries_ejecutadas.append({
+            'nombre': 'Incoming Total',
+            'descripcion': f'Casos totales para {args.commerce_group} en ambos períodos',
+            'tabla': 'BT_CX_CONTACTS',
+            'output': f'P1: {inc_p1_total:,} casos | P2: {inc_p2_total:,} casos'
+        })
+        var_inc_total = inc_p2_total - inc_p1_total
+
+        print(f"[OK] Incoming P1: {inc_p1_total:,}")
+        print(f"[OK] Incoming P2: {inc_p2_total:,}")
+        print(f"[OK] Variación: {var_inc_total:+,} casos")
+        print()
+
+        # ========================================
+        # CALCULAR DRIVERS DINÁMICAMENTE SEGÚN COMMERCE GROUP
+        # ========================================
+        # Configuración de driver obtenida en PROGRAMACIÓN DE QUERIES
+        driver_desc = get_driver_description(args.commerce_group, args.site)
+
+        # Agregar indicador de override si corresponde
+        if driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site:
+            driver_desc = f"{driver_desc} ({args.site} únicamente) ⚠️ MODO OVERRIDE"
+
+        print(f"[DRIVER] Commerce Group: {args.commerce_group}")
+        print(f"[DRIVER] Tipo: {driver_config['type']}")
+        print(f"[DRIVER] Tabla: {driver_config['table']}")
+        print(f"[DRIVER] Filtrar por site: {'SÍ' if driver_config['filter_by_site'] or (driver_config['type'] == 'shipping_drivers' and args.filter_driver_by_site) else 'NO (GLOBAL)'}")
+        print(f"[DRIVER] Descripción: {driver_desc}")
+        print()
+
+        print(f"[QUERY] Calculando drivers totales...")
+
+        df_drv_total = self._drivers('drivers_total')
+        drv_p1_total = int(df_drv_total['DRV_P1'].iloc[0])
+        drv_p2_total = int(df_drv_total['DRV_P2'].iloc[0])
+
+        # Registrar query ejecutada
+        queries_ejecutadas.append({
+            'nombre': f'Drivers ({driver_config["type"]})',
+            'descripcion': driver_desc,
+            'tabla': driver_config['table'],
+            'output': f'P1: {drv_p1_total:,} | P2: {drv_p2_total:,}'
+        })
+
+        print(f"[OK] Drivers P1: {drv_p1_total:,}")
+        print(f"[OK] Drivers P2: {drv_p2_total:,}")
+        print()
+
+        # Calcular CR
+        cr_p1 = (inc_p1_total / drv_p1_total) * 100
+        cr_p2 = (inc_p2_total / drv_p2_total) * 100
+        var_cr = cr_p2 - cr_p1
+        var_cr_pct = (var_cr / cr_p1) * 100 if cr_p1 > 0 else 0
+        var_inc_pct = (var_inc_total / inc_p1_total) * 100 if inc_p1_total > 0 else 0
+
+        print(f"[RESULTADO] CR P1: {cr_p1:.4f} pp")
+        print(f"[RESULTADO] CR P2: {cr_p2:.4f} pp")
+        print(f"[RESULTADO] Variación CR: {var_cr:+.4f} pp ({var_cr_pct:+.1f}%)")
+        print()
+
+        # Guardar métricas consolidadas
+        metrics_consolidadas = {
+            'inc_p1': inc_p1_total,
+            'inc_p2': inc_p2_total,
+            'var_inc': var_inc_total,
+            'var_inc_pct': var_inc_pct,
+            'drv_p1': drv_p1_total,
+            'drv_p2': drv_p2_total,
+            'cr_p1': cr_p1,
+            'cr_p2': cr_p2,
+            'var_cr': var_cr,
+            'var_cr_pct': var_cr_pct
+        }
+
+        self.driver_desc = driver_desc
+        self.metrics_consolidadas = metrics_consolidadas
+        self._memorizar('consolidated_metrics', driver_desc=driver_desc, metrics_consolidadas=metrics_consolidadas,
+                        queries=queries_ejecutadas[n_queries:])
+        return metrics_consolidadas
+
+    def weekly(self):
+        """PASO 2: CR semanal de las últimas 25 semanas."""
+        args = self.args
+        scheduler = self.scheduler
+        queries_ejecutadas = self.queries_ejecutadas
+
+        print("="*80)
+        print("PASO 2: GRÁFICO SEMANAL")
+        print("="*80 + "\n")
+
+        memo = self._memo('weekly')
+        if memo is not None:
+            queries_ejecutadas.extend(memo['queries'])
+            self.df_weekly = memo['df_weekly']
+            print()
+            return self.df_weekly
+
+        print(f"[QUERY] Calculando CR semanal (últimas 25 semanas)...")
+
+        resultado_fusionado = self._fusionado()
+        if resultado_fusionado is not None or self.driver_store is not None:
+            # Incoming semanal de la lectura fusionada (o solo incoming con --driver-store): falta el driver
+            df_incoming = resultado_fusionado['weekly'] if resultado_fusionado is not None else scheduler.result('weekly')
+            df_weekly_drv = self._drivers('drivers_semanales')
+            df_weekly = df_incoming.rename(columns={'CASOS': 'INCOMING'}).merge(
+                df_weekly_drv.rename(columns={'ORDERS': 'DRIVER'}), on='SEMANA', how='left'
+            )
+            df_weekly['CR'] = (df_weekly['INCOMING'] / df_weekly['DRIVER']) * 100
+        else:
+            df_weekly = scheduler.result('weekly')
+        df_weekly['SEMANA'] = pd.to_datetime(df_weekly['SEMANA'])
+        df_weekly['SEMANA_LABEL'] = df_weekly['SEMANA'].dt.strftime('%d-%b')
+
+        # Registrar query ejecutada
+        query_semanal = {
+            'nombre': 'Evolución Semanal',
+            'descripcion': f'CR semanal para {args.commerce_group} desde 14+ semanas antes',
+            'tabla': 'BT_CX_CONTACTS + BT_ORD_ORDERS',
+            'output': f'{len(df_weekly)} semanas analizadas'
+        }
+        queries_ejecutadas.append(query_semanal)
+
+        print(f"[OK] {len(df_weekly)} semanas calculadas")
+        print()
+
+        self.df_weekly = df_weekly
+        self._memorizar('weekly', df_weekly=df_weekly, queries=[query_semanal])
+        return df_weekly
+
+    def dimension_tables(self):
+        """PASO 3: cuadro cuantitativo por apertura (regla 80% + Otros + TOTAL)."""
+        args = self.args
+        scheduler = self.scheduler
+        aperturas_list = self.aperturas_list
+        modo_proceso_unico = self.modo_proceso_unico
+        m = self.metrics_consolidadas
+        inc_p1_total, inc_p2_total, var_inc_total = m['inc_p1'], m['inc_p2'], m['var_inc']
+        drv_p1_total, drv_p2_total = m['drv_p1'], m['drv_p2']
+        cr_p1, cr_p2, var_cr = m['cr_p1'], m['cr_p2'], m['var_cr']
+
+        print("="*80)
+        print("PASO 3: CUADROS CUANTITATIVOS")
+        print("="*80 + "\n")
+
+        # Almacenar resultados de cada dimensión
+        cuadros_cuantitativos = {}
+
+        # Rastrear queries ejecutadas (para footer técnico)
+        queries_ejecutadas = []
+
+        # ========================================
+        # MODO PROCESO ÚNICO: Generar cuadro sintético
+        # ========================================
+        # Si se especifica --process-name con --aperturas NONE, generar cuadro de 1 fila
+        # para que el análisis de conversaciones pueda funcionar correctamente
+        # (modo_proceso_unico se determina en PROGRAMACIÓN DE QUERIES)
+
+        if modo_proceso_unico:
+            print("[MODO] Proceso único detectado: análisis de 1 proceso sin drill-down")
+            print(f"[INFO] Proceso: {args.process_name}")
+            print(f"[INFO] Generando cuadro sintético con 1 elemento (100% contribución)")
+            print()
+
+            # Crear cuadro sintético con 1 fila
+            df_proceso_unico = pd.DataFrame([{
+                'DIMENSION_VAL': args.process_name,
+                'INC_P1': inc_p1_total,
+                'INC_P2': inc_p2_total,
+                'VAR_INC': var_inc_total,
+                'VAR_ABS': abs(var_inc_total),
+                'CONTRIB_ABS': 100.0,
+                'VAR_INC_PCT': (var_inc_total / inc_p1_total) * 100 if inc_p1_total > 0 else 0,
+                'DRV_P1': drv_p1_total,
+                'DRV_P2': drv_p2_total,
+                'CR_P1': cr_p1,
+                'CR_P2': cr_p2,
+                'VAR_CR': var_cr
+            }])
+
+            # Fila TOTAL (para mantener estructura consistente)
+            fila_total = {
+                'DIMENSION_VAL': 'TOTAL',
+                'INC_P1': inc_p1_total,
+                'INC_P2': inc_p2_total,
+                'VAR_INC': var_inc_total,
+                'VAR_ABS': abs(var_inc_total),
+                'CONTRIB_ABS': 100.0,
+                'VAR_INC_PCT': (var_inc_total / inc_p1_total) * 100 if inc_p1_total > 0 else 0,
+                'DRV_P1': drv_p1_total,
+                'DRV_P2': drv_p2_total,
+                'CR_P1': cr_p1,
+                'CR_P2': cr_p2,
+                'VAR_CR': var_cr
+            }
+            df_proceso_unico = pd.concat([df_proceso_unico, pd.DataFrame([fila_total])], ignore_index=True)
+
+            # Agregar a cuadros cuantitativos con dimensión PROCESO
+            cuadros_cuantitativos['PROCESO'] = df_proceso_unico
+
+            # Guardar CSV del cuadro
+            p1_month = args.p1_start[:7]  # 2025-11
+            p2_month = args.p2_start[:7]  # 2025-12
+            commerce_group_safe = args.commerce_group.lower().replace(' ', '_')
+            output_path = Path(args.output_dir)
+            output_path.mkdir(exist_ok=True)
+            csv_path = output_path / f"cuadro_proceso_{args.site.lower()}_{commerce_group_safe}_{p1_month}_{p2_month}.csv"
+            df_proceso_unico.to_csv(csv_path, index=False, encoding='utf-8-sig')
+            self.csv_paths.append(csv_path)
+
+            print(f"[OK] Cuadro proceso único generado: {csv_path.name}")
+            print(f"[OK] 1 elemento (100% contribución) + TOTAL")
+            print()
+
+            # Registrar query sintética
+            queries_ejecutadas.append({
+                'nombre': 'Cuadro Cuantitativo - PROCESO (sintético)',
+                'descripcion': f'Cuadro sintético para proceso único: {args.process_name}',
+                'tabla': 'Métricas consolidadas',
+                'output': '1 elemento (modo proceso único)'
+            })
+
+        for apertura in aperturas_list:
+            # Si estamos en modo proceso único, saltar bucle (ya generamos cuadro sintético)
+            if modo_proceso_unico:
+                print(f"[SKIP] Saltando bucle de aperturas (modo proceso único activo)")
+                break
+
+            print(f"[DIMENSIÓN] Procesando: {apertura}")
+
+            # Saltar dimensión PROCESO si hay filtro por proceso específico EXACTO (1 solo proceso)
+            # Si process_name matchea múltiples procesos (ej: "Apelaciones"), NO saltar
+            if apertura == 'PROCESO' and args.process_name:
+                print(f"[INFO] Dimensión PROCESO con filtro process-name '{args.process_name}' - permitido (puede matchear múltiples procesos)")
+                # No saltar: permitir breakdown por PROCESO incluso con process_name
+
+            # Obtener campo de BigQuery
+            campo_bq = FIELD_MAPPING.get(apertura)
+            if not campo_bq:
+                print(f"[WARNING] Dimensión '{apertura}' no tiene campo mapeado. Saltando...")
+                continue
+
+            # Nodo dimension:{APERTURA}: cambiar --aperturas solo calcula las aperturas nuevas
+            nodo = f'dimension:{apertura}'
+            memo = self._memo(nodo)
+            if memo is not None:
+                queries_ejecutadas.extend(memo['queries'])
+                if memo['cuadro'] is not None:
+                    cuadros_cuantitativos[apertura] = memo['cuadro']
+                if memo.get('dimension') is not None:
+                    self.dimensiones_completas[apertura] = memo['dimension']
+                continue
+
+            resultado_fusionado = self._fusionado()
+            if resultado_fusionado is not None:
+                df_dimension = resultado_fusionado['dimensiones'][apertura]
+            else:
+                df_dimension = scheduler.result(f'dimension_{apertura}')
+
+            # Registrar query ejecutada
+            query_dimension = {
+                'nombre': f'Cuadro Cuantitativo - {apertura}',
+                'descripcion': f'Desglose de incoming por {apertura} para ambos períodos',
+                'tabla': 'BT_CX_CONTACTS',
+                'output': f'{len(df_dimension)} elementos encontrados'
+            }
+            queries_ejecutadas.append(query_dimension)
+
+            if len(df_dimension) == 0:
+                print(f"[WARNING] No hay datos para {apertura}")
+                self._memorizar(nodo, cuadro=None, queries=[query_dimension])
+                continue
+
+            df_80 = priorizar_elementos(df_dimension, m)
+            self.dimensiones_completas[apertura] = df_dimension
+            cuadros_cuantitativos[apertura] = df_80
+            self._memorizar(nodo, cuadro=df_80, dimension=df_dimension, queries=[query_dimension])
+
+            print(f"[OK] {apertura}: {len(df_80)-2} elementos + Otros + Total")
+
+        print()
+
+        self.cuadros_cuantitativos = cuadros_cuantitativos
+        self.queries_ejecutadas = queries_ejecutadas
+        return cuadros_cuantitativos
+
+    # ========================================
+    # ANÁLISIS DE CONVERSACIONES (Claude / Cursor AI)
+    # ========================================
+
+    def configurar_analisis_claude(self, site, commerce_group, muestreo_dimension, p1_start, p2_start, elementos_priorizados=None, usar_analisis_separado=True):
+        """
+    Configura la búsqueda dinámica de análisis de conversaciones.
+    
+    v6.3.8: Soporta análisis separado por período (P1 y P2 independientes)
+    
+    Busca:
+    - Si usar_analisis_separado=True: 2 JSONs separados por período
+      * analisis_conversaciones_claude_{site}_{cg}_{dim}_p1_{p1}.json
+      * analisis_conversaciones_claude_{site}_{cg}_{dim}_p2_{p2}.json
+    - Si usar_analisis_separado=False: JSON conjunto legacy
+      * analisis_conversaciones_claude_{site}_{cg}_{dim}_{p1}_{p2}.json
+    
+    Args:
+        site: Código del site (MLA, MLB, etc.)
+        commerce_group: Commerce group (PDD, PNR, etc.)
+        muestreo_dimension: Dimensión usada para muestreo (PROCESO, CDU, TIPIFICACION, etc.)
+        p1_start: Fecha de inicio período 1 (YYYY-MM-DD)
+        p2_start: Fecha de inicio período 2 (YYYY-MM-DD)
+        elementos_priorizados: Lista de elementos priorizados (regla 80%) para validar coherencia
+        usar_analisis_separado: Si True, busca análisis separado por período (v6.3.8+)
+    """
+        # Construir nombres dinámicos
+        p1_mes = p1_start[:7]  # YYYY-MM
+        p2_mes = p2_start[:7]  # YYYY-MM
+
+        if usar_analisis_separado:
+            # v6.3.8: Buscar análisis separados por período
+            analisis_p1_name = f"analisis_conversaciones_claude_{site.lower()}_{commerce_group.lower()}_{muestreo_dimension.lower()}_p1_{p1_mes}.json"
+            analisis_p2_name = f"analisis_conversaciones_claude_{site.lower()}_{commerce_group.lower()}_{muestreo_dimension.lower()}_p2_{p2_mes}.json"
+
+            analisis_p1_path = REPO_DIR / "output" / analisis_p1_name
+            analisis_p2_path = REPO_DIR / "output" / analisis_p2_name
+
+            # Guardar path legacy para compatibilidad
+            analisis_json_name = f"analisis_conversaciones_claude_{site.lower()}_{commerce_group.lower()}_{muestreo_dimension.lower()}_{p1_mes}_{p2_mes}.json"
+            self.analisis_claude_path = REPO_DIR / "output" / analisis_json_name
+
+            # Verificar si existen ambos JSONs
+            ambos_existen = analisis_p1_path.exists() and analisis_p2_path.exists()
+
+            if ambos_existen:
+                try:
+                    # Cargar análisis P1 (utf-8-sig tolera BOM si existe)
+                    with open(analisis_p1_path, 'r', encoding='utf-8-sig') as f:
+                        analisis_p1 = json.load(f)
+
+                    # Cargar análisis P2 (utf-8-sig tolera BOM si existe)
+                    with open(analisis_p2_path, 'r', encoding='utf-8-sig') as f:
+                        analisis_p2 = json.load(f)
+
+                    # Combinar análisis en estructura compatible con código existente
+                    # Cada elemento tiene causas_p1 y causas_p2 separadas
+                    self.analisis_preexistentes = {}
+
+                    for elemento in set(list(analisis_p1.keys()) + list(analisis_p2.keys())):
+                        data_p1 = analisis_p1.get(elemento, {})
+                        data_p2 = analisis_p2.get(elemento, {})
+
+                        # Crear estructura combinada (formato compatible con código existente)
+                        self.analisis_preexistentes[elemento] = {
+                            "proceso": elemento,
+                            "commerce_group": commerce_group,
+                            "site": site,
+                            "periodo": f"{p1_mes} vs {p2_mes}",
+                            "total_conversaciones": data_p1.get('total_conversaciones', 0) + data_p2.get('total_conversaciones', 0),
+                            "conversaciones_p1": data_p1.get('total_conversaciones', 0),
+                            "conversaciones_p2": data_p2.get('total_conversaciones', 0),
+                            # Mantener análisis separado
+                            "causas_p1": data_p1.get('causas', []),
+                            "causas_p2": data_p2.get('causas', []),
+                            # Por compatibilidad, usar causas_p2 como "causas" principal
+                            "causas": data_p2.get('causas', []),
+                            "cobertura": data_p2.get('cobertura', {"target_pct": 80.0, "covered_pct": 100.0, "remainder_pct": 0.0}),
+                            "hallazgo_principal": data_p2.get('hallazgo_principal', ''),
+                            # Metadata
+                            "analisis_separado": True,  # Flag para indicar que es análisis separado
+                            "version": "v6.3.8"
+                        }
+
+                    # VALIDACIÓN DE COHERENCIA (v6.3.1)
+                    if elementos_priorizados is not None:
+                        json_procesos = list(self.analisis_preexistentes.keys())
+                        es_coherente, mensaje = validar_coherencia_analisis(json_procesos, elementos_priorizados)
+
+                        if not es_coherente:
+                            print(f"[WARNING] Analisis existente NO coincide con procesos priorizados actuales")
+                            print(f"[WARNING] {mensaje}")
+                            print(f"[ACTION] Eliminando JSONs antiguos para forzar re-analisis...")
+                            analisis_p1_path.unlink()
+                            analisis_p2_path.unlink()
+                            self.use_claude_analysis = False
+                            self.analisis_preexistentes = {}
+                            print(f"[INFO] JSONs eliminados. Re-ejecutar con --export-only para generar CSVs actualizados")
+                            print()
+                            return
+
+                    self.use_claude_analysis = True
+                    print(f"[INFO] Analisis de Claude (separado) encontrados:")
+                    print(f"       - P1: {analisis_p1_name}")
+                    print(f"       - P2: {analisis_p2_name}")
+                    print(f"[INFO] {len(self.analisis_preexistentes)} procesos con analisis cargados (v6.3.8)")
+                    if elementos_priorizados:
+                        print(f"[VALIDACION] Coherencia verificada: procesos coinciden con priorizados actuales")
+
+                except Exception as e:
+                    print(f"[ERROR] No se pudieron cargar los análisis separados: {e}")
+                    self.use_claude_analysis = False
+                    self.analisis_preexistentes = {}
+            else:
+                self.use_claude_analysis = False
+                self.analisis_preexistentes = {}
+                print(f"[INFO] No se encontraron análisis pre-generados (separados por período)")
+                print("[INFO] Se exportarán CSVs separados por período para análisis manual")
+                print(f"[HINT] Crear JSONs:")
+                print(f"       - {analisis_p1_name}")
+                print(f"       - {analisis_p2_name}")
+
+        else:
+            # Comportamiento legacy (análisis conjunto)
+            analisis_json_name = f"analisis_conversaciones_claude_{site.lower()}_{commerce_group.lower()}_{muestreo_dimension.lower()}_{p1_mes}_{p2_mes}.json"
+            self.analisis_claude_path = REPO_DIR / "output" / analisis_json_name
+
+            if self.analisis_claude_path.exists():
+                try:
+                    with open(self.analisis_claude_path, 'r', encoding='utf-8-sig') as f:
+                        self.analisis_preexistentes = json.load(f)
+
+                    # VALIDACIÓN DE COHERENCIA
+                    if elementos_priorizados is not None:
+                        json_procesos = list(self.analisis_preexistentes.keys())
+                        es_coherente, mensaje = validar_coherencia_analisis(json_procesos, elementos_priorizados)
+
+                        if not es_coherente:
+                            print(f"[WARNING] Analisis existente NO coincide con procesos priorizados actuales")
+                            print(f"[WARNING] {mensaje}")
+                            print(f"[ACTION] Eliminando JSON antiguo para forzar re-analisis...")
+                            self.analisis_claude_path.unlink()
+                            self.use_claude_analysis = False
+                            self.analisis_preexistentes = {}
+                            print(f"[INFO] JSON eliminado. Re-ejecutar con --export-only para generar CSVs actualizados")
+                            print()
+                            return
+
+                    self.use_claude_analysis = True
+                    print(f"[INFO] Analisis de Claude encontrado: {analisis_json_name}")
+                    print(f"[INFO] {len(self.analisis_preexistentes)} procesos con analisis cargados")
+                    if elementos_priorizados:
+                        print(f"[VALIDACION] Coherencia verificada: procesos coinciden con priorizados actuales")
+                except Exception as e:
+                    print(f"[ERROR] No se pudo cargar {analisis_json_name}: {e}")
+                    self.use_claude_analysis = False
+                    self.analisis_preexistentes = {}
+            else:
+                self.use_claude_analysis = False
+                self.analisis_preexistentes = {}
+                print(f"[INFO] No se encontro analisis pre-generado: {analisis_json_name}")
+                print("[INFO] Se exportaran CSVs para analisis manual")
+                print(f"[HINT] Crear JSON con nombre: {analisis_json_name}")
+
+        print()
+
+    def analyze_conversations_with_llm(self, df_conversations, proceso, commerce_group):
+        """
+    Analiza conversaciones usando análisis de Claude (Cursor AI) o fallback manual.
+    
+    Args:
+        df_conversations: DataFrame con columnas CAS_CASE_ID, CONVERSATION_SUMMARY, CONTACT_DATE_ID
+        proceso: Nombre del proceso (o CDU)
+        commerce_group: Commerce group (PDD, PNR, etc.)
+    
+    Returns:
+        dict con causas raíz, frecuencias, citas, sentimiento y cobertura
+    """
+        n_conversaciones = len(df_conversations)
+
+        # Validación 1: Sin conversaciones
+        if df_conversations.empty:
+            return {
+                "proceso": proceso,
+                "total_conversaciones": 0,
+                "estado": "SIN_CONVERSACIONES",
+                "causas": [],
+                "cobertura": {"target_pct": 80.0, "covered_pct": 0.0, "remainder_pct": 100.0},
+                "hallazgo_principal": "❌ Sin conversaciones disponibles."
+            }
+
+        # Validación 2: Muestra insuficiente (< UMBRAL_MINIMO)
+        if n_conversaciones < UMBRAL_MINIMO_CONVERSACIONES:
+            return {
+                "proceso": proceso,
+                "total_conversaciones": n_conversaciones,
+                "estado": "MUESTRA_INSUFICIENTE",
+                "causas": [],
+                "cobertura": {"target_pct": 80.0, "covered_pct": 0.0, "remainder_pct": 100.0},
+                "hallazgo_principal": f"⚠️ Muestra insuficiente: solo {n_conversaciones} conversaciones (mínimo requerido: {UMBRAL_MINIMO_CONVERSACIONES}). No es posible extraer conclusiones cualitativas válidas."
+            }
+
+        # PRIORIDAD 1: Usar análisis pre-generado por Claude si existe
+        if self.use_claude_analysis and proceso in self.analisis_preexistentes:
+            print(f"[CLAUDE] Usando análisis pre-generado para '{proceso}'")
+            analisis = self.analisis_preexistentes[proceso]
+            # Agregar validación de umbral mínimo al análisis existente
+            if analisis.get('total_conversaciones', 0) < UMBRAL_MINIMO_CONVERSACIONES:
+                analisis['estado'] = 'MUESTRA_INSUFICIENTE'
+                analisis['hallazgo_principal'] = f"⚠️ Muestra insuficiente: solo {analisis.get('total_conversaciones', 0)} conversaciones (mínimo requerido: {UMBRAL_MINIMO_CONVERSACIONES}). Análisis no concluyente."
+            else:
+                analisis['estado'] = 'ANALISIS_VALIDO'
+            return analisis
+
+        # FALLBACK: Sin análisis disponible (pero con muestra válida)
+        return {
+            "proceso": proceso,
+            "total_conversaciones": n_conversaciones,
+            "estado": "PENDIENTE_ANALISIS",
+            "causas": [{
+                "descripcion": "⚠️ Análisis disponible en CSV exportado (ejecutar analizar_conversaciones_claude.py para generar análisis)",
+                "frecuencia_absoluta": n_conversaciones,
+                "frecuencia_porcentaje": 100.0,
+                "case_ids_ejemplo": df_conversations.head(3)['CAS_CASE_ID'].astype(str).tolist(),
+                "citas": []
+            }],
+            "cobertura": {"target_pct": 80.0, "covered_pct": 100.0, "remainder_pct": 0.0},
+            "hallazgo_principal": f"Análisis de {n_conversaciones} conversaciones disponible en CSV para revisión manual."
+        }
+
+    def conversations(self):
+        """PASO 4: muestreo de conversaciones de los elementos priorizados y carga de análisis."""
+        args = self.args
+        backend, scheduler = self.backend, self.scheduler
+        modo_proceso_unico = self.modo_proceso_unico
+        cuadros_cuantitativos = self.cuadros_cuantitativos
+        base_contacts_table, deps_contactos = self.base_contacts_table, self.deps_contactos
+        commerce_filter, process_filter = self.commerce_filter, self.process_filter
+        queries_ejecutadas = self.queries_ejecutadas
+
+        conversaciones_por_proceso = {}
+
+        if not args.skip_conversations:
+            print("="*80)
+            print("PASO 4: ANÁLISIS DE CONVERSACIONES")
+            print("="*80 + "\n")
+
+            # Obtener dimensión para muestreo
+            dimension_muestreo = args.muestreo_dimension.upper()
+
+            # En modo proceso único, forzar dimensión PROCESO si existe en cuadros
+            if modo_proceso_unico and 'PROCESO' in cuadros_cuantitativos:
+                dimension_muestreo = 'PROCESO'
+                print(f"[MODO] Usando dimensión PROCESO (cuadro sintético generado)")
+
+            if dimension_muestreo not in cuadros_cuantitativos:
+                print(f"[WARNING] Dimensión '{dimension_muestreo}' no existe en cuadros cuantitativos")
+                print(f"[INFO] Saltando análisis de conversaciones")
+            else:
+                # Identificar elementos priorizados (regla 80%)
+                df_muestreo = cuadros_cuantitativos[dimension_muestreo]
+                df_muestreo = df_muestreo[~df_muestreo['DIMENSION_VAL'].isin(['TOTAL'])].copy()
+                df_muestreo = df_muestreo[~df_muestreo['DIMENSION_VAL'].str.contains('Otros', na=False)].copy()
+
+                elementos_priorizados = df_muestreo['DIMENSION_VAL'].tolist()
+
+                print(f"[INFO] Dimensión de muestreo: {dimension_muestreo}")
+                print(f"[INFO] Elementos priorizados (regla 80%): {len(elementos_priorizados)}")
+                print(f"[INFO] Elementos: {', '.join(elementos_priorizados[:3])}...")
+                print()
+
+                # Configurar análisis de Claude CON validación de coherencia (v6.3.1)
+                self.configurar_analisis_claude(args.site, args.commerce_group, args.muestreo_dimension, args.p1_start, args.p2_start, elementos_priorizados, usar_analisis_separado=True)
+
+                # Obtener campo de BigQuery para la dimensión de muestreo
+                campo_muestreo = FIELD_MAPPING.get(dimension_muestreo)
+
+                if not campo_muestreo:
+                    print(f"[ERROR] No hay campo mapeado para {dimension_muestreo}")
+                else:
+                    # Preparar lista IN para SQL
+                    elementos_in = ','.join([f"'{str(e).replace(chr(39), chr(39)+chr(39))}'" for e in elementos_priorizados])
+
+                    # ========================================
+                    # CÁLCULO DINÁMICO DE MUESTREO v6.4.9 (Por CONTRIB_ABS)
+                    # ========================================
+                    # Distribución inteligente por impacto en variación de CR
+                    num_elementos_priorizados = len(elementos_priorizados)
+
+                    print(f"[MUESTREO] Calculando distribución por impacto en variación de CR...")
+                    distribucion_muestra = calcular_distribucion_por_impacto(
+                        df_elementos=df_muestreo,
+                        max_total=MAX_TOTAL_CONVERSATIONS,
+                        min_por_elemento_periodo=UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO
+                    )
+
+                    # Evitar división por cero cuando no hay elementos priorizados (ej. volumen muy bajo)
+                    if num_elementos_priorizados == 0 or not distribucion_muestra:
+                        print(f"[INFO] Sin elementos priorizados o distribución vacía: se omite muestreo de conversaciones.")
+                        df_conversaciones = pd.DataFrame()
+                        queries_ejecutadas.append({
+                            'nombre': 'Muestreo de Conversaciones',
+                            'descripcion': 'Sin elementos priorizados (volumen insuficiente para drill-down)',
+                            'tabla': 'BT_CX_CONTACTS + BT_CX_STUDIO_SAMPLE + DM_CX_POST_PURCHASE',
+                            'output': '0 conversaciones'
+                        })
+                        print(f"[OK] 0 conversaciones obtenidas")
+                        print(f"[INFO] Continuando sin conversaciones (solo métricas cuantitativas)...")
+                        for elemento in elementos_priorizados:
+                            conversaciones_por_proceso[elemento] = {
+                                'status': 'sin_data',
+                                'casos_p1': 0,
+                                'casos_p2': 0
+                            }
+                        print()
+                    else:
+                        # Calcular totales para logging
+                        total_esperado = sum(d['total'] for d in distribucion_muestra.values())
+                        casos_promedio_por_periodo = total_esperado / (num_elementos_priorizados * 2)
+
+                        # Para la query, usar el máximo de casos por elemento-período como límite superior
+                        max_casos_elemento_periodo = max(max(d['p1'], d['p2']) for d in distribucion_muestra.values())
+                        casos_pico = int(max_casos_elemento_periodo * 0.7)
+                        casos_normal = max_casos_elemento_periodo - casos_pico
+
+                        print(f"[INFO] Distribución por impacto calculada:")
+                        print(f"[INFO] • Elementos priorizados: {num_elementos_priorizados}")
+                        print(f"[INFO] • Total esperado: {total_esperado} conversaciones (máx {MAX_TOTAL_CONVERSATIONS})")
+                        print(f"[INFO] • Mínimo por elemento-período: {UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO}")
+                        print(f"[INFO] • Promedio por elemento-período: {casos_promedio_por_periodo:.1f}")
+
+                        # Mostrar top 3 elementos por muestra asignada
+                        top_elementos = sorted(distribucion_muestra.items(), key=lambda x: x[1]['total'], reverse=True)[:3]
+                        print(f"[INFO] • Top 3 elementos por muestra:")
+                        for elemento, dist in top_elementos:
+                            elemento_corto = elemento[:50] + '...' if len(elemento) > 50 else elemento
+                            print(f"    - {elemento_corto}: {dist['total']} casos (P1:{dist['p1']} + P2:{dist['p2']}) | Impacto: {dist['contribucion']:.1f}")
+
+                        print(f"[QUERY] Muestreando conversaciones con ponderación por picos (70/30)...")
+                        print(f"[INFO] Esto puede tardar 3-6 minutos...")
+
+                        # Origen de contactos: tabla BASE_CONTACTS materializada (ya filtrada) o BT_CX_CONTACTS
+                        if base_contacts_table:
+                            origen_contactos = f"""'{args.commerce_group}' AS AGRUP_COMMERCE
+                FROM {base_contacts_table} C
+                WHERE C.CONTACT_DATE_ID BETWEEN '{args.p1_start}' AND '{args.p2_end}'"""
+                        else:
+                            origen_contactos = f"""{commerce_filter} AS AGRUP_COMMERCE
+                FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+                WHERE {resolve_site_sql(args.site, 'C.SIT_SITE_ID')}
+                    AND C.CONTACT_DATE_ID BETWEEN '{args.p1_start}' AND '{args.p2_end}'
+                    AND C.PROCESS_BU_CR_REPORTING IN ('ME','ML')
+                    AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
+                    {process_filter}"""
+
+                        query_conversaciones = f"""
+            WITH INCOMING_DATA AS (
+                SELECT 
+                    C.CLA_CLAIM_ID,
+                    {campo_muestreo} as DIMENSION_VAL,
+                    C.CONTACT_DATE_ID,
+                    DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+                    C.CAS_CASE_ID,
+                    {origen_contactos}
+                    AND {campo_muestreo} IN ({elementos_in})
+                    AND C.CAS_CASE_ID IS NOT NULL
+            ),
+            -- Calcular volumen diario para detectar picos
+            DAILY_VOLUME AS (
+                SELECT 
+                    DIMENSION_VAL,
+                    PERIODO,
+                    CONTACT_DATE_ID,
+                    COUNT(*) as CASOS_DIA
+                FROM INCOMING_DATA
+                WHERE AGRUP_COMMERCE = '{args.commerce_group}'
+                GROUP BY DIMENSION_VAL, PERIODO, CONTACT_DATE_ID
+            ),
+            -- Calcular estadísticas temporales (promedio y desviación estándar)
+            TEMPORAL_STATS AS (
+                SELECT 
+                    DIMENSION_VAL,
+                    PERIODO,
+                    AVG(CASOS_DIA) as PROMEDIO,
+                    STDDEV(CASOS_DIA) as STD
+                FROM DAILY_VOLUME
+                GROUP BY DIMENSION_VAL, PERIODO
+            ),
+            -- Clasificar días en PICO o NORMAL (pico = promedio + 1.5σ)
+            PEAK_CLASSIFICATION AS (
+                SELECT 
+                    DV.DIMENSION_VAL,
+                    DV.PERIODO,
+                    DV.CONTACT_DATE_ID,
+                    CASE 
+                        WHEN DV.CASOS_DIA > (TS.PROMEDIO + 1.5 * TS.STD) THEN 'PICO'
+                        ELSE 'NORMAL'
+                    END as TIPO_DIA
+                FROM DAILY_VOLUME DV
+                JOIN TEMPORAL_STATS TS 
+                    ON DV.DIMENSION_VAL = TS.DIMENSION_VAL 
+                    AND DV.PERIODO = TS.PERIODO
+            ),
+            -- Enriquecer datos con clasificación de día
+            INCOMING_ENRICHED AS (
+                SELECT 
+                    I.*,
+                    COALESCE(PC.TIPO_DIA, 'NORMAL') as TIPO_DIA,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY I.DIMENSION_VAL, I.PERIODO, COALESCE(PC.TIPO_DIA, 'NORMAL')
+                        ORDER BY RAND()
+                    ) as rn_tipo
+                FROM INCOMING_DATA I
+                LEFT JOIN PEAK_CLASSIFICATION PC
+                    ON I.DIMENSION_VAL = PC.DIMENSION_VAL 
+                    AND I.PERIODO = PC.PERIODO
+                    AND I.CONTACT_DATE_ID = PC.CONTACT_DATE_ID
+                WHERE I.AGRUP_COMMERCE = '{args.commerce_group}'
+            ),
+            -- Muestreo ponderado: 70% picos + 30% normales (distribución dinámica)
+            INCOMING_FILTERED AS (
+                SELECT 
+                    CLA_CLAIM_ID,
+                    DIMENSION_VAL,
+                    CONTACT_DATE_ID,
+                    PERIODO,
+                    CAS_CASE_ID,
+                    TIPO_DIA
+                FROM INCOMING_ENRICHED
+                WHERE (TIPO_DIA = 'PICO' AND rn_tipo <= {casos_pico})
+                   OR (TIPO_DIA = 'NORMAL' AND rn_tipo <= {casos_normal})
+            ),
+            STUDIO_DATA AS (
+                SELECT 
+                    ST.CAS_CASE_ID,
+                    TRIM(REGEXP_REPLACE(
+                        CONCAT(
+                            COALESCE(JSON_VALUE(ST.SUMMARY_CX_STUDIO, '$.problem'), ''), 
+                            ' ', 
+                            COALESCE(JSON_VALUE(ST.SUMMARY_CX_STUDIO, '$.solution'), '')
+                        ), 
+                        r'\\s+', ' '
+                    )) AS CONVERSATION_SUMMARY
+                FROM `meli-bi-data.WHOWNER.BT_CX_STUDIO_SAMPLE` ST
+                WHERE ST.ARRIVAL_DATE BETWEEN DATE_SUB('{args.p1_start}', INTERVAL 1 MONTH) AND DATE_ADD('{args.p2_end}', INTERVAL 1 MONTH)
+            ),
+            ORDERS_DATA AS (
+                SELECT
+                    PP.CLA_CLAIM_ID,
+                    PP.ORD_CLOSED_DT as ORD_CLOSED_DATE
+                FROM `meli-bi-data.WHOWNER.DM_CX_POST_PURCHASE` PP
+                WHERE PP.ORD_CLOSED_DT BETWEEN DATE_SUB('{args.p1_start}', INTERVAL 1 MONTH) AND '{args.p2_end}'
+            )
+            SELECT 
+                I.DIMENSION_VAL,
+                I.PERIODO,
+                I.CONTACT_DATE_ID,
+                I.CAS_CASE_ID,
+                I.TIPO_DIA,
+                S.CONVERSATION_SUMMARY,
+                O.ORD_CLOSED_DATE
+            FROM INCOMING_FILTERED I
+            LEFT JOIN STUDIO_DATA S ON I.CAS_CASE_ID = S.CAS_CASE_ID
+            LEFT JOIN ORDERS_DATA O ON I.CLA_CLAIM_ID = O.CLA_CLAIM_ID
+            WHERE S.CONVERSATION_SUMMARY IS NOT NULL 
+                AND LENGTH(TRIM(S.CONVERSATION_SUMMARY)) > 10
+            ORDER BY I.DIMENSION_VAL, I.PERIODO, I.TIPO_DIA DESC
+            """
+
+                        # Configurar timeout y límites de BigQuery
+                        job_config = backend.job_config(
+                            use_query_cache=True,
+                            maximum_bytes_billed=5_000_000_000_000  # Límite 5TB - Cubre todos los casos incluyendo Shipping de alto volumen
+                        )
+
+                        try:
+                            print(f"[BQ] Ejecutando query con timeout de 8 minutos...")
+                            # Descarga Arrow: resúmenes como strings Arrow, dimensión y tipo de día categóricos
+                            df_conversaciones = scheduler.run('muestreo_conversaciones', query_conversaciones,
+                                                              timeout=480, job_config=job_config,  # 8 min timeout
+                                                              depends_on=deps_contactos, arrow=True,
+                                                              categoricals=['DIMENSION_VAL', 'TIPO_DIA'])
+
+                            bytes_processed = (scheduler.job_info('muestreo_conversaciones').get('bytes_processed') or 0) / (1024**3)  # GB
+                            print(f"[BQ] Bytes procesados: {bytes_processed:.2f} GB")
+
+                        except Exception as e:
+                            print(f"[ERROR] Query de muestreo falló: {e}")
+                            print(f"[INFO] Continuando sin análisis de conversaciones...")
+                            df_conversaciones = pd.DataFrame()
+
+                        # Solo convertir tipos si hay datos
+                        if len(df_conversaciones) > 0:
+                            df_conversaciones['PERIODO'] = pd.to_datetime(df_conversaciones['PERIODO'])
+                            df_conversaciones['CONTACT_DATE_ID'] = pd.to_datetime(df_conversaciones['CONTACT_DATE_ID'])
+
+                            # ========================================
+                            # FILTRADO POR DISTRIBUCIÓN ESPECÍFICA v6.4.9
+                            # ========================================
+                            print(f"[FILTRADO] Aplicando distribución por impacto...")
+
+                            # Aplicar límite específico por elemento-período
+                            df_filtered_list = []
+                            for elemento, dist in distribucion_muestra.items():
+                                df_elem = df_conversaciones[df_conversaciones['DIMENSION_VAL'] == elemento].copy()
+
+                                if len(df_elem) > 0:
+                                    # Separar por período
+                                    df_elem_p1 = df_elem[df_elem['PERIODO'].dt.strftime('%Y-%m') == pd.to_datetime(args.p1_start).strftime('%Y-%m')]
+                                    df_elem_p2 = df_elem[df_elem['PERIODO'].dt.strftime('%Y-%m') == pd.to_datetime(args.p2_start).strftime('%Y-%m')]
+
+                                    # Aplicar límite específico por período
+                                    if len(df_elem_p1) > dist['p1']:
+                                        df_elem_p1 = df_elem_p1.sample(n=dist['p1'], random_state=42)
+                                    if len(df_elem_p2) > dist['p2']:
+                                        df_elem_p2 = df_elem_p2.sample(n=dist['p2'], random_state=42)
+
+                                    df_filtered_list.append(df_elem_p1)
+                                    df_filtered_list.append(df_elem_p2)
+
+                            # Reconstruir DataFrame filtrado
+                            if df_filtered_list:
+                                df_conversaciones = pd.concat(df_filtered_list, ignore_index=True)
+                                print(f"[OK] Filtrado completado: {len(df_conversaciones)} conversaciones finales")
+                            else:
+                                df_conversaciones = pd.DataFrame()
+                                print(f"[WARNING] Sin conversaciones después del filtrado")
+
+                        # Registrar query ejecutada
+                        if len(df_conversaciones) > 0:
+                            picos = len(df_conversaciones[df_conversaciones.get('TIPO_DIA', 'NORMAL') == 'PICO'])
+                            normales = len(df_conversaciones[df_conversaciones.get('TIPO_DIA', 'NORMAL') == 'NORMAL'])
+
+                            queries_ejecutadas.append({
+                                'nombre': 'Muestreo de Conversaciones (v6.4.9 - Por CONTRIB_ABS)',
+                                'descripcion': f'Muestreo proporcional a CONTRIB_ABS (contribución % a variación de CR). Distribución dinámica: {total_esperado} conversaciones (mín {UMBRAL_MINIMO_CONVERSACIONES_POR_ELEMENTO_PERIODO}/elemento-período, máx {MAX_TOTAL_CONVERSATIONS} total)',
+                                'tabla': 'BT_CX_CONTACTS + BT_CX_STUDIO_SAMPLE + DM_CX_POST_PURCHASE',
+                                'output': f'{len(df_conversaciones)} conversaciones ({picos} picos + {normales} normales) | Estrategia: 70/30 pico/normal por elemento'
+                            })
+                        else:
+                            queries_ejecutadas.append({
+                                'nombre': 'Muestreo de Conversaciones',
+                                'descripcion': f'Muestreo intentado pero falló',
+                                'tabla': 'BT_CX_CONTACTS + BT_CX_STUDIO_SAMPLE + DM_CX_POST_PURCHASE',
+                                'output': '0 conversaciones'
+                            })
+
+                        if 'ORD_CLOSED_DATE' in df_conversaciones.columns:
+                            df_conversaciones['ORD_CLOSED_DATE'] = pd.to_datetime(df_conversaciones['ORD_CLOSED_DATE'])
+
+                        print(f"[OK] {len(df_conversaciones)} conversaciones obtenidas")
+                        if len(df_conversaciones) == 0:
+                            print(f"[DEBUG] Query devolvió 0 resultados. Verificar:")
+                            print(f"[DEBUG] - Elementos priorizados: {len(elementos_priorizados)}")
+                            print(f"[DEBUG] - Campo muestreo: {campo_muestreo}")
+                            print(f"[DEBUG] - Commerce group: {args.commerce_group}")
+                            print(f"[INFO] Continuando sin conversaciones (solo métricas cuantitativas)...")
+                            # Marcar todos los elementos como sin data
+                            for elemento in elementos_priorizados:
+                                conversaciones_por_proceso[elemento] = {
+                                    'status': 'sin_data',
+                                    'casos_p1': 0,
+                                    'casos_p2': 0
+                                }
+                        print()
+
+                    # Agrupar por elemento y período (solo si hay datos)
+                    if len(df_conversaciones) > 0 and 'DIMENSION_VAL' in df_conversaciones.columns:
+                        for elemento in elementos_priorizados:
+                            df_elem = df_conversaciones[df_conversaciones['DIMENSION_VAL'] == elemento]
+
+                            if len(df_elem) == 0:
+                                print(f"[WARNING] No hay conversaciones para '{elemento}'")
+                                conversaciones_por_proceso[elemento] = {
+                                    'status': 'sin_data',
+                                    'casos_p1': 0,
+                                    'casos_p2': 0
+                                }
+                                continue
+
+                            df_p1 = df_elem[df_elem['PERIODO'].between(args.p1_start, args.p1_end)]
+                            df_p2 = df_elem[df_elem['PERIODO'].between(args.p2_start, args.p2_end)]
+
+                            conversaciones_por_proceso[elemento] = {
+                                'status': 'con_data',
+                                'casos_p1': len(df_p1),
+                                'casos_p2': len(df_p2),
+                                'df_p1': df_p1,
+                                'df_p2': df_p2,
+                                'df_all': df_elem
+                            }
+
+                            print(f"[OK] '{elemento}': {len(df_p1)} conversaciones P1, {len(df_p2)} conversaciones P2")
+
+                    print()
+
+                    # Ejecutar análisis usando Claude (Cursor AI) o fallback
+                    print(f"[ANÁLISIS] Cargando análisis para {len(conversaciones_por_proceso)} procesos...")
+                    print()
+
+                    for elemento, data in conversaciones_por_proceso.items():
+                        if data['status'] != 'con_data':
+                            continue
+
+                        # Ejecutar análisis (usa Claude si está disponible, sino fallback)
+                        analisis = self.analyze_conversations_with_llm(
+                            df_conversations=data['df_all'],
+                            proceso=elemento,
+                            commerce_group=args.commerce_group
+                        )
+
+                        # Guardar resultado
+                        conversaciones_por_proceso[elemento]['analisis_llm'] = analisis
+
+                        # Mostrar resultado
+                        if self.use_claude_analysis and elemento in self.analisis_preexistentes:
+                            cobertura = analisis['cobertura']['covered_pct']
+                            num_causas = len([c for c in analisis['causas'] if '⚠️' not in c['descripcion']])
+                            print(f"[OK] '{elemento}': {num_causas} causas raíz (cobertura: {cobertura:.0f}%)")
+                        else:
+                            print(f"[SKIP] '{elemento}': CSV exportado para análisis manual")
+
+                    print()
+                    if self.use_claude_analysis:
+                        print(f"[OK] Análisis de Claude cargados: {len([p for p in conversaciones_por_proceso if conversaciones_por_proceso[p].get('analisis_llm', {}).get('cobertura', {}).get('covered_pct', 0) > 0])} procesos")
+                    else:
+                        print(f"[INFO] Los CSVs con conversaciones están disponibles para análisis manual")
+                        print(f"[INFO] Ejecutar: py analizar_conversaciones_claude.py")
+
+        else:
+            print("[INFO] Análisis de conversaciones saltado (--skip-conversations)")
+            print()
+
+        self.conversaciones_por_proceso = conversaciones_por_proceso
+        return conversaciones_por_proceso
+
+    def save_csvs(self):
+        """Guarda los CSVs intermedios (cuadros, conversaciones por período y semanal)."""
+        args = self.args
+        backend, query_cache, presupuesto = self.backend, self.query_cache, self.presupuesto
+        p1_start_dt, p2_start_dt = self.p1_start_dt, self.p2_start_dt
+        cuadros_cuantitativos = self.cuadros_cuantitativos
+        conversaciones_por_proceso = self.conversaciones_por_proceso
+        df_weekly = self.df_weekly
+
+        print("="*80)
+        print("PASO 5: GENERACIÓN HTML")
+        print("="*80 + "\n")
+
+        # Guardar CSVs intermedios
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(exist_ok=True)
+
+        print("[SAVE] Guardando CSVs intermedios...")
+
+        for dimension, df in cuadros_cuantitativos.items():
+            csv_path = output_dir / f"cuadro_{dimension.lower()}_{args.site.lower()}_{p1_start_dt.strftime('%Y%m')}.csv"
+            df.to_csv(csv_path, index=False)
+            self.csv_paths.append(csv_path)
+            print(f"  [OK] {csv_path.name}")
+
+        # Guardar conversaciones si existen - SEPARADAS POR PERÍODO (v6.3.8)
+        if len(conversaciones_por_proceso) > 0:
+            for elemento, data in conversaciones_por_proceso.items():
+                if data['status'] == 'con_data':
+                    elem_safe = elemento.replace('/', '_').replace(' ', '_')
+
+                    # Exportar CSV separado para P1
+                    csv_path_p1 = output_dir / f"conversaciones_{elem_safe}_{args.site.lower()}_p1_{p1_start_dt.strftime('%Y%m')}.csv"
+                    data['df_p1'].to_csv(csv_path_p1, index=False)
+                    self.csv_paths.append(csv_path_p1)
+                    print(f"  [OK] {csv_path_p1.name} ({len(data['df_p1'])} conversaciones)")
+
+                    # Exportar CSV separado para P2
+                    csv_path_p2 = output_dir / f"conversaciones_{elem_safe}_{args.site.lower()}_p2_{p2_start_dt.strftime('%Y%m')}.csv"
+                    data['df_p2'].to_csv(csv_path_p2, index=False)
+                    self.csv_paths.append(csv_path_p2)
+                    print(f"  [OK] {csv_path_p2.name} ({len(data['df_p2'])} conversaciones)")
+
+        # Guardar weekly
+        csv_weekly = output_dir / f"weekly_{args.site.lower()}_{args.commerce_group.lower()}_{p1_start_dt.strftime('%Y%m')}.csv"
+        df_weekly.to_csv(csv_weekly, index=False)
+        self.csv_paths.append(csv_weekly)
+        print(f"  [OK] {csv_weekly.name}")
+
+        print()
+
+        if query_cache is not None:
+            print(f"[CACHE] Queries desde cache local: {query_cache.hits} | ejecutadas en {backend.name}: {query_cache.misses} "
+                  f"| tamaño: {query_cache.size_bytes() / (1024**2):.1f} MB")
+            print()
+
+        if self.stage_cache is not None:
+            print(f"[MEMO] Etapas desde cache de etapas: {self.stage_cache.hits} | calculadas: {self.stage_cache.misses}")
+            print()
+
+        if presupuesto is not None:
+            print(f"[PRESUPUESTO] Procesados (estimado): {format_bytes(presupuesto.usado)} de {format_bytes(presupuesto.max_bytes)}")
+            print()
+
+        # Artefactos para --rerender (ver utils/run_artifacts.py); sin ellos el reporte igual se genera
+        from utils.run_artifacts import save_run
+        try:
+            self.run_id = save_run(self)
+            print(f"[RUN] Artefactos guardados: --rerender {self.run_id}")
+            print()
+        except Exception as e:
+            print(f"[WARNING] No se pudieron guardar los artefactos de la corrida: {e}")
+            print()
+
+        self.output_dir = output_dir
+        return list(self.csv_paths)
+
+    def restore_run(self, corrida: dict):
+        """Carga en la instancia el estado de una corrida guardada (ver utils.run_artifacts.load_run)."""
+        args = self.args
+        for nombre, valor in corrida['estado'].items():
+            setattr(self, nombre, valor)
+        self.df_weekly = corrida['df_weekly']
+        self.cuadros_cuantitativos = corrida['cuadros']
+        self.dimensiones_completas = corrida['dimensiones']
+
+        conversaciones_por_proceso = {}
+        for elemento, data in corrida['conversaciones'].items():
+            data = dict(data)
+            if 'df_all' in data:
+                df_elem = data['df_all']
+                data['df_p1'] = df_elem[df_elem['PERIODO'].between(args.p1_start, args.p1_end)]
+                data['df_p2'] = df_elem[df_elem['PERIODO'].between(args.p2_start, args.p2_end)]
+            conversaciones_por_proceso[elemento] = data
+        self.conversaciones_por_proceso = conversaciones_por_proceso
+
+        self.run_id = corrida['run_id']
+        self.csv_paths = [Path(p) for p in corrida['csv_paths']]
+        self.output_dir = Path(args.output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def reload_analysis(self):
+        """Vuelve a cargar los JSONs de análisis de conversaciones de output/ y re-analiza cada elemento (sin queries)."""
+        args = self.args
+        conversaciones_por_proceso = self.conversaciones_por_proceso
+        if not conversaciones_por_proceso:
+            return
+
+        self.configurar_analisis_claude(
+            args.site,
+            args.commerce_group,
+            args.muestreo_dimension,
+            args.p1_start,
+            args.p2_start,
+            list(conversaciones_por_proceso.keys()),
+            usar_analisis_separado=True
+        )
+        for elemento, data in conversaciones_por_proceso.items():
+            if data['status'] == 'con_data':
+                data['analisis_llm'] = self.analyze_conversations_with_llm(
+                    df_conversations=data['df_all'],
+                    proceso=elemento,
+                    commerce_group=args.commerce_group
+                )
+        print()
+
+    def _driver_semanal(self, df_weekly_drv, serie_mensual: bool):
+        """
+        Serie de un driver alternativo alineada con las semanas de df_weekly.
+
+        Las series semanales se cruzan por SEMANA. Las mensuales (tablas por
+        MONTH_ID, SEMANA = primer día del mes) se prorratean por día: cada
+        semana suma DRIVER del mes / días del mes por cada día hasta p2_end.
+
+        Returns:
+            (DRIVER por semana, nota para el HTML); DRIVER es None si la serie
+            no cubre todas las semanas del reporte
+        """
+        semanas = self.df_weekly['SEMANA']
+        df_weekly_drv = df_weekly_drv.assign(SEMANA=pd.to_datetime(df_weekly_drv['SEMANA']))
+        nota = None
+        if serie_mensual:
+            por_mes = df_weekly_drv.groupby(df_weekly_drv['SEMANA'].dt.to_period('M'))['DRIVER'].sum()
+            fin = pd.Timestamp(self.args.p2_end)
+
+            def prorratear(semana):
+                meses = pd.date_range(semana, min(semana + pd.Timedelta(days=6), fin)).to_period('M')
+                if not meses.isin(por_mes.index).all():
+                    return float('nan')
+                return sum(por_mes[mes] / mes.days_in_month for mes in meses)
+
+            driver = semanas.map(prorratear)
+            nota = 'Driver mensual prorrateado por día: el CR semanal es aproximado.'
+        else:
+            driver = semanas.map(df_weekly_drv.groupby('SEMANA')['DRIVER'].sum())
+
+        faltantes = int(driver.isna().sum())
+        if faltantes:
+            return None, (f"CR semanal no disponible: la serie del driver no cubre {faltantes} "
+                          f"de {len(semanas)} semanas.")
+        return driver, nota
+
+    def apply_driver(self, drv_p1, drv_p2, df_weekly_drv, driver_desc: str, serie_mensual: bool = False):
+        """
+        Reemplaza el denominador de una corrida restaurada (--whatif-driver).
+
+        Recalcula métricas consolidadas, CR semanal y cuadros (CONTRIB_ABS,
+        regla 80%, CR_P1 / CR_P2 / VAR_CR) sobre el incoming guardado, sin
+        queries de contactos. Las aperturas de corridas que no guardaron el
+        incoming completo conservan sus filas (incluida Otros) y solo
+        recalculan drivers, CR y contribución. Si la serie del driver no cubre
+        las semanas del reporte, el HTML reemplaza el gráfico semanal por una
+        nota (ver _driver_semanal).
+
+        Args:
+            drv_p1: Driver de P1
+            drv_p2: Driver de P2
+            df_weekly_drv: DataFrame[SEMANA, DRIVER] con la serie del driver
+            driver_desc: Descripción del driver para el reporte
+            serie_mensual: La serie es mensual (SEMANA = primer día del mes)
+
+        Raises:
+            ReportError: Driver en 0 en algún período
+        """
+        if not drv_p1 or not drv_p2:
+            raise ReportError(f"El driver es 0 en algún período (P1: {drv_p1:,}, P2: {drv_p2:,})")
+        m = self.metrics_consolidadas
+        cr_p1 = (m['inc_p1'] / drv_p1) * 100
+        cr_p2 = (m['inc_p2'] / drv_p2) * 100
+        var_cr = cr_p2 - cr_p1
+        m = dict(m, drv_p1=drv_p1, drv_p2=drv_p2, cr_p1=cr_p1, cr_p2=cr_p2, var_cr=var_cr,
+                 var_cr_pct=(var_cr / cr_p1) * 100 if cr_p1 > 0 else 0)
+
+        print(f"[WHAT-IF] Driver: {driver_desc}")
+        print(f"[WHAT-IF] Drivers P1: {drv_p1:,} | P2: {drv_p2:,}")
+        print(f"[WHAT-IF] CR P1: {cr_p1:.4f} pp | CR P2: {cr_p2:.4f} pp | Variación: {var_cr:+.4f} pp "
+              f"(antes {self.metrics_consolidadas['var_cr']:+.4f} pp)")
+        print()
+
+        driver_semanal, nota_semanal = self._driver_semanal(df_weekly_drv, serie_mensual)
+        if nota_semanal:
+            print(f"[{'WHAT-IF' if driver_semanal is not None else 'WARNING'}] {nota_semanal}")
+            print()
+        df_weekly = self.df_weekly.copy()
+        df_weekly['DRIVER'] = driver_semanal if driver_semanal is not None else float('nan')
+        df_weekly['CR'] = (df_weekly['INCOMING'] / df_weekly['DRIVER']) * 100
+
+        cuadros_cuantitativos = {}
+        for apertura, df in self.cuadros_cuantitativos.items():
+            if apertura in self.dimensiones_completas:
+                cuadros_cuantitativos[apertura] = priorizar_elementos(self.dimensiones_completas[apertura], m)
+                continue
+            df = df.drop(columns=['CONTRIB_CUMSUM'], errors='ignore')
+            df['DRV_P1'] = drv_p1
+            df['DRV_P2'] = drv_p2
+            df['CR_P1'] = (df['INC_P1'] / drv_p1) * 100
+            df['CR_P2'] = (df['INC_P2'] / drv_p2) * 100
+            df['VAR_CR'] = df['CR_P2'] - df['CR_P1']
+            df['CONTRIB_ABS'] = (df['VAR_CR'] / var_cr * 100) if var_cr != 0 else 0
+            df.loc[df['DIMENSION_VAL'] == 'TOTAL', 'CONTRIB_ABS'] = 100.0
+            cuadros_cuantitativos[apertura] = df
+
+        self.metrics_consolidadas = m
+        self.df_weekly = df_weekly
+        self.nota_semanal = nota_semanal
+        self.cuadros_cuantitativos = cuadros_cuantitativos
+        self.driver_desc = driver_desc
+        self.driver_config = dict(self.driver_config, type='alternativo', description=driver_desc)
+
+    def wait_for_analysis(self):
+        """Sin análisis previo y con conversaciones exportadas, espera los JSONs de Claude y recarga el análisis (v6.3.6)."""
+        args = self.args
+        p1_start_dt, p2_start_dt = self.p1_start_dt, self.p2_start_dt
+        conversaciones_por_proceso = self.conversaciones_por_proceso
+
+        # Si no existe análisis previo Y hay conversaciones exportadas → esperar automáticamente
+        if not self.use_claude_analysis and len(conversaciones_por_proceso) > 0 and not args.export_only:
+            # Obtener elementos priorizados
+            elementos_priorizados = list(conversaciones_por_proceso.keys())
+
+            # Mostrar lista de CSVs exportados
+            print("[INFO] CSVs de conversaciones exportados (separados por período):")
+            for elemento in elementos_priorizados:
+                elem_safe = elemento.replace('/', '_').replace(' ', '_')
+                csv_p1_name = f"conversaciones_{elem_safe}_{args.site.lower()}_p1_{p1_start_dt.strftime('%Y%m')}.csv"
+                csv_p2_name = f"conversaciones_{elem_safe}_{args.site.lower()}_p2_{p2_start_dt.strftime('%Y%m')}.csv"
+                print(f"  ✅ {csv_p1_name}")
+                print(f"  ✅ {csv_p2_name}")
+            print()
+
+            # Con --prefetch, la espera precarga las queries de los reportes probables siguientes
+            self.start_prefetch()
+
+            # Esperar automáticamente hasta que se generen los JSONs (análisis separado por período)
+            json_detectado = esperar_analisis_conversaciones(
+                json_path=self.analisis_claude_path,
+                elementos_priorizados=elementos_priorizados,
+                timeout_seconds=600,  # 10 minutos
+                check_interval=5,     # Verificar cada 5 segundos
+                site=args.site,
+                commerce_group=args.commerce_group,
+                p1_label=p1_start_dt.strftime('%b %Y'),
+                p2_label=p2_start_dt.strftime('%b %Y'),
+                analisis_separado=True  # v6.3.8: Análisis separado por período
+            )
+
+            # Si se detectó el JSON → recargar análisis
+            if json_detectado:
+                # Reconfigurar con los nuevos JSONs
+                self.configurar_analisis_claude(
+                    args.site, 
+                    args.commerce_group, 
+                    args.muestreo_dimension, 
+                    args.p1_start, 
+                    args.p2_start,
+                    elementos_priorizados,
+                    usar_analisis_separado=True
+                )
+
+                # Re-ejecutar análisis para todos los elementos con el JSON cargado
+                print("[RELOADING] Recargando análisis con JSON detectado...")
+                for elemento, data in conversaciones_por_proceso.items():
+                    if data['status'] == 'con_data':
+                        analisis = self.analyze_conversations_with_llm(
+                            df_conversations=data['df_all'],
+                            proceso=elemento,
+                            commerce_group=args.commerce_group
+                        )
+                        conversaciones_por_proceso[elemento]['analisis_llm'] = analisis
+
+                        if self.use_claude_analysis and elemento in self.analisis_preexistentes:
+                            cobertura = analisis['cobertura']['covered_pct']
+                            num_causas = len([c for c in analisis['causas'] if '⚠️' not in c['descripcion']])
+                            print(f"  [OK] '{elemento}': {num_causas} causas raíz (cobertura: {cobertura:.0f}%)")
+
+                print(f"\n[SUCCESS] Análisis completado exitosamente para {len(elementos_priorizados)} elementos\n")
+
+    def start_prefetch(self):
+        """Con --prefetch, envía en segundo plano las queries de los reportes probables siguientes (ver utils/prefetch.py)."""
+        if not self.args.prefetch or self.prefetcher is not None or self.query_cache is None:
+            return
+        self.prefetcher = Prefetcher(self.backend, self.query_cache, budget=self.presupuesto)
+        args = self.args
+        if self.fusionado_por_presupuesto:
+            # Mismo modo de lectura que esta corrida (la degradación no modifica args.fused_scan)
+            args = report_args(args)
+            args.fused_scan = True
+        self.prefetcher.start(prefetch_jobs(args, self.aperturas_list))
+        print()
+
+    def export_only_summary(self):
+        """Resumen de --export-only: CSVs listos para el análisis con Cursor AI (no se genera HTML)."""
+        args = self.args
+        p1_start_dt, p2_start_dt = self.p1_start_dt, self.p2_start_dt
+        conversaciones_por_proceso = self.conversaciones_por_proceso
+
+        print()
+        print("="*80)
+        print("[EXPORT-ONLY MODE] CSVs de conversaciones exportados exitosamente")
+        print("="*80)
+        print()
+        print(f"[ARCHIVOS] {len(conversaciones_por_proceso) * 2} CSVs de conversaciones generados (separados por período):")
+        for elemento in conversaciones_por_proceso.keys():
+            elem_safe = elemento.replace('/', '_').replace(' ', '_')
+            csv_p1_name = f"conversaciones_{elem_safe}_{args.site.lower()}_p1_{p1_start_dt.strftime('%Y%m')}.csv"
+            csv_p2_name = f"conversaciones_{elem_safe}_{args.site.lower()}_p2_{p2_start_dt.strftime('%Y%m')}.csv"
+            print(f"  OK output/{csv_p1_name}")
+            print(f"  OK output/{csv_p2_name}")
+        print()
+        print("[NEXT STEP] El asistente de Cursor AI analizará las conversaciones automáticamente")
+        print("[ACCIÓN] No se requiere intervención manual")
+        print("[INFO] Re-ejecutar script sin --export-only para generar HTML con análisis")
+        print()
+
+    def checkpoint_html(self, pendientes: list, error: str = None):
+        """
+        HTML parcial: escribe el reporte con lo calculado hasta ahora.
+
+        Las secciones de las etapas pendientes ('weekly', 'dimension_tables',
+        'conversations') quedan como placeholders y la página se recarga
+        sola; render_html reemplaza el mismo archivo al final. Un error al
+        escribir el parcial no interrumpe la corrida.
+
+        Returns:
+            Path del HTML (None con --export-only o si no se pudo escribir)
+        """
+        if self.args.export_only:
+            return None
+        self.secciones_pendientes = list(pendientes)
+        self.error_parcial = error
+        try:
+            self.output_dir = Path(self.args.output_dir)
+            self.output_dir.mkdir(exist_ok=True)
+            return self.render_html()
+        except Exception as e:
+            print(f"[WARNING] No se pudo escribir el HTML parcial: {e}")
+            return None
+        finally:
+            self.secciones_pendientes = []
+            self.error_parcial = None
+
+    def checkpoint_error(self, error: Exception):
+        """Marca el HTML parcial (si quedó uno) como incompleto por error, para que no figure 'en curso'."""
+        if self.html_parcial:
+            self.checkpoint_html(self.html_parcial, error=f"{type(error).__name__}: {error}")
+
+    def render_html(self):
+        """PASO 5: resumen ejecutivo, hallazgo principal, análisis comparativo y HTML del reporte."""
+        from utils.report_html import generar_html_reporte
+
+        salida = generar_html_reporte(self)
+        self.html_content = salida['html_content']
+        self.html_path = salida['html_path']
+        self.html_parcial = list(self.secciones_pendientes) or None
+        self.bullets = [salida['bullet_1'], salida['bullet_2'], salida['bullet_3']]
+        self.hallazgo_explicaciones = salida['hallazgo_explicaciones']
+        self.analisis_comp = salida['analisis_comp']
+        self.orden_contribucion = salida['orden_contribucion']
+        self.analisis_comparativo_path = salida['analisis_comparativo_path']
+        return self.html_path
+
+    def print_summary(self):
+        """Resumen completo en consola (v6.4.10) y apertura del reporte con --open-report."""
+        args = self.args
+        aperturas_list = self.aperturas_list
+        m = self.metrics_consolidadas
+        inc_p1_total, inc_p2_total, var_inc_total = m['inc_p1'], m['inc_p2'], m['var_inc']
+        drv_p1_total, drv_p2_total = m['drv_p1'], m['drv_p2']
+        cr_p1, cr_p2, var_cr = m['cr_p1'], m['cr_p2'], m['var_cr']
+        var_inc_pct, var_cr_pct = m['var_inc_pct'], m['var_cr_pct']
+        bullet_1, bullet_2, bullet_3 = self.bullets
+        hallazgo_explicaciones = self.hallazgo_explicaciones
+        cuadros_cuantitativos = self.cuadros_cuantitativos
+        conversaciones_por_proceso = self.conversaciones_por_proceso
+        eventos_comerciales_p1, eventos_comerciales_p2 = self.eventos_comerciales_p1, self.eventos_comerciales_p2
+        analisis_comp, orden_contribucion = self.analisis_comp, self.orden_contribucion
+        analisis_comparativo_path = self.analisis_comparativo_path
+        html_path = self.html_path
+
+        # ========================================
+        # FINALIZAR - RESUMEN COMPLETO EN CONSOLA (v6.4.10)
+        # ========================================
+
+        print()
+        print("="*80)
+        print("  REPORTE COMPLETADO - RESUMEN COMPLETO")
+        print("="*80)
+        print()
+
+        # --- 1. CONFIGURACIÓN ---
+        print(f"  Site: {args.site} | Commerce Group: {args.commerce_group} | Aperturas: {', '.join(aperturas_list)}")
+        print(f"  P1: {args.p1_start} a {args.p1_end} | P2: {args.p2_start} a {args.p2_end}")
+        print()
+
+        # --- 2. CARDS EJECUTIVAS ---
+        print("  📊 CARDS EJECUTIVAS")
+        print("  " + "─"*76)
+        print(f"  │ Incoming P1:  {inc_p1_total:>12,}   │  Incoming P2:  {inc_p2_total:>12,}   │")
+        print(f"  │ Driver P1:    {drv_p1_total:>12,}   │  Driver P2:    {drv_p2_total:>12,}   │")
+        print(f"  │ CR P1:        {cr_p1:>11.4f} pp  │  CR P2:        {cr_p2:>11.4f} pp  │")
+        print(f"  │ Var Incoming:    {var_inc_total:>+10,} ({var_inc_pct:+.1f}%)")
+        print(f"  │ Var CR:          {var_cr:>+10.4f} pp ({var_cr_pct:+.1f}%)")
+        for metrica, conteo in self.conteos_distintos.items():
+            print(f"  │ {METRICAS_SKETCH[metrica] + ':':<17}{conteo['p1']:>10,} → {conteo['p2']:,} (estimado HLL)")
+        print("  " + "─"*76)
+        print()
+
+        # --- 3. RESUMEN EJECUTIVO (3 bullets) ---
+        print("  📋 RESUMEN EJECUTIVO")
+        print("  " + "─"*76)
+        print(f"  1. {bullet_1}")
+        print(f"  2. {bullet_2}")
+        print(f"  3. {bullet_3}")
+        print()
+
+        # --- 4. HALLAZGO PRINCIPAL ---
+        print("  💡 HALLAZGO PRINCIPAL")
+        print("  " + "─"*76)
+        direccion_hallazgo = "mejora" if var_cr < 0 else "empeoramiento"
+        print(f"  El {direccion_hallazgo} del {abs(var_cr_pct):.1f}% en CR se debe principalmente a:")
+        for i, exp in enumerate(hallazgo_explicaciones, 1):
+            print(f"    {i}. {exp}")
+        print()
+
+        # --- 5. CUADRO CUANTITATIVO POR DIMENSIÓN ---
+        for dimension, df in cuadros_cuantitativos.items():
+            print(f"  📊 CUADRO POR {dimension}")
+            print("  " + "─"*76)
+            header = f"  {'Elemento':<25} {'Inc P1':>9} {'Inc P2':>9} {'Var':>8} {'Contrib%':>9} {'CR P1':>9} {'CR P2':>9} {'Var CR':>9}"
+            print(header)
+            print("  " + "─"*76)
+            for _, row in df.iterrows():
+                dim_val = str(row['DIMENSION_VAL'])[:24]
+                r_inc_p1 = int(row['INC_P1'])
+                r_inc_p2 = int(row['INC_P2'])
+                r_var_inc = int(row['VAR_INC'])
+                r_contrib = row.get('CONTRIB_ABS', 0)
+                r_cr_p1 = row['CR_P1']
+                r_cr_p2 = row['CR_P2']
+                r_var_cr = row['VAR_CR']
+                contrib_str = f"{r_contrib:.1f}%" if pd.notna(r_contrib) and str(r_contrib) != '' else ""
+                print(f"  {dim_val:<25} {r_inc_p1:>9,} {r_inc_p2:>9,} {r_var_inc:>+8,} {contrib_str:>9} {r_cr_p1:>9.4f} {r_cr_p2:>9.4f} {r_var_cr:>+9.4f}")
+            print()
+
+        # --- 6. ANÁLISIS COMPARATIVO DE CAUSAS RAÍZ ---
+        try:
+            if analisis_comp and len(analisis_comp) > 0:
+                print("  " + "="*76)
+                print("  🔍 ANÁLISIS COMPARATIVO DE CAUSAS RAÍZ")
+                print("  " + "="*76)
+                print()
+
+                # Usar orden por contribución si está disponible
+                try:
+                    elementos_ordenados = orden_contribucion if orden_contribucion is not None else list(analisis_comp.keys())
+                except:
+                    elementos_ordenados = list(analisis_comp.keys())
+
+                for idx, elemento in enumerate(elementos_ordenados, 1):
+                    if elemento not in analisis_comp:
+                        continue
+                    data = analisis_comp[elemento]
+
+                    # Obtener métricas del elemento
+                    inc_elem_p1 = data.get('incoming_nov', 0)
+                    inc_elem_p2 = data.get('incoming_dic', 0)
+                    var_elem = data.get('variacion_casos', 0)
+                    var_pct_elem = data.get('variacion_pct', 0)
+                    conv_p1 = data.get('conversaciones_nov', 0)
+                    conv_p2 = data.get('conversaciones_dic', 0)
+
+                    # Buscar contrib% en el cuadro cuantitativo
+                    contrib_elem = ""
+                    for dim_key, df_dim in cuadros_cuantitativos.items():
+                        match = df_dim[df_dim['DIMENSION_VAL'] == elemento]
+                        if len(match) > 0:
+                            contrib_val = match.iloc[0].get('CONTRIB_ABS', 0)
+                            if pd.notna(contrib_val):
+                                contrib_elem = f" | Contribución al CR: {contrib_val:.1f}%"
+                            break
+
+                    print(f"  ┌{'─'*74}┐")
+                    print(f"  │ #{idx} 📌 {elemento:<68}│")
+                    print(f"  │ Incoming: {inc_elem_p1:,} → {inc_elem_p2:,} ({var_pct_elem:+.1f}%, {var_elem:+,} casos){contrib_elem}")
+                    print(f"  │ Conversaciones analizadas: P1={conv_p1} | P2={conv_p2}")
+                    print(f"  └{'─'*74}┘")
+
+                    # Mostrar causas consolidadas con % por período
+                    causas_consolidadas = data.get('causas_consolidadas', [])
+                    if causas_consolidadas:
+                        print(f"  {'Causa':<50} {'% P1':>6} {'% P2':>6} {'Δ':>5}  {'Patrón'}")
+                        print(f"  {'─'*50} {'─'*6} {'─'*6} {'─'*5}  {'─'*15}")
+                        for c in causas_consolidadas:
+                            c_name = str(c.get('causa', ''))[:49]
+                            c_pct_p1 = c.get('pct_p1', 0)
+                            c_pct_p2 = c.get('pct_p2', 0)
+                            c_delta = c_pct_p2 - c_pct_p1
+                            # Determinar patrón
+                            if c_pct_p1 > 0 and c_pct_p2 > 0:
+                                patron = "PERSISTENTE"
+                            elif c_pct_p1 == 0 and c_pct_p2 > 0:
+                                patron = "🆕 NUEVO"
+                            elif c_pct_p1 > 0 and c_pct_p2 == 0:
+                                patron = "❌ DESAPARECE"
+                            else:
+                                patron = ""
+                            print(f"  {c_name:<50} {c_pct_p1:>5.0f}% {c_pct_p2:>5.0f}% {c_delta:>+4.0f}  {patron}")
+                    else:
+                        # Fallback: mostrar causas P1 y P2 por separado
+                        causas_p1_list = data.get('causas_nov', [])
+                        causas_p2_list = data.get('causas_dic', [])
+                        if causas_p1_list:
+                            print(f"\n  📅 P1 ({args.p1_start[:7]}):")
+                            for c in causas_p1_list[:5]:
+                                print(f"    • {c.get('causa', 'N/A')} ({c.get('porcentaje', 0)}%)")
+                        if causas_p2_list:
+                            print(f"\n  📅 P2 ({args.p2_start[:7]}):")
+                            for c in causas_p2_list[:5]:
+                                print(f"    • {c.get('causa', 'N/A')} ({c.get('porcentaje', 0)}%)")
+
+                    # Insight del elemento
+                    analisis_elem = data.get('analisis_comparativo', {})
+                    insight = analisis_elem.get('insight_principal', '')
+                    patron_cambio = analisis_elem.get('patron_cambio', '')
+                    if insight:
+                        print(f"\n  💡 Insight: {insight}")
+                    if patron_cambio:
+                        patron_dom_p1 = analisis_elem.get('patron_dominante_p1', '')
+                        patron_dom_p2 = analisis_elem.get('patron_dominante_p2', '')
+                        if patron_cambio == 'cambió':
+                            print(f"  ⚠️  Patrón dominante CAMBIÓ: \"{patron_dom_p1}\" → \"{patron_dom_p2}\"")
+                        else:
+                            print(f"  ✅ Patrón dominante se mantuvo: \"{patron_dom_p1}\"")
+
+                    # Citas destacadas (top 2 por período)
+                    causas_p1_citas = data.get('causas_nov', [])
+                    causas_p2_citas = data.get('causas_dic', [])
+                    citas_mostradas = 0
+                    max_citas = 3
+
+                    todas_citas_p1 = []
+                    todas_citas_p2 = []
+                    for c in causas_p1_citas[:2]:
+                        for cita in c.get('citas', [])[:1]:
+                            todas_citas_p1.append(cita)
+                    for c in causas_p2_citas[:2]:
+                        for cita in c.get('citas', [])[:1]:
+                            todas_citas_p2.append(cita)
+
+                    if todas_citas_p1 or todas_citas_p2:
+                        print(f"\n  📝 Citas destacadas:")
+                        for cita in todas_citas_p1[:2]:
+                            texto = str(cita.get('texto', ''))[:120]
+                            print(f"    P1 - Caso {cita.get('case_id', 'N/A')} ({cita.get('fecha', 'N/A')}): {texto}...")
+                        for cita in todas_citas_p2[:2]:
+                            texto = str(cita.get('texto', ''))[:120]
+                            print(f"    P2 - Caso {cita.get('case_id', 'N/A')} ({cita.get('fecha', 'N/A')}): {texto}...")
+
+                    print()
+        except NameError:
+            # analisis_comp no existe (no se ejecutó análisis comparativo)
+            pass
+        except Exception as e:
+            print(f"  [WARNING] Error al imprimir análisis comparativo: {e}")
+            print()
+
+        # --- 7. EVENTOS COMERCIALES ---
+        if eventos_comerciales_p1 or eventos_comerciales_p2:
+            print("  📅 EVENTOS COMERCIALES")
+            print("  " + "─"*76)
+            if eventos_comerciales_p1:
+                print(f"  P1 ({args.p1_start[:7]}):")
+                for nombre, ev in eventos_comerciales_p1.items():
+                    print(f"    • {nombre}: {ev.get('casos', 0):,} casos ({ev.get('porcentaje', 0):.1f}%)")
+            if eventos_comerciales_p2:
+                print(f"  P2 ({args.p2_start[:7]}):")
+                for nombre, ev in eventos_comerciales_p2.items():
+                    print(f"    • {nombre}: {ev.get('casos', 0):,} casos ({ev.get('porcentaje', 0):.1f}%)")
+            print()
+
+        # --- 8. ARCHIVOS GENERADOS ---
+        print("  📁 ARCHIVOS GENERADOS")
+        print("  " + "─"*76)
+        print(f"  HTML:            {html_path}")
+        print(f"  CSVs:            {len(cuadros_cuantitativos)} cuadro(s) cuantitativo(s)")
+        if len(conversaciones_por_proceso) > 0:
+            total_conv = sum(d.get('analisis_llm', {}).get('total_conversaciones', 0) for d in conversaciones_por_proceso.values())
+            print(f"  Conversaciones:  {len(conversaciones_por_proceso)} elementos ({total_conv} conversaciones analizadas)")
+        try:
+            if analisis_comp and len(analisis_comp) > 0:
+                print(f"  Comparativo:     {analisis_comparativo_path.name}")
+        except NameError:
+            pass
+        print()
+
+        if args.open_report and self.preview_path is None:   # la vista previa abierta se recarga sola
+            print("[OPEN] Abriendo reporte en navegador...")
+            webbrowser.open(str(html_path.absolute()))
+            print()
+
+        print("="*80)
+
+
+
+def generate_report(params, backend=None, query_cache=None, budget=None) -> ReportResult:
+    """
+    Genera un reporte completo (ver ReportPipeline).
+
+    Args:
+        params: dict, argparse.Namespace o lista de argumentos de línea de comandos
+        backend, query_cache, budget: Recursos compartidos (opcionales)
+
+    Returns:
+        ReportResult
+    """
+    return ReportPipeline(params, backend=backend, query_cache=query_cache, budget=budget).run()
+
+
+def rerender_report(run_id: str, output_dir: str = 'output', open_report: bool = False) -> ReportResult:
+    """
+    Regenera el HTML de una corrida guardada sin ejecutar queries (--rerender).
+
+    Usa los artefactos de save_csvs (ver utils/run_artifacts.py) y vuelve a
+    cargar los JSONs de análisis de conversaciones, así un análisis
+    corregido se refleja en el reporte en segundos. El HTML se escribe en
+    output_dir con el mismo nombre que el de la corrida original.
+
+    Args:
+        run_id: Id de la corrida ('latest' = la más reciente)
+        output_dir: Directorio donde se guardó la corrida (y donde se escribe el HTML)
+        open_report: Abrir el HTML al terminar
+
+    Raises:
+        ReportError: Corrida inexistente o incompatible
+    """
+    from utils.run_artifacts import load_run
+
+    corrida = load_run(run_id, output_dir)
+    print(f"[RERENDER] Corrida {corrida['run_id']} ({corrida['creado']}): HTML desde artefactos, sin queries")
+    print()
+    pipeline = ReportPipeline(dict(corrida['args'], output_dir=output_dir, open_report=open_report,
+                                   export_only=False, preview=False, plan=False))
+    pipeline.configure()
+    pipeline.restore_run(corrida)
+    pipeline.reload_analysis()
+    pipeline.render_html()
+    pipeline.print_summary()
+    return pipeline.result()
+
+
+def whatif_report(run_id: str, driver_key: str, output_dir: str = 'output', open_report: bool = False) -> ReportResult:
+    """
+    Recalcula una corrida guardada con un driver alternativo (--rerender ... --whatif-driver).
+
+    Solo se consulta el driver (config.drivers_alternativos, una query por
+    tabla y cacheada como cualquier otra); incoming, aperturas, conversaciones
+    y análisis salen de los artefactos de la corrida. CR, CONTRIB_ABS y la
+    regla 80% se recalculan con ReportPipeline.apply_driver. El HTML se
+    escribe en output_dir con el nombre del original y el sufijo
+    _whatif_{driver_key}.
+
+    Args:
+        run_id: Id de la corrida ('latest' = la más reciente)
+        driver_key: Key del driver alternativo del commerce group de la corrida
+        output_dir: Directorio donde se guardó la corrida (y donde se escribe el HTML)
+        open_report: Abrir el HTML al terminar
+
+    Raises:
+        ReportError: Corrida inexistente, driver inexistente o sin datos para el site
+    """
+    from config.drivers_alternativos import (
+        buscar_driver_alternativo, evaluar_drivers_alternativos, get_driver_alternativo
+    )
+    from utils.run_artifacts import load_run
+
+    corrida = load_run(run_id, output_dir)
+    pipeline = ReportPipeline(dict(corrida['args'], output_dir=output_dir, open_report=open_report,
+                                   export_only=False, preview=False, plan=False))
+    args = pipeline.args
+    try:
+        driver = buscar_driver_alternativo(args.commerce_group, driver_key)
+    except KeyError as e:
+        raise ReportError(e.args[0])
+    config = get_driver_alternativo(*driver)
+    print(f"[WHAT-IF] Corrida {corrida['run_id']} ({corrida['creado']}): incoming desde artefactos, "
+          f"driver '{driver[3]}' desde {config['tabla_fuente']}")
+    print()
+
+    pipeline.configure()
+    pipeline.restore_run(corrida)
+    pipeline.connect()
+    try:
+        df_totales, df_semanal = evaluar_drivers_alternativos(
+            pipeline.scheduler, [driver], args.p1_start, args.p1_end, args.p2_start, args.p2_end,
+            sites=get_site_list(args.site)
+        )
+    finally:
+        pipeline.close()
+    if df_totales.empty:
+        raise ReportError(f"Driver '{driver[3]}' no disponible para {args.site} "
+                          f"(sites: {', '.join(config.get('sites_disponibles', []))})")
+
+    pipeline.queries_ejecutadas.append({
+        'nombre': f"Driver alternativo ({driver[3]})",
+        'descripcion': config['description'],
+        'tabla': config['tabla_fuente'],
+        'output': f"P1: {int(df_totales['DRV_P1'].sum()):,} | P2: {int(df_totales['DRV_P2'].sum()):,}"
+    })
+    pipeline.output_suffix = f'_whatif_{driver[3]}'
+    pipeline.apply_driver(
+        int(df_totales['DRV_P1'].sum()), int(df_totales['DRV_P2'].sum()),
+        df_semanal.groupby('SEMANA', as_index=False)['DRIVER'].sum(),
+        f"{config['label']} (what-if: driver alternativo, tabla {config['tabla_fuente']})",
+        serie_mensual=config['fecha_field'] == 'MONTH_ID'
+    )
+    pipeline.reload_analysis()
+    pipeline.render_html()
+    pipeline.print_summary()
+    return pipeline.result()
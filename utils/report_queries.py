@@ -0,0 +1,1189 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+REPORT QUERIES - Queries del reporte universal de CR
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Construcción de las queries de BT_CX_CONTACTS usadas por
+             generar_reporte_cr_universal y separación de sus resultados.
+
+Queries individuales (modo por defecto):
+  build_incoming_total_query, build_drivers_total_query, build_weekly_query,
+  build_dimension_query, build_feriados_query, build_eventos_fallback_query,
+  build_cross_site_incoming_query, build_global_drivers_query
+
+Modo fusionado (--fused-scan):
+  Una sola lectura de BT_CX_CONTACTS calcula con GROUPING SETS:
+    - ()            → incoming total P1 / P2          (PASO 1)
+    - (SEMANA)      → incoming semanal 25 semanas      (PASO 2)
+    - (DIM_<apert>) → incoming por elemento de apertura (PASO 3)
+  El resultado se separa en pandas con split_fused_contacts().
+
+Cubo diario local (--contacts-cube, utils.contacts_cube):
+  build_daily_contacts_query() lee solo los días que le faltan al cubo con
+  GROUPING SETS (FECHA) y (FECHA, DIM_<apert>); PASO 1-3 se responden desde
+  los Parquet del cubo para cualquier par de períodos.
+
+DriverStore (--driver-store, calculations.drivers_management):
+  build_daily_orders_query() y build_shipping_drivers_query() leen solo los
+  días (órdenes) o meses (Shipping) que le faltan al store, para todos los
+  sites; drivers totales, semanales y cross-site se suman en memoria y
+  build_weekly_query(include_drivers=False) deja solo el incoming semanal.
+
+Sketches HLL de conteos distintos (utils.hll_sketches):
+  build_hll_registers_query() devuelve los registros HyperLogLog por site y
+  día de un identificador (órdenes, casos o clientes). Se combinan en local
+  con el máximo por registro: el conteo distinto de cualquier ventana sale
+  de los sketches diarios sin volver a leer la tabla.
+
+Modo batch (--batch, utils.batch_reports):
+  build_batch_contacts_query() hace la lectura fusionada una sola vez para
+  todos los sites y commerce groups del batch (SIT_SITE_ID en cada grouping
+  set y columnas INC_P1_<i> / INC_P2_<i> / CASOS_<i> por commerce group), y
+  build_batch_orders_query() lee BT_ORD_ORDERS una vez por site para los
+  drivers totales y semanales. split_batch_contacts() y split_batch_orders()
+  extraen de esas lecturas el resultado de cada reporte.
+
+SQL canónico (utils.canonical_sql):
+  Las queries se retornan como CanonicalQuery: texto normalizado y valores de
+  la corrida como parámetros (@sites, @p1_start, @commerce_group, ...). Las
+  piezas compartidas (_contacts_source, _orders_source) son las mismas en
+  todas las queries, así el mismo pedido lógico genera siempre el mismo texto
+  y reutiliza la cache de resultados de BigQuery. FIELD_MAPPING y
+  COMMERCE_GROUP_FILTERS se comparten con scripts/run_analysis.py, que arma
+  su query con build_dimension_query().
+
+Tabla BASE_CONTACTS materializada (--materialize-base):
+  build_base_contacts_table() crea una tabla con los contactos del site,
+  commerce group y ventana del reporte (filtros de BU/flag, commerce group y
+  proceso ya aplicados). Las queries de PASO 1-3 y el muestreo de
+  conversaciones reciben base_table y leen esa tabla en lugar de
+  BT_CX_CONTACTS. El resto de las exclusiones estándar se guarda en la
+  columna PASA_EXCLUSIONES_CR porque el muestreo no las aplica.
+
+Uso:
+  from utils.report_queries import build_fused_contacts_query, split_fused_contacts
+
+  query = build_fused_contacts_query(site, commerce_group, commerce_filter,
+                                     campos, p1_start, p1_end, p2_start, p2_end)
+  partes = split_fused_contacts(client.query(query).to_dataframe(), list(campos))
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import re
+from datetime import date, timedelta
+
+from config.site_groups import get_site_list, resolve_site_sql
+from utils.canonical_sql import canonical_query, fecha_param, sites_param
+from utils.local_store import ultimo_cerrado
+from utils.partition_predicates import post_purchase_predicate
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Semanas de la serie semanal (PASO 2): DATE_SUB(p2_end, INTERVAL 25 WEEK)
+SEMANAS_SERIE = 25
+
+# Filtros del numerador de CR que aplican todas las queries de contactos (incluido el muestreo)
+FILTROS_BASE_CONTACTOS = """C.PROCESS_BU_CR_REPORTING IN ('ME','ML')
+        AND COALESCE(C.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0"""
+
+# Exclusiones de site, colas, procesos y CI reasons (PASO 1-3, no el muestreo)
+EXCLUSIONES_CR = """C.SIT_SITE_ID NOT IN ('MLV')
+        AND C.QUEUE_ID NOT IN (2131, 230, 1102, 1241, 2075, 2294, 2295)
+        AND C.PROCESS_ID NOT IN (1312)
+        AND COALESCE(C.CI_REASON_ID, 0) NOT IN (2592, 6588, 10068, 2701, 10048)"""
+
+# Exclusiones estándar del numerador de CR (mismas que PASO 1-3)
+FILTROS_ESTANDAR_CONTACTOS = f"""{FILTROS_BASE_CONTACTOS}
+        AND {EXCLUSIONES_CR}"""
+
+# Vigencia de la tabla BASE_CONTACTS materializada (se reutiliza entre corridas)
+BASE_CONTACTS_EXPIRATION_HOURS = 24
+
+# Vigencia con días abiertos en la ventana: la misma que la cache de queries para BT_CX_CONTACTS
+BASE_CONTACTS_OPEN_EXPIRATION_HOURS = 12
+
+# Sites incluidos en el cuadro cross-site
+SITES_CROSS_SITE = ['MLA', 'MLB', 'MLC', 'MCO', 'MEC', 'MLM', 'MLU', 'MPE']
+
+# Identificadores con conteo distinto por sketch HLL: métrica → (fuente, campo)
+METRICAS_DISTINTAS = {
+    'orders': ('orders', 'ORD.ORD_ORDER_ID'),
+    'cases': ('contacts', 'C.CAS_CASE_ID'),
+    'customers': ('contacts', 'C.CUS_CUST_ID'),
+}
+
+# Mapeo de dimensiones a campos de BigQuery
+FIELD_MAPPING = {
+    'PROCESO': 'C.PROCESS_NAME',
+    'CDU': 'C.CDU',
+    'TIPIFICACION': 'C.REASON_DETAIL_GROUP_REPORTING',
+    'ENVIRONMENT': 'C.ENVIRONMENT',
+    'CLA_REASON_DETAIL': 'C.CLA_REASON_DETAIL',
+    'SOURCE_ID': 'C.CHANNEL_ID',
+    'SOLUTION_ID': 'C.SOLUTION_ID'
+}
+
+# Mapeo de commerce groups a filtros CASE
+COMMERCE_GROUP_FILTERS = {
+    'PDD': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%PDD%') THEN 'PDD'  
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others' THEN 'PDD'
+            ELSE 'OTRO' 
+        END
+    """,
+    'PNR': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%PNR%') THEN 'PNR' 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale' THEN 'PNR'
+            ELSE 'OTRO' 
+        END
+    """,
+    'PCF_COMPRADOR': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Post Compra%') 
+            AND C.PROCESS_GROUP_ECOMMERCE IN ('Comprador') THEN 'PCF_COMPRADOR'
+            ELSE 'OTRO' 
+        END
+    """,
+    'PCF_VENDEDOR': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Post Compra%') 
+            AND C.PROCESS_GROUP_ECOMMERCE IN ('Vendedor') THEN 'PCF_VENDEDOR'
+            ELSE 'OTRO' 
+        END
+    """,
+    'ME_PREDESPACHO': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Mercado Envíos%') 
+                 AND C.PROCESS_GROUP_ECOMMERCE IN ('Vendedor') THEN 'ME_PREDESPACHO'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('Post Compra Funcionalidades Vendedor') 
+                 AND C.PROCESS_BU_CR_REPORTING IN ('ME') THEN 'ME_PREDESPACHO'
+            ELSE 'OTRO' 
+        END
+    """,
+    'ME_DISTRIBUCION': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Mercado Envíos%') 
+                 AND C.PROCESS_GROUP_ECOMMERCE IN ('Comprador') THEN 'ME_DISTRIBUCION'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Post Compra Comprador%') 
+                 AND C.PROCESS_BU_CR_REPORTING IN ('ME') THEN 'ME_DISTRIBUCION'
+            ELSE 'OTRO' 
+        END
+    """,
+    'ME_DRIVERS': """
+        CASE 
+            WHEN C.PROCESS_NAME = 'Drivers' THEN 'ME_DRIVERS'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Drivers%') THEN 'ME_DRIVERS'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Extra%') 
+                 AND C.PROCESS_BU_CR_REPORTING IN ('ME') THEN 'ME_DRIVERS'
+            ELSE 'OTRO' 
+        END
+    """,
+    'GENERALES_COMPRA': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Compra%') 
+                 AND C.PROCESS_GROUP_ECOMMERCE IN ('Comprador') THEN 'GENERALES_COMPRA'
+            ELSE 'OTRO' 
+        END
+    """,
+    'MODERACIONES': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Prustomer%') THEN 'MODERACIONES'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Moderaciones%') THEN 'MODERACIONES'
+            ELSE 'OTRO' 
+        END
+    """,
+    'PAGOS': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%Pagos%') THEN 'PAGOS'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%MP On%') THEN 'PAGOS'
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%MP Payer%') THEN 'PAGOS'
+            ELSE 'OTRO' 
+        END
+    """,
+    'FBM Sellers': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%FBM Sellers%') THEN 'FBM Sellers'
+            ELSE 'OTRO' 
+        END
+    """,
+    'FBM_SELLERS': """
+        CASE 
+            WHEN C.PROCESS_PROBLEMATIC_REPORTING LIKE ('%FBM Sellers%') THEN 'FBM_SELLERS'
+            ELSE 'OTRO' 
+        END
+    """
+}
+
+# Filtros de commerce group para la query fallback de eventos comerciales (fix v6.3.9.1)
+COMMERCE_GROUP_EVENTS_FILTERS = {
+    'PDD': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%PDD%' OR c.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Others')",
+    'PNR': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%PNR%' OR c.PROCESS_PROBLEMATIC_REPORTING = 'Conflict Stale')",
+    'PCF_COMPRADOR': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Post Compra%' AND c.PROCESS_GROUP_ECOMMERCE = 'Comprador')",
+    'PCF_VENDEDOR': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Post Compra%' AND c.PROCESS_GROUP_ECOMMERCE = 'Vendedor')",
+    'ME_PREDESPACHO': "AND ((c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Mercado Envíos%' AND c.PROCESS_GROUP_ECOMMERCE = 'Vendedor') OR (c.PROCESS_PROBLEMATIC_REPORTING LIKE 'Post Compra Funcionalidades Vendedor' AND c.PROCESS_BU_CR_REPORTING = 'ME'))",
+    'ME_DISTRIBUCION': "AND ((c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Mercado Envíos%' AND c.PROCESS_GROUP_ECOMMERCE = 'Comprador') OR (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Post Compra Comprador%' AND c.PROCESS_BU_CR_REPORTING = 'ME'))",
+    'GENERALES_COMPRA': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Compra%' AND c.PROCESS_GROUP_ECOMMERCE = 'Comprador')",
+    'MODERACIONES': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Prustomer%' OR c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Moderaciones%')",
+    'PAGOS': "AND (c.PROCESS_PROBLEMATIC_REPORTING LIKE '%Pagos%' OR c.PROCESS_PROBLEMATIC_REPORTING LIKE '%MP On%' OR c.PROCESS_PROBLEMATIC_REPORTING LIKE '%MP Payer%')",
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FUNCIONES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def weekly_start(p2_end: str) -> str:
+    """
+    Retorna el inicio de la serie semanal (equivale a DATE_SUB(p2_end, INTERVAL 25 WEEK)).
+
+    Args:
+        p2_end: Fecha fin P2 (YYYY-MM-DD)
+
+    Returns:
+        Fecha inicio de la serie (YYYY-MM-DD)
+    """
+    import pandas as pd
+
+    return (pd.to_datetime(p2_end) - timedelta(weeks=SEMANAS_SERIE)).strftime('%Y-%m-%d')
+
+
+def build_process_filter(process_name: str = None) -> str:
+    """
+    Construye el filtro opcional por proceso (LIKE con comillas escapadas).
+
+    Args:
+        process_name: Nombre (o parte) del proceso, o None
+
+    Returns:
+        "AND C.PROCESS_NAME LIKE '%...%'" o "" si no hay proceso
+    """
+    if not process_name:
+        return ""
+    process_name_escaped = process_name.replace("'", "''")
+    return f"AND C.PROCESS_NAME LIKE '%{process_name_escaped}%'"
+
+
+def _periodos_params(p1_start: str, p1_end: str, p2_start: str, p2_end: str) -> dict:
+    """Parámetros DATE @p1_start, @p1_end, @p2_start, @p2_end."""
+    return {
+        'p1_start': fecha_param(p1_start),
+        'p1_end': fecha_param(p1_end),
+        'p2_start': fecha_param(p2_start),
+        'p2_end': fecha_param(p2_end),
+    }
+
+
+def _contacts_source(fecha_inicio: str, fecha_fin: str,
+                     process_filter: str = "", base_table: str = None) -> str:
+    """
+    FROM / WHERE de los contactos de PASO 1-3 y cross-site (parámetro @sites).
+
+    Sin base_table lee BT_CX_CONTACTS con los filtros estándar; con base_table
+    lee la tabla materializada (site, commerce group y proceso ya filtrados).
+
+    Args:
+        fecha_inicio, fecha_fin: Rango de CONTACT_DATE_ID (parámetros o expresiones SQL)
+    """
+    if base_table:
+        return f"""FROM {base_table} C
+    WHERE C.PASA_EXCLUSIONES_CR
+        AND C.CONTACT_DATE_ID BETWEEN {fecha_inicio} AND {fecha_fin}"""
+    return f"""FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+    WHERE C.SIT_SITE_ID IN UNNEST(@sites)
+        AND C.CONTACT_DATE_ID BETWEEN {fecha_inicio} AND {fecha_fin}
+        AND {FILTROS_ESTANDAR_CONTACTOS}
+        {process_filter}"""
+
+
+def _orders_source(fecha_inicio: str, fecha_fin: str, filter_by_site: bool) -> str:
+    """
+    FROM / WHERE de las órdenes del driver (BT_ORD_ORDERS).
+
+    Args:
+        fecha_inicio, fecha_fin: Rango de ORD_CLOSED_DT (parámetros o expresiones SQL)
+        filter_by_site: Filtrar por @sites (Marketplace) o global sin MLV
+    """
+    site_filter = "ORD.SIT_SITE_ID IN UNNEST(@sites)" if filter_by_site else "ORD.SIT_SITE_ID NOT IN ('MLV')"
+    return f"""FROM `meli-bi-data.WHOWNER.BT_ORD_ORDERS` ORD
+    WHERE ORD.ORD_CLOSED_DT BETWEEN {fecha_inicio} AND {fecha_fin}
+        AND ORD.ORD_GMV_FLG = TRUE
+        AND ORD.ORD_MARKETPLACE_FLG = TRUE
+        AND {site_filter}
+        AND (UPPER(ORD.DOM_DOMAIN_ID) <> 'TIPS')"""
+
+
+def _weekly_orders_sql(filter_by_site: bool) -> str:
+    """SELECT de órdenes semanales de la serie de PASO 2 (SEMANA, ORDERS)."""
+    return f"""
+    SELECT
+        DATE_TRUNC(ORD.ORD_CLOSED_DT, WEEK(MONDAY)) as SEMANA,
+        COUNT(DISTINCT ORD.ORD_ORDER_ID) as ORDERS
+    {_orders_source(f"DATE_SUB(@p2_end, INTERVAL {SEMANAS_SERIE} WEEK)", "@p2_end", filter_by_site)}
+    GROUP BY SEMANA"""
+
+
+def _dia_siguiente(fecha: str) -> str:
+    """Día siguiente a una fecha inclusiva (fin exclusivo de un rango)."""
+    import pandas as pd
+
+    return (pd.Timestamp(fecha) + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def _commerce_expr(commerce_filter: str, base_table: str = None) -> str:
+    """Expresión AGRUP_COMMERCE (constante si la tabla base ya está filtrada)."""
+    return "@commerce_group" if base_table else commerce_filter
+
+
+def build_base_contacts_table(site: str, commerce_group: str, commerce_filter: str, campos,
+                              p1_start: str, p2_end: str, dataset: str,
+                              process_filter: str = "",
+                              expiration_hours: int = BASE_CONTACTS_EXPIRATION_HOURS,
+                              hoy: date = None) -> tuple:
+    """
+    Construye el DDL de la tabla BASE_CONTACTS materializada del reporte.
+
+    La tabla contiene los contactos del site / commerce group / proceso en
+    [min(p1_start, inicio serie semanal), p2_end] con los filtros de BU y
+    flag de exclusión aplicados, clusterizada por fecha y por las primeras
+    dimensiones. El nombre es un hash del SELECT: corridas con los mismos
+    parámetros reutilizan la tabla mientras no expire (CREATE IF NOT EXISTS).
+    Si p2_end cae en los días abiertos (utils.local_store.ultimo_cerrado), el
+    hash incluye también el último día cerrado y la tabla vence a las
+    BASE_CONTACTS_OPEN_EXPIRATION_HOURS: un snapshot con días que todavía
+    se completan no se reutiliza más que las lecturas de la cache de queries.
+
+    Args:
+        site: Site o grupo
+        commerce_group: Commerce group
+        commerce_filter: Expresión CASE que clasifica AGRUP_COMMERCE
+        campos: Campos de dimensión a incluir (ej: ['C.PROCESS_NAME', 'C.CDU'])
+        p1_start, p2_end: Inicio P1 y fin P2 (YYYY-MM-DD)
+        dataset: Dataset de trabajo 'proyecto.dataset' donde crear la tabla
+        process_filter: Filtro opcional de proceso
+        expiration_hours: Horas hasta que BigQuery elimina la tabla
+        hoy: Fecha de referencia de los días abiertos (default: hoy)
+
+    Returns:
+        (tabla, ddl): nombre calificado con backticks y SQL de creación
+    """
+    columnas = []
+    for campo in dict.fromkeys(campos):
+        if not re.fullmatch(r'C\.\w+', campo):
+            raise ValueError(f"Campo no materializable (se espera C.<COLUMNA>): {campo}")
+        if campo not in ('C.CAS_CASE_ID', 'C.CLA_CLAIM_ID'):
+            columnas.append(campo)
+    columnas_sql = "".join(f"\n    {campo}," for campo in columnas)
+
+    inicio_scan = min(p1_start, weekly_start(p2_end))
+    select = f"""SELECT
+    C.CONTACT_DATE_ID,
+    C.SIT_SITE_ID,
+    C.CAS_CASE_ID,
+    C.CLA_CLAIM_ID,{columnas_sql}
+    COALESCE({EXCLUSIONES_CR}, FALSE) AS PASA_EXCLUSIONES_CR
+FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` C
+WHERE {resolve_site_sql(site, 'C.SIT_SITE_ID')}
+    AND C.CONTACT_DATE_ID BETWEEN '{inicio_scan}' AND '{p2_end}'
+    AND {FILTROS_BASE_CONTACTOS}
+    AND {commerce_filter} = '{commerce_group}'
+    {process_filter}"""
+
+    identidad = " ".join(select.split())
+    cerrado = ultimo_cerrado(hoy)
+    if date.fromisoformat(p2_end) > cerrado:
+        identidad += f" -- {cerrado.isoformat()}"
+        expiration_hours = min(expiration_hours, BASE_CONTACTS_OPEN_EXPIRATION_HOURS)
+    sufijo = hashlib.sha256(identidad.encode('utf-8')).hexdigest()[:16]
+    tabla = f"`{dataset}.BASE_CONTACTS_{sufijo}`"
+    cluster = ", ".join(["CONTACT_DATE_ID"] + [c.split('.')[-1] for c in columnas[:3]])
+
+    ddl = f"""
+CREATE TABLE IF NOT EXISTS {tabla}
+CLUSTER BY {cluster}
+OPTIONS(expiration_timestamp = TIMESTAMP_ADD(CURRENT_TIMESTAMP(), INTERVAL {expiration_hours} HOUR))
+AS
+{select}
+"""
+    return tabla, ddl
+
+
+def build_incoming_total_query(site: str, commerce_group: str, commerce_filter: str,
+                               p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                               process_filter: str = "", base_table: str = None) -> str:
+    """
+    Query de incoming total P1 / P2 del commerce group (PASO 1).
+
+    Args:
+        base_table: Tabla BASE_CONTACTS materializada (opcional)
+
+    Returns:
+        CanonicalQuery con columnas INC_P1, INC_P2 (una fila).
+    """
+    return canonical_query(f"""
+WITH BASE_CONTACTS AS (
+    SELECT
+        DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+        {_commerce_expr(commerce_filter, base_table)} AS AGRUP_COMMERCE,
+        1.0 AS CANT_CASES
+    {_contacts_source("@p1_start", "@p2_end", process_filter, base_table)}
+),
+BASE_FILTERED AS (
+    SELECT * FROM BASE_CONTACTS
+    WHERE AGRUP_COMMERCE = @commerce_group
+)
+SELECT 
+    SUM(CASE WHEN PERIODO BETWEEN @p1_start AND @p1_end THEN CANT_CASES ELSE 0 END) as INC_P1,
+    SUM(CASE WHEN PERIODO BETWEEN @p2_start AND @p2_end THEN CANT_CASES ELSE 0 END) as INC_P2
+FROM BASE_FILTERED
+""", sites=sites_param(get_site_list(site)), commerce_group=commerce_group,
+        **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def build_drivers_total_query(site: str, driver_config: dict,
+                              p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                              filter_driver_by_site: bool = False) -> str:
+    """
+    Query de drivers totales P1 / P2 según el tipo de driver del commerce group (PASO 1).
+
+    Args:
+        site: Site o grupo
+        driver_config: Resultado de get_driver_config(commerce_group)
+        p1_start, p1_end, p2_start, p2_end: Fechas de los períodos
+        filter_driver_by_site: Override --filter-driver-by-site (solo Shipping)
+
+    Returns:
+        CanonicalQuery con columnas DRV_P1, DRV_P2 (una fila).
+    """
+    periodos = _periodos_params(p1_start, p1_end, p2_start, p2_end)
+
+    if driver_config['type'] == 'shipping_drivers':
+        # Drivers de Shipping: usar BT_CX_DRIVERS_CR
+        # Por defecto es GLOBAL, pero puede filtrarse por site con --filter-driver-by-site
+        site_filter = "AND drv.SIT_SITE_ID IN UNNEST(@sites)" if filter_driver_by_site else ""
+        count_expr_raw = driver_config['count_expression'].replace('SUM(drv.', 'drv.').replace(')', '')
+        return canonical_query(f"""
+    SELECT
+        SUM(CASE WHEN drv.MONTH_ID BETWEEN @p1_start AND @p1_end THEN {count_expr_raw} ELSE 0 END) as DRV_P1,
+        SUM(CASE WHEN drv.MONTH_ID BETWEEN @p2_start AND @p2_end THEN {count_expr_raw} ELSE 0 END) as DRV_P2
+    FROM `meli-bi-data.WHOWNER.BT_CX_DRIVERS_CR` drv
+    WHERE drv.MONTH_ID BETWEEN @p1_start AND @p2_end
+    {site_filter}
+    """, sites=sites_param(get_site_list(site)) if filter_driver_by_site else None, **periodos)
+
+    # Marketplace: órdenes filtradas por site | Post-Compra, Pagos, Cuenta: órdenes globales
+    return canonical_query(f"""
+    SELECT
+        SUM(CASE WHEN ORD.ORD_CLOSED_DT BETWEEN @p1_start AND @p1_end THEN 1 ELSE 0 END) as DRV_P1,
+        SUM(CASE WHEN ORD.ORD_CLOSED_DT BETWEEN @p2_start AND @p2_end THEN 1 ELSE 0 END) as DRV_P2
+    {_orders_source("@p1_start", "@p2_end", driver_config['filter_by_site'])}
+    """, sites=sites_param(get_site_list(site)) if driver_config['filter_by_site'] else None, **periodos)
+
+
+def build_weekly_query(site: str, commerce_group: str, commerce_filter: str, p2_end: str,
+                       filter_by_site: bool, process_filter: str = "", base_table: str = None,
+                       include_drivers: bool = True) -> str:
+    """
+    Query de CR semanal de las últimas 25 semanas (PASO 2).
+
+    Args:
+        base_table: Tabla BASE_CONTACTS materializada (opcional)
+        include_drivers: False = solo incoming semanal (--driver-store: las
+                         órdenes semanales salen del DriverStore)
+
+    Returns:
+        CanonicalQuery con columnas SEMANA, INCOMING, DRIVER, CR
+        (SEMANA, CASOS con include_drivers=False).
+    """
+    if not include_drivers:
+        seleccion = """
+SELECT SEMANA, CASOS
+FROM WEEKLY_INCOMING
+ORDER BY SEMANA
+"""
+    else:
+        seleccion = f""",
+WEEKLY_DRIVERS AS ({_weekly_orders_sql(filter_by_site)}
+)
+SELECT 
+    I.SEMANA,
+    I.CASOS as INCOMING,
+    D.ORDERS as DRIVER,
+    (I.CASOS / D.ORDERS) * 100 as CR
+FROM WEEKLY_INCOMING I
+LEFT JOIN WEEKLY_DRIVERS D ON I.SEMANA = D.SEMANA
+ORDER BY I.SEMANA
+"""
+    return canonical_query(f"""
+WITH BASE_CONTACTS AS (
+    SELECT
+        DATE_TRUNC(C.CONTACT_DATE_ID, WEEK(MONDAY)) as SEMANA,
+        {_commerce_expr(commerce_filter, base_table)} AS AGRUP_COMMERCE,
+        1.0 AS CANT_CASES
+    {_contacts_source(f"DATE_SUB(@p2_end, INTERVAL {SEMANAS_SERIE} WEEK)", "@p2_end",
+                      process_filter, base_table)}
+),
+WEEKLY_INCOMING AS (
+    SELECT SEMANA, SUM(CANT_CASES) as CASOS
+    FROM BASE_CONTACTS
+    WHERE AGRUP_COMMERCE = @commerce_group
+    GROUP BY SEMANA
+){seleccion}""", sites=sites_param(get_site_list(site)), commerce_group=commerce_group,
+        p2_end=fecha_param(p2_end))
+
+
+def build_dimension_query(site: str, commerce_group: str, commerce_filter: str, campo_bq: str,
+                          p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                          process_filter: str = "", base_table: str = None) -> str:
+    """
+    Query de incoming por elemento de una apertura (PASO 3).
+
+    Args:
+        base_table: Tabla BASE_CONTACTS materializada (opcional)
+
+    Returns:
+        CanonicalQuery con columnas DIMENSION_VAL, INC_P1, INC_P2, VAR_INC, VAR_ABS.
+    """
+    return canonical_query(f"""
+    WITH BASE_CONTACTS AS (
+        SELECT
+            {campo_bq} as DIMENSION_VAL,
+            DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+            {_commerce_expr(commerce_filter, base_table)} AS AGRUP_COMMERCE,
+            1.0 AS CANT_CASES
+        {_contacts_source("@p1_start", "@p2_end", process_filter, base_table)}
+            AND {campo_bq} IS NOT NULL
+    ),
+    BASE_FILTERED AS (
+        SELECT * FROM BASE_CONTACTS
+        WHERE AGRUP_COMMERCE = @commerce_group
+    ),
+    AGGREGATED AS (
+        SELECT
+            DIMENSION_VAL,
+            SUM(CASE WHEN PERIODO BETWEEN @p1_start AND @p1_end THEN CANT_CASES ELSE 0 END) as INC_P1,
+            SUM(CASE WHEN PERIODO BETWEEN @p2_start AND @p2_end THEN CANT_CASES ELSE 0 END) as INC_P2
+        FROM BASE_FILTERED
+        GROUP BY DIMENSION_VAL
+    )
+    SELECT 
+        DIMENSION_VAL,
+        INC_P1,
+        INC_P2,
+        (INC_P2 - INC_P1) as VAR_INC,
+        ABS(INC_P2 - INC_P1) as VAR_ABS
+    FROM AGGREGATED
+    WHERE INC_P1 > 0 OR INC_P2 > 0
+    ORDER BY VAR_ABS DESC
+    """, sites=sites_param(get_site_list(site)), commerce_group=commerce_group,
+        **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def build_feriados_query(site: str, fecha_inicio: str, fecha_fin: str) -> str:
+    """
+    Query de feriados del site en el rango (LK_TIM_HOLIDAYS).
+
+    Returns:
+        CanonicalQuery con columnas SIT_SITE_ID, Fecha_feriado, HOLIDAY_DESC.
+    """
+    return canonical_query("""
+SELECT
+    SIT_SITE_ID,
+    TIM_DAY as Fecha_feriado,
+    HOLIDAY_DESC
+FROM `meli-bi-data.WHOWNER.LK_TIM_HOLIDAYS`
+WHERE SIT_SITE_ID IN UNNEST(@sites)
+    AND TIM_DAY BETWEEN @fecha_inicio AND @fecha_fin
+ORDER BY TIM_DAY ASC
+""", sites=sites_param(get_site_list(site)),
+        fecha_inicio=fecha_param(fecha_inicio), fecha_fin=fecha_param(fecha_fin))
+
+
+def build_eventos_fallback_query(site: str, p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                                 commerce_filter_sql: str) -> str:
+    """
+    Query on-the-fly de correlación con eventos comerciales cuando no hay hard metrics.
+
+    Args:
+        commerce_filter_sql: Filtro de COMMERCE_GROUP_EVENTS_FILTERS (alias c.)
+
+    Returns:
+        CanonicalQuery con columnas EVENT_NAME, fecha_inicio, fecha_fin, periodo,
+        casos, casos_totales, porcentaje.
+    """
+    return canonical_query(f"""
+    -- Query Fallback: Correlación con Eventos Comerciales v6.4.2
+    WITH eventos AS (
+        SELECT 
+            EVENT_NAME,
+            DATE(EVENT_START_DTTM) as fecha_inicio,
+            DATE(EVENT_END_DTTM) as fecha_fin
+        FROM `meli-bi-data.WHOWNER.LK_MKP_PROMOTIONS_EVENT`
+        WHERE SIT_SITE_ID IN UNNEST(@sites)
+            AND (
+                DATE(EVENT_START_DTTM) BETWEEN @p1_start AND @p2_end
+                OR DATE(EVENT_END_DTTM) BETWEEN @p1_start AND @p2_end
+            )
+            AND UPPER(EVENT_NAME) NOT LIKE '%PRUEBA%'
+            AND UPPER(EVENT_NAME) NOT LIKE '%TEST%'
+            AND STANDARD_METADATA.TYPE IN ('TIER_1', 'TIER_2', 'DOUBLE_DAYS')
+    ),
+    incoming_base AS (
+        SELECT 
+            c.CAS_CASE_ID,
+            c.CONTACT_DATE_ID,
+            pp.ORD_CLOSED_DT
+        FROM `meli-bi-data.WHOWNER.BT_CX_CONTACTS` c
+        LEFT JOIN `meli-bi-data.WHOWNER.DM_CX_POST_PURCHASE` pp 
+            ON c.CLA_CLAIM_ID = pp.CLA_CLAIM_ID
+            AND {post_purchase_predicate('pp.ORD_CLOSED_DT', p1_start, _dia_siguiente(p2_end))}
+        WHERE c.SIT_SITE_ID IN UNNEST(@sites)
+            AND c.CONTACT_DATE_ID BETWEEN @p1_start AND @p2_end
+            AND COALESCE(c.FLAG_EXCLUDE_NUMERATOR_CR, 0) = 0
+            AND COALESCE(c.QUEUE_ID, 0) NOT IN (2131, 230, 1102, 1241, 2075, 2294, 2295)
+            AND COALESCE(c.CI_REASON_ID, 0) NOT IN (2592, 6588, 10068, 2701, 10048)
+            {commerce_filter_sql}
+    ),
+    casos_por_evento AS (
+        SELECT 
+            e.EVENT_NAME,
+            e.fecha_inicio,
+            e.fecha_fin,
+            CASE 
+                WHEN i.CONTACT_DATE_ID <= @p1_end THEN 'P1'
+                ELSE 'P2'
+            END as periodo,
+            COUNT(DISTINCT i.CAS_CASE_ID) as casos
+        FROM incoming_base i
+        JOIN eventos e 
+            ON DATE(i.ORD_CLOSED_DT) BETWEEN e.fecha_inicio AND e.fecha_fin
+        WHERE i.ORD_CLOSED_DT IS NOT NULL
+        GROUP BY 1,2,3,4
+    ),
+    totales AS (
+        SELECT 
+            CASE 
+                WHEN CONTACT_DATE_ID <= @p1_end THEN 'P1'
+                ELSE 'P2'
+            END as periodo,
+            COUNT(DISTINCT CAS_CASE_ID) as total
+        FROM incoming_base
+        GROUP BY 1
+    )
+    SELECT 
+        c.EVENT_NAME,
+        c.fecha_inicio,
+        c.fecha_fin,
+        c.periodo,
+        c.casos,
+        t.total as casos_totales,
+        ROUND(c.casos * 100.0 / NULLIF(t.total, 0), 2) as porcentaje
+    FROM casos_por_evento c
+    JOIN totales t ON c.periodo = t.periodo
+    ORDER BY c.casos DESC
+    """, sites=sites_param(get_site_list(site)), **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def build_cross_site_incoming_query(commerce_group: str, commerce_filter: str,
+                                    p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                                    process_filter: str = "") -> str:
+    """
+    Query de incoming por site para el cuadro cross-site (GROUP BY SIT_SITE_ID).
+
+    Returns:
+        CanonicalQuery con columnas SIT_SITE_ID, INC_P1, INC_P2.
+    """
+    return canonical_query(f"""
+    WITH BASE_CONTACTS AS (
+        SELECT
+            C.SIT_SITE_ID,
+            DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+            {commerce_filter} AS AGRUP_COMMERCE,
+            1.0 AS CANT_CASES
+        {_contacts_source("@p1_start", "@p2_end", process_filter)}
+    ),
+    BASE_FILTERED AS (
+        SELECT * FROM BASE_CONTACTS
+        WHERE AGRUP_COMMERCE = @commerce_group
+    )
+    SELECT 
+        SIT_SITE_ID,
+        SUM(CASE WHEN PERIODO BETWEEN @p1_start AND @p1_end THEN CANT_CASES ELSE 0 END) as INC_P1,
+        SUM(CASE WHEN PERIODO BETWEEN @p2_start AND @p2_end THEN CANT_CASES ELSE 0 END) as INC_P2
+    FROM BASE_FILTERED
+    GROUP BY SIT_SITE_ID
+    ORDER BY SIT_SITE_ID
+    """, sites=sites_param(SITES_CROSS_SITE), commerce_group=commerce_group,
+        **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def build_global_drivers_query(driver_config: dict, p1_start: str, p1_end: str,
+                               p2_start: str, p2_end: str) -> str:
+    """
+    Query de driver GLOBAL (sin filtro de site) para el cuadro cross-site.
+
+    Returns:
+        CanonicalQuery con columnas DRV_P1, DRV_P2 (una fila).
+    """
+    # Shipping: BT_CX_DRIVERS_CR sin filtro de site | Orders: órdenes globales (sin MLV)
+    return build_drivers_total_query(None, {**driver_config, 'filter_by_site': False},
+                                     p1_start, p1_end, p2_start, p2_end,
+                                     filter_driver_by_site=False)
+
+
+def build_fused_contacts_query(site: str, commerce_group: str, commerce_filter: str,
+                               campos: dict, p1_start: str, p1_end: str,
+                               p2_start: str, p2_end: str,
+                               process_filter: str = "", base_table: str = None) -> str:
+    """
+    Construye la query fusionada de PASO 1-3 (una sola lectura de BT_CX_CONTACTS).
+
+    El rango leído es [min(p1_start, inicio serie semanal), p2_end]. Cada fila
+    de salida pertenece a un grouping set identificado por las columnas G_*
+    (GROUPING() = 0 indica que la columna es parte del set).
+
+    Args:
+        site: Site o grupo (ej: 'MLB', 'ROLA')
+        commerce_group: Commerce group (ej: 'PDD')
+        commerce_filter: Expresión CASE que clasifica AGRUP_COMMERCE
+        campos: Dict apertura → campo de BigQuery (ej: {'PROCESO': 'C.PROCESS_NAME'})
+        p1_start, p1_end, p2_start, p2_end: Fechas de los períodos (YYYY-MM-DD)
+        process_filter: Filtro opcional de proceso ("AND C.PROCESS_NAME LIKE ...")
+        base_table: Tabla BASE_CONTACTS materializada (opcional)
+
+    Returns:
+        CanonicalQuery lista para ejecutar.
+    """
+    inicio_semanal = weekly_start(p2_end)
+    inicio_scan = min(p1_start, inicio_semanal)
+
+    columnas_dim = "".join(
+        f"\n        {campo} AS DIM_{apertura},"
+        for apertura, campo in campos.items()
+    )
+    flags_dim = "".join(
+        f"\n    GROUPING(DIM_{apertura}) AS G_{apertura},"
+        for apertura in campos
+    )
+    select_dim = "".join(f"\n    DIM_{apertura}," for apertura in campos)
+    sets_dim = "".join(f", (DIM_{apertura})" for apertura in campos)
+
+    return canonical_query(f"""
+WITH BASE_CONTACTS AS (
+    SELECT
+        DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+        IF(C.CONTACT_DATE_ID >= @inicio_semanal, DATE_TRUNC(C.CONTACT_DATE_ID, WEEK(MONDAY)), NULL) AS SEMANA,{columnas_dim}
+        {_commerce_expr(commerce_filter, base_table)} AS AGRUP_COMMERCE,
+        1.0 AS CANT_CASES
+    {_contacts_source("@inicio_scan", "@p2_end", process_filter, base_table)}
+),
+BASE_FILTERED AS (
+    SELECT * FROM BASE_CONTACTS
+    WHERE AGRUP_COMMERCE = @commerce_group
+)
+SELECT
+    GROUPING(SEMANA) AS G_SEMANA,{flags_dim}
+    SEMANA,{select_dim}
+    SUM(CASE WHEN PERIODO BETWEEN @p1_start AND @p1_end THEN CANT_CASES ELSE 0 END) as INC_P1,
+    SUM(CASE WHEN PERIODO BETWEEN @p2_start AND @p2_end THEN CANT_CASES ELSE 0 END) as INC_P2,
+    SUM(CANT_CASES) as CASOS
+FROM BASE_FILTERED
+GROUP BY GROUPING SETS ((), (SEMANA){sets_dim})
+""", sites=sites_param(get_site_list(site)), commerce_group=commerce_group,
+        inicio_semanal=fecha_param(inicio_semanal), inicio_scan=fecha_param(inicio_scan),
+        **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def split_fused_contacts(df, aperturas: list) -> dict:
+    """
+    Separa el resultado de build_fused_contacts_query() en las piezas de PASO 1-3.
+
+    Replica la semántica de las queries individuales:
+      - Total: INC_P1 / INC_P2 del grouping set vacío
+      - Semanal: SEMANA, CASOS (solo semanas dentro de la serie)
+      - Dimensiones: DIMENSION_VAL, INC_P1, INC_P2, VAR_INC, VAR_ABS
+        (sin NULLs, con INC_P1 > 0 o INC_P2 > 0, ordenado por VAR_ABS desc)
+
+    Args:
+        df: DataFrame devuelto por la query fusionada
+        aperturas: Aperturas incluidas en la query (mismas keys que `campos`)
+
+    Returns:
+        {
+            'inc_p1': int,
+            'inc_p2': int,
+            'weekly': DataFrame[SEMANA, CASOS],
+            'dimensiones': {apertura: DataFrame}
+        }
+    """
+    flags = ['G_SEMANA'] + [f'G_{a}' for a in aperturas]
+    es_total = (df[flags] == 1).all(axis=1)
+
+    df_total = df[es_total]
+    inc_p1 = int(df_total['INC_P1'].sum()) if len(df_total) else 0
+    inc_p2 = int(df_total['INC_P2'].sum()) if len(df_total) else 0
+
+    df_semanal = df[(df['G_SEMANA'] == 0) & df['SEMANA'].notna()]
+    df_semanal = df_semanal[['SEMANA', 'CASOS']].sort_values('SEMANA').reset_index(drop=True)
+
+    dimensiones = {}
+    for apertura in aperturas:
+        df_dim = df[(df[f'G_{apertura}'] == 0) & df[f'DIM_{apertura}'].notna()]
+        df_dim = df_dim[[f'DIM_{apertura}', 'INC_P1', 'INC_P2']].rename(
+            columns={f'DIM_{apertura}': 'DIMENSION_VAL'}
+        )
+        df_dim = df_dim[(df_dim['INC_P1'] > 0) | (df_dim['INC_P2'] > 0)].copy()
+        df_dim['VAR_INC'] = df_dim['INC_P2'] - df_dim['INC_P1']
+        df_dim['VAR_ABS'] = df_dim['VAR_INC'].abs()
+        dimensiones[apertura] = df_dim.sort_values('VAR_ABS', ascending=False).reset_index(drop=True)
+
+    return {
+        'inc_p1': inc_p1,
+        'inc_p2': inc_p2,
+        'weekly': df_semanal,
+        'dimensiones': dimensiones,
+    }
+
+
+def build_daily_contacts_query(site: str, commerce_group: str, commerce_filter: str,
+                               campos: dict, fecha_inicio: str, fecha_fin: str,
+                               process_filter: str = "") -> str:
+    """
+    Construye la query de contactos por día del cubo local (--contacts-cube).
+
+    Mismos filtros que las queries de PASO 1-3; cada fila de salida pertenece a
+    un grouping set: (FECHA) para el total diario y (FECHA, DIM_<apertura>)
+    por apertura (G_<apertura> = 0 indica que la apertura es parte del set).
+
+    Args:
+        site: Site o grupo (ej: 'MLB', 'ROLA')
+        commerce_group: Commerce group (ej: 'PDD')
+        commerce_filter: Expresión CASE que clasifica AGRUP_COMMERCE
+        campos: Dict apertura → campo de BigQuery (ej: {'PROCESO': 'C.PROCESS_NAME'})
+        fecha_inicio, fecha_fin: Días a leer (YYYY-MM-DD, inclusivos)
+        process_filter: Filtro opcional de proceso ("AND C.PROCESS_NAME LIKE ...")
+
+    Returns:
+        CanonicalQuery con columnas G_<apertura>, FECHA, DIM_<apertura>, CASOS.
+    """
+    columnas_dim = "".join(f"\n        {campo} AS DIM_{apertura}," for apertura, campo in campos.items())
+    flags_dim = "".join(f"\n    GROUPING(DIM_{apertura}) AS G_{apertura}," for apertura in campos)
+    select_dim = "".join(f"\n    DIM_{apertura}," for apertura in campos)
+    sets_dim = "".join(f", (FECHA, DIM_{apertura})" for apertura in campos)
+
+    return canonical_query(f"""
+WITH BASE_CONTACTS AS (
+    SELECT
+        C.CONTACT_DATE_ID AS FECHA,{columnas_dim}
+        {commerce_filter} AS AGRUP_COMMERCE,
+        1.0 AS CANT_CASES
+    {_contacts_source("@fecha_inicio", "@fecha_fin", process_filter)}
+),
+BASE_FILTERED AS (
+    SELECT * FROM BASE_CONTACTS
+    WHERE AGRUP_COMMERCE = @commerce_group
+)
+SELECT{flags_dim}
+    FECHA,{select_dim}
+    SUM(CANT_CASES) as CASOS
+FROM BASE_FILTERED
+GROUP BY GROUPING SETS ((FECHA){sets_dim})
+""", sites=sites_param(get_site_list(site)), commerce_group=commerce_group,
+        fecha_inicio=fecha_param(fecha_inicio), fecha_fin=fecha_param(fecha_fin))
+
+
+def build_weekly_drivers_query(site: str, p2_end: str, filter_by_site: bool) -> str:
+    """
+    Construye la query de órdenes semanales (driver de la serie de PASO 2).
+
+    Args:
+        site: Site o grupo
+        p2_end: Fecha fin P2 (YYYY-MM-DD)
+        filter_by_site: Si el driver del commerce group se filtra por site
+
+    Returns:
+        CanonicalQuery con columnas SEMANA, ORDERS (mismo SELECT que WEEKLY_DRIVERS
+        de build_weekly_query).
+    """
+    return canonical_query(_weekly_orders_sql(filter_by_site),
+                           sites=sites_param(get_site_list(site)), p2_end=fecha_param(p2_end))
+
+
+def build_daily_orders_query(fecha_inicio: str, fecha_fin: str) -> str:
+    """
+    Construye la query de órdenes por día y site del DriverStore (--driver-store).
+
+    Mismos filtros que _orders_source sin filtro de site (todos los sites salvo
+    MLV): el driver por site, por grupo o global se suma después en memoria.
+
+    Args:
+        fecha_inicio, fecha_fin: Días a leer (YYYY-MM-DD, inclusivos)
+
+    Returns:
+        CanonicalQuery con columnas FECHA, SIT_SITE_ID, ORDERS (filas, como
+        DRV_P1 / DRV_P2) y ORDERS_DISTINTAS (órdenes distintas, como la serie semanal).
+    """
+    return canonical_query(f"""
+    SELECT
+        ORD.ORD_CLOSED_DT AS FECHA,
+        ORD.SIT_SITE_ID,
+        COUNT(*) as ORDERS,
+        COUNT(DISTINCT ORD.ORD_ORDER_ID) as ORDERS_DISTINTAS
+    {_orders_source("@fecha_inicio", "@fecha_fin", False)}
+    GROUP BY FECHA, ORD.SIT_SITE_ID
+    """, fecha_inicio=fecha_param(fecha_inicio), fecha_fin=fecha_param(fecha_fin))
+
+
+def build_shipping_drivers_query(fecha_inicio: str, fecha_fin: str, medidas) -> str:
+    """
+    Construye la query de drivers de Shipping por mes y site del DriverStore (--driver-store).
+
+    Args:
+        fecha_inicio, fecha_fin: Rango de MONTH_ID (YYYY-MM-DD, inclusivos)
+        medidas: Columnas de BT_CX_DRIVERS_CR (ej: ['ORDERS_SHIPPED', 'OS_WITH_FBM'])
+
+    Returns:
+        CanonicalQuery con columnas MONTH_ID, SIT_SITE_ID y una por medida.
+    """
+    columnas = "".join(f",\n        SUM(drv.{m}) as {m}" for m in medidas)
+    return canonical_query(f"""
+    SELECT
+        drv.MONTH_ID,
+        drv.SIT_SITE_ID{columnas}
+    FROM `meli-bi-data.WHOWNER.BT_CX_DRIVERS_CR` drv
+    WHERE drv.MONTH_ID BETWEEN @fecha_inicio AND @fecha_fin
+    GROUP BY drv.MONTH_ID, drv.SIT_SITE_ID
+    """, fecha_inicio=fecha_param(fecha_inicio), fecha_fin=fecha_param(fecha_fin))
+
+
+def build_hll_registers_query(metrica: str, fecha_inicio: str, fecha_fin: str, precision: int,
+                              commerce_group: str = None) -> str:
+    """
+    Construye la query de registros HyperLogLog por site y día (utils.hll_sketches).
+
+    Cada identificador se hashea con FARM_FINGERPRINT (63 bits): los
+    `precision` bits bajos eligen el registro y el resto aporta RHO (ceros
+    finales + 1). El máximo de RHO por registro es el sketch del día; el de
+    una ventana es el máximo de los sketches de sus días.
+
+    Args:
+        metrica: Key de METRICAS_DISTINTAS ('orders', 'cases', 'customers')
+        fecha_inicio, fecha_fin: Días a leer (YYYY-MM-DD, inclusivos)
+        precision: Bits del índice de registro (2^precision registros)
+        commerce_group: Solo contactos de este commerce group (métricas de contactos)
+
+    Returns:
+        CanonicalQuery con columnas FECHA, SIT_SITE_ID, REGISTRO, RHO.
+    """
+    fuente, campo = METRICAS_DISTINTAS[metrica]
+    if fuente == 'orders':
+        # Mismos filtros que el driver global de órdenes (todos los sites salvo MLV)
+        fecha, site, origen = 'ORD.ORD_CLOSED_DT', 'ORD.SIT_SITE_ID', _orders_source("@fecha_inicio", "@fecha_fin", False)
+    else:
+        fecha, site, origen = 'C.CONTACT_DATE_ID', 'C.SIT_SITE_ID', _contacts_source("@fecha_inicio", "@fecha_fin")
+        if commerce_group:
+            origen += f"\n        AND {COMMERCE_GROUP_FILTERS[commerce_group]} = @commerce_group"
+
+    return canonical_query(f"""
+WITH HASHES AS (
+    SELECT
+        {fecha} AS FECHA,
+        {site} AS SIT_SITE_ID,
+        FARM_FINGERPRINT(CAST({campo} AS STRING)) & 9223372036854775807 AS H
+    {origen}
+        AND {campo} IS NOT NULL
+),
+REGISTROS AS (
+    SELECT FECHA, SIT_SITE_ID, H & @mascara AS REGISTRO, H >> @precision AS W
+    FROM HASHES
+)
+SELECT
+    FECHA,
+    SIT_SITE_ID,
+    REGISTRO,
+    MAX(IF(W = 0, @rho_max, BIT_COUNT((W & -W) - 1) + 1)) AS RHO
+FROM REGISTROS
+GROUP BY FECHA, SIT_SITE_ID, REGISTRO
+""", sites=sites_param(SITES_CROSS_SITE), commerce_group=commerce_group,
+        fecha_inicio=fecha_param(fecha_inicio), fecha_fin=fecha_param(fecha_fin),
+        mascara=2 ** precision - 1, precision=precision, rho_max=63 - precision + 1)
+
+
+def build_batch_contacts_query(sites, commerce_groups, campos: dict,
+                               p1_start: str, p1_end: str, p2_start: str, p2_end: str,
+                               process_filter: str = "") -> str:
+    """
+    Construye la lectura compartida de PASO 1-3 de un batch (--batch).
+
+    Una sola lectura de BT_CX_CONTACTS para todos los sites y commerce groups:
+    cada contacto se clasifica en todos los commerce groups a la vez (columna
+    CG_<i> = 1 si pertenece al grupo i) y se agrega con los mismos grouping
+    sets que build_fused_contacts_query(), más SIT_SITE_ID en cada set. Los
+    grupos pueden solaparse (un contacto cuenta en todos los que lo clasifican).
+
+    Args:
+        sites: Sites individuales a leer (unión de los sites / grupos del batch)
+        commerce_groups: Commerce groups (keys de COMMERCE_GROUP_FILTERS); el
+                         índice de cada uno es el sufijo de sus columnas
+        campos: Dict apertura → campo de BigQuery
+        p1_start, p1_end, p2_start, p2_end: Fechas de los períodos (YYYY-MM-DD)
+        process_filter: Filtro opcional de proceso
+
+    Returns:
+        CanonicalQuery con columnas SIT_SITE_ID, G_SEMANA, G_<apertura>, SEMANA,
+        DIM_<apertura> e INC_P1_<i>, INC_P2_<i>, CASOS_<i> por commerce group.
+    """
+    inicio_semanal = weekly_start(p2_end)
+    inicio_scan = min(p1_start, inicio_semanal)
+
+    columnas_dim = "".join(
+        f"\n        {campo} AS DIM_{apertura},"
+        for apertura, campo in campos.items()
+    )
+    columnas_cg = ",".join(
+        f"\n        IF({COMMERCE_GROUP_FILTERS[cg]} = @commerce_group_{i}, 1.0, 0.0) AS CG_{i}"
+        for i, cg in enumerate(commerce_groups)
+    )
+    en_algun_cg = " + ".join(f"CG_{i}" for i in range(len(commerce_groups)))
+    flags_dim = "".join(
+        f"\n    GROUPING(DIM_{apertura}) AS G_{apertura},"
+        for apertura in campos
+    )
+    select_dim = "".join(f"\n    DIM_{apertura}," for apertura in campos)
+    metricas_cg = ",".join(
+        f"""
+    SUM(CASE WHEN PERIODO BETWEEN @p1_start AND @p1_end THEN CG_{i} ELSE 0 END) as INC_P1_{i},
+    SUM(CASE WHEN PERIODO BETWEEN @p2_start AND @p2_end THEN CG_{i} ELSE 0 END) as INC_P2_{i},
+    SUM(CG_{i}) as CASOS_{i}"""
+        for i in range(len(commerce_groups))
+    )
+    sets_dim = "".join(f", (SIT_SITE_ID, DIM_{apertura})" for apertura in campos)
+
+    return canonical_query(f"""
+WITH BASE_CONTACTS AS (
+    SELECT
+        C.SIT_SITE_ID,
+        DATE_TRUNC(C.CONTACT_DATE_ID, MONTH) AS PERIODO,
+        IF(C.CONTACT_DATE_ID >= @inicio_semanal, DATE_TRUNC(C.CONTACT_DATE_ID, WEEK(MONDAY)), NULL) AS SEMANA,{columnas_dim}{columnas_cg}
+    {_contacts_source("@inicio_scan", "@p2_end", process_filter)}
+),
+BASE_FILTERED AS (
+    SELECT * FROM BASE_CONTACTS
+    WHERE {en_algun_cg} > 0
+)
+SELECT
+    SIT_SITE_ID,
+    GROUPING(SEMANA) AS G_SEMANA,{flags_dim}
+    SEMANA,{select_dim}{metricas_cg}
+FROM BASE_FILTERED
+GROUP BY GROUPING SETS ((SIT_SITE_ID), (SIT_SITE_ID, SEMANA){sets_dim})
+""", sites=sites_param(sites), inicio_semanal=fecha_param(inicio_semanal),
+        inicio_scan=fecha_param(inicio_scan),
+        **{f'commerce_group_{i}': cg for i, cg in enumerate(commerce_groups)},
+        **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def split_batch_contacts(df, commerce_groups, commerce_group: str,
+                         sites, aperturas: list):
+    """
+    Extrae de la lectura compartida el resultado fusionado de un reporte.
+
+    Suma los sites del reporte (un site o los de un grupo) y devuelve las
+    mismas columnas y filas que build_fused_contacts_query() para ese site y
+    commerce group, listo para split_fused_contacts().
+
+    Args:
+        df: DataFrame devuelto por build_batch_contacts_query()
+        commerce_groups: Lista de commerce groups usada en la query
+        commerce_group: Commerce group del reporte
+        sites: Sites individuales del reporte (get_site_list)
+        aperturas: Aperturas del reporte (subconjunto de las de la query)
+    """
+    i = list(commerce_groups).index(commerce_group)
+    flags = ['G_SEMANA'] + [f'G_{a}' for a in aperturas]
+    claves = flags + ['SEMANA'] + [f'DIM_{a}' for a in aperturas]
+
+    # Sets de aperturas de la query que el reporte no usa
+    otros = [c for c in df.columns if c.startswith('G_') and c not in flags]
+    df = df[df['SIT_SITE_ID'].isin(list(sites))]
+    if otros:
+        df = df[(df[otros] == 1).all(axis=1)]
+    df = df[claves + [f'INC_P1_{i}', f'INC_P2_{i}', f'CASOS_{i}']].rename(columns={
+        f'INC_P1_{i}': 'INC_P1', f'INC_P2_{i}': 'INC_P2', f'CASOS_{i}': 'CASOS'
+    })
+    df = df.groupby(claves, dropna=False, sort=False, as_index=False)[['INC_P1', 'INC_P2', 'CASOS']].sum()
+
+    # Como en la query fusionada, solo existen las semanas / elementos con contactos del grupo
+    es_total = (df[flags] == 1).all(axis=1)
+    return df[es_total | (df['CASOS'] > 0)].reset_index(drop=True)
+
+
+def build_batch_orders_query(p1_start: str, p1_end: str, p2_start: str, p2_end: str) -> str:
+    """
+    Construye la lectura compartida de órdenes de un batch (drivers de PASO 1-2).
+
+    Una sola lectura de BT_ORD_ORDERS (todos los sites salvo MLV) por site:
+      - (SIT_SITE_ID)         → DRV_P1 / DRV_P2 (build_drivers_total_query)
+      - (SIT_SITE_ID, SEMANA) → ORDERS semanales (build_weekly_drivers_query)
+
+    Returns:
+        CanonicalQuery con columnas SIT_SITE_ID, G_SEMANA, SEMANA, DRV_P1, DRV_P2, ORDERS.
+    """
+    inicio_semanal = weekly_start(p2_end)
+    return canonical_query(f"""
+WITH ORDENES AS (
+    SELECT
+        ORD.SIT_SITE_ID,
+        ORD.ORD_ORDER_ID,
+        ORD.ORD_CLOSED_DT,
+        IF(ORD.ORD_CLOSED_DT >= @inicio_semanal, DATE_TRUNC(ORD.ORD_CLOSED_DT, WEEK(MONDAY)), NULL) AS SEMANA
+    {_orders_source("@inicio_scan", "@p2_end", False)}
+)
+SELECT
+    SIT_SITE_ID,
+    GROUPING(SEMANA) AS G_SEMANA,
+    SEMANA,
+    SUM(CASE WHEN ORD_CLOSED_DT BETWEEN @p1_start AND @p1_end THEN 1 ELSE 0 END) as DRV_P1,
+    SUM(CASE WHEN ORD_CLOSED_DT BETWEEN @p2_start AND @p2_end THEN 1 ELSE 0 END) as DRV_P2,
+    COUNT(DISTINCT ORD_ORDER_ID) as ORDERS
+FROM ORDENES
+GROUP BY GROUPING SETS ((SIT_SITE_ID), (SIT_SITE_ID, SEMANA))
+""", inicio_semanal=fecha_param(inicio_semanal),
+        inicio_scan=fecha_param(min(p1_start, inicio_semanal)),
+        **_periodos_params(p1_start, p1_end, p2_start, p2_end))
+
+
+def split_batch_orders(df, sites=None) -> dict:
+    """
+    Extrae de la lectura compartida de órdenes los drivers de un reporte.
+
+    Args:
+        df: DataFrame devuelto por build_batch_orders_query()
+        sites: Sites del reporte si el driver se filtra por site (None = global sin MLV)
+
+    Returns:
+        {
+            'drivers_total': DataFrame[DRV_P1, DRV_P2] (una fila),
+            'drivers_semanales': DataFrame[SEMANA, ORDERS]
+        }
+    """
+    import pandas as pd
+
+    if sites is not None:
+        df = df[df['SIT_SITE_ID'].isin(list(sites))]
+    df_total = df[df['G_SEMANA'] == 1]
+    df_semanal = df[(df['G_SEMANA'] == 0) & df['SEMANA'].notna()]
+    return {
+        'drivers_total': pd.DataFrame({
+            'DRV_P1': [int(df_total['DRV_P1'].sum())],
+            'DRV_P2': [int(df_total['DRV_P2'].sum())],
+        }),
+        'drivers_semanales': df_semanal.groupby('SEMANA', as_index=False)['ORDERS'].sum(),
+    }
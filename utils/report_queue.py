@@ -0,0 +1,413 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+REPORT QUEUE - Cola de reportes con prioridades y pool de workers
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Cola local delante de ReportPipeline para gobernar la carga
+             sobre BigQuery cuando varios analistas piden reportes a la vez:
+               - prioridades (alta / normal / baja; FIFO dentro de cada una)
+               - N workers: como máximo N reportes en ejecución
+               - límite de queries simultáneas por worker (pisa
+                 --max-concurrent-queries del pedido si es mayor), así el
+                 total contra BigQuery es workers × límite
+               - pedidos idénticos (mismos parámetros normalizados) que
+                 están pendientes o en ejecución se unen al job existente
+               - estado de los jobs y cancelación de los pendientes
+
+             Cada job guarda sus eventos (inicio / log / fin); quien se une
+             tarde a un job recibe los eventos desde el principio. La salida
+             de cada worker se separa por hilo: lo que imprime el reporte va
+             al log de su job.
+
+Uso:
+  from utils.report_queue import ReportQueue
+
+  cola = ReportQueue(backend, query_cache, workers=2, max_queries_per_worker=3)
+  cola.start()
+  job, nuevo = cola.submit({'site': 'MLB', 'commerce_group': 'PDD', ...}, prioridad='alta')
+  for evento in job.events():
+      print(evento)
+  cola.cancel(otro_job.id)
+  cola.stop()
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import heapq
+import io
+import itertools
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+PRIORIDADES = {'alta': 0, 'normal': 1, 'baja': 2}
+
+# Jobs terminados que se conservan para consultar su estado / eventos
+MAX_HISTORIAL = 100
+
+
+class QueueError(Exception):
+    """Error de la cola de reportes (prioridad inválida, job inexistente o no cancelable)."""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# JOBS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReportJob:
+    """
+    Pedido de reporte en la cola.
+
+    Estados: pendiente → ejecutando → terminado | error, o pendiente → cancelado.
+    """
+
+    def __init__(self, id: int, pedido: dict, clave: str, etiqueta: str, prioridad: str):
+        self.id = id
+        self.pedido = pedido
+        self.clave = clave
+        self.etiqueta = etiqueta
+        self.prioridad = prioridad
+        self.estado = 'pendiente'
+        self.suscriptores = 1
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self._eventos = []
+        self._cond = threading.Condition()
+
+    def emit(self, evento: str, **datos):
+        """Agrega un evento al job (y despierta a quienes lo siguen)."""
+        with self._cond:
+            self._eventos.append({'evento': evento, 'job': self.id, **datos})
+            self._cond.notify_all()
+
+    def events(self):
+        """Eventos del job desde el primero hasta 'fin' (bloquea esperando los nuevos)."""
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self._eventos):
+                    self._cond.wait()
+                nuevos = self._eventos[i:]
+                i = len(self._eventos)
+            for evento in nuevos:
+                yield evento
+                if evento['evento'] == 'fin':
+                    return
+
+    @property
+    def activo(self) -> bool:
+        return self.estado in ('pendiente', 'ejecutando')
+
+    def info(self) -> dict:
+        """Estado del job para listados."""
+        ahora = time.time()
+        return {
+            'id': self.id,
+            'reporte': self.etiqueta,
+            'prioridad': self.prioridad,
+            'estado': self.estado,
+            'suscriptores': self.suscriptores,
+            'espera_segundos': round((self.inicio or ahora) - self.creado, 1),
+            'ejecucion_segundos': round((self.fin or ahora) - self.inicio, 1) if self.inicio else None,
+        }
+
+
+class _JobOutput(io.TextIOBase):
+    """Salida de un worker convertida en eventos 'log' de su job (una línea por evento)."""
+
+    def __init__(self, job: ReportJob):
+        self.job = job
+        self._buffer = ''
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        self._buffer += texto
+        *lineas, self._buffer = self._buffer.split('\n')
+        for linea in lineas:
+            self.job.emit('log', linea=linea)
+        return len(texto)
+
+    def close_buffer(self):
+        """Envía la última línea si quedó sin salto de línea."""
+        if self._buffer:
+            linea, self._buffer = self._buffer, ''
+            self.job.emit('log', linea=linea)
+
+
+class _SalidaPorHilo(io.TextIOBase):
+    """sys.stdout que envía lo que imprime cada worker al log de su job (el resto, a la consola)."""
+
+    def __init__(self, original):
+        self.original = original
+        self.destinos = {}   # id de hilo → _JobOutput
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        return self.destinos.get(threading.get_ident(), self.original).write(texto)
+
+    def flush(self):
+        self.original.flush()
+
+
+def request_key(pedido: dict) -> tuple:
+    """
+    Clave de de-duplicación y etiqueta de un pedido.
+
+    Los parámetros se normalizan con report_args (defaults del CLI), así el
+    mismo reporte pedido como dict o como flags da la misma clave.
+
+    Raises:
+        ReportError: Parámetros inválidos
+    """
+    from utils.report_cli import report_args
+
+    if 'batch' in pedido:
+        clave = json.dumps({'batch': pedido['batch'], 'argv': list(pedido.get('argv', ()))},
+                           sort_keys=True, default=str)
+        return clave, 'batch'
+    params = {k: v for k, v in pedido.items() if k != 'prioridad'}
+    args = report_args(params['argv'] if 'argv' in params else params)
+    return json.dumps(vars(args), sort_keys=True, default=str), f"{args.site} {args.commerce_group}"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# COLA
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReportQueue:
+    """
+    Cola de reportes con prioridades ejecutada por un pool de workers.
+
+    Args:
+        backend: QueryBackend compartido por todos los reportes
+        query_cache: QueryCache compartida (opcional)
+        workers: Reportes en ejecución simultánea como máximo
+        max_queries_per_worker: Queries simultáneas por reporte como máximo
+                                (None = las del pedido)
+    """
+
+    def __init__(self, backend, query_cache=None, workers: int = 1, max_queries_per_worker: int = None):
+        self.backend = backend
+        self.query_cache = query_cache
+        self.workers = max(1, workers)
+        self.max_queries_per_worker = max_queries_per_worker
+        self._cond = threading.Condition()
+        self._pendientes = []           # heap (prioridad, secuencia, job)
+        self._jobs = OrderedDict()      # id → ReportJob (activos + historial)
+        self._ids = itertools.count(1)
+        self._hilos = []
+        self._salida = None
+        self._detenida = False
+
+    # ──────────────────────────────────────────────
+    # Ciclo de vida
+    # ──────────────────────────────────────────────
+
+    def start(self):
+        """Inicia los workers y separa la salida de cada uno."""
+        if self._hilos:
+            return
+        self._salida = _SalidaPorHilo(sys.stdout)
+        sys.stdout = self._salida
+        for i in range(self.workers):
+            hilo = threading.Thread(target=self._worker, name=f'report-worker-{i + 1}', daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def stop(self):
+        """Detiene los workers al terminar sus reportes en curso (los pendientes se cancelan)."""
+        with self._cond:
+            self._detenida = True
+            pendientes = [job for _, _, job in self._pendientes if job.estado == 'pendiente']
+            self._pendientes = []
+            self._cond.notify_all()
+        for job in pendientes:
+            self._cancelar(job, 'cola detenida')
+        if self._salida is not None and sys.stdout is self._salida:
+            sys.stdout = self._salida.original
+
+    # ──────────────────────────────────────────────
+    # Pedidos
+    # ──────────────────────────────────────────────
+
+    def submit(self, pedido: dict, prioridad: str = 'normal') -> tuple:
+        """
+        Encola un pedido (o lo une a uno idéntico pendiente o en ejecución).
+
+        Args:
+            pedido: dict de parámetros, {"argv": [...]} o {"batch": spec, "argv": [...]}
+            prioridad: 'alta', 'normal' o 'baja'
+
+        Returns:
+            (ReportJob, nuevo): nuevo = False si se unió a un job existente
+
+        Raises:
+            QueueError: Prioridad inválida o cola detenida
+            ReportError: Parámetros del reporte inválidos
+        """
+        if prioridad not in PRIORIDADES:
+            raise QueueError(f"Prioridad inválida '{prioridad}' (opciones: {', '.join(PRIORIDADES)})")
+        clave, etiqueta = request_key(pedido)
+
+        with self._cond:
+            if self._detenida:
+                raise QueueError('La cola está detenida')
+            for job in self._jobs.values():
+                if job.activo and job.clave == clave:
+                    job.suscriptores += 1
+                    if job.estado == 'pendiente' and PRIORIDADES[prioridad] < PRIORIDADES[job.prioridad]:
+                        job.prioridad = prioridad
+                        self._pendientes = [(PRIORIDADES[j.prioridad], s, j) for _, s, j in self._pendientes]
+                        heapq.heapify(self._pendientes)
+                    return job, False
+
+            job = ReportJob(next(self._ids), pedido, clave, etiqueta, prioridad)
+            self._jobs[job.id] = job
+            heapq.heappush(self._pendientes, (PRIORIDADES[prioridad], job.id, job))
+            self._purgar_historial()
+            job.emit('encolado', posicion=self.position(job))
+            self._cond.notify()
+        return job, True
+
+    def cancel(self, job_id: int) -> ReportJob:
+        """
+        Cancela un job pendiente.
+
+        Raises:
+            QueueError: Job inexistente o que ya no está pendiente
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise QueueError(f"Job {job_id} no existe")
+            if job.estado != 'pendiente':
+                raise QueueError(f"Job {job_id} no se puede cancelar: está {job.estado}")
+            self._pendientes = [p for p in self._pendientes if p[2] is not job]
+            heapq.heapify(self._pendientes)
+        self._cancelar(job, 'cancelado')
+        return job
+
+    def _cancelar(self, job: ReportJob, motivo: str):
+        job.estado = 'cancelado'
+        job.fin = time.time()
+        job.emit('fin', ok=False, error=f"Job {job.id} {motivo}")
+
+    def get(self, job_id: int) -> ReportJob:
+        """Job por id (activo o del historial)."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise QueueError(f"Job {job_id} no existe")
+        return job
+
+    def position(self, job: ReportJob) -> int:
+        """Posición de un job pendiente en la cola (1 = el próximo; 0 si no está pendiente)."""
+        with self._cond:
+            orden = sorted(self._pendientes)
+        for i, (_, _, j) in enumerate(orden, 1):
+            if j is job:
+                return i
+        return 0
+
+    def status(self) -> dict:
+        """Workers, jobs en ejecución, pendientes (en orden) y terminados recientes."""
+        with self._cond:
+            pendientes = [j for _, _, j in sorted(self._pendientes)]
+            jobs = list(self._jobs.values())
+        return {
+            'workers': self.workers,
+            'max_queries_por_worker': self.max_queries_per_worker,
+            'ejecutando': [j.info() for j in jobs if j.estado == 'ejecutando'],
+            'pendientes': [j.info() for j in pendientes],
+            'terminados': [j.info() for j in jobs if not j.activo][-10:],
+        }
+
+    def _purgar_historial(self):
+        terminados = [j.id for j in self._jobs.values() if not j.activo]
+        for job_id in terminados[:max(0, len(terminados) - MAX_HISTORIAL)]:
+            del self._jobs[job_id]
+
+    # ──────────────────────────────────────────────
+    # Workers
+    # ──────────────────────────────────────────────
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pendientes and not self._detenida:
+                    self._cond.wait()
+                if self._detenida:
+                    return
+                _, _, job = heapq.heappop(self._pendientes)
+                job.estado = 'ejecutando'
+                job.inicio = time.time()
+            self._ejecutar_job(job)
+
+    def _ejecutar_job(self, job: ReportJob):
+        """Ejecuta un job con su salida redirigida a sus eventos."""
+        salida = _JobOutput(job)
+        self._salida.destinos[threading.get_ident()] = salida
+        job.emit('inicio', reporte=job.etiqueta, worker=threading.current_thread().name)
+        try:
+            resultados = self._ejecutar(job.pedido)
+            salida.close_buffer()
+        except Exception as e:
+            salida.close_buffer()
+            job.estado = 'error'
+            job.fin = time.time()
+            job.emit('fin', ok=False, error=str(e), segundos=round(job.fin - job.inicio, 1))
+            return
+        finally:
+            del self._salida.destinos[threading.get_ident()]
+
+        reportes = [_resumen(etiqueta, r) for etiqueta, r in resultados.items()]
+        job.estado = 'terminado' if all(r['ok'] for r in reportes) else 'error'
+        job.fin = time.time()
+        job.emit('fin', ok=job.estado == 'terminado', reportes=reportes,
+                 segundos=round(job.fin - job.inicio, 1))
+
+    def _ejecutar(self, pedido: dict) -> dict:
+        """{etiqueta: ReportResult o excepción} de un pedido."""
+        from config.site_groups import get_report_sites
+        from utils.batch_reports import run_batch, run_reports, site_reports
+        from utils.report_pipeline import report_args, ReportPipeline
+
+        recursos = {'backend': self.backend, 'query_cache': self.query_cache}
+        limite = self.max_queries_per_worker
+        if 'batch' in pedido:
+            spec = dict(pedido['batch'])
+            if limite:
+                spec['max_concurrent_queries'] = min(spec.get('max_concurrent_queries', limite), limite)
+            return run_batch(spec, pedido.get('argv', ()), **recursos)
+
+        params = {k: v for k, v in pedido.items() if k != 'prioridad'}
+        args = report_args(params['argv'] if 'argv' in params else params)
+        if limite:
+            args.max_concurrent_queries = min(args.max_concurrent_queries, limite)
+        if len(get_report_sites(args.site, args.explode_group)) > 1:
+            return run_reports(site_reports(args), **recursos)
+        return {f"{args.site} {args.commerce_group}": ReportPipeline(args, **recursos).run()}
+
+
+def _resumen(etiqueta: str, resultado) -> dict:
+    """Resultado de un reporte para el evento 'fin'."""
+    if isinstance(resultado, Exception):
+        return {'reporte': etiqueta, 'ok': False, 'error': str(resultado)}
+    return {
+        'reporte': etiqueta,
+        'ok': True,
+        'html_path': str(resultado.html_path) if resultado.html_path else None,
+        'csv_paths': [str(p) for p in resultado.csv_paths],
+    }
@@ -0,0 +1,437 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+REPORT SERVER - Servidor local de reportes CR (daemon)
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Proceso de larga vida que genera reportes a pedido por HTTP en
+             localhost. El arranque (imports de pandas / pyarrow / clientes,
+             autenticación del backend, apertura de la cache local) se paga
+             una sola vez; cada pedido reutiliza el backend y la QueryCache
+             ya inicializados y devuelve el progreso del reporte en vivo.
+
+API (JSON, solo 127.0.0.1):
+  GET    /estado          → backend, uptime, reportes pedidos, en curso y pendientes
+  POST   /reportes        → encola un reporte; el body es:
+                              - dict de parámetros (como generate_report), o
+                              - {"argv": [flags de línea de comandos]}, o
+                              - {"batch": spec, "argv": [...]} (ver utils.batch_reports)
+                            más "prioridad": "alta" | "normal" | "baja" (default: normal).
+                            La respuesta es un stream NDJSON de eventos:
+                              {"evento": "encolado", "job": id, "posicion": n}
+                              {"evento": "unido", "job": id, "estado": "..."}  (pedido idéntico a un job activo)
+                              {"evento": "inicio", "job": id, "reporte": n, "worker": "..."}
+                              {"evento": "log", "job": id, "linea": "..."}     (cada línea del log del reporte)
+                              {"evento": "fin", "job": id, "ok": true, "reportes": [{reporte, ok, html_path, csv_paths, error}]}
+                            Con ?esperar=0 responde 202 con el job sin esperar el reporte.
+  GET    /trabajos        → jobs en ejecución, pendientes (en orden) y terminados recientes
+  GET    /trabajos/<id>   → estado de un job
+  GET    /trabajos/<id>/eventos → stream NDJSON del job (repite los eventos ya emitidos)
+  DELETE /trabajos/<id>   → cancela un job pendiente (409 si ya empezó)
+
+  Los pedidos pasan por una cola con prioridad (ver utils.report_queue) que
+  atienden --workers reportes a la vez; cada reporte envía sus queries en
+  paralelo, hasta --max-queries-por-worker. Un pedido idéntico a un job
+  pendiente o en ejecución se une a ese job en lugar de repetirlo. Todos
+  usan el backend del servidor; --no-cache en un pedido desactiva la cache
+  para ese reporte.
+
+Uso:
+  # Levantar el servidor (queda escuchando hasta Ctrl+C)
+  python -m utils.report_server serve --backend duckdb --port 8765
+
+  # Pedir un reporte (mismos flags que el generador)
+  python -m utils.report_server run -- --site MLB --commerce-group PDD --aperturas PROCESO,CDU \\
+      --p1-start 2025-11-01 --p1-end 2025-11-30 --p2-start 2025-12-01 --p2-end 2025-12-31
+
+  # Pedido urgente sin esperar, cola y cancelación
+  python -m utils.report_server run --prioridad alta --no-esperar -- --site MLA ...
+  python -m utils.report_server trabajos
+  python -m utils.report_server cancelar 7
+
+  # Desde Python (el cliente solo usa la librería estándar)
+  from utils.report_server import request_report
+  reportes = request_report({'site': 'MLB', 'commerce_group': 'PDD', ...})
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.report_queue import PRIORIDADES, QueueError, ReportQueue
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_URL = f'http://{DEFAULT_HOST}:{DEFAULT_PORT}'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SERVIDOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ReportServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP de reportes: los pedidos pasan por una ReportQueue con
+    backend y cache compartidos.
+
+    Args:
+        address: (host, puerto); puerto 0 = uno libre (ver server_address)
+        backend: QueryBackend ya inicializado
+        query_cache: QueryCache compartida por todos los reportes (opcional)
+        workers: Reportes en ejecución simultánea (default: 1)
+        max_queries_per_worker: Queries simultáneas por reporte como máximo (default: las del pedido)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, backend, query_cache=None, workers: int = 1, max_queries_per_worker: int = None):
+        super().__init__(address, _ReportHandler)
+        self.backend = backend
+        self.query_cache = query_cache
+        self.inicio = time.time()
+        self.reportes = 0
+        self.queue = ReportQueue(backend, query_cache, workers=workers,
+                                 max_queries_per_worker=max_queries_per_worker)
+        self.queue.start()
+
+    def server_close(self):
+        self.queue.stop()
+        super().server_close()
+
+    def estado(self) -> dict:
+        """Estado del servidor (GET /estado)."""
+        cola = self.queue.status()
+        return {
+            'backend': self.backend.name,
+            'cache': None if self.query_cache is None else {
+                'dir': str(self.query_cache.cache_dir),
+                'hits': self.query_cache.hits,
+                'misses': self.query_cache.misses,
+            },
+            'uptime_segundos': round(time.time() - self.inicio, 1),
+            'reportes': self.reportes,
+            'en_curso': [j['reporte'] for j in cola['ejecutando']],
+            'pendientes': len(cola['pendientes']),
+        }
+
+
+class _ReportHandler(BaseHTTPRequestHandler):
+    """Rutas /estado, /reportes y /trabajos del servidor."""
+
+    def _json(self, status: int, datos: dict):
+        cuerpo = json.dumps(datos, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _stream(self, job, primeros=()):
+        """Envía los eventos del job como NDJSON hasta 'fin' o hasta que el cliente se desconecta."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for evento in itertools.chain(primeros, job.events()):
+            try:
+                self.wfile.write((json.dumps(evento, ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+                self.wfile.flush()
+            except OSError:
+                return   # el job sigue en la cola
+
+    def _job(self, partes):
+        """Job de /trabajos/<id>[/...] (None + respuesta 404 si no existe)."""
+        try:
+            return self.server.queue.get(int(partes[1]))
+        except (ValueError, QueueError) as e:
+            self._json(404, {'error': str(e)})
+            return None
+
+    def do_GET(self):
+        ruta = urlparse(self.path).path.strip('/')
+        partes = ruta.split('/')
+        if ruta == 'estado':
+            self._json(200, self.server.estado())
+        elif ruta == 'trabajos':
+            self._json(200, self.server.queue.status())
+        elif partes[0] == 'trabajos' and len(partes) in (2, 3):
+            job = self._job(partes)
+            if job is None:
+                return
+            if len(partes) == 3 and partes[2] == 'eventos':
+                self._stream(job)
+            else:
+                self._json(200, job.info())
+        else:
+            self._json(404, {'error': f'Ruta no encontrada: {self.path}'})
+
+    def do_DELETE(self):
+        partes = urlparse(self.path).path.strip('/').split('/')
+        if partes[0] != 'trabajos' or len(partes) != 2:
+            self._json(404, {'error': f'Ruta no encontrada: {self.path}'})
+            return
+        job = self._job(partes)
+        if job is None:
+            return
+        try:
+            self._json(200, self.server.queue.cancel(job.id).info())
+        except QueueError as e:
+            self._json(409, {'error': str(e)})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.strip('/') != 'reportes':
+            self._json(404, {'error': f'Ruta no encontrada: {self.path}'})
+            return
+        try:
+            largo = int(self.headers.get('Content-Length') or 0)
+            pedido = json.loads(self.rfile.read(largo) or b'{}')
+            if not isinstance(pedido, dict):
+                raise ValueError('se espera un objeto JSON')
+            prioridad = pedido.pop('prioridad', 'normal')
+            job, nuevo = self.server.queue.submit(pedido, prioridad)
+        except Exception as e:
+            # JSON inválido, prioridad inválida o parámetros del reporte inválidos (ReportError)
+            self._json(400, {'error': f'Pedido inválido: {e}'})
+            return
+        if nuevo:
+            self.server.reportes += 1
+
+        if parse_qs(url.query).get('esperar') == ['0']:
+            self._json(202, dict(job.info(), nuevo=nuevo, posicion=self.server.queue.position(job)))
+        else:
+            self._stream(job, [] if nuevo else [{'evento': 'unido', 'job': job.id, 'estado': job.estado}])
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"[SERVER] {self.address_string()} {format % args}\n")
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, backend=None, query_cache=None,
+          workers: int = 1, max_queries_per_worker: int = None):
+    """
+    Inicializa los recursos y atiende pedidos hasta Ctrl+C.
+
+    Args:
+        host, port: Dirección de escucha (default: 127.0.0.1:8765)
+        backend: QueryBackend (requerido)
+        query_cache: QueryCache compartida (opcional)
+        workers, max_queries_per_worker: Límites de la cola (ver ReportQueue)
+    """
+    server = ReportServer((host, port), backend, query_cache, workers=workers,
+                          max_queries_per_worker=max_queries_per_worker)
+    limite = f", máx {max_queries_per_worker} queries c/u" if max_queries_per_worker else ""
+    print(f"[SERVER] Reportes CR en http://{host}:{server.server_address[1]} "
+          f"(backend {backend.name}, {server.queue.workers} workers{limite}) - Ctrl+C para detener")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SERVER] Detenido")
+    finally:
+        server.server_close()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CLIENTE (solo librería estándar)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _http(metodo: str, url: str, datos: dict = None, timeout: float = None):
+    """Pedido HTTP al servidor; los errores con cuerpo JSON se relanzan como RuntimeError."""
+    cuerpo = None if datos is None else json.dumps(datos, default=str).encode('utf-8')
+    request = urllib.request.Request(url, data=cuerpo, method=metodo,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        return urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        try:
+            mensaje = json.loads(e.read()).get('error', str(e))
+        except ValueError:
+            mensaje = str(e)
+        raise RuntimeError(mensaje)
+
+
+def request_report(pedido, url: str = DEFAULT_URL, on_log=print, timeout: float = None,
+                   prioridad: str = 'normal') -> list:
+    """
+    Pide un reporte al servidor y sigue su progreso.
+
+    Args:
+        pedido: dict de parámetros, {"argv": [...]} o {"batch": spec}
+        url: URL del servidor
+        on_log: Función llamada con cada línea del log (None = descartar)
+        timeout: Segundos máximos sin recibir eventos (None = sin límite)
+        prioridad: 'alta', 'normal' o 'baja'
+
+    Returns:
+        Lista de reportes del evento 'fin' (reporte, ok, html_path, csv_paths, error)
+
+    Raises:
+        RuntimeError: Pedido rechazado, cancelado o que falló antes de generar los reportes
+    """
+    fin = None
+    with _http('POST', f"{url.rstrip('/')}/reportes", dict(pedido, prioridad=prioridad), timeout) as respuesta:
+        for linea in respuesta:
+            evento = json.loads(linea)
+            if on_log is not None:
+                if evento['evento'] == 'log':
+                    on_log(evento['linea'])
+                elif evento['evento'] == 'encolado' and evento['posicion'] > 1:
+                    on_log(f"[COLA] Job {evento['job']} en cola (posición {evento['posicion']})")
+                elif evento['evento'] == 'unido':
+                    on_log(f"[COLA] Pedido idéntico al job {evento['job']} ({evento['estado']}): se sigue ese job")
+            if evento['evento'] == 'fin':
+                fin = evento
+    if fin is None:
+        raise RuntimeError('El servidor cerró la conexión sin terminar el reporte')
+    if 'error' in fin:
+        raise RuntimeError(fin['error'])
+    return fin['reportes']
+
+
+def server_status(url: str = DEFAULT_URL) -> dict:
+    """Estado del servidor (GET /estado)."""
+    with _http('GET', f"{url.rstrip('/')}/estado", timeout=10) as respuesta:
+        return json.loads(respuesta.read())
+
+
+def list_jobs(url: str = DEFAULT_URL) -> dict:
+    """Jobs de la cola: en ejecución, pendientes y terminados recientes (GET /trabajos)."""
+    with _http('GET', f"{url.rstrip('/')}/trabajos", timeout=10) as respuesta:
+        return json.loads(respuesta.read())
+
+
+def cancel_job(job_id: int, url: str = DEFAULT_URL) -> dict:
+    """
+    Cancela un job pendiente (DELETE /trabajos/<id>).
+
+    Raises:
+        RuntimeError: Job inexistente o que ya no está pendiente
+    """
+    with _http('DELETE', f"{url.rstrip('/')}/trabajos/{job_id}", timeout=10) as respuesta:
+        return json.loads(respuesta.read())
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CLI
+# ══════════════════════════════════════════════════════════════════════════════
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Servidor local de reportes CR')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    p_serve = comandos.add_parser('serve', help='Levantar el servidor')
+    p_serve.add_argument('--host', default=DEFAULT_HOST, help=f'Dirección de escucha (default: {DEFAULT_HOST})')
+    p_serve.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Puerto (default: {DEFAULT_PORT})')
+    p_serve.add_argument('--no-cache', action='store_true', default=False,
+                         help='No usar la cache local de resultados de queries')
+    p_serve.add_argument('--cache-dir', default=None, help='Directorio de la cache local de queries')
+    p_serve.add_argument('--cache-max-gb', type=float, default=5.0,
+                         help='Tamaño máximo de la cache local en GB (default: 5)')
+    p_serve.add_argument('--workers', type=int, default=2,
+                         help='Reportes en ejecución simultánea (default: 2)')
+    p_serve.add_argument('--max-queries-por-worker', type=int, default=None,
+                         help='Queries simultáneas por reporte como máximo (default: --max-concurrent-queries del pedido)')
+
+    p_run = comandos.add_parser('run', help='Pedir un reporte (flags del generador después de --)')
+    p_run.add_argument('--url', default=DEFAULT_URL, help=f'URL del servidor (default: {DEFAULT_URL})')
+    p_run.add_argument('--batch', default=None, help='Spec de batch (YAML / JSON) en lugar de un reporte')
+    p_run.add_argument('--prioridad', choices=list(PRIORIDADES), default='normal',
+                       help='Prioridad en la cola del servidor (default: normal)')
+    p_run.add_argument('--no-esperar', action='store_true', default=False,
+                       help='Encolar el reporte y salir sin seguir su progreso')
+    p_run.add_argument('argv', nargs=argparse.REMAINDER, help='Flags del reporte')
+
+    p_estado = comandos.add_parser('estado', help='Estado del servidor')
+    p_estado.add_argument('--url', default=DEFAULT_URL, help=f'URL del servidor (default: {DEFAULT_URL})')
+
+    p_trabajos = comandos.add_parser('trabajos', help='Jobs en ejecución, pendientes y terminados')
+    p_trabajos.add_argument('--url', default=DEFAULT_URL, help=f'URL del servidor (default: {DEFAULT_URL})')
+
+    p_cancelar = comandos.add_parser('cancelar', help='Cancelar un job pendiente')
+    p_cancelar.add_argument('job', type=int, help='Id del job')
+    p_cancelar.add_argument('--url', default=DEFAULT_URL, help=f'URL del servidor (default: {DEFAULT_URL})')
+
+    # Los flags de backend solo se importan (con pandas) al levantar el servidor
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['serve']:
+        from utils.query_backend import add_backend_arguments
+        add_backend_arguments(p_serve)
+    args = parser.parse_args(argv)
+
+    if args.comando == 'estado':
+        print(json.dumps(server_status(args.url), indent=2, ensure_ascii=False))
+        return
+
+    if args.comando == 'trabajos':
+        cola = list_jobs(args.url)
+        for grupo in ('ejecutando', 'pendientes', 'terminados'):
+            print(f"{grupo.upper()} ({len(cola[grupo])})")
+            for job in cola[grupo]:
+                print(f"  #{job['id']:<4} {job['prioridad']:<6} {job['estado']:<10} {job['reporte']}")
+        return
+
+    if args.comando == 'cancelar':
+        try:
+            job = cancel_job(args.job, args.url)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        print(f"[OK] Job {job['id']} cancelado ({job['reporte']})")
+        return
+
+    if args.comando == 'run':
+        flags = [a for a in args.argv if a != '--']
+        if args.batch:
+            from utils.batch_reports import load_batch_spec
+            pedido = {'batch': load_batch_spec(args.batch), 'argv': flags}
+        else:
+            pedido = {'argv': flags}
+        try:
+            if args.no_esperar:
+                with _http('POST', f"{args.url.rstrip('/')}/reportes?esperar=0",
+                           dict(pedido, prioridad=args.prioridad), timeout=30) as respuesta:
+                    job = json.loads(respuesta.read())
+                accion = 'encolado' if job['nuevo'] else 'ya estaba en la cola'
+                print(f"[OK] Job {job['id']} {accion} ({job['reporte']}, posición {job['posicion']})")
+                return
+            reportes = request_report(pedido, args.url, prioridad=args.prioridad)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            sys.exit(1)
+        for reporte in reportes:
+            estado = 'OK' if reporte['ok'] else 'ERROR'
+            print(f"[{estado}] {reporte['reporte']}: {reporte.get('html_path') or reporte.get('error') or '(sin HTML)'}")
+        if not all(r['ok'] for r in reportes):
+            sys.exit(1)
+        return
+
+    # serve: backend, cache e imports del pipeline se inicializan una sola vez
+    from utils.query_backend import backend_from_args
+    from utils.query_cache import QueryCache, DEFAULT_CACHE_DIR
+    import utils.report_pipeline  # noqa: F401  (pandas, queries y HTML quedan cargados)
+
+    print(f"[INIT] Inicializando backend de queries ({args.backend})...")
+    backend = backend_from_args(args)
+    query_cache = None
+    if not args.no_cache:
+        query_cache = QueryCache(args.cache_dir or DEFAULT_CACHE_DIR,
+                                 max_bytes=int(args.cache_max_gb * 1024**3), namespace=backend.name)
+    serve(args.host, args.port, backend, query_cache, workers=args.workers,
+          max_queries_per_worker=args.max_queries_por_worker)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+RUN ARTIFACTS - Artefactos de cada corrida para re-renderizar sin queries
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Al guardar los CSVs (PASO 5), ReportPipeline guarda también
+             todo lo que necesita el HTML en {output_dir}/runs/{run_id}/:
+               run.json                  → parámetros, métricas, drivers,
+                                           eventos, feriados, queries y
+                                           estado de las conversaciones
+               weekly.parquet            → serie semanal
+               cuadro_{i}.parquet        → cuadros cuantitativos
+               dimension_{i}.parquet     → incoming de cada elemento de la
+                                           apertura (antes de la regla 80%)
+               conversaciones_{i}.parquet → conversaciones muestreadas
+
+             Con --rerender {run_id} el HTML completo (cards, gráfico,
+             cuadros, análisis comparativo y footer) se regenera desde estos
+             artefactos y los JSONs de análisis de output/, sin ejecutar
+             ninguna query. Parquet conserva los tipos (fechas de la serie
+             semanal, enteros de los cuadros) que un CSV perdería.
+
+             Con --rerender {run_id} --whatif-driver {driver_key} el reporte
+             se recalcula con un driver alternativo
+             (config/drivers_alternativos.py): solo se consulta el driver,
+             el incoming sale de los artefactos (ver
+             ReportPipeline.apply_driver).
+
+Uso:
+  python generar_reporte_cr_universal_v6.3.6.py --rerender mlb_pdd_202511_202512_20260210-153000
+  python generar_reporte_cr_universal_v6.3.6.py --rerender latest --open-report
+  python generar_reporte_cr_universal_v6.3.6.py --rerender latest --whatif-driver retiro_requests
+
+  from utils.run_artifacts import list_runs
+  list_runs('output')   # run_ids, del más reciente al más viejo
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.report_pipeline import ReportError
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUNS_DIR = 'runs'
+RUN_FILE = 'run.json'
+RUN_VERSION = 1
+
+# Atributos de ReportPipeline (JSON) que usan render_html y print_summary
+ESTADO_JSON = [
+    'aperturas_list', 'metrics_consolidadas', 'driver_config', 'driver_desc',
+    'eventos_comerciales', 'eventos_comerciales_p1', 'eventos_comerciales_p2',
+    'eventos_fuente', 'eventos_html', 'total_casos_correlacionados',
+    'feriados_data', 'feriados_html', 'queries_ejecutadas', 'conteos_distintos', 'fusionado_por_presupuesto',
+]
+
+
+def _json_default(valor):
+    """Tipos de numpy / pandas / fechas que json no serializa."""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, datetime, date)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def new_run_id(args) -> str:
+    """Id legible y ordenable: {site}_{commerce_group}[_{proceso}]_{p1}_{p2}_{timestamp}."""
+    partes = [args.site, args.commerce_group.replace(' ', '_')]
+    if args.process_name:
+        partes.append(args.process_name.replace(' ', '_').replace('-', ''))
+    partes += [args.p1_start[:7].replace('-', ''), args.p2_start[:7].replace('-', ''),
+               datetime.now().strftime('%Y%m%d-%H%M%S')]
+    return '_'.join(partes).lower()
+
+
+def runs_dir(output_dir) -> Path:
+    return Path(output_dir) / RUNS_DIR
+
+
+def list_runs(output_dir='output') -> list:
+    """run_ids guardados en output_dir, del más reciente al más viejo."""
+    directorio = runs_dir(output_dir)
+    if not directorio.exists():
+        return []
+    corridas = [d for d in directorio.iterdir() if (d / RUN_FILE).exists()]
+    return [d.name for d in sorted(corridas, key=lambda d: (d / RUN_FILE).stat().st_mtime, reverse=True)]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GUARDAR / CARGAR
+# ══════════════════════════════════════════════════════════════════════════════
+
+def save_run(pipeline) -> str:
+    """
+    Guarda los artefactos de una corrida (después de save_csvs).
+
+    Returns:
+        run_id
+    """
+    args = pipeline.args
+    run_id = pipeline.run_id or new_run_id(args)
+    directorio = runs_dir(args.output_dir) / run_id
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    pipeline.df_weekly.to_parquet(directorio / 'weekly.parquet', index=False)
+    cuadros = {}
+    for i, (dimension, df) in enumerate(pipeline.cuadros_cuantitativos.items()):
+        cuadros[dimension] = f'cuadro_{i}.parquet'
+        df.to_parquet(directorio / cuadros[dimension], index=False)
+    dimensiones = {}
+    for i, (dimension, df) in enumerate(pipeline.dimensiones_completas.items()):
+        dimensiones[dimension] = f'dimension_{i}.parquet'
+        df.to_parquet(directorio / dimensiones[dimension], index=False)
+
+    conversaciones = {}
+    for i, (elemento, data) in enumerate(pipeline.conversaciones_por_proceso.items()):
+        conversaciones[elemento] = {k: data[k] for k in ('status', 'casos_p1', 'casos_p2')}
+        if data['status'] == 'con_data':
+            conversaciones[elemento]['archivo'] = f'conversaciones_{i}.parquet'
+            data['df_all'].to_parquet(directorio / conversaciones[elemento]['archivo'], index=False)
+
+    corrida = {
+        'version': RUN_VERSION,
+        'run_id': run_id,
+        'creado': datetime.now().isoformat(timespec='seconds'),
+        'args': vars(args),
+        'estado': {nombre: getattr(pipeline, nombre) for nombre in ESTADO_JSON},
+        'cuadros': cuadros,
+        'dimensiones': dimensiones,
+        'conversaciones': conversaciones,
+        'csv_paths': [str(p) for p in pipeline.csv_paths],
+    }
+    # Escritura atómica: run.json marca la corrida como completa (ver list_runs)
+    tmp = directorio / f'{RUN_FILE}.tmp'
+    tmp.write_text(json.dumps(corrida, ensure_ascii=False, indent=2, default=_json_default), encoding='utf-8')
+    tmp.replace(directorio / RUN_FILE)
+    return run_id
+
+
+def load_run(run_id: str, output_dir='output') -> dict:
+    """
+    Artefactos de una corrida ('latest' = la más reciente de output_dir).
+
+    Returns:
+        dict de run.json con los DataFrames cargados: df_weekly, cuadros y
+        dimensiones {dimensión: DataFrame} y conversaciones {elemento: {..., df_all}}
+
+    Raises:
+        ReportError: Corrida inexistente o de una versión incompatible
+    """
+    disponibles = list_runs(output_dir)
+    if run_id == 'latest':
+        if not disponibles:
+            raise ReportError(f"No hay corridas guardadas en {runs_dir(output_dir)}")
+        run_id = disponibles[0]
+    directorio = runs_dir(output_dir) / run_id
+    if not (directorio / RUN_FILE).exists():
+        recientes = ', '.join(disponibles[:5]) or 'ninguna'
+        raise ReportError(f"Corrida '{run_id}' no encontrada en {runs_dir(output_dir)} (recientes: {recientes})")
+
+    corrida = json.loads((directorio / RUN_FILE).read_text(encoding='utf-8'))
+    if corrida.get('version') != RUN_VERSION:
+        raise ReportError(f"Corrida '{run_id}' guardada con otra versión de artefactos ({corrida.get('version')})")
+
+    corrida['df_weekly'] = pd.read_parquet(directorio / 'weekly.parquet')
+    corrida['cuadros'] = {dimension: pd.read_parquet(directorio / archivo)
+                          for dimension, archivo in corrida['cuadros'].items()}
+    # Corridas anteriores a --whatif-driver no guardaban las aperturas completas
+    corrida['dimensiones'] = {dimension: pd.read_parquet(directorio / archivo)
+                              for dimension, archivo in corrida.get('dimensiones', {}).items()}
+    for data in corrida['conversaciones'].values():
+        if 'archivo' in data:
+            data['df_all'] = pd.read_parquet(directorio / data.pop('archivo'))
+    return corrida
@@ -0,0 +1,201 @@
+"""
+══════════════════════════════════════════════════════════════════════════════
+STAGE CACHE - Memoización en disco de las etapas del reporte (DAG)
+══════════════════════════════════════════════════════════════════════════════
+Descripción: Las etapas de ReportPipeline forman un DAG (DAG_ETAPAS en
+             utils/report_pipeline.py): cada nodo declara los jobs de queries
+             que lee, los parámetros que usa y los nodos de los que depende.
+             La key de un nodo es el hash de esas entradas (SQL normalizado
+             de sus jobs, parámetros y keys de los nodos previos), así que se
+             conoce antes de ejecutar nada:
+
+               - Si el nodo está memoizado, sus salidas se restauran y sus
+                 queries ni se envían al scheduler.
+               - Cambiar --aperturas solo cambia el conjunto de nodos
+                 dimension:{APERTURA}: los que ya estaban se reutilizan y se
+                 calcula únicamente el nuevo.
+               - Si la corrida falla más adelante (conversaciones, análisis
+                 comparativo, HTML), al re-ejecutarla los nodos ya completados
+                 se retoman de la cache.
+
+Vigencia (TTL): la de las queries del nodo y de sus nodos previos (ver
+ttl_for en utils/query_cache.py): 30 días para períodos cerrados, horas para
+el mes en curso.
+
+Estructura:
+  {cache_dir}/{key[:2]}/{key}.pkl   → {'nodo', 'creado', 'ttl', 'salidas'}
+
+Uso:
+  from utils.stage_cache import StageCache, node_keys
+
+  cache = StageCache('.cache/stages')
+  claves = node_keys(nodos, sqls, namespace='bigquery')
+  salidas = cache.get(claves['weekly'][0])
+  if salidas is None:
+      salidas = calcular()
+      cache.put('weekly', *claves['weekly'], salidas)
+
+Version: 1.0
+Fecha: Febrero 2026
+══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+from utils.query_cache import TTL_DEFAULT, normalize_sql, ttl_for
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONSTANTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+DEFAULT_STAGE_CACHE_DIR = '.cache/stages'
+
+# Cambiar al modificar el cálculo de una etapa memoizada (invalida todas las entradas)
+STAGE_VERSION = 1
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# KEYS DEL DAG
+# ══════════════════════════════════════════════════════════════════════════════
+
+def node_keys(nodos: dict, sqls: dict, namespace: str = '') -> dict:
+    """
+    Key y TTL de cada nodo memoizable del DAG.
+
+    Args:
+        nodos: {nodo: {'jobs': [...], 'params': {...}, 'depende': [...]}}
+               (los jobs que no están en sqls no aplican a esta corrida)
+        sqls: {nombre de job: SQL} de la corrida
+        namespace: Separador de resultados (ej: backend de ejecución)
+
+    Returns:
+        {nodo: (key, ttl en segundos)}
+    """
+    claves = {}
+
+    def resolver(nodo, visitados=()):
+        if nodo in claves:
+            return claves[nodo]
+        if nodo in visitados:
+            raise ValueError(f"Ciclo en el DAG de etapas: {' → '.join(visitados + (nodo,))}")
+        definicion = nodos[nodo]
+        previos = {d: resolver(d, visitados + (nodo,)) for d in definicion.get('depende', [])}
+        jobs = {j: normalize_sql(sqls[j]) for j in definicion.get('jobs', []) if j in sqls}
+        entradas = {
+            'version': STAGE_VERSION,
+            'namespace': namespace,
+            'nodo': nodo,
+            'jobs': jobs,
+            'params': definicion.get('params', {}),
+            'depende': {d: key for d, (key, _) in previos.items()},
+        }
+        key = hashlib.sha256(json.dumps(entradas, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        ttls = [ttl_for(sqls[j]) for j in jobs] + [ttl for _, ttl in previos.values()]
+        claves[nodo] = (key, min(ttls, default=TTL_DEFAULT))
+        return claves[nodo]
+
+    for nodo in nodos:
+        resolver(nodo)
+    return claves
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class StageCache:
+    """
+    Cache en disco de las salidas de cada nodo del DAG de etapas.
+
+    Thread-safe: los reportes de un batch o de la cola del servidor la comparten.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_STAGE_CACHE_DIR, refresh: bool = False):
+        """
+        Args:
+            cache_dir: Directorio de la cache
+            refresh: Ignorar entradas existentes (se recalcula y se sobrescribe)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def _leer(self, key: str):
+        """Entrada vigente de la key o None (no existe, ilegible o vencida)."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                entrada = pickle.load(f)
+        except Exception as e:
+            print(f"[MEMO] Entrada ilegible {key[:12]}: {e}")
+            return None
+        if time.time() - entrada['creado'] > entrada['ttl']:
+            return None
+        return entrada
+
+    def contains(self, key: str) -> bool:
+        """Indica si hay una entrada vigente para el nodo (sin contarla como hit)."""
+        if self.refresh:
+            return False
+        return self._leer(key) is not None
+
+    def get(self, key: str):
+        """
+        Salidas memoizadas del nodo o None (no existe, vencida o refresh).
+
+        Args:
+            key: Key del nodo (ver node_keys)
+
+        Returns:
+            dict de salidas o None
+        """
+        with self._lock:
+            entrada = None if self.refresh else self._leer(key)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entrada['salidas']
+
+    def put(self, nodo: str, key: str, ttl: int, salidas: dict):
+        """
+        Guarda las salidas del nodo (escritura atómica: una corrida cortada no deja entradas a medias).
+
+        Args:
+            nodo: Nombre del nodo (metadata)
+            key: Key del nodo (ver node_keys)
+            ttl: Segundos de vigencia
+            salidas: Salidas del nodo (serializables con pickle)
+        """
+        path = self._path(key)
+        entrada = {'nodo': nodo, 'creado': time.time(), 'ttl': ttl, 'salidas': salidas}
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f'.tmp{threading.get_ident()}')
+            try:
+                with open(tmp, 'wb') as f:
+                    pickle.dump(entrada, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, path)
+            except Exception as e:
+                print(f"[MEMO] No se pudo guardar {nodo}: {e}")
+                tmp.unlink(missing_ok=True)
+
+    def clear(self):
+        """Elimina todas las entradas de la cache."""
+        with self._lock:
+            for path in self.cache_dir.glob('*/*.pkl'):
+                path.unlink(missing_ok=True)